@@ -16,8 +16,9 @@ import {
   fmtWeight,
   getFavorites,
   setFavorites,
+  loadImageAttribution,
 } from '@/lib/aircraft-data'
-import type { AircraftSortField } from '@/lib/aircraft-data'
+import type { AircraftSortField, ImageAttribution } from '@/lib/aircraft-data'
 
 // ─── ACN/PCN Panel ──────────────────────────────────────────
 
@@ -275,9 +276,19 @@ function AircraftDetailCard({
 }) {
   const [expanded, setExpanded] = useState(false)
   const [showAcn, setShowAcn] = useState(false)
+  const [attribution, setAttribution] = useState<ImageAttribution | null>(null)
 
   const isMilitary = ac.category === 'military'
 
+  // Photo credit lives in a separate lazily fetched file — only load it once a
+  // card with an image is opened.
+  useEffect(() => {
+    if (!expanded || !ac.image_url || attribution) return
+    let cancelled = false
+    loadImageAttribution(ac.aircraft).then(a => { if (!cancelled) setAttribution(a) })
+    return () => { cancelled = true }
+  }, [expanded, ac.image_url, ac.aircraft, attribution])
+
   return (
     <div
       className="card"
@@ -433,7 +444,7 @@ function AircraftDetailCard({
               }}
             >
               <Image
-                src={ac.image_url}
+                src={ac.image_card_url ?? ac.image_url}
                 alt={ac.aircraft}
                 fill
                 sizes="(max-width: 768px) 100vw, 400px"
@@ -441,6 +452,16 @@ function AircraftDetailCard({
               />
             </div>
           )}
+          {ac.image_url && attribution?.license && (
+            <div style={{ fontSize: 'var(--fs-xs)', color: 'var(--color-text-3)', marginTop: -10, marginBottom: 14 }}>
+              Photo:{' '}
+              {attribution.source_page ? (
+                <a href={attribution.source_page} target="_blank" rel="noopener noreferrer" style={{ color: 'inherit' }}>
+                  {attribution.license}
+                </a>
+              ) : attribution.license}
+            </div>
+          )}
 
           {/* Action Buttons */}
           <div style={{ display: 'flex', gap: 6, marginBottom: 14 }}>
@@ -10,7 +10,17 @@ import { baseDistanceUnit, fmtDistance } from '@/lib/distance-units'
 import { formatCoordsDMS } from '@/lib/utils'
 import { allAircraft } from '@/lib/aircraft-data'
 import type { AircraftCharacteristics } from '@/lib/aircraft_database_schema'
-import silhouetteManifest from '@/public/aircraft_silhouette_manifest.json'
+import { aircraftSilhouettePath } from '@/lib/aircraft-bundle'
+import {
+  decodeSilhouetteGeometry,
+  outlineToPath2D,
+  silhouetteLodId,
+  silhouetteLodTier,
+  type SilhouetteLodTier,
+  type SilhouetteOutline,
+} from '@/lib/silhouette-geometry'
+import commercialSilhouettes from '@/public/runtime/aircraft_silhouettes.commercial.json'
+import militarySilhouettes from '@/public/runtime/aircraft_silhouettes.military.json'
 import { NumberField } from '@/components/ui/number-field'
 import { HeadingSlider } from '@/components/ui/heading-slider'
 import {
@@ -81,9 +91,18 @@ import {
 
 // ── Silhouette manifest lookup ──
 
-const manifest = silhouetteManifest as Record<string, { base_name: string; path: string; filename: string }>
+// Compact runtime maps (base name → SVG filename) from scripts/asset_runtime.py
+const manifest: Record<string, { base_name: string; path: string }> = {}
+for (const [base, filename] of Object.entries({ ...militarySilhouettes, ...commercialSilhouettes } as Record<string, string>)) {
+  manifest[base] = { base_name: base, path: `/aircraft_silhouettes/${filename}` }
+}
 
 function findSilhouettePath(aircraftName: string): string | null {
+  // Joined on the library's base name at build time (scripts/build_aircraft_bundle.py);
+  // the fuzzy matching below only runs for names the bundle doesn't know
+  const bundled = aircraftSilhouettePath(aircraftName)
+  if (bundled) return bundled
+
   const normalize = (s: string) => s.replace(/[-\s_]/g, '').toLowerCase()
   const entries = Object.entries(manifest)
 
@@ -187,6 +206,52 @@ async function loadSvgElement(path: string): Promise<SVGElement | null> {
   }
 }
 
+// Whole silhouette library in one file (generate_aircraft_silhouettes.py --sprite).
+// Each <symbol id="ac-<file stem>"> already has a viewBox tightened to its
+// content, so symbols skip tightenSvgViewBox(). No sprite → per-file fetches.
+const SPRITE_PATH = '/aircraft_silhouettes/sprite.svg'
+let spriteRequest: Promise<Document | null> | null = null
+
+/** "/aircraft_silhouettes/c130.svg" → "c130" (sprite and geometry ids) */
+function silhouetteFileStem(path: string): string {
+  return path.slice(path.lastIndexOf('/') + 1).replace(/\.svg$/, '')
+}
+
+async function loadSpriteSymbol(path: string): Promise<SVGElement | null> {
+  if (!spriteRequest) {
+    spriteRequest = fetch(SPRITE_PATH)
+      .then(res => (res.ok ? res.text() : null))
+      .then(text => (text ? new DOMParser().parseFromString(text, 'image/svg+xml') : null))
+      .catch(() => null)
+  }
+  const doc = await spriteRequest
+  const id = 'ac-' + silhouetteFileStem(path)
+  const symbol = doc?.querySelector(`symbol[id="${id}"]`)
+  if (!symbol) return null
+  const svg = document.createElementNS('http://www.w3.org/2000/svg', 'svg')
+  svg.setAttribute('viewBox', symbol.getAttribute('viewBox') || '0 0 80 80')
+  symbol.childNodes.forEach(child => svg.appendChild(child.cloneNode(true)))
+  return svg
+}
+
+// Quantized outlines of the whole library (scripts/asset_geometry.py), drawn
+// straight to canvas via Path2D — no SVG serialize → Image decode round trip.
+// Missing/undecodable file → sprite/SVG rendering below.
+const GEOMETRY_PATH = '/aircraft_silhouettes/geometry.bin'
+let geometryRequest: Promise<Map<string, SilhouetteOutline> | null> | null = null
+
+async function loadSilhouetteOutline(path: string, tier: SilhouetteLodTier): Promise<SilhouetteOutline | null> {
+  if (!geometryRequest) {
+    geometryRequest = fetch(GEOMETRY_PATH)
+      .then(res => (res.ok ? res.arrayBuffer() : null))
+      .then(buf => (buf ? decodeSilhouetteGeometry(buf) : null))
+      .catch(() => null)
+  }
+  const outlines = await geometryRequest
+  const id = silhouetteFileStem(path)
+  return outlines?.get(silhouetteLodId(id, tier)) ?? outlines?.get(id) ?? null
+}
+
 // Fixed reference size for SVG rendering — marker icon scaling handles display size
 const REF_ICON_SIZE = 256
 
@@ -237,22 +302,18 @@ function tightenSvgViewBox(svg: SVGElement): SVGElement {
   return clone
 }
 
-/** Render an SVG silhouette to a fixed-size canvas image.
+/** Render an SVG silhouette to a fixed-size canvas image, using the outline
+ *  detail of `tier` (see markerLodTier) when the geometry file is available.
  *  Scaling to real-world size is handled by icon-size in the symbol layer. */
 async function renderSilhouetteImage(
   aircraftName: string,
   wingspanFt: number,
   lengthFt: number,
+  tier: SilhouetteLodTier,
 ): Promise<{ imageData: ImageData; width: number; height: number } | null> {
   const svgPath = findSilhouettePath(aircraftName)
   if (!svgPath) return null
 
-  const svg = await loadSvgElement(svgPath)
-  if (!svg) return null
-
-  // Tighten viewBox so aircraft fills the image (SVGs share a fixed 80×80 viewBox)
-  const tightSvg = tightenSvgViewBox(svg)
-
   // Render to a fixed canvas — aspect ratio from aircraft dimensions
   const aspect = lengthFt / wingspanFt
   let w: number, h: number
@@ -270,6 +331,38 @@ async function renderSilhouetteImage(
   canvas.height = h + padding * 2
   const ctx = canvas.getContext('2d')!
 
+  const outline = await loadSilhouetteOutline(svgPath, tier)
+  if (outline) {
+    // Same framing as the SVG path: content bbox + 0.5-unit pad, stretched to w×h
+    const [minX, minY, maxX, maxY] = outline.bbox
+    const pad = 0.5
+    const scaleX = w / (maxX - minX + pad * 2)
+    const scaleY = h / (maxY - minY + pad * 2)
+    ctx.filter = 'drop-shadow(0px 0px 2px rgba(0,0,0,0.8))'
+    ctx.translate(padding, padding)
+    ctx.scale(scaleX, scaleY)
+    ctx.translate(pad - minX, pad - minY)
+    const path = outlineToPath2D(outline)
+    ctx.fillStyle = '#E0E7FF'
+    ctx.fill(path)
+    // Same colours as the recoloured SVG below: light fill, dark 1px outline
+    ctx.strokeStyle = '#1E293B'
+    ctx.lineWidth = 1 / Math.min(scaleX, scaleY)
+    ctx.stroke(path)
+    ctx.setTransform(1, 0, 0, 1, 0, 0)
+    ctx.filter = 'none'
+    const imageData = ctx.getImageData(0, 0, canvas.width, canvas.height)
+    return { imageData, width: canvas.width, height: canvas.height }
+  }
+
+  const symbol = await loadSpriteSymbol(svgPath)
+  const svg = symbol ?? await loadSvgElement(svgPath)
+  if (!svg) return null
+
+  // Tighten viewBox so aircraft fills the image (SVGs share a fixed 80×80 viewBox;
+  // sprite symbols are pre-tightened)
+  const tightSvg = symbol ?? tightenSvgViewBox(svg)
+
   const svgMarkup = new XMLSerializer().serializeToString(tightSvg)
   const recolored = svgMarkup
     .replace(/fill="[^"]*"/g, 'fill="#E0E7FF"')
@@ -315,8 +408,9 @@ async function buildBaseSilhouetteCanvas(
   aircraftName: string,
   wingspanFt: number,
   lengthFt: number,
+  tier: SilhouetteLodTier,
 ): Promise<HTMLCanvasElement> {
-  const result = await renderSilhouetteImage(aircraftName, wingspanFt, lengthFt)
+  const result = await renderSilhouetteImage(aircraftName, wingspanFt, lengthFt, tier)
   const imgData = result || renderFallbackIcon()
   const fixedDim = Math.max(imgData.width, imgData.height) + 16
   const canvas = document.createElement('canvas')
@@ -419,6 +513,18 @@ function computeIconScale(wingspanFt: number, lengthFt: number, gmap: google.map
   return Math.max(0.02, Math.min((targetPx / svgDrawW) * 1.03, 4.0))
 }
 
+/** Outline detail for a marker drawn at `iconScale`: the REF_ICON_SIZE image's
+ *  longest side is REF_ICON_SIZE × iconScale pixels on screen, so zoomed-out
+ *  markers get the coarse tier and close-ups the full outline. */
+function markerLodTier(iconScale: number): SilhouetteLodTier {
+  return silhouetteLodTier(REF_ICON_SIZE * iconScale)
+}
+
+/** Base canvas cache key — one canvas per aircraft type and LOD tier */
+function baseCanvasKey(aircraftName: string | null | undefined, wingspanFt: number, lengthFt: number, tier: SilhouetteLodTier): string {
+  return `${aircraftName || '__fallback'}-${wingspanFt}-${lengthFt}@${tier}`
+}
+
 // ── Main Page ──
 
 export default function ParkingPage() {
@@ -661,15 +767,18 @@ export default function ParkingPage() {
   const ruler = useGoogleMapRuler(gmapRawRef, rulerActive)
   const spotMarkersMapRef = useRef<Map<string, google.maps.Marker>>(new Map())
   // Per-spot metadata for zoom rescaling (avoids full re-render)
-  const spotMetaRef = useRef<Map<string, { fixedDim: number; wingspanFt: number; lengthFt: number; cacheKey: string }>>(new Map())
+  const spotMetaRef = useRef<Map<string, {
+    fixedDim: number; wingspanFt: number; lengthFt: number; cacheKey: string
+    aircraftName: string; heading: number; tier: SilhouetteLodTier
+  }>>(new Map())
   // Selection ring — managed separately from main render
   const selectionRingRef = useRef<google.maps.Circle | null>(null)
   // Cache rotated silhouette data URLs to avoid re-rendering on every zoom change
   const silhouetteCacheRef = useRef<Map<string, { url: string; fixedDim: number; heading: number }>>(new Map())
-  // Cache the un-rotated, padded base canvas per aircraft type. Used by
-  // imperativeRotateSpot to spin the icon synchronously during slider drag
-  // (bypassing the React → map effect → async SVG re-render chain).
-  // Key: `${aircraftName}-${wingspanFt}-${lengthFt}`.
+  // Cache the un-rotated, padded base canvas per aircraft type and LOD tier.
+  // Used by imperativeRotateSpot to spin the icon synchronously during slider
+  // drag (bypassing the React → map effect → async SVG re-render chain).
+  // Key: baseCanvasKey().
   const baseSilhouetteCanvasRef = useRef<Map<string, HTMLCanvasElement>>(new Map())
   // Nose gear markers — managed with aircraft layer
   const noseGearMarkersRef = useRef<google.maps.Marker[]>([])
@@ -717,12 +826,12 @@ export default function ParkingPage() {
     if (!spot) return false
     const marker = spotMarkersMapRef.current.get(spotId)
     if (!marker) return false
-    const baseKey = `${spot.aircraft_name || '__fallback'}-${spot.wingspan_ft}-${spot.length_ft}`
-    const baseCanvas = baseSilhouetteCanvasRef.current.get(baseKey)
+    const iconScale = computeIconScale(spot.wingspan_ft, spot.length_ft, w.gmap)
+    const tier = markerLodTier(iconScale)
+    const baseCanvas = baseSilhouetteCanvasRef.current.get(baseCanvasKey(spot.aircraft_name, spot.wingspan_ft, spot.length_ft, tier))
     if (!baseCanvas) return false
     const effective = ((headingDeg - mapHeadingDegRef.current + 360) % 360)
     const { url, fixedDim } = rotateBaseCanvas(baseCanvas, effective)
-    const iconScale = computeIconScale(spot.wingspan_ft, spot.length_ft, w.gmap)
     const displayDim = Math.min(800, Math.max(8, Math.round(fixedDim * iconScale)))
     marker.setIcon({
       url,
@@ -1293,8 +1402,8 @@ export default function ParkingPage() {
         return prev != null && prev.name === (s.aircraft_name || '')
       })
     const allBasesCached = sameSet && spotsWithAircraft.every(s => {
-      const baseKey = `${s.aircraft_name || '__fallback'}-${s.wingspan_ft}-${s.length_ft}`
-      return baseSilhouetteCanvasRef.current.has(baseKey)
+      const tier = markerLodTier(computeIconScale(s.wingspan_ft, s.length_ft, gmap))
+      return baseSilhouetteCanvasRef.current.has(baseCanvasKey(s.aircraft_name, s.wingspan_ft, s.length_ft, tier))
     })
 
     if (allBasesCached && spotMarkersMapRef.current.size > 0) {
@@ -1316,18 +1425,21 @@ export default function ParkingPage() {
         if (prev && prev.heading !== effective) {
           // Heading changed — re-rotate the cached base canvas and swap the
           // marker's icon in place. No async work, no marker re-creation.
-          const baseKey = `${spot.aircraft_name || '__fallback'}-${spot.wingspan_ft}-${spot.length_ft}`
-          const baseCanvas = baseSilhouetteCanvasRef.current.get(baseKey)!
-          const { url, fixedDim } = rotateBaseCanvas(baseCanvas, effective)
           const iconScale = computeIconScale(spot.wingspan_ft, spot.length_ft, gmap)
+          const tier = markerLodTier(iconScale)
+          const baseCanvas = baseSilhouetteCanvasRef.current.get(baseCanvasKey(spot.aircraft_name, spot.wingspan_ft, spot.length_ft, tier))!
+          const { url, fixedDim } = rotateBaseCanvas(baseCanvas, effective)
           const displayDim = Math.min(800, Math.max(8, Math.round(fixedDim * iconScale)))
           marker.setIcon({
             url,
             scaledSize: new google.maps.Size(displayDim, displayDim),
             anchor: new google.maps.Point(displayDim / 2, displayDim / 2),
           } as google.maps.Icon)
-          const cacheKey = `${spot.id}-${effective}`
-          spotMetaRef.current.set(spot.id, { fixedDim, wingspanFt: spot.wingspan_ft, lengthFt: spot.length_ft, cacheKey })
+          const cacheKey = `${spot.id}-${effective}@${tier}`
+          spotMetaRef.current.set(spot.id, {
+            fixedDim, wingspanFt: spot.wingspan_ft, lengthFt: spot.length_ft, cacheKey,
+            aircraftName: spot.aircraft_name || '', heading: effective, tier,
+          })
           if (!silhouetteCacheRef.current.has(cacheKey)) {
             silhouetteCacheRef.current.set(cacheKey, { url, fixedDim, heading: effective })
           }
@@ -1365,18 +1477,19 @@ export default function ParkingPage() {
         // Google Maps applies map.heading on top of our pre-rotated canvas,
         // so subtracting it here cancels out and the icon stays screen-fixed.
         const effectiveHeading = ((spot.heading_deg || 0) - mapHeadingDeg + 360) % 360
-        const cacheKey = `${spot.id}-${Math.round(effectiveHeading)}`
 
         // Use computeIconScale — same formula that worked in Mapbox
         const iconScale = computeIconScale(spot.wingspan_ft, spot.length_ft, gmap)
+        const tier = markerLodTier(iconScale)
+        const cacheKey = `${spot.id}-${Math.round(effectiveHeading)}@${tier}`
 
-        // Get or build the un-rotated base canvas for this aircraft type.
-        // Shared across all spots of the same aircraft so the heavy SVG
-        // render only runs once per type, not once per spot.
-        const baseKey = `${spot.aircraft_name || '__fallback'}-${spot.wingspan_ft}-${spot.length_ft}`
+        // Get or build the un-rotated base canvas for this aircraft type at
+        // this tier. Shared across all spots of the same aircraft so the heavy
+        // SVG render only runs once per type and tier, not once per spot.
+        const baseKey = baseCanvasKey(spot.aircraft_name, spot.wingspan_ft, spot.length_ft, tier)
         let baseCanvas = baseSilhouetteCanvasRef.current.get(baseKey)
         if (!baseCanvas) {
-          baseCanvas = await buildBaseSilhouetteCanvas(spot.aircraft_name || '', spot.wingspan_ft, spot.length_ft)
+          baseCanvas = await buildBaseSilhouetteCanvas(spot.aircraft_name || '', spot.wingspan_ft, spot.length_ft, tier)
           baseSilhouetteCanvasRef.current.set(baseKey, baseCanvas)
         }
         if (renderCancelRef.current !== renderToken) return
@@ -1411,7 +1524,10 @@ export default function ParkingPage() {
           } : undefined,
         })
         spotMarkersMapRef.current.set(spot.id, marker)
-        spotMetaRef.current.set(spot.id, { fixedDim: cached.fixedDim, wingspanFt: spot.wingspan_ft, lengthFt: spot.length_ft, cacheKey })
+        spotMetaRef.current.set(spot.id, {
+          fixedDim: cached.fixedDim, wingspanFt: spot.wingspan_ft, lengthFt: spot.length_ft, cacheKey,
+          aircraftName: spot.aircraft_name || '', heading: effectiveHeading, tier,
+        })
         w.featureIndex.set(`spot-${spot.id}`, { lat: c.lat, lng: c.lon, type: 'aircraft', props: { spotId: spot.id, heading: spot.heading_deg } })
         renderedSpotsRef.current.set(spot.id, { lat: spot.latitude, lng: spot.longitude, heading: Math.round(effectiveHeading), name: spot.aircraft_name || '' })
       }
@@ -1433,12 +1549,44 @@ export default function ParkingPage() {
 
   // ── Layer 3: Zoom rescaling — fires on 'idle' (after zoom animation settles),
   // not on 'zoom_changed' (which fires during animation and causes flicker).
+  // A marker whose on-screen size crosses an LOD tier boundary switches to
+  // that tier's base canvas, built once per aircraft type and tier.
   useEffect(() => {
     const w = map.current
     if (!w || !mapLoaded) return
     const gmap = w.gmap
     let lastZoom = gmap.getZoom() ?? 15
 
+    const switchTier = async (spotId: string, marker: google.maps.Marker, tier: SilhouetteLodTier) => {
+      const meta = spotMetaRef.current.get(spotId)!
+      const baseKey = baseCanvasKey(meta.aircraftName, meta.wingspanFt, meta.lengthFt, tier)
+      let baseCanvas = baseSilhouetteCanvasRef.current.get(baseKey)
+      if (!baseCanvas) {
+        baseCanvas = await buildBaseSilhouetteCanvas(meta.aircraftName, meta.wingspanFt, meta.lengthFt, tier)
+        baseSilhouetteCanvasRef.current.set(baseKey, baseCanvas)
+      }
+      // Skip if the marker was rebuilt, or zoomed into another tier, meanwhile
+      const current = spotMetaRef.current.get(spotId)
+      if (!current || spotMarkersMapRef.current.get(spotId) !== marker) return
+      const iconScale = computeIconScale(current.wingspanFt, current.lengthFt, gmap)
+      if (markerLodTier(iconScale) !== tier) return
+
+      const cacheKey = `${spotId}-${Math.round(current.heading)}@${tier}`
+      let cached = silhouetteCacheRef.current.get(cacheKey)
+      if (!cached) {
+        const { url, fixedDim } = rotateBaseCanvas(baseCanvas, current.heading)
+        cached = { url, fixedDim, heading: current.heading }
+        silhouetteCacheRef.current.set(cacheKey, cached)
+      }
+      spotMetaRef.current.set(spotId, { ...current, fixedDim: cached.fixedDim, cacheKey, tier })
+      const displayDim = Math.min(800, Math.max(8, Math.round(cached.fixedDim * iconScale)))
+      marker.setIcon({
+        url: cached.url,
+        scaledSize: new google.maps.Size(displayDim, displayDim),
+        anchor: new google.maps.Point(displayDim / 2, displayDim / 2),
+      } as google.maps.Icon)
+    }
+
     const onIdle = () => {
       const zoom = gmap.getZoom() ?? 15
       if (zoom === lastZoom) return // pan-only — no rescale needed
@@ -1447,10 +1595,15 @@ export default function ParkingPage() {
       spotMetaRef.current.forEach((meta, spotId) => {
         const marker = spotMarkersMapRef.current.get(spotId)
         if (!marker) return
+        const iconScale = computeIconScale(meta.wingspanFt, meta.lengthFt, gmap)
+        const tier = markerLodTier(iconScale)
+        if (tier !== meta.tier) {
+          void switchTier(spotId, marker, tier)
+          return
+        }
         const cached = silhouetteCacheRef.current.get(meta.cacheKey)
         if (!cached) return
 
-        const iconScale = computeIconScale(meta.wingspanFt, meta.lengthFt, gmap)
         const displayDim = Math.min(800, Math.max(8, Math.round(meta.fixedDim * iconScale)))
 
         marker.setIcon({
@@ -0,0 +1,75 @@
+// Reader for /runtime/aircraft_bundle.json — the pre-joined, columnar aircraft
+// dataset written by scripts/build_aircraft_bundle.py (layout documented there).
+// Numbers are already parsed and validated, and each aircraft's photo and
+// silhouette are resolved at build time, so nothing here parses display
+// strings or matches names. It is the only copy of the aircraft data the
+// client imports: bundledAircraft() rebuilds the rows from its columns.
+
+import type { AircraftCharacteristics } from './aircraft_database_schema'
+import bundleJson from '../public/runtime/aircraft_bundle.json'
+
+type NumericColumn = { scale: number; values: (number | null)[] }
+
+type AircraftBundle = {
+  v: number
+  names: string[]
+  strings: string[]
+  text: Record<string, number[]>
+  num: Record<string, NumericColumn>
+}
+
+const bundle = bundleJson as AircraftBundle
+const rowByName = new Map(bundle.names.map((name, i) => [name, i]))
+
+function text(name: string, column: string): string | undefined {
+  const row = rowByName.get(name)
+  const index = row === undefined ? -1 : bundle.text[column]?.[row] ?? -1
+  return index >= 0 ? bundle.strings[index] : undefined
+}
+
+/** Parsed value of a numeric field ("wing_span_ft", "acn.max_wt", …), or undefined if the aircraft has none */
+export function aircraftNumber(name: string, field: string): number | undefined {
+  const row = rowByName.get(name)
+  const column = bundle.num[field]
+  const value = row === undefined || !column ? null : column.values[row]
+  return value === null || value === undefined ? undefined : value / 10 ** column.scale
+}
+
+/** "/aircraft_silhouettes/<file>.svg", joined on the silhouette library's base name */
+export function aircraftSilhouettePath(name: string): string | undefined {
+  return text(name, 'silhouette')
+}
+
+// Bundle text columns under another AircraftCharacteristics field (null: not a field)
+const TEXT_FIELDS: Record<string, string | null> = {
+  image: 'image_url', // "/aircraft_images/<category>/<file>"
+  image_card: 'image_card_url', // 16:9 subject-aware crop (scripts/asset_crop.py)
+  base: null,
+  silhouette: null, // see aircraftSilhouettePath()
+}
+
+/**
+ * Every aircraft, in bundle order: military, then commercial, each A–Z. Fields
+ * are the source JSON's display strings, kept verbatim in the string table;
+ * the fixed-point columns are for aircraftNumber() (sorting) only.
+ */
+export function bundledAircraft(): AircraftCharacteristics[] {
+  const sourcePage = bundle.num.source_page
+  return bundle.names.map((name, row) => {
+    const ac: Record<string, unknown> = { aircraft: name }
+    const acn: Record<string, string> = {}
+    for (const [column, indices] of Object.entries(bundle.text)) {
+      if (indices[row] < 0) continue
+      const value = bundle.strings[indices[row]]
+      if (column.startsWith('acn.')) acn[column.slice('acn.'.length)] = value
+      else {
+        const field = column in TEXT_FIELDS ? TEXT_FIELDS[column] : column
+        if (field) ac[field] = value
+      }
+    }
+    if (Object.keys(acn).length) ac.acn = acn
+    const page = sourcePage?.values[row]
+    if (page !== null && page !== undefined) ac.source_page = page / 10 ** sourcePage.scale
+    return ac as unknown as AircraftCharacteristics
+  })
+}
@@ -2,30 +2,39 @@
 // Sources: USACE TSC 13-2 (Military) & TSC 13-3 (Commercial)
 
 import type { AircraftCharacteristics } from './aircraft_database_schema'
-import commercialRaw from '../public/commercial_aircraft.json'
-import militaryRaw from '../public/military_aircraft.json'
-import imageManifest from '../public/image_manifest.json'
-
-// Resolve image URL from manifest by aircraft name
-const manifest = imageManifest as Record<string, { filename: string }>
-
-function withImage(ac: AircraftCharacteristics): AircraftCharacteristics {
-  const entry = manifest[ac.aircraft]
-  return entry ? { ...ac, image_url: `/aircraft_images/${entry.filename}` } : ac
+import { aircraftNumber, bundledAircraft } from './aircraft-bundle'
+
+// Image attribution — fetched once, on first use
+export type ImageAttribution = { source_url?: string; source_page?: string; license?: string }
+
+type AttributionRow = { u?: string; p?: string; l?: string }
+let attributionRequest: Promise<Record<string, AttributionRow>> | null = null
+
+export async function loadImageAttribution(aircraft: string): Promise<ImageAttribution | null> {
+  if (!attributionRequest) {
+    attributionRequest = fetch('/runtime/aircraft_images.attribution.json')
+      .then(res => (res.ok ? res.json() : {}))
+      .catch(() => {
+        attributionRequest = null // retry on the next call (e.g. back online)
+        return {}
+      })
+  }
+  const row = (await attributionRequest)[aircraft]
+  return row ? { source_url: row.u, source_page: row.p, license: row.l } : null
 }
 
-// Merge and tag both datasets — military first, then commercial, each sorted A–Z
-const allAircraft: AircraftCharacteristics[] = [
-  ...(militaryRaw as AircraftCharacteristics[]).map(a => withImage({ ...a, category: 'military' })).sort((a, b) => a.aircraft.localeCompare(b.aircraft)),
-  ...(commercialRaw as AircraftCharacteristics[]).map(a => withImage({ ...a, category: 'commercial' })).sort((a, b) => a.aircraft.localeCompare(b.aircraft)),
-]
+// Both datasets, tagged, merged and sorted (military first, then commercial,
+// each A–Z) at build time by scripts/build_aircraft_bundle.py, image URLs
+// included; source and license details stay out of the bundle — see
+// loadImageAttribution().
+const allAircraft: AircraftCharacteristics[] = bundledAircraft()
 
 export { allAircraft }
 
 export const AIRCRAFT_COUNT = {
   total: allAircraft.length,
-  commercial: commercialRaw.length,
-  military: militaryRaw.length,
+  commercial: allAircraft.filter(a => a.category === 'commercial').length,
+  military: allAircraft.filter(a => a.category === 'military').length,
 }
 
 // Get unique manufacturers sorted
@@ -45,19 +54,19 @@ export const SORT_OPTIONS: { value: AircraftSortField; label: string }[] = [
   { value: 'turn_radius', label: 'Turn Radius' },
 ]
 
-function parseNum(v: string | undefined): number {
-  if (!v) return 0
-  return parseFloat(v.replace(/,/g, '')) || 0
+// Pre-parsed bundle value; 0 where the aircraft has none
+function numberOf(ac: AircraftCharacteristics, field: 'wing_span_ft' | 'length_ft' | 'max_to_wt_klbs' | 'turn_radius_ft'): number {
+  return aircraftNumber(ac.aircraft, field) ?? 0
 }
 
 export function getSortValue(ac: AircraftCharacteristics, field: AircraftSortField): string | number {
   switch (field) {
     case 'name': return ac.aircraft
     case 'manufacturer': return ac.manufacturer || ''
-    case 'wingspan': return parseNum(ac.wing_span_ft)
-    case 'length': return parseNum(ac.length_ft)
-    case 'max_weight': return parseNum(ac.max_to_wt_klbs)
-    case 'turn_radius': return parseNum(ac.turn_radius_ft)
+    case 'wingspan': return numberOf(ac, 'wing_span_ft')
+    case 'length': return numberOf(ac, 'length_ft')
+    case 'max_weight': return numberOf(ac, 'max_to_wt_klbs')
+    case 'turn_radius': return numberOf(ac, 'turn_radius_ft')
   }
 }
 
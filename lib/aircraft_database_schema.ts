@@ -141,6 +141,8 @@ export interface AircraftCharacteristics {
   // === IMAGE ===
   /** Path to aircraft image relative to /public (e.g. "/aircraft_images/military/C-17A_Globemaster_III.jpg") */
   image_url?: string;
+  /** 16:9 crop of image_url placed on the aircraft (scripts/asset_crop.py), for the detail card */
+  image_card_url?: string;
 
   // === METADATA ===
   /** Source PDF page number */
@@ -0,0 +1,104 @@
+// Decoder for /aircraft_silhouettes/geometry.bin — quantized, delta-encoded
+// silhouette outlines written by scripts/asset_geometry.py (layout documented
+// there). Decodes straight to Float32Array rings for Path2D or WebGL buffers.
+//
+// Besides the full outline "<id>", each shape carries simplified LOD tiers
+// "<id>@coarse" / "<id>@medium" sized for small markers; pick one for a
+// marker's on-screen size with silhouetteLodTier() / silhouetteLodId().
+
+export type SilhouetteOutline = {
+  /** Closed rings as flat [x0, y0, x1, y1, …] arrays in SVG units */
+  rings: Float32Array[]
+  /** [minX, minY, maxX, maxY] over all rings */
+  bbox: [number, number, number, number]
+}
+
+const MAGIC = 0x31474c53 // "SLG1" read as little-endian u32
+const VERSION = 1
+const HEADER_BYTES = 20
+const INDEX_BYTES = 20
+
+/** Largest on-screen size (px) each tier is built for — LOD_TIERS in asset_geometry.py */
+export const SILHOUETTE_LOD_TIERS = [
+  ['coarse', 24],
+  ['medium', 96],
+] as const
+
+export type SilhouetteLodTier = (typeof SILHOUETTE_LOD_TIERS)[number][0] | 'full'
+
+/** Tier to draw at `sizePx` (longest side on screen): the coarsest that holds up */
+export function silhouetteLodTier(sizePx: number): SilhouetteLodTier {
+  for (const [tier, maxPx] of SILHOUETTE_LOD_TIERS) {
+    if (sizePx <= maxPx) return tier
+  }
+  return 'full'
+}
+
+/** Shape id of `id` at `tier` (a tier name, or a size in px for silhouetteLodTier) */
+export function silhouetteLodId(id: string, tier: SilhouetteLodTier | number): string {
+  const name = typeof tier === 'number' ? silhouetteLodTier(tier) : tier
+  return name === 'full' ? id : `${id}@${name}`
+}
+
+export function decodeSilhouetteGeometry(buffer: ArrayBuffer): Map<string, SilhouetteOutline> {
+  const view = new DataView(buffer)
+  if (view.getUint32(0, true) !== MAGIC || view.getUint16(4, true) !== VERSION) {
+    throw new Error('Unsupported silhouette geometry file')
+  }
+  const count = view.getUint16(6, true)
+  const dataLength = view.getUint32(12, true)
+  const namesLength = view.getUint32(16, true)
+  const dataStart = HEADER_BYTES + INDEX_BYTES * count
+  const data = new Int16Array(buffer, dataStart, dataLength)
+  const names = new TextDecoder()
+    .decode(new Uint8Array(buffer, dataStart + dataLength * 2, namesLength))
+    .split('\n')
+
+  const outlines = new Map<string, SilhouetteOutline>()
+  for (let i = 0; i < count; i++) {
+    const at = HEADER_BYTES + INDEX_BYTES * i
+    const x0 = view.getFloat32(at, true)
+    const y0 = view.getFloat32(at + 4, true)
+    const step = view.getFloat32(at + 8, true)
+    let pos = view.getUint32(at + 12, true)
+    const ringCount = view.getUint16(at + 16, true)
+
+    const rings: Float32Array[] = []
+    let qMinX = Infinity, qMinY = Infinity, qMaxX = -Infinity, qMaxY = -Infinity
+    for (let r = 0; r < ringCount; r++) {
+      const n = data[pos]
+      const ring = new Float32Array(n * 2)
+      let qx = data[pos + 1]
+      let qy = data[pos + 2]
+      for (let k = 0; k < n; k++) {
+        if (k > 0) {
+          qx += data[pos + 1 + 2 * k]
+          qy += data[pos + 2 + 2 * k]
+        }
+        ring[2 * k] = x0 + qx * step
+        ring[2 * k + 1] = y0 + qy * step
+        if (qx < qMinX) qMinX = qx
+        if (qx > qMaxX) qMaxX = qx
+        if (qy < qMinY) qMinY = qy
+        if (qy > qMaxY) qMaxY = qy
+      }
+      rings.push(ring)
+      pos += 1 + 2 * n
+    }
+    outlines.set(names[i], {
+      rings,
+      bbox: [x0 + qMinX * step, y0 + qMinY * step, x0 + qMaxX * step, y0 + qMaxY * step],
+    })
+  }
+  return outlines
+}
+
+export function outlineToPath2D(outline: SilhouetteOutline): Path2D {
+  const path = new Path2D()
+  for (const ring of outline.rings) {
+    path.moveTo(ring[0], ring[1])
+    for (let k = 2; k < ring.length; k += 2) path.lineTo(ring[k], ring[k + 1])
+    path.closePath()
+  }
+  return path
+}
@@ -6,8 +6,10 @@
 // All images are public domain (U.S. Government work)
 //
 // Offline images: run `python scripts/scrape_wildlife_images.py` to download
-// all species photos to /public/wildlife_images/. The resolveWildlifeImage()
-// function will prefer the local path when available.
+// all species photos to /public/wildlife_images/. The scraper reads this
+// table (scripts/asset_species.py), so adding, renaming or removing a species
+// here is all it takes. The resolveWildlifeImage() function will prefer the
+// local path when available.
 
 export type WildlifeSpecies = {
   common_name: string
@@ -22,10 +24,11 @@ export type WildlifeSpecies = {
 
 /**
  * Resolve the local image path for a species.
- * Filename convention must match scripts/scrape_wildlife_images.py's
- * safe_filename() exactly — apostrophes and parens are stripped (not replaced),
- * spaces and hyphens become underscores. Mismatch breaks photo display
- * for any species containing an apostrophe (Bonaparte's, Saunders's, etc.).
+ * scripts/asset_species.py reads the filename rule below and applies it when
+ * saving images, so keep it a toLowerCase() followed by .replace(/re/g, 'str')
+ * steps — apostrophes and parens are stripped (not replaced), spaces and
+ * hyphens become underscores. Mismatch breaks photo display for any species
+ * containing an apostrophe (Bonaparte's, Saunders's, etc.).
  */
 export function resolveWildlifeImage(species: WildlifeSpecies): string | null {
   const safeName = species.common_name
@@ -1,9 +1,29 @@
+// Content-hashed asset list written by scripts/asset_precache.py. Precache-tier
+// files (silhouettes) ship in the SW precache manifest with their sha256 as the
+// revision, so an update re-downloads only the files whose content changed.
+// Missing file (fresh clone before the asset scripts ran) = nothing extra.
+const assetPrecache = (() => {
+  try {
+    return require('./public/asset_precache_manifest.json')
+  } catch {
+    return null
+  }
+})()
+const assetPrecacheEntries = assetPrecache
+  ? Object.values(assetPrecache.sections)
+      .flat()
+      .filter((row) => assetPrecache.precache_tiers.includes(row.tier))
+      .sort((a, b) => a.priority - b.priority)
+      .map((row) => ({ url: row.url, revision: row.sha256.slice(0, 16) }))
+  : []
+
 const withPWA = require('@ducanh2912/next-pwa').default({
   dest: 'public',
   disable: process.env.NODE_ENV === 'development',
   cacheOnFrontEndNav: true,
   extendDefaultRuntimeCaching: true,
   workboxOptions: {
+    additionalManifestEntries: assetPrecacheEntries,
     runtimeCaching: [
       {
         // Offline-readable tables — NetworkFirst so online users always get fresh
@@ -84,6 +104,25 @@ const withPWA = require('@ducanh2912/next-pwa').default({
           },
         },
       },
+      {
+        // Scraped aircraft/wildlife photos — the "full" tier of
+        // asset_precache_manifest.json, cached on first view rather than at
+        // install (~110 MB). StaleWhileRevalidate because the URLs are not
+        // content-hashed: a re-scraped photo is picked up on the next view.
+        urlPattern: /\/(aircraft_images|wildlife_images)\//,
+        method: 'GET',
+        handler: 'StaleWhileRevalidate',
+        options: {
+          cacheName: 'asset-photos',
+          expiration: {
+            maxEntries: 600,
+            maxAgeSeconds: 90 * 24 * 60 * 60, // 90 days
+          },
+          cacheableResponse: {
+            statuses: [0, 200],
+          },
+        },
+      },
       {
         // Cache ESRI satellite tiles — CacheFirst so tiles load instantly after first fetch
         urlPattern: /server\.arcgisonline\.com\/.*\/tile\//,
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Aircraft families for the silhouette library and the aircraft bundle.
+
+military_aircraft.json and commercial_aircraft.json list one row per variant.
+get_base_name() folds a variant to its family ("C-130H Hercules" -> "C-130",
+"Boeing 737-800" -> "737"); generate_aircraft_silhouettes.py keys its manifest
+on it and build_aircraft_bundle.py joins each row's silhouette on it, so both
+import it from here rather than from each other.
+"""
+
+import json
+import re
+
+
+def get_base_name(aircraft_name):
+    """Extract the base aircraft name for deduplication."""
+    name = aircraft_name.strip()
+    mil_match = re.match(r'^([A-Z]{1,3}-\d{1,3})', name)
+    if mil_match:
+        return mil_match.group(1)
+    comm_match = re.match(
+        r'^(?:Airbus|Boeing|Bombardier|Embraer|McDonnell Douglas|Cessna|ATR|Saab|'
+        r'de Havilland|BAe|Fokker|Lockheed|Beech|Gulfstream|Dassault|Pilatus)?\s*'
+        r'([A-Z]?\d{2,4})', name
+    )
+    if comm_match:
+        return comm_match.group(1)
+    return name
+
+
+def load_aircraft(sources):
+    """Load and deduplicate aircraft from [(json path, category)], first row of a family wins."""
+    aircraft_map = {}
+    for json_path, category in sources:
+        if not json_path.exists():
+            print(f"[WARN] {json_path.name} not found, skipping")
+            continue
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for entry in data:
+            full_name = entry.get("aircraft", "").strip()
+            if not full_name:
+                continue
+            base = get_base_name(full_name)
+            if base not in aircraft_map:
+                aircraft_map[base] = {
+                    "base_name": base,
+                    "display_name": full_name,
+                    "category": category,
+                }
+    return aircraft_map
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Indexed SQLite catalogue behind the three asset manifests.
+
+The scrapers and the silhouette generator commit each run here in a single
+transaction; image_manifest.json, wildlife_image_manifest.json and
+aircraft_silhouette_manifest.json are exported from it afterwards in the
+exact format the scripts always wrote. Questions that used to mean loading
+and walking every JSON file — what failed, what has not been refreshed in
+90 days, which files share a content hash — are indexed queries instead.
+
+Schema (one database, one section per manifest, keyed by directory name):
+
+    sections        name, root, script, updated_at, exported
+    entities        section, name, base_name, grp, status, position,
+                    entry (the manifest entry as written), updated_at
+    sources         entity -> url, page, license, dedup_from, shape
+    files           entity -> path, sha256, bytes, mtime_ns
+    fetch_attempts  run, entity, at, status, source, query
+    runs            section, script, started_at, finished_at
+
+status is "ok", "missing" (entry whose file is gone) or "failed" (catalogue
+row with no image; the entry column then holds the failure record).
+updated_at moves only when an entity's entry, file or status changes, so it
+reads as "last refreshed" (annotate(), for asset_crop.py's boxes, rewrites
+entries without moving it). File hashes are reused while size and mtime are
+unchanged.
+
+The database lives in the cache dir (scripts/.cache/, see asset_runtime.py)
+and is not committed. load_manifest()
+reads a section from it only while the JSON export on disk is the one it last
+wrote (by sha256); a fresh clone, a pulled manifest or a hand edit falls back
+to the JSON, and the next commit takes it from there. Sharded runs leave the
+catalogue alone; `merge` commits their combined result.
+
+Usage:
+    python scripts/asset_catalogue.py                       # per-section summary
+    python scripts/asset_catalogue.py needs-work --stale-days 90 [--section S]
+    python scripts/asset_catalogue.py dupes                 # files sharing a sha256
+    python scripts/asset_catalogue.py export SECTION        # manifest JSON to stdout
+    python scripts/asset_catalogue.py import                # seed sections whose public/ JSON changed
+    python scripts/asset_catalogue.py sql "SELECT ..."      # ad-hoc read-only query
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import asset_runtime
+from asset_precache import PUBLIC_SECTIONS, sha256_file
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+CACHE_NAME = "asset_catalogue.sqlite3"   # in asset_runtime.CACHE_DIR
+SCHEMA_VERSION = 1
+KEEP_RUNS = 20          # fetch attempts are kept for this many runs per section
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    name        TEXT PRIMARY KEY,
+    root        TEXT NOT NULL,
+    script      TEXT NOT NULL,
+    updated_at  REAL NOT NULL,
+    exported    TEXT            -- sha256 of the JSON export last written
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    section     TEXT NOT NULL REFERENCES sections(name) ON DELETE CASCADE,
+    script      TEXT NOT NULL,
+    started_at  REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id          INTEGER PRIMARY KEY,
+    section     TEXT NOT NULL REFERENCES sections(name) ON DELETE CASCADE,
+    name        TEXT NOT NULL,
+    base_name   TEXT,
+    grp         TEXT,
+    status      TEXT NOT NULL,
+    position    INTEGER NOT NULL,
+    entry       TEXT NOT NULL,
+    updated_at  REAL NOT NULL,
+    UNIQUE (section, name)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    entity_id   INTEGER PRIMARY KEY REFERENCES entities(id) ON DELETE CASCADE,
+    url         TEXT,
+    page        TEXT,
+    license     TEXT,
+    dedup_from  TEXT,
+    shape       TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    entity_id   INTEGER PRIMARY KEY REFERENCES entities(id) ON DELETE CASCADE,
+    path        TEXT NOT NULL,
+    sha256      TEXT,
+    bytes       INTEGER,
+    mtime_ns    INTEGER
+);
+CREATE TABLE IF NOT EXISTS fetch_attempts (
+    id          INTEGER PRIMARY KEY,
+    run_id      INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    entity_id   INTEGER NOT NULL REFERENCES entities(id) ON DELETE CASCADE,
+    at          REAL NOT NULL,
+    status      TEXT NOT NULL,
+    source      TEXT,
+    query       TEXT
+);
+CREATE INDEX IF NOT EXISTS entities_name ON entities(name);
+CREATE INDEX IF NOT EXISTS entities_base_name ON entities(base_name);
+CREATE INDEX IF NOT EXISTS entities_group ON entities(section, grp);
+CREATE INDEX IF NOT EXISTS entities_status ON entities(status, updated_at);
+CREATE INDEX IF NOT EXISTS entities_updated ON entities(updated_at);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files(sha256);
+CREATE INDEX IF NOT EXISTS attempts_entity ON fetch_attempts(entity_id, at);
+CREATE INDEX IF NOT EXISTS attempts_status ON fetch_attempts(status);
+"""
+
+
+def _dump(entry: dict) -> str:
+    # Key order is kept, so exports reproduce the manifest byte for byte
+    return json.dumps(entry, ensure_ascii=False)
+
+
+def _sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def default_path() -> Path:
+    """The catalogue file in asset_runtime.CACHE_DIR as it is now."""
+    return asset_runtime.cache_path(CACHE_NAME)
+
+
+def load_manifest(root: Path, json_path: Path, path: Path | None = None) -> dict:
+    """
+    Current manifest for the section at `root`: from the catalogue if the JSON
+    export is unchanged since it was written, else from the JSON, else {}.
+    """
+    try:
+        text = json_path.read_text(encoding="utf-8")
+    except OSError:
+        text = None
+    if (path or default_path()).exists():
+        cat = Catalogue(path)
+        try:
+            if text is None or cat.is_current(root.name, text):
+                manifest = cat.manifest(root.name, root)
+                if manifest is not None:
+                    return manifest
+        finally:
+            cat.close()
+    try:
+        return json.loads(text) if text is not None else {}
+    except json.JSONDecodeError:
+        return {}
+
+
+def refreshed_at(section: str, path: Path | None = None) -> dict[str, float]:
+    """{name: updated_at} for `section`, or {} if there is no catalogue yet (plan commands)."""
+    if not (path or default_path()).exists():
+        return {}
+    cat = Catalogue(path)
+    try:
+        return cat.refreshed(section)
+    finally:
+        cat.close()
+
+
+class Catalogue:
+    """
+    One connection, used from the thread that opened it. attempt() may be
+    called from worker threads: attempts are buffered and written by commit().
+    The path defaults to default_path() when the catalogue is opened.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or default_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript(SCHEMA + f"PRAGMA user_version = {SCHEMA_VERSION};")
+        self._lock = threading.Lock()
+        self._attempts: list[tuple] = []
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    # ── Writing ─────────────────────────────────────────────────────
+
+    def attempt(self, name: str, status: str, source: str | None = None, query: str | None = None):
+        """Buffer one lookup outcome for `name`; written by the next commit()."""
+        with self._lock:
+            self._attempts.append((name, time.time(), status, source, query))
+
+    def commit(self, section: str, script: str, root: Path, manifest: dict,
+               failures: dict | None = None, started_at: float | None = None) -> dict:
+        """
+        Make `section` hold exactly `manifest` (files under `root`) plus the
+        `failures` {name: record}, and log the buffered attempts, all in one
+        transaction. Returns {added, changed, removed, missing, failed, hashed}.
+        """
+        now = time.time()
+        failures = failures or {}
+        with self._lock:
+            attempts, self._attempts = self._attempts, []
+        stats = dict.fromkeys(("added", "changed", "removed", "missing", "failed", "hashed"), 0)
+
+        with self.transaction() as db:
+            row = db.execute("SELECT root FROM sections WHERE name = ?", (section,)).fetchone()
+            if row is not None and row["root"] != str(root.resolve()):
+                db.execute("DELETE FROM sections WHERE name = ?", (section,))   # another output dir
+            db.execute("INSERT INTO sections (name, root, script, updated_at) VALUES (?, ?, ?, ?) "
+                       "ON CONFLICT (name) DO UPDATE SET root = excluded.root, script = excluded.script, "
+                       "updated_at = excluded.updated_at", (section, str(root.resolve()), script, now))
+            run_id = db.execute("INSERT INTO runs (section, script, started_at, finished_at) VALUES (?, ?, ?, ?)",
+                                (section, script, started_at or now, now)).lastrowid
+
+            previous = {r["name"]: r for r in db.execute(
+                "SELECT e.id, e.name, e.status, e.entry, f.path, f.sha256, f.bytes, f.mtime_ns "
+                "FROM entities e LEFT JOIN files f ON f.entity_id = e.id WHERE e.section = ?", (section,))}
+            hashes: dict[str, tuple] = {}   # path -> (sha256, bytes, mtime_ns), aliases hash once
+
+            def file_state(rel: str, old) -> tuple | None:
+                if rel in hashes:
+                    return hashes[rel]
+                try:
+                    st = (root / rel).stat()
+                except OSError:
+                    hashes[rel] = None
+                    return None
+                if old is not None and old["path"] == rel and old["bytes"] == st.st_size \
+                        and old["mtime_ns"] == st.st_mtime_ns and old["sha256"]:
+                    hashes[rel] = (old["sha256"], st.st_size, st.st_mtime_ns)
+                else:
+                    hashes[rel] = (sha256_file(root / rel), st.st_size, st.st_mtime_ns)
+                    stats["hashed"] += 1
+                return hashes[rel]
+
+            rows = [(name, entry, "ok") for name, entry in manifest.items()]
+            rows += [(name, record, "failed") for name, record in failures.items() if name not in manifest]
+            for position, (name, entry, status) in enumerate(rows):
+                old = previous.get(name)
+                rel = entry.get("filename") if status != "failed" else None
+                state = file_state(rel, old) if rel else None
+                if status == "ok" and state is None:
+                    status = "missing"
+                text = _dump(entry)
+                changed = (old is None or old["entry"] != text or old["status"] != status
+                           or (state and old["sha256"] != state[0]))
+                if old is None:
+                    stats["added"] += 1
+                elif changed:
+                    stats["changed"] += 1
+                if status in ("missing", "failed"):
+                    stats[status] += 1
+                entity_id = db.execute(
+                    "INSERT INTO entities (section, name, base_name, grp, status, position, entry, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (section, name) DO UPDATE SET "
+                    "base_name = excluded.base_name, grp = excluded.grp, status = excluded.status, "
+                    "position = excluded.position, entry = excluded.entry, "
+                    "updated_at = CASE WHEN ? THEN excluded.updated_at ELSE entities.updated_at END "
+                    "RETURNING id",
+                    (section, name, entry.get("base_name"), entry.get("category") or entry.get("group"),
+                     status, position, text, now, changed)).fetchone()[0]
+                db.execute("INSERT OR REPLACE INTO sources (entity_id, url, page, license, dedup_from, shape) "
+                           "VALUES (?, ?, ?, ?, ?, ?)",
+                           (entity_id, entry.get("source_url"), entry.get("source_page"), entry.get("license"),
+                            entry.get("dedup_from"), entry.get("source_shape")))
+                if rel:
+                    db.execute("INSERT OR REPLACE INTO files (entity_id, path, sha256, bytes, mtime_ns) "
+                               "VALUES (?, ?, ?, ?, ?)", (entity_id, rel, *(state or (None, None, None))))
+                else:
+                    db.execute("DELETE FROM files WHERE entity_id = ?", (entity_id,))
+
+            gone = [old["id"] for name, old in previous.items() if name not in manifest and name not in failures]
+            stats["removed"] = len(gone)
+            db.executemany("DELETE FROM entities WHERE id = ?", [(i,) for i in gone])
+
+            ids = {r["name"]: r["id"] for r in db.execute(
+                "SELECT id, name FROM entities WHERE section = ?", (section,))}
+            db.executemany("INSERT INTO fetch_attempts (run_id, entity_id, at, status, source, query) "
+                           "VALUES (?, ?, ?, ?, ?, ?)",
+                           [(run_id, ids[name], *rest) for name, *rest in attempts if name in ids])
+            db.execute("DELETE FROM runs WHERE section = ? AND id NOT IN "
+                       "(SELECT id FROM runs WHERE section = ? ORDER BY id DESC LIMIT ?)",
+                       (section, section, KEEP_RUNS))
+        return stats
+
+    def annotate(self, section: str, entries: dict[str, dict]):
+        """
+        Replace the stored entry of existing entities, leaving status, files and
+        updated_at alone: for derived data (asset_crop.py's crop boxes) that
+        does not make an image any fresher.
+        """
+        with self.transaction() as db:
+            db.executemany("UPDATE entities SET entry = ? WHERE section = ? AND name = ?",
+                           [(_dump(entry), section, name) for name, entry in entries.items()])
+
+    # ── Reading ─────────────────────────────────────────────────────
+
+    def manifest(self, section: str, root: Path | None = None) -> dict | None:
+        """
+        The section's manifest in written order, or None if it was never
+        committed (or, with `root`, was committed for another directory).
+        """
+        row = self.conn.execute("SELECT root FROM sections WHERE name = ?", (section,)).fetchone()
+        if row is None or (root is not None and row["root"] != str(root.resolve())):
+            return None
+        return {r["name"]: json.loads(r["entry"]) for r in self.conn.execute(
+            "SELECT name, entry FROM entities WHERE section = ? AND status != 'failed' ORDER BY position",
+            (section,))}
+
+    def export(self, section: str, json_path: Path, render) -> dict:
+        """Write render(manifest) to `json_path`, remember its hash and return the manifest."""
+        manifest = self.manifest(section) or {}
+        text = render(manifest)
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        json_path.write_text(text, encoding="utf-8")
+        self.mark_exported(section, text)
+        return manifest
+
+    def mark_exported(self, section: str, text: str):
+        self.conn.execute("UPDATE sections SET exported = ? WHERE name = ?", (_sha256_text(text), section))
+
+    def is_current(self, section: str, text: str) -> bool:
+        """True if `text` is the JSON export this catalogue last wrote for `section`."""
+        row = self.conn.execute("SELECT exported FROM sections WHERE name = ?", (section,)).fetchone()
+        return row is not None and row["exported"] == _sha256_text(text)
+
+    def refreshed(self, section: str) -> dict[str, float]:
+        """{name: updated_at} for every entity in the section, failures included."""
+        return {r["name"]: r["updated_at"] for r in self.conn.execute(
+            "SELECT name, updated_at FROM entities WHERE section = ?", (section,))}
+
+    def failures(self, section: str) -> list[dict]:
+        return [json.loads(r["entry"]) for r in self.conn.execute(
+            "SELECT entry FROM entities WHERE section = ? AND status = 'failed' ORDER BY position", (section,))]
+
+    def needs_work(self, section: str | None = None, stale_days: float | None = None) -> list[sqlite3.Row]:
+        """Failed or missing entities, plus (with `stale_days`) those not refreshed for that long."""
+        cutoff = time.time() - stale_days * 86400 if stale_days is not None else -1.0
+        where = " AND section = ?" if section else ""
+        # A UNION, not OR, so each half is an index lookup (status, updated_at);
+        # sorted here because ORDER BY tempts the planner into a full index scan
+        select = "SELECT section, position, name, status, updated_at FROM entities WHERE "
+        query = f"{select}status IN ('failed', 'missing'){where} UNION {select}updated_at < ?{where}"
+        params = [section, cutoff, section] if section else [cutoff]
+        return sorted(self.conn.execute(query, params), key=lambda r: (r["section"], r["position"]))
+
+    def duplicates(self) -> list[sqlite3.Row]:
+        """Files whose content hash is shared by more than one distinct path."""
+        return self.conn.execute(
+            "SELECT f.sha256, COUNT(DISTINCT e.section || '/' || f.path) AS paths, "
+            "GROUP_CONCAT(DISTINCT e.section || '/' || f.path) AS files "
+            "FROM files f JOIN entities e ON e.id = f.entity_id WHERE f.sha256 IS NOT NULL "
+            "GROUP BY f.sha256 HAVING paths > 1 ORDER BY paths DESC, f.sha256").fetchall()
+
+    def summary(self) -> list[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT s.name, s.script, s.updated_at, COUNT(e.id) AS entities, "
+            "SUM(e.status = 'ok') AS ok, SUM(e.status = 'missing') AS missing, "
+            "SUM(e.status = 'failed') AS failed, MIN(e.updated_at) AS oldest "
+            "FROM sections s LEFT JOIN entities e ON e.section = s.name "
+            "GROUP BY s.name ORDER BY s.name").fetchall()
+
+
+def describe(stats: dict) -> str:
+    text = (f"{stats['added']} added, {stats['changed']} changed, {stats['removed']} removed, "
+            f"{stats['hashed']} hashed")
+    if stats["missing"]:
+        text += f", {stats['missing']} missing files"
+    if stats["failed"]:
+        text += f", {stats['failed']} failed"
+    return text
+
+
+def _when(ts: float | None) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts)) if ts else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the asset catalogue")
+    parser.add_argument("command", nargs="?", default="summary",
+                        choices=["summary", "needs-work", "dupes", "export", "import", "sql"])
+    parser.add_argument("arg", nargs="?", help="export: section name; sql: the query")
+    parser.add_argument("--section", help="needs-work: limit to one section")
+    parser.add_argument("--stale-days", type=float, help="needs-work: also entries older than this")
+    parser.add_argument("--db", type=Path, help="Catalogue file (default: asset_catalogue.sqlite3 in the cache dir)")
+    args = parser.parse_args()
+
+    cat = Catalogue(args.db)
+    if args.command == "summary":
+        for row in cat.summary():
+            print(f"  {row['name']:22s} {row['entities']:4d} entities ({row['ok'] or 0} ok, "
+                  f"{row['missing'] or 0} missing, {row['failed'] or 0} failed), "
+                  f"last run {_when(row['updated_at'])} by {row['script']}, oldest {_when(row['oldest'])}")
+    elif args.command == "needs-work":
+        rows = cat.needs_work(args.section, args.stale_days)
+        for row in rows:
+            print(f"  [{row['status'].upper()}] {row['section']}/{row['name']} (updated {_when(row['updated_at'])})")
+        print(f"{len(rows)} entries need work")
+    elif args.command == "dupes":
+        for row in cat.duplicates():
+            print(f"  {row['sha256'][:12]} x{row['paths']}: {row['files'].replace(',', ', ')}")
+    elif args.command == "export":
+        manifest = cat.manifest(args.arg or "")
+        if manifest is None:
+            print(f"[ERROR] No section {args.arg!r} in {cat.path}")
+            sys.exit(1)
+        print(json.dumps(manifest, indent=2, ensure_ascii=False))
+    elif args.command == "import":
+        for section, (manifest_name, _, _) in PUBLIC_SECTIONS.items():
+            path = PUBLIC_DIR / manifest_name
+            if not path.exists():
+                continue
+            text = path.read_text(encoding="utf-8")
+            if cat.is_current(section, text):
+                print(f"  [SKIP] {section}: catalogue matches {manifest_name}")
+                continue
+            stats = cat.commit(section, "import", PUBLIC_DIR / section, json.loads(text))
+            cat.mark_exported(section, text)
+            print(f"  [OK] {section}: {describe(stats)}")
+    elif args.command == "sql":
+        cat.conn.execute("PRAGMA query_only = ON")
+        for row in cat.conn.execute(args.arg or ""):
+            print("  " + " | ".join(str(v) for v in row))
+    cat.close()
+
+if __name__ == "__main__":
+    main()
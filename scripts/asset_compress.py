@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Finalize stage: precompressed .gz / .br siblings for generated text assets.
+
+Silhouette SVGs and the JSON manifests compress very well, so the scripts write
+`<file>.gz` (gzip -9) and `<file>.br` (brotli quality 11) next to each output
+for static hosting and the offline cache to serve directly. Compression runs in
+a process pool; a file whose sha256 matches the last finalize run and whose
+siblings exist is skipped. Photos are already compressed and never go through
+here.
+
+brotli is optional (pip install brotli). Without it only .gz is written, and a
+.br left over from an earlier run is removed when its source changes so it can
+never be served stale.
+
+Usage:
+    python scripts/asset_compress.py                # silhouettes + manifests under public/
+    python scripts/asset_compress.py FILE [FILE…]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from asset_metrics import metrics
+import asset_precache
+import asset_runtime
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+STATE_NAME = "compress_state.json"   # in asset_runtime.CACHE_DIR
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def _siblings(path: Path) -> list[Path]:
+    gz = path.with_name(path.name + ".gz")
+    return [gz, path.with_name(path.name + ".br")] if brotli else [gz]
+
+
+def _compress(path_str: str) -> tuple[str, int, int, int | None]:
+    """Worker: write the siblings for one file; return (path, raw, gz, br) sizes."""
+    path = Path(path_str)
+    data = path.read_bytes()
+    gz = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    path.with_name(path.name + ".gz").write_bytes(gz)
+    br_path = path.with_name(path.name + ".br")
+    if brotli:
+        br = brotli.compress(data, quality=BROTLI_QUALITY, mode=brotli.MODE_TEXT)
+        br_path.write_bytes(br)
+        return path_str, len(data), len(gz), len(br)
+    br_path.unlink(missing_ok=True)
+    return path_str, len(data), len(gz), None
+
+
+def _existing_sizes(path: Path) -> tuple[str, int, int, int | None]:
+    gz, *br = _siblings(path)
+    return str(path), path.stat().st_size, gz.stat().st_size, br[0].stat().st_size if br else None
+
+
+def _load_state() -> dict[str, str]:
+    try:
+        return json.loads(asset_runtime.cache_path(STATE_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def section_outputs(root: Path, manifest_path: Path) -> list[Path]:
+    """A section's manifest, its runtime maps and the precache manifest beside it."""
+    runtime_dir = root.parent / asset_runtime.RUNTIME_DIRNAME
+    return [manifest_path,
+            *sorted(runtime_dir.glob(f"{root.name}.*.json")),
+            root.parent / asset_precache.PRECACHE_FILENAME]
+
+
+def finalize(paths, workers: int | None = None) -> dict[str, dict]:
+    """
+    Compress every existing file in `paths` whose content changed since the
+    last run. Returns per-class totals keyed by suffix ("svg", "json").
+    """
+    state = _load_state()
+    pending, results, skipped = [], [], {}
+    for path in dict.fromkeys(Path(p) for p in paths):
+        if not path.is_file():
+            continue
+        key = str(path.resolve())
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        if state.get(key) == digest and all(s.exists() for s in _siblings(path)):
+            results.append(_existing_sizes(path))
+            cls = path.suffix.lstrip(".")
+            skipped[cls] = skipped.get(cls, 0) + 1
+            metrics.cache("compress", hit=True)
+            continue
+        metrics.cache("compress", hit=False)
+        pending.append(str(path))
+        state[key] = digest
+
+    with metrics.stage("finalize"):
+        if len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results.extend(pool.map(_compress, pending, chunksize=8))
+        else:
+            results.extend(_compress(p) for p in pending)
+
+    report: dict[str, dict] = {}
+    for path_str, raw, gz, br in results:
+        cls = Path(path_str).suffix.lstrip(".")
+        r = report.setdefault(cls, {"files": 0, "skipped": skipped.get(cls, 0), "raw": 0, "gz": 0, "br": 0})
+        r["files"] += 1
+        r["raw"] += raw
+        r["gz"] += gz
+        r["br"] += br or 0
+    metrics.count("compressed_files", len(pending))
+
+    state_path = asset_runtime.cache_path(STATE_NAME)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(json.dumps(dict(sorted(state.items())), indent=2) + "\n", encoding="utf-8")
+    return report
+
+
+def print_report(report: dict[str, dict]):
+    print(f"\n-- Compression ({'gzip -9, brotli q11' if brotli else 'gzip -9; brotli not installed'}) --")
+    for cls, r in sorted(report.items()):
+        gz = f"gz {r['gz'] / 1024:7.1f} KB ({r['gz'] / r['raw'] * 100:4.1f}%)" if r["raw"] else ""
+        br = f"  br {r['br'] / 1024:7.1f} KB ({r['br'] / r['raw'] * 100:4.1f}%)" if brotli and r["raw"] else ""
+        print(f"  {cls:5s} {r['files']:4d} files ({r['skipped']} unchanged)  "
+              f"raw {r['raw'] / 1024:7.1f} KB  {gz}{br}")
+
+
+def default_paths() -> list[Path]:
+    paths = sorted((PUBLIC_DIR / "aircraft_silhouettes").glob("*.svg"))
+    for section, (manifest_name, _, _) in asset_runtime.PUBLIC_SECTIONS.items():
+        paths += section_outputs(PUBLIC_DIR / section, PUBLIC_DIR / manifest_name)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings for generated text assets")
+    parser.add_argument("paths", nargs="*", type=Path, help="Files to compress (default: public/ assets)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Process pool size")
+    args = parser.parse_args()
+    print_report(finalize(args.paths or default_paths(), workers=args.workers))
+
+
+if __name__ == "__main__":
+    main()
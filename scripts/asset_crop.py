@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Subject-aware crops of the scraped photos at the app's display aspect ratios.
+
+The aircraft detail card shows photos at 16:9 and the wildlife pickers at
+4:3, both with object-fit: cover, and the selected-species chip at 1:1; the
+sources arrive in any shape. For every manifest entry this writes
+
+    <stem>.card.jpg    aircraft 16:9 at 800 px wide, wildlife 4:3 at 480 px
+    <stem>.thumb.jpg   1:1 at 128 px
+
+next to the image, placed on the subject rather than the frame centre, and
+records each box in the manifest entry:
+
+    "crops": {"source": <sha256 of the image, 16 hex>,
+              "card": {"box": [x0, y0, x1, y1], "file": "...card.jpg", "size": [800, 450]},
+              "thumb": {...}}
+
+Subject finding is a saliency map on a ≤ ANALYSIS_SIDE px copy: colour
+distance from the image's mean colour (blurred, so texture does not win)
+plus gradient energy, with a mild centre bias. A summed-area table then
+scores every window position at once. The card window is the largest of its
+aspect; the thumbnail zooms in to the smallest window that still holds
+THUMB_KEEP of what the full-size window holds.
+
+Reruns are cheap: an entry whose source hash and output sizes match its
+record, with the crop files on disk, is skipped without decoding. A record
+with "manual": true keeps its box whatever the image (edit the manifest,
+then rerun to render it); when a scraper refetches an image, auto boxes are
+dropped and manual ones carried over (carry_over()).
+
+Needs NumPy and Pillow (pip install numpy Pillow); the scrapers import this
+module for carry_over() and crop_files() only, which need neither.
+
+Usage:
+    python scripts/asset_crop.py                        # both photo sections, changed entries only
+    python scripts/asset_crop.py --section wildlife_images --force
+    python scripts/asset_crop.py --jobs 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # optional
+    np = None
+try:
+    from PIL import Image, ImageFilter
+except ImportError:  # optional
+    Image = None
+
+import asset_catalogue
+import asset_compress
+import asset_precache
+import asset_verify
+import build_aircraft_bundle
+
+PUBLIC_DIR = asset_precache.PUBLIC_DIR
+
+# section -> {profile: (aspect w, aspect h, output width)}
+PROFILES = {
+    "aircraft_images": {"card": (16, 9, 800), "thumb": (1, 1, 128)},
+    "wildlife_images": {"card": (4, 3, 480), "thumb": (1, 1, 128)},
+}
+# section -> how its scraper renders the manifest export
+RENDER = {
+    "aircraft_images": lambda m: json.dumps(m, indent=2),
+    "wildlife_images": lambda m: json.dumps(m, indent=2, ensure_ascii=False) + "\n",
+}
+ANALYSIS_SIDE = 256
+THUMB_SCALES = (1.0, 0.9, 0.8, 0.7, 0.6, 0.5)
+THUMB_KEEP = 0.85
+CENTER_BIAS = 0.4       # weight of the centre falloff in the saliency map
+JPEG_QUALITY = 82
+
+
+# ── Manifest records (no NumPy/Pillow needed) ──────────────────────
+
+
+def crop_filename(filename: str, profile: str) -> str:
+    """"commercial/A330-200.jpg" -> "commercial/A330-200.card.jpg"."""
+    stem, _, _ = filename.rpartition(".")
+    return f"{stem}.{profile}.jpg"
+
+
+def crop_files(manifest: dict):
+    """Every entry's filename followed by its rendered crops (precache and verify lists)."""
+    for entry in manifest.values():
+        yield entry["filename"]
+        for record in (entry.get("crops") or {}).values():
+            if isinstance(record, dict) and record.get("file"):
+                yield record["file"]
+
+
+def manual_crops(crops: dict | None) -> dict:
+    """The hand-set boxes of a crops record, ready to be rendered again."""
+    return {profile: {"box": record["box"], "manual": True} for profile, record in (crops or {}).items()
+            if isinstance(record, dict) and record.get("manual") and record.get("box")}
+
+
+def carry_over(manifest: dict, previous: dict, root: Path) -> int:
+    """
+    Give entries the scraper just rebuilt the crops of their previous entry:
+    all of them if the image is unchanged (same hash), else only manual boxes,
+    to be rendered again by the next crop run. Returns entries touched.
+    """
+    touched = 0
+    for name, entry in manifest.items():
+        crops = (previous.get(name) or {}).get("crops")
+        if "crops" in entry or not crops:
+            continue
+        path = root / entry["filename"]
+        if entry["filename"] == previous[name].get("filename") and asset_verify.present(path) \
+                and asset_verify.hash_file(path)[0][:16] == crops.get("source"):
+            entry["crops"] = crops
+        elif manual_crops(crops):
+            entry["crops"] = manual_crops(crops)
+        else:
+            continue
+        touched += 1
+    return touched
+
+
+def is_current(entry: dict, source: str, profiles: dict, root: Path) -> bool:
+    """Crops recorded for this exact image at the current profiles, files on disk."""
+    crops = entry.get("crops") or {}
+    if crops.get("source") != source:
+        return False
+    for profile, (aw, ah, width) in profiles.items():
+        record = crops.get(profile) or {}
+        box, size = record.get("box"), record.get("size")
+        if not box or not size or record.get("file") != crop_filename(entry["filename"], profile) \
+                or abs(size[0] * ah - size[1] * aw) > aw \
+                or (not record.get("manual") and size[0] != min(width, box[2] - box[0])) \
+                or not asset_verify.present(root / record["file"]):
+            return False
+    return True
+
+
+# ── Saliency and windows ────────────────────────────────────────────
+
+
+def _normalized(a):
+    span = float(a.max() - a.min())
+    return (a - a.min()) / span if span else np.zeros_like(a)
+
+
+def saliency(im):
+    """Saliency map (float32, ≤ ANALYSIS_SIDE px on the long side) of a PIL image."""
+    small = im.convert("RGB")
+    small.thumbnail((ANALYSIS_SIDE, ANALYSIS_SIDE))
+    blurred = np.asarray(small.filter(ImageFilter.GaussianBlur(2)), dtype=np.float32) / 255
+    colour = np.linalg.norm(blurred - blurred.reshape(-1, 3).mean(axis=0), axis=2)
+    grey = np.asarray(small.convert("L"), dtype=np.float32) / 255
+    gy, gx = np.gradient(grey)
+    energy = _normalized(colour) + _normalized(np.hypot(gx, gy))
+    h, w = energy.shape
+    y, x = np.ogrid[:h, :w]
+    falloff = np.exp(-(((x + 0.5) / w - 0.5) ** 2 + ((y + 0.5) / h - 0.5) ** 2) / (2 * 0.3 ** 2))
+    return (energy * (1 - CENTER_BIAS + CENTER_BIAS * falloff)).astype(np.float32)
+
+
+def window_size(width: int, height: int, aw: int, ah: int, scale: float = 1.0) -> tuple[int, int]:
+    """Largest aw:ah window inside width x height, times scale (at least 1 px)."""
+    w = min(width, height * aw / ah) * scale
+    return max(1, round(w)), max(1, round(w * ah / aw))
+
+
+def best_window(sal, aw: int, ah: int, scales=(1.0,), keep: float = 1.0):
+    """
+    (x, y, w, h) in saliency-map pixels: for each scale the best-scoring
+    position; the smallest scale holding `keep` of the largest one's score wins.
+    """
+    h_map, w_map = sal.shape
+    table = np.zeros((h_map + 1, w_map + 1), dtype=np.float64)
+    table[1:, 1:] = sal.cumsum(axis=0).cumsum(axis=1)
+    found = []
+    for scale in scales:
+        w, h = window_size(w_map, h_map, aw, ah, scale)
+        sums = table[h:, w:] - table[:-h, w:] - table[h:, :-w] + table[:-h, :-w]
+        y, x = np.unravel_index(np.argmax(sums), sums.shape)
+        found.append((float(sums[y, x]), (int(x), int(y), w, h)))
+    target = found[0][0] * keep
+    return [window for score, window in found if score >= target][-1]
+
+
+def to_box(window, map_size: tuple[int, int], image_size: tuple[int, int], aw: int, ah: int, scale: float) -> list[int]:
+    """A map window as an exact aw:ah box in image pixels."""
+    (x, y, _, _), (mw, mh), (iw, ih) = window, map_size, image_size
+    w, h = window_size(iw, ih, aw, ah, scale)
+    x0 = min(max(round(x * iw / mw), 0), iw - w)
+    y0 = min(max(round(y * ih / mh), 0), ih - h)
+    return [x0, y0, x0 + w, y0 + h]
+
+
+def fit_box(box, image_size: tuple[int, int], aw: int, ah: int) -> list[int]:
+    """A hand-set box grown to aw:ah about its centre and kept inside the image."""
+    iw, ih = image_size
+    x0, y0, x1, y1 = (max(0, min(v, limit)) for v, limit in zip(box, (iw, ih, iw, ih)))
+    wanted = max(x1 - x0, (y1 - y0) * aw / ah, 1)
+    w, h = window_size(iw, ih, aw, ah, min(1.0, wanted / window_size(iw, ih, aw, ah)[0]))
+    left = min(max(round((x0 + x1 - w) / 2), 0), iw - w)
+    top = min(max(round((y0 + y1 - h) / 2), 0), ih - h)
+    return [left, top, left + w, top + h]
+
+
+# ── Rendering (pool workers) ────────────────────────────────────────
+
+
+def crop_entry(root: str, filename: str, profiles: dict, manual: dict) -> dict:
+    """{profile: record} for one image: find or fit each box, write the crop file."""
+    with Image.open(Path(root) / filename) as im:
+        im.load()
+        image = im.convert("RGB")
+    sal = None
+    records = {}
+    for profile, (aw, ah, width) in profiles.items():
+        if profile in manual:
+            box = fit_box(manual[profile], image.size, aw, ah)
+        else:
+            if sal is None:
+                sal = saliency(image)
+            scales, keep = (THUMB_SCALES, THUMB_KEEP) if profile == "thumb" else ((1.0,), 1.0)
+            window = best_window(sal, aw, ah, scales, keep)
+            scale = window[2] / window_size(sal.shape[1], sal.shape[0], aw, ah)[0]
+            box = to_box(window, (sal.shape[1], sal.shape[0]), image.size, aw, ah, scale)
+        out_w = min(width, box[2] - box[0])
+        size = [out_w, max(1, round(out_w * ah / aw))]
+        rel = crop_filename(filename, profile)
+        image.crop(box).resize(size, Image.LANCZOS).save(
+            Path(root) / rel, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        if profile in manual:   # the hand-set box stays as written
+            records[profile] = {"box": manual[profile], "manual": True, "file": rel, "size": size}
+        else:
+            records[profile] = {"box": box, "file": rel, "size": size}
+    return records
+
+
+# ── Sections ────────────────────────────────────────────────────────
+
+
+def crop_section(section: str, public_dir: Path, force: bool = False, jobs: int | None = None) -> dict:
+    """Crop one section and write its manifest back. Returns {"cropped", "current", "failed", "manifest"}."""
+    root = public_dir / section
+    manifest_path = public_dir / asset_precache.PUBLIC_SECTIONS[section][0]
+    manifest = asset_catalogue.load_manifest(root, manifest_path)
+    profiles = PROFILES[section]
+    images = {name: root / entry["filename"] for name, entry in manifest.items()
+              if asset_verify.present(root / entry["filename"])}
+    hashes = asset_verify.hash_all(set(images.values()), jobs)
+
+    work, current = {}, 0
+    for name, path in images.items():
+        source = hashes[path][0][:16]
+        entry = manifest[name]
+        if not force and is_current(entry, source, profiles, root):
+            current += 1
+            continue
+        manual = {profile: record["box"] for profile, record in (entry.get("crops") or {}).items()
+                  if isinstance(record, dict) and record.get("manual") and record.get("box")}
+        work[name] = (source, manual)
+
+    failed = []
+    if work:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            futures = {name: pool.submit(crop_entry, str(root), manifest[name]["filename"], profiles, manual)
+                       for name, (_, manual) in work.items()}
+            for name, future in futures.items():
+                try:
+                    manifest[name]["crops"] = {"source": work[name][0], **future.result()}
+                except Exception as e:   # unreadable image: leave the entry as it was
+                    failed.append((name, str(e)))
+                    del work[name]
+    if work:
+        write_manifest(section, root, manifest_path, manifest, {name: manifest[name] for name in work})
+    return {"cropped": len(work), "current": current, "failed": failed, "manifest": manifest}
+
+
+def write_manifest(section: str, root: Path, manifest_path: Path, manifest: dict, changed: dict):
+    """Store the new crop records in the catalogue (if it wrote the JSON on disk) and export."""
+    render = RENDER[section]
+    text = manifest_path.read_text(encoding="utf-8") if manifest_path.exists() else None
+    if asset_catalogue.default_path().exists() and text is not None:
+        cat = asset_catalogue.Catalogue()
+        try:
+            if cat.is_current(section, text):
+                cat.annotate(section, changed)
+                cat.export(section, manifest_path, render)
+                return
+        finally:
+            cat.close()
+    manifest_path.write_text(render(manifest), encoding="utf-8")   # next scraper run imports it
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subject-aware crops of the scraped photos")
+    parser.add_argument("--section", action="append", choices=list(PROFILES), help="Only this section (repeatable)")
+    parser.add_argument("--force", action="store_true", help="Recompute every auto crop, current or not")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+    if np is None or Image is None:
+        print("[ERROR] asset_crop.py needs NumPy and Pillow: pip install numpy Pillow")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("Asset crops")
+    print("=" * 60)
+    started = time.perf_counter()
+    failures = 0
+    for section in args.section or PROFILES:
+        result = crop_section(section, PUBLIC_DIR, args.force, args.jobs)
+        manifest = result["manifest"]
+        print(f"\n{section}: {result['cropped']} cropped, {result['current']} current, "
+              f"{len(result['failed'])} failed")
+        for name, error in result["failed"]:
+            print(f"  [ERROR] {name}: {error}")
+        failures += len(result["failed"])
+        if not result["cropped"]:
+            continue
+        root = PUBLIC_DIR / section
+        tier = asset_precache.PUBLIC_SECTIONS[section][1]
+        precache = asset_precache.write_section(root, crop_files(manifest), tier)
+        print(f"  Precache section: {asset_precache.describe(precache)}")
+        outputs = asset_compress.section_outputs(root, PUBLIC_DIR / asset_precache.PUBLIC_SECTIONS[section][0])
+        if section == "aircraft_images":
+            bundle = build_aircraft_bundle.write_bundle(PUBLIC_DIR)
+            outputs += [bundle] if bundle else []
+        asset_compress.print_report(asset_compress.finalize(outputs))
+
+    print(f"\n{'=' * 60}")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    print("=" * 60)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Record/replay HTTP fixtures for the asset scrapers.
+
+Record mode runs a scraper with a response-capturing handler installed and
+writes every API and image response into a zip fixture archive. Serve mode
+starts a local stand-in HTTP server that replays the archive with configurable
+latency, bandwidth and error injection; run mode executes a scraper with all of
+its requests redirected to that server. Nothing in the scrapers changes — the
+handlers are installed through asset_http.
+
+Usage:
+    python scripts/asset_fixtures.py record --archive fixtures.zip -- scripts/scrape_wildlife_images.py
+    python scripts/asset_fixtures.py serve --archive fixtures.zip --port 8765 --latency 0.08 --bandwidth 2000000
+    python scripts/asset_fixtures.py run --replay http://127.0.0.1:8765 -- scripts/scrape_aircraft_images.py --delay 0
+
+Archive layout:
+    index.json       — [{method, url, status, headers, body, bytes}], last recording wins
+    bodies/<sha256>  — response bodies, stored once per distinct payload
+
+scripts/tests/fixtures/scrapers.zip is a tiny archive of this kind: the replay
+smoke test (python -m pytest scripts/tests) runs both scrapers against it.
+"""
+
+import argparse
+import hashlib
+import http.server
+import json
+import random
+import runpy
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+import zipfile
+from pathlib import Path
+
+import asset_http
+
+
+# ── Archive ─────────────────────────────────────────────────────────
+
+
+class FixtureArchive:
+    """In-memory view of a fixture zip, keyed by (method, url)."""
+
+    def __init__(self):
+        self.entries: dict[tuple[str, str], dict] = {}
+        self.bodies: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "FixtureArchive":
+        archive = cls()
+        with zipfile.ZipFile(path) as zf:
+            for entry in json.loads(zf.read("index.json")):
+                archive.entries[(entry["method"], entry["url"])] = entry
+                if entry["body"] not in archive.bodies:
+                    archive.bodies[entry["body"]] = zf.read(f"bodies/{entry['body']}")
+        return archive
+
+    def add(self, method: str, url: str, status: int, headers: list[tuple[str, str]], body: bytes):
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            self.bodies[digest] = body
+            self.entries[(method, url)] = {
+                "method": method,
+                "url": url,
+                "status": status,
+                "headers": [[k, v] for k, v in headers],
+                "body": digest,
+                "bytes": len(body),
+            }
+
+    def lookup(self, method: str, url: str) -> tuple[dict, bytes] | None:
+        entry = self.entries.get((method, url))
+        if entry is None:
+            return None
+        return entry, self.bodies[entry["body"]]
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        index = sorted(self.entries.values(), key=lambda e: (e["url"], e["method"]))
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("index.json", json.dumps(index, indent=2))
+            for digest in sorted({e["body"] for e in index}):
+                zf.writestr(f"bodies/{digest}", self.bodies[digest])
+
+    def total_bytes(self) -> int:
+        return sum(e["bytes"] for e in self.entries.values())
+
+
+# ── urllib handlers ─────────────────────────────────────────────────
+
+
+class RecordingHandler(urllib.request.BaseHandler):
+    """Capture every response (including 4xx/5xx) into a FixtureArchive."""
+
+    def __init__(self, archive: FixtureArchive):
+        self.archive = archive
+
+    def http_response(self, req, response):
+        data, replacement = asset_http.buffer_response(response)
+        self.archive.add(
+            req.get_method(), asset_http.origin_url(req), response.status,
+            list(response.headers.items()), data,
+        )
+        return replacement
+
+    https_response = http_response
+
+
+class ReplayRedirectHandler(urllib.request.BaseHandler):
+    """Rewrite https://host/path?q to {base}/https/host/path?q before sending."""
+
+    handler_order = 100  # ahead of everything that looks at the request URL
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    def http_request(self, req):
+        url = req.full_url
+        if url.startswith(self.base_url):
+            return req
+        parts = urllib.parse.urlsplit(url)
+        req.asset_origin_url = url
+        rest = parts.path or "/"
+        if parts.query:
+            rest += f"?{parts.query}"
+        req.full_url = f"{self.base_url}/{parts.scheme}/{parts.netloc}{rest}"
+        return req
+
+    https_request = http_request
+
+
+def replay_url_to_origin(path: str) -> str | None:
+    """Invert ReplayRedirectHandler: /https/host/path?q -> https://host/path?q."""
+    scheme, _, rest = path.lstrip("/").partition("/")
+    if scheme not in ("http", "https") or not rest:
+        return None
+    return f"{scheme}://{rest}"
+
+
+# ── Replay server ───────────────────────────────────────────────────
+
+
+class ReplayStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.misses = 0
+        self.injected_errors = 0
+
+    def add(self, **deltas: int):
+        with self._lock:
+            for key, value in deltas.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "bytes": self.bytes_sent,
+                "misses": self.misses,
+                "injected_errors": self.injected_errors,
+            }
+
+
+class ReplayServer(http.server.ThreadingHTTPServer):
+    """
+    Local stand-in for Wikimedia, iNaturalist and USFWS.
+
+    latency    — seconds added before each response (plus up to `jitter` extra)
+    bandwidth  — bytes/second cap per response body (0 = unlimited)
+    error_rate — fraction of requests answered with 503 instead of the fixture
+    """
+
+    daemon_threads = True
+
+    def __init__(self, archive: FixtureArchive, port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, bandwidth: int = 0, error_rate: float = 0.0,
+                 seed: int = 0, quiet: bool = True):
+        super().__init__(("127.0.0.1", port), _ReplayRequestHandler)
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.quiet = quiet
+        self.stats = ReplayStats()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def roll(self) -> tuple[float, bool]:
+        """Return (delay, inject_error) for one request, deterministic per seed."""
+        with self._rng_lock:
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            inject = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return delay, inject
+
+    def start_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="replay-server", daemon=True)
+        thread.start()
+        return thread
+
+
+class _ReplayRequestHandler(http.server.BaseHTTPRequestHandler):
+    server: ReplayServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        delay, inject = self.server.roll()
+        if delay:
+            time.sleep(delay)
+
+        origin = replay_url_to_origin(self.path)
+        hit = self.server.archive.lookup("GET", origin) if origin else None
+        if inject:
+            self.server.stats.add(requests=1, injected_errors=1)
+            self._send(503, [("Content-Type", "text/plain")], b"injected error\n")
+            return
+        if hit is None:
+            self.server.stats.add(requests=1, misses=1)
+            self._send(404, [("Content-Type", "text/plain")], b"no fixture recorded\n")
+            return
+
+        entry, body = hit
+        self.server.stats.add(requests=1, bytes_sent=len(body))
+        headers = [(k, v) for k, v in entry["headers"]
+                   if k.lower() not in ("content-length", "transfer-encoding", "connection",
+                                        "content-encoding")]
+        self._send(entry["status"], headers, body)
+
+    def _send(self, status: int, headers: list[tuple[str, str]], body: bytes):
+        self.send_response(status)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        bandwidth = self.server.bandwidth
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        chunk = max(1024, bandwidth // 20)
+        for start in range(0, len(body), chunk):
+            piece = body[start:start + chunk]
+            self.wfile.write(piece)
+            time.sleep(len(piece) / bandwidth)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+# ── CLI ─────────────────────────────────────────────────────────────
+
+
+def run_script(script: str, script_args: list[str]):
+    """Execute a scraper as __main__ with the given argv."""
+    saved_argv = sys.argv
+    sys.argv = [script, *script_args]
+    sys.path.insert(0, str(Path(script).resolve().parent))
+    try:
+        runpy.run_path(script, run_name="__main__")
+    finally:
+        sys.argv = saved_argv
+
+
+def cmd_record(args):
+    archive = FixtureArchive.load(args.archive) if args.append and args.archive.exists() else FixtureArchive()
+    handler = asset_http.register_handler(RecordingHandler(archive))
+    try:
+        run_script(args.script, args.script_args)
+    finally:
+        asset_http.unregister_handler(handler)
+        archive.save(args.archive)
+        print(f"\nRecorded {len(archive.entries)} responses "
+              f"({archive.total_bytes() / 1024 / 1024:.1f} MB) -> {args.archive}")
+
+
+def cmd_serve(args):
+    archive = FixtureArchive.load(args.archive)
+    server = ReplayServer(archive, port=args.port, latency=args.latency, jitter=args.jitter,
+                          bandwidth=args.bandwidth, error_rate=args.error_rate, seed=args.seed,
+                          quiet=not args.verbose)
+    print(f"Replaying {len(archive.entries)} fixtures at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n{server.stats.snapshot()}")
+
+
+def cmd_run(args):
+    handler = asset_http.register_handler(ReplayRedirectHandler(args.replay))
+    try:
+        run_script(args.script, args.script_args)
+    finally:
+        asset_http.unregister_handler(handler)
+
+
+def add_replay_options(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to N seconds")
+    parser.add_argument("--bandwidth", type=int, default=0, help="Body throughput cap in bytes/s (0 = off)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 503")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and error injection")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay HTTP fixtures for the asset scrapers")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Run a scraper and capture its responses")
+    rec.add_argument("--archive", type=Path, required=True)
+    rec.add_argument("--append", action="store_true", help="Add to an existing archive")
+    rec.add_argument("script")
+    rec.add_argument("script_args", nargs=argparse.REMAINDER)
+    rec.set_defaults(func=cmd_record)
+
+    srv = sub.add_parser("serve", help="Replay an archive over local HTTP")
+    srv.add_argument("--archive", type=Path, required=True)
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--verbose", action="store_true", help="Log every request")
+    add_replay_options(srv)
+    srv.set_defaults(func=cmd_serve)
+
+    run = sub.add_parser("run", help="Run a scraper against a replay server")
+    run.add_argument("--replay", required=True, help="Replay server base URL")
+    run.add_argument("script")
+    run.add_argument("script_args", nargs=argparse.REMAINDER)
+    run.set_defaults(func=cmd_run)
+
+    args = parser.parse_args()
+    if getattr(args, "script_args", None) and args.script_args[0] == "--":
+        args.script_args = args.script_args[1:]
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
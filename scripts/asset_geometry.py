@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Quantized binary geometry for the silhouette library.
+
+Every silhouette is flattened (asset_svg) and stored as closed rings of int16
+coordinates on a GRID-step lattice spanning the shape's own bounding box, so a
+client can decode straight into Path2D or a WebGL vertex buffer without parsing
+SVG. Identical geometry (C-130 variants, 737 family, ...) is stored once.
+
+Level-of-detail tiers ride along as extra shapes named "<id>@coarse" and
+"<id>@medium" (see lod_outlines()); "<id>" itself is the full outline.
+
+Layout (little-endian, all sections 2-byte aligned):
+
+    header  20 B   "SLG1", u16 version, u16 shapes, u16 grid, u16 0,
+                   u32 data length (int16 words), u32 names length (bytes)
+    index   20 B × shapes
+                   f32 x0, f32 y0, f32 step, u32 data offset (words), u16 rings, u16 0
+    data    int16 × data length
+                   per ring: n, x, y, then n-1 (dx, dy) deltas — all in grid steps
+    names   utf-8, "\n"-separated shape ids (file stems), same order as index
+
+A point decodes as (x0 + qx * step, y0 + qy * step); the error against the
+flattened outline is at most step / 2 per axis.
+
+Usage:
+    python scripts/asset_geometry.py [--write]   # build from public/, verify, compare sizes
+"""
+
+import argparse
+import gzip
+import heapq
+import math
+import struct
+from pathlib import Path
+
+import asset_svg
+
+MAGIC = b"SLG1"
+VERSION = 1
+GRID = 4095           # lattice steps across the larger bbox side
+HEADER = struct.Struct("<4sHHHHII")
+INDEX = struct.Struct("<fffIHH")
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+
+# (tier, largest on-screen size in px it is meant for); above the last → full
+LOD_TIERS = (("coarse", 24), ("medium", 96))
+LOD_MAX_ERROR_PX = 0.5   # outline may move at most this far at the tier's largest size
+LOD_MAX_AREA_ERROR = 0.01   # net area change per ring, as a fraction of its area
+
+
+def quantize(lines, grid: int = GRID):
+    """(x0, y0, step, rings) with each ring a list of int lattice points, repeats removed."""
+    box = asset_svg.bbox(lines)
+    if box is None:
+        return 0.0, 0.0, 1.0, []
+    x0, y0, x1, y1 = box
+    step = max(x1 - x0, y1 - y0) / grid or 1.0
+    # Round-trip through float32 so the decoder's origin/step match ours exactly
+    x0, y0, step = struct.unpack("<fff", struct.pack("<fff", x0, y0, step))
+    rings = []
+    for line in lines:
+        ring = []
+        for x, y in line:
+            q = (min(grid, max(0, round((x - x0) / step))), min(grid, max(0, round((y - y0) / step))))
+            if not ring or ring[-1] != q:
+                ring.append(q)
+        if len(ring) > 1 and ring[0] == ring[-1]:
+            ring.pop()
+        if len(ring) >= 3:
+            rings.append(ring)
+    return x0, y0, step, rings
+
+
+def _ring_words(ring) -> list[int]:
+    words = [len(ring), ring[0][0], ring[0][1]]
+    for (px, py), (x, y) in zip(ring, ring[1:]):
+        words += (x - px, y - py)
+    return words
+
+
+def encode(shapes: dict[str, list], grid: int = GRID, cache: dict | None = None) -> bytes:
+    """
+    shapes: {id: polylines} → blob. Shapes with identical quantized rings share
+    data. `cache`, a dict the caller keeps between calls (watch mode), skips
+    quantizing a shape whose polylines are the same object as last time.
+    """
+    index, data, shared = [], [], {}
+    for shape_id, lines in shapes.items():
+        hit = cache.get(shape_id) if cache is not None else None
+        if hit is not None and hit[0] is lines and hit[1] == grid:
+            x0, y0, step, words, ring_count = hit[2]
+        else:
+            x0, y0, step, rings = quantize(lines, grid)
+            words, ring_count = [w for ring in rings for w in _ring_words(ring)], len(rings)
+            if cache is not None:
+                cache[shape_id] = (lines, grid, (x0, y0, step, words, ring_count))
+        key = (x0, y0, step, tuple(words))
+        if key not in shared:
+            shared[key] = len(data)
+            data.extend(words)
+        index.append(INDEX.pack(x0, y0, step, shared[key], ring_count, 0))
+    if cache is not None:
+        for shape_id in cache.keys() - shapes.keys():
+            del cache[shape_id]
+    if any(not -32768 <= w <= 32767 for w in data):
+        raise ValueError("ring too long or grid too fine for int16")
+
+    names = "\n".join(shapes).encode("utf-8")
+    return b"".join([
+        HEADER.pack(MAGIC, VERSION, len(shapes), grid, 0, len(data), len(names)),
+        *index,
+        struct.pack(f"<{len(data)}h", *data),
+        names,
+    ])
+
+
+def decode(blob: bytes, quantized: bool = False, only=None) -> dict[str, list]:
+    """
+    blob → {id: rings}, rings as lists of (x, y) floats. With quantized=True
+    the values are (lattice rings, (x0, y0, step)) instead. `only` limits the
+    result to those ids.
+    """
+    magic, version, count, grid, _, data_len, names_len = HEADER.unpack_from(blob, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a v{VERSION} silhouette geometry blob")
+    data_start = HEADER.size + INDEX.size * count
+    data = struct.unpack_from(f"<{data_len}h", blob, data_start)
+    names = blob[data_start + 2 * data_len:data_start + 2 * data_len + names_len].decode("utf-8").split("\n")
+
+    shapes = {}
+    for i, shape_id in enumerate(names[:count]):
+        if only is not None and shape_id not in only:
+            continue
+        x0, y0, step, offset, ring_count, _ = INDEX.unpack_from(blob, HEADER.size + INDEX.size * i)
+        rings, pos = [], offset
+        for _ in range(ring_count):
+            n = data[pos]
+            x, y = data[pos + 1], data[pos + 2]
+            ring = [(x, y)]
+            for k in range(n - 1):
+                x += data[pos + 3 + 2 * k]
+                y += data[pos + 4 + 2 * k]
+                ring.append((x, y))
+            pos += 1 + 2 * n
+            rings.append(ring if quantized else [(x0 + qx * step, y0 + qy * step) for qx, qy in ring])
+        shapes[shape_id] = (rings, (x0, y0, step)) if quantized else rings
+    return shapes
+
+
+def verify(blob: bytes, shapes: dict[str, list], grid: int = GRID, only=None) -> float:
+    """
+    Round-trip check: the decoded lattice must equal quantize() exactly and
+    every decoded point must lie within step/2 of its source point. Returns the
+    worst error as a fraction of the shape size; raises AssertionError on mismatch.
+    `only` checks just those ids (the ones encode() quantized anew).
+    """
+    decoded = decode(blob, quantized=True, only=only)
+    assert list(decoded) == [i for i in shapes if only is None or i in only], "shape ids out of order"
+    worst = 0.0
+    for shape_id, lines in shapes.items():
+        if only is not None and shape_id not in only:
+            continue
+        x0, y0, step, rings = quantize(lines, grid)
+        got, (dx0, dy0, dstep) = decoded[shape_id]
+        assert (dx0, dy0, dstep) == (x0, y0, step), f"{shape_id}: frame mismatch"
+        assert got == rings, f"{shape_id}: lattice mismatch"
+        for line in lines:
+            for x, y in line:
+                qx = min(grid, max(0, round((x - x0) / step)))
+                qy = min(grid, max(0, round((y - y0) / step)))
+                err = max(abs(x0 + qx * step - x), abs(y0 + qy * step - y))
+                assert err <= step / 2 + 1e-6 * max(1.0, abs(x), abs(y)), f"{shape_id}: error {err} > step/2"
+                worst = max(worst, err / (step * grid))
+    return worst
+
+
+# ── Level of detail ─────────────────────────────────────────────────
+
+
+def _segment_distance(p, a, b) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.dist(p, a)
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length_sq))
+    return math.dist(p, (a[0] + t * dx, a[1] + t * dy))
+
+
+def _signed_triangle(a, b, c) -> float:
+    return ((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2
+
+
+def simplify_ring(ring, tolerance: float, area_budget: float = math.inf) -> list:
+    """
+    Visvalingam–Whyatt on a closed ring: repeatedly drop the vertex whose
+    triangle with its neighbours has the smallest area — the least area change
+    per removal — but only while every original vertex between the new
+    neighbours stays within `tolerance` of the shortcut and the ring's net
+    area change stays within `area_budget`. Keeps at least 3 vertices.
+    """
+    n = len(ring)
+    if n <= 3:
+        return list(ring)
+    prev = [(i - 1) % n for i in range(n)]
+    nxt = [(i + 1) % n for i in range(n)]
+    alive = [True] * n
+    version = [0] * n
+
+    def cost(i):
+        return abs(_signed_triangle(ring[prev[i]], ring[i], ring[nxt[i]]))
+
+    def within_tolerance(i) -> bool:
+        a, b = ring[prev[i]], ring[nxt[i]]
+        j = (prev[i] + 1) % n
+        while j != nxt[i]:
+            if _segment_distance(ring[j], a, b) > tolerance:
+                return False
+            j = (j + 1) % n
+        return True
+
+    heap = [(cost(i), i, 0) for i in range(n)]
+    heapq.heapify(heap)
+    remaining = n
+    net_change = 0.0
+    while heap and remaining > 3:
+        area, i, v = heapq.heappop(heap)
+        if not alive[i] or v != version[i]:
+            continue
+        change = -_signed_triangle(ring[prev[i]], ring[i], ring[nxt[i]])
+        if abs(net_change + change) > area_budget or not within_tolerance(i):
+            continue   # re-queued when a neighbour changes
+        net_change += change
+        alive[i] = False
+        remaining -= 1
+        p, q = prev[i], nxt[i]
+        nxt[p], prev[q] = q, p
+        for k in (p, q):
+            version[k] += 1
+            heapq.heappush(heap, (cost(k), k, version[k]))
+    return [ring[i] for i in range(n) if alive[i]]
+
+
+def lod_outlines(lines) -> dict[str, dict]:
+    """
+    {tier: {"lines", "vertices", "max_px", "area_error"}} for each LOD tier plus
+    "full". A tier's distance tolerance is LOD_MAX_ERROR_PX at its largest pixel
+    size and each ring keeps its area within LOD_MAX_AREA_ERROR; rings smaller
+    than one pixel at that size are dropped.
+    """
+    box = asset_svg.bbox(lines)
+    full_area = sum(abs(asset_svg.signed_area(line)) for line in lines) or 1.0
+    tiers = {"full": {"lines": lines, "vertices": sum(map(len, lines)), "max_px": None, "area_error": 0.0}}
+    if box is None:
+        return tiers
+    span = max(box[2] - box[0], box[3] - box[1])
+    for tier, max_px in LOD_TIERS:
+        unit = span / max_px
+        simplified = [simplify_ring(line, LOD_MAX_ERROR_PX * unit,
+                                    LOD_MAX_AREA_ERROR * abs(asset_svg.signed_area(line)))
+                      for line in lines if abs(asset_svg.signed_area(line)) >= unit * unit]
+        area = sum(abs(asset_svg.signed_area(line)) for line in simplified)
+        tiers[tier] = {
+            "lines": simplified,
+            "vertices": sum(map(len, simplified)),
+            "max_px": max_px,
+            "area_error": round(abs(area - full_area) / full_area, 5),
+        }
+    return tiers
+
+
+def lod_shapes(outlines: dict[str, list]) -> tuple[dict[str, list], dict[str, dict]]:
+    """
+    Expand {id: lines} into the shapes to encode (full outlines plus
+    "<id>@<tier>") and per-id manifest metadata:
+    {id: {tier: {"vertices", "max_px"}}}, "full" having no max_px.
+    """
+    shapes, meta = {}, {}
+    for shape_id, lines in outlines.items():
+        tiers = lod_outlines(lines)
+        meta[shape_id] = {}
+        for tier, lod in tiers.items():
+            shapes[shape_id if tier == "full" else f"{shape_id}@{tier}"] = lod["lines"]
+            meta[shape_id][tier] = {"vertices": lod["vertices"]}
+            if lod["max_px"]:
+                meta[shape_id][tier]["max_px"] = lod["max_px"]
+    return shapes, meta
+
+
+def size_report(blob: bytes, svg_paths) -> dict[str, int]:
+    svg = b"".join(Path(p).read_bytes() for p in svg_paths)
+    return {
+        "svg": len(svg),
+        "svg_gz": len(gzip.compress(svg, 9, mtime=0)),
+        "blob": len(blob),
+        "blob_gz": len(gzip.compress(blob, 9, mtime=0)),
+    }
+
+
+def describe(sizes: dict[str, int]) -> str:
+    return (f"{sizes['blob'] / 1024:.0f} KB ({sizes['blob_gz'] / 1024:.0f} KB gz) vs SVG "
+            f"{sizes['svg'] / 1024:.0f} KB ({sizes['svg_gz'] / 1024:.0f} KB gz), "
+            f"{sizes['blob'] / sizes['svg'] * 100:.0f}% of the SVG size")
+
+
+def describe_lod(meta: dict[str, dict]) -> str:
+    totals = {}
+    for tiers in meta.values():
+        for tier, info in tiers.items():
+            totals[tier] = totals.get(tier, 0) + info["vertices"]
+    full = totals.get("full") or 1
+    return ", ".join(f"{tier} {totals[tier]} vertices ({totals[tier] / full * 100:.0f}%)"
+                     for tier in [t for t, _ in LOD_TIERS] + ["full"] if tier in totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and verify the silhouette geometry blob from public/")
+    parser.add_argument("--write", action="store_true", help="Also write aircraft_silhouettes/geometry.bin")
+    args = parser.parse_args()
+
+    directory = PUBLIC_DIR / "aircraft_silhouettes"
+    files = sorted(p for p in directory.glob("*.svg") if p.name != "sprite.svg")
+    shapes, lod = lod_shapes({p.stem: asset_svg.read_svg(p.read_text(encoding="utf-8")).polylines()
+                              for p in files})
+    blob = encode(shapes)
+    worst = verify(blob, shapes)
+    print(f"Round trip OK: {len(shapes)} shapes, worst error {worst * 100:.4f}% of shape size")
+    print(f"Size: {describe(size_report(blob, files))}")
+    print(f"LOD: {describe_lod(lod)}")
+    if args.write:
+        (directory / "geometry.bin").write_bytes(blob)
+        print(f"Written: {directory / 'geometry.bin'}")
+
+
+if __name__ == "__main__":
+    main()
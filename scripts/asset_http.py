@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Shared urllib plumbing for the asset scripts.
+
+The scrapers call urllib.request.urlopen() directly. Tooling that needs to
+observe or reroute that traffic (fixture record/replay, run metrics) registers
+a handler here, and the global opener is rebuilt with every registered handler
+in place so the scrapers themselves stay unaware of it.
+"""
+
+import io
+import urllib.request
+import urllib.response
+
+_HANDLERS: list[urllib.request.BaseHandler] = []
+
+
+def _install():
+    urllib.request.install_opener(urllib.request.build_opener(*_HANDLERS))
+
+
+def register_handler(handler: urllib.request.BaseHandler) -> urllib.request.BaseHandler:
+    """Add a handler to the global opener used by urllib.request.urlopen()."""
+    _HANDLERS.append(handler)
+    _install()
+    return handler
+
+
+def unregister_handler(handler: urllib.request.BaseHandler):
+    """Remove a previously registered handler and rebuild the global opener."""
+    if handler in _HANDLERS:
+        _HANDLERS.remove(handler)
+    if _HANDLERS:
+        _install()
+    else:
+        urllib.request.install_opener(None)
+
+
+def origin_url(req: urllib.request.Request) -> str:
+    """The URL the scraper asked for, before any replay redirect rewrote it."""
+    return getattr(req, "asset_origin_url", req.full_url)
+
+
+def buffer_response(response) -> tuple[bytes, urllib.response.addinfourl]:
+    """
+    Read a response body fully and return (data, replacement response).
+
+    Response processors that need the body (recording, byte counting) consume
+    the original stream; the replacement hands the same bytes on to the caller.
+    """
+    data = response.read()
+    replacement = urllib.response.addinfourl(
+        io.BytesIO(data), response.headers, response.geturl(), response.status
+    )
+    replacement.msg = getattr(response, "msg", "")
+    return data, replacement
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Validation stage for downloaded images, shared by both scrapers.
+
+Nothing is written to public/ until its bytes pass inspect():
+
+    format     the magic bytes decide the type and so the extension, whatever
+               the URL or Content-Type claimed; HTML error pages, SVG and
+               unknown payloads are refused
+    structure  JPEG: marker segments walked from SOI to EOI, frame size from
+               SOF. PNG: every chunk's CRC checked, IHDR to IEND, the IDAT
+               stream inflated and its length checked against the image size.
+               A file cut short fails here.
+    decode     with Pillow installed, a full decode (truncated or corrupt
+               pixel data raises) and a blank check on a greyscale thumbnail
+    geometry   smaller than MIN_SIDE px, or longer side more than MAX_ASPECT
+               times the shorter, is refused
+
+Pillow is optional (pip install Pillow). Without it the structure check
+still catches truncation and bad headers; only the blank check is skipped.
+
+The checks run in a process pool, so decoding never holds the scraper's GIL;
+validate() blocks only its caller, a thread of asset_pipeline's process stage,
+while the I/O stages keep fetching. A rejection is returned, not raised: the
+scrapers move on to their next candidate URL. Truncation is marked transient
+(worth retrying next run); every other rejection is final for that URL.
+
+Usage:
+    python scripts/asset_image.py FILE...     # run the checks on local files
+"""
+
+import io
+import os
+import struct
+import sys
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+
+try:
+    from PIL import Image, ImageStat
+except ImportError:  # optional
+    Image = None
+
+MIN_BYTES = 1024
+MIN_SIDE = 120          # px; below this it is a thumbnail or an icon
+MAX_ASPECT = 4.0        # longer side / shorter side
+BLANK_STDDEV = 2.0      # greyscale standard deviation below which an image is blank
+WORKERS = min(4, os.cpu_count() or 1)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+_ADAM7 = ((0, 0, 8, 8), (4, 0, 8, 8), (0, 4, 4, 8), (2, 0, 4, 4), (0, 2, 2, 4), (1, 0, 2, 2), (0, 1, 1, 2))
+
+
+class Verdict(NamedTuple):
+    ext: str | None        # ".jpg", ".png", ".gif", ".webp"; None if unrecognised
+    width: int
+    height: int
+    error: str | None      # None = accepted
+    transient: bool = False
+
+
+class Truncated(ValueError):
+    pass
+
+
+# ── Format sniffing ─────────────────────────────────────────────────
+
+
+def sniff(data: bytes) -> str | None:
+    """Extension for the image type in `data`'s magic bytes, or None."""
+    if data.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if data.startswith(PNG_SIGNATURE):
+        return ".png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def describe_unknown(data: bytes) -> str:
+    head = data[:512].lstrip().lower()
+    if head.startswith((b"<!doctype html", b"<html")):
+        return "HTML page, not an image"
+    if b"<svg" in head:
+        return "SVG, not a raster image"
+    return f"unrecognised format (starts {data[:8].hex()})"
+
+
+# ── Structure checks (no Pillow needed) ─────────────────────────────
+
+
+def jpeg_size(data: bytes) -> tuple[int, int]:
+    """(width, height) after walking every marker segment from SOI to EOI."""
+    n, i, size = len(data), 2, None
+    while True:
+        if i + 2 > n:
+            raise Truncated("no end-of-image marker")
+        if data[i] != 0xFF:
+            raise ValueError(f"bad JPEG marker at byte {i}")
+        marker = data[i + 1]
+        if marker == 0xFF:          # fill byte
+            i += 1
+            continue
+        if marker == 0xD9:          # EOI
+            break
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            i += 2
+            continue
+        if i + 4 > n:
+            raise Truncated("segment header cut off")
+        length = int.from_bytes(data[i + 2:i + 4], "big")
+        if length < 2 or i + 2 + length > n:
+            raise Truncated(f"segment 0x{marker:02X} runs past the end")
+        if marker in _JPEG_SOF:
+            if length < 7:
+                raise ValueError("short frame header")
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            size = (width, height)
+        i += 2 + length
+        if marker == 0xDA:          # SOS: skip the entropy-coded scan to the next marker
+            while True:
+                j = data.find(b"\xff", i)
+                if j < 0 or j + 1 >= n:
+                    raise Truncated("scan data without an end-of-image marker")
+                follow = data[j + 1]
+                if follow == 0x00 or 0xD0 <= follow <= 0xD7:
+                    i = j + 2
+                elif follow == 0xFF:
+                    i = j + 1
+                else:
+                    i = j
+                    break
+    if size is None:
+        raise ValueError("no JPEG frame header")
+    return size
+
+
+def _png_raw_bytes(width: int, height: int, depth: int, color: int, interlace: int) -> int:
+    bits = _PNG_CHANNELS[color] * depth
+    row = lambda w: 1 + (w * bits + 7) // 8
+    if not interlace:
+        return height * row(width)
+    total = 0
+    for x0, y0, dx, dy in _ADAM7:
+        w, h = (width - x0 + dx - 1) // dx, (height - y0 + dy - 1) // dy
+        if w > 0 and h > 0:
+            total += h * row(w)
+    return total
+
+
+def png_size(data: bytes) -> tuple[int, int]:
+    """(width, height) after checking every chunk CRC and inflating the whole IDAT stream."""
+    n, i = len(data), len(PNG_SIGNATURE)
+    header, inflater, raw = None, zlib.decompressobj(), 0
+    while True:
+        if i + 8 > n:
+            raise Truncated("no IEND chunk")
+        length, kind = struct.unpack(">I4s", data[i:i + 8])
+        if i + 12 + length > n:
+            raise Truncated(f"{kind.decode('latin-1')} chunk runs past the end")
+        body = data[i + 8:i + 8 + length]
+        if zlib.crc32(kind + body) != int.from_bytes(data[i + 8 + length:i + 12 + length], "big"):
+            raise ValueError(f"CRC mismatch in {kind.decode('latin-1')} chunk")
+        if header is None and kind != b"IHDR":
+            raise ValueError("first chunk is not IHDR")
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+            if header[3] not in _PNG_CHANNELS:
+                raise ValueError(f"unknown PNG colour type {header[3]}")
+        elif kind == b"IDAT":
+            try:
+                raw += len(inflater.decompress(body))
+            except zlib.error as e:
+                raise ValueError(f"corrupt image data: {e}") from None
+        elif kind == b"IEND":
+            break
+        i += 12 + length
+    width, height, depth, color, _, _, interlace = header
+    if not inflater.eof or raw != _png_raw_bytes(width, height, depth, color, interlace):
+        raise Truncated("image data ends early")
+    return width, height
+
+
+# ── Inspection ──────────────────────────────────────────────────────
+
+
+def _decode(data: bytes) -> tuple[int, int, float]:
+    """(width, height, greyscale stddev) from a full Pillow decode."""
+    with Image.open(io.BytesIO(data)) as im:
+        im.load()
+        grey = im.convert("L")
+        grey.thumbnail((64, 64))
+        return im.width, im.height, ImageStat.Stat(grey).stddev[0]
+
+
+def inspect(data: bytes) -> Verdict:
+    """Every check on one payload. Runs in the pool; must stay a top-level function."""
+    ext = sniff(data)
+    if len(data) < MIN_BYTES:
+        return Verdict(ext, 0, 0, f"tiny ({len(data)} bytes)")
+    if ext is None:
+        return Verdict(None, 0, 0, describe_unknown(data))
+    width = height = 0
+    try:
+        if ext == ".jpg":
+            width, height = jpeg_size(data)
+        elif ext == ".png":
+            width, height = png_size(data)
+        if Image is not None:
+            width, height, spread = _decode(data)
+            if spread < BLANK_STDDEV:
+                return Verdict(ext, width, height, f"blank (greyscale stddev {spread:.1f})")
+    except Truncated as e:
+        return Verdict(ext, width, height, f"truncated: {e}", transient=True)
+    except Exception as e:   # ValueError from the walkers; anything Pillow raises on bad data
+        return Verdict(ext, width, height, f"corrupt: {e}")
+    if width and height:
+        if min(width, height) < MIN_SIDE:
+            return Verdict(ext, width, height, f"tiny ({width}x{height})")
+        if max(width, height) / min(width, height) > MAX_ASPECT:
+            return Verdict(ext, width, height, f"skewed ({width}x{height})")
+    return Verdict(ext, width, height, None)
+
+
+# ── Pool ────────────────────────────────────────────────────────────
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ProcessPoolExecutor | None:
+    global _pool
+    with _pool_lock:
+        if _pool is None and WORKERS > 1:
+            _pool = ProcessPoolExecutor(max_workers=WORKERS)
+        return _pool
+
+
+def validate(data: bytes, accept=(".jpg", ".png")) -> Verdict:
+    """inspect() in the process pool (inline on one CPU), then the caller's allowed extensions."""
+    pool = _executor()
+    try:
+        verdict = pool.submit(inspect, data).result() if pool else inspect(data)
+    except (BrokenProcessPool, OSError):
+        verdict = inspect(data)
+    if verdict.error is None and verdict.ext not in accept:
+        return verdict._replace(error=f"{verdict.ext} image, expected {' or '.join(accept)}")
+    return verdict
+
+
+def shutdown():
+    """Stop the pool (end of a run); the next validate() starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def main():
+    for name in sys.argv[1:]:
+        with open(name, "rb") as f:
+            verdict = validate(f.read(), accept=(".jpg", ".png", ".gif", ".webp"))
+        status = "OK" if verdict.error is None else "REJECT"
+        print(f"  [{status}] {name}: {verdict.ext} {verdict.width}x{verdict.height}"
+              + (f" — {verdict.error}" if verdict.error else ""))
+    shutdown()
+
+
+if __name__ == "__main__":
+    main()
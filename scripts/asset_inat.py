@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+iNaturalist taxon lookups for the wildlife scraper, resolved once and batched.
+
+The scraper used to run a free-text /v1/taxa?q= search for every species that
+reached its iNaturalist fallback. Instead:
+
+    resolve   each scientific name is searched once and matched as before
+              (the exact name, or the species a subspecies name starts with);
+              the taxon ID is kept in scripts/.cache/inat_taxa.json, since IDs
+              do not change when photos do
+    fetch     photo data comes from /v1/taxa/{id,id,...}, BATCH_SIZE IDs per
+              request: the first species of a run that needs iNaturalist pulls
+              in every resolved species queued behind it
+
+With a warm map the whole species list costs ceil(species / 30) taxa requests
+rather than one search each. Only matches are stored: a name with no taxon is
+a miss for the negative cache (asset_negcache.py), as it always was. A stored
+ID the API no longer returns is dropped and searched again next time.
+
+File format:
+    {"version": 1, "taxa": {scientific_name: taxon_id}}
+
+Usage:
+    python scripts/asset_inat.py              # resolved / unresolved species from the cache
+    python scripts/asset_inat.py --resolve    # search every unresolved name now (warm the map)
+"""
+
+import argparse
+import json
+import threading
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+import asset_runtime
+import asset_schedule
+import asset_species
+from asset_metrics import metrics
+
+API = "https://api.inaturalist.org/v1"
+USER_AGENT = "GlidepathApp/1.0 (wildlife-image-downloader; airfield-safety-app)"
+CACHE_NAME = "inat_taxa.json"   # in asset_runtime.CACHE_DIR
+CACHE_VERSION = 1
+BATCH_SIZE = 30   # most IDs /v1/taxa/{ids} takes per request
+
+
+def match(results: list[dict], scientific_name: str) -> dict | None:
+    """First search result with a photo whose name is scientific_name, or a prefix of it (subspecies)."""
+    wanted = scientific_name.lower()
+    for taxon in results:
+        name = taxon.get("name", "").lower()
+        if name and (name == wanted or wanted.startswith(name)) and taxon.get("default_photo"):
+            return taxon
+    return None
+
+
+class Taxa:
+    """
+    Persisted name -> ID map plus this run's photo data. queue() the species
+    a run may look up so fetch batches can be filled ahead of need. lookup()
+    may be called from several pipeline threads (asset_pipeline.py).
+    """
+
+    def __init__(self, user_agent: str, path: Path | None = None, api: str = API):
+        self.user_agent = user_agent
+        self.path = path = path or asset_runtime.cache_path(CACHE_NAME)
+        self.api = api
+        self.ids: dict[str, int] = {}
+        self.fetched: dict[int, dict | None] = {}   # this run: ID -> taxon (None: not returned)
+        self.pending: list[str] = []
+        self.requests = {"search": 0, "batch": 0}
+        self._lock = threading.Lock()
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == CACHE_VERSION:
+                    self.ids = data.get("taxa", {})
+            except (json.JSONDecodeError, OSError):
+                print(f"[WARN] Ignoring unreadable taxon cache: {path}")
+
+    def _get(self, url: str) -> dict:
+        req = urllib.request.Request(url, headers={"User-Agent": self.user_agent})
+        with urllib.request.urlopen(req, timeout=15) as resp:
+            return json.loads(resp.read())
+
+    def queue(self, scientific_names):
+        """Species that may need a lookup this run, in the order they will be reached."""
+        self.pending = list(dict.fromkeys(scientific_names))
+
+    def lookup(self, scientific_name: str) -> dict | None:
+        """
+        The taxon (with default_photo) for a name, or None if iNaturalist has
+        no match. Network and HTTP errors propagate; nothing is cached for them.
+        """
+        with self._lock:   # one batch request fills the map for every waiting thread
+            return self._lookup(scientific_name)
+
+    def _lookup(self, scientific_name: str) -> dict | None:
+        taxon_id = self.ids.get(scientific_name)
+        metrics.cache("inat_taxon_id", hit=taxon_id is not None)
+        if taxon_id is None:
+            return self._search(scientific_name)
+        if taxon_id not in self.fetched:
+            self._fetch_batch(taxon_id)
+        taxon = self.fetched.get(taxon_id)
+        if taxon is None or not taxon.get("default_photo"):
+            del self.ids[scientific_name]   # gone or photo-less: search again next run
+            return None
+        return taxon
+
+    def _search(self, scientific_name: str) -> dict | None:
+        params = urllib.parse.urlencode({"q": scientific_name, "per_page": "3", "is_active": "true"})
+        with metrics.stage("inat_search"):
+            data = self._get(f"{self.api}/taxa?{params}")
+        self.requests["search"] += 1
+        taxon = match(data.get("results", []), scientific_name)
+        if taxon is not None and taxon.get("id") is not None:
+            self.ids[scientific_name] = taxon["id"]
+            self.fetched[taxon["id"]] = taxon
+        return taxon
+
+    def _fetch_batch(self, taxon_id: int):
+        """Photo data for taxon_id and the next resolved, unfetched queued species."""
+        batch = [taxon_id]
+        for name in self.pending:
+            other = self.ids.get(name)
+            if len(batch) == BATCH_SIZE:
+                break
+            if other is not None and other not in self.fetched and other not in batch:
+                batch.append(other)
+        with metrics.stage("inat_taxa"):
+            data = self._get(f"{self.api}/taxa/{','.join(map(str, batch))}")
+        self.requests["batch"] += 1
+        metrics.count("inat_batch_ids", len(batch))
+        for taxon_id in batch:
+            self.fetched[taxon_id] = None
+        for taxon in data.get("results", []):
+            if taxon.get("id") in self.fetched:
+                self.fetched[taxon["id"]] = taxon
+
+    def resolve(self, scientific_names, delay: float = 1.0) -> list[str]:
+        """Search every name not in the map yet; returns those still unmatched."""
+        unmatched = []
+        for name in dict.fromkeys(scientific_names):
+            if name in self.ids:
+                continue
+            if self._search(name) is None:
+                unmatched.append(name)
+            asset_schedule.pace(delay)
+        return unmatched
+
+    def describe(self) -> str:
+        return (f"{len(self.ids)} taxon IDs cached, {self.requests['search']} searches, "
+                f"{self.requests['batch']} batch requests")
+
+    def save(self):
+        payload = {"version": CACHE_VERSION, "taxa": dict(sorted(self.ids.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="iNaturalist taxon ID map for the wildlife scraper")
+    parser.add_argument("--resolve", action="store_true", help="Search every unresolved species now")
+    args = parser.parse_args()
+
+    taxa = Taxa(USER_AGENT)
+    names = [s["scientific_name"] for s in asset_species.load()["species"] if "spp." not in s["scientific_name"]]
+    if args.resolve:
+        taxa.resolve(names)
+        taxa.save()
+    resolved = [name for name in names if name in taxa.ids]
+    print(f"{taxa.path}: {len(resolved)}/{len(names)} species resolved to iNaturalist taxon IDs "
+          f"({-(-len(resolved) // BATCH_SIZE)} batch requests for all of them)")
+    for name in sorted(set(names) - set(resolved)):
+        print(f"  unresolved: {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Run metrics and profiling hooks shared by the asset scripts.
+
+generate_aircraft_silhouettes.py, scrape_aircraft_images.py and
+scrape_wildlife_images.py all report through the module-level `metrics`
+instance:
+
+    with metrics.stage("search"):        # per-stage wall-clock timers
+        ...
+    metrics.count("image_bytes", n)       # byte / item counters
+    metrics.cache("dedup", hit=True)      # cache-hit ratios
+    metrics.event("entry", name=..., ...) # JSON-lines event log
+
+HTTP latency and bytes per host are captured automatically by MetricsHandler,
+which session() installs on the global urllib opener. session() also wires the
+shared CLI switches:
+
+    --metrics-log PATH   append JSON-lines events to PATH
+    --profile [PATH]     run under cProfile, print hot functions, dump stats
+    --trace-memory       run under tracemalloc, print top allocation sites
+
+All methods are thread-safe so a worker pool can report into one instance.
+"""
+
+import bisect
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+import asset_http
+
+# Latency histogram bucket upper bounds (seconds); the last bucket is open-ended
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+PROFILE_TOP_N = 20
+MEMORY_TOP_N = 10
+
+
+class RunMetrics:
+    """Collects timers, counters, cache ratios and per-host latencies for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._log = None
+        self.reset()
+
+    def reset(self):
+        self.script = ""
+        self.started = time.perf_counter()
+        self.stages: dict[str, list[float]] = {}      # name -> [total_seconds, calls]
+        self.counters: dict[str, int] = {}
+        self.caches: dict[str, list[int]] = {}        # name -> [hits, misses]
+        self.hosts: dict[str, dict] = {}
+
+    # ── lifecycle ──
+
+    def begin(self, script: str, log_path: Path | None = None):
+        self.reset()
+        self.script = script
+        if log_path:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log = open(log_path, "a", encoding="utf-8")
+        self.event("run_start", script=script)
+
+    def finish(self):
+        self.event("run_end", wall_s=round(self.elapsed(), 3), **self.as_dict())
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    # ── recording ──
+
+    def event(self, kind: str, **fields):
+        if self._log is None:
+            return
+        line = json.dumps({"ts": round(time.time(), 3), "event": kind, **fields}, default=str)
+        with self._lock:
+            self._log.write(line + "\n")
+            self._log.flush()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - start)
+
+    def add_stage_time(self, name: str, seconds: float):
+        with self._lock:
+            totals = self.stages.setdefault(name, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += 1
+
+    def sleep(self, seconds: float):
+        """time.sleep() that is accounted for as the 'rate_limit' stage."""
+        if seconds <= 0:
+            return
+        with self.stage("rate_limit"):
+            time.sleep(seconds)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def cache(self, name: str, hit: bool):
+        with self._lock:
+            ratio = self.caches.setdefault(name, [0, 0])
+            ratio[0 if hit else 1] += 1
+
+    def record_request(self, host: str, seconds: float, nbytes: int, status: int):
+        with self._lock:
+            h = self.hosts.setdefault(host, {
+                "requests": 0, "errors": 0, "bytes": 0, "seconds": 0.0,
+                "latencies": [], "histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+            })
+            h["requests"] += 1
+            h["bytes"] += nbytes
+            h["seconds"] += seconds
+            h["latencies"].append(seconds)
+            h["histogram"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            if status >= 400:
+                h["errors"] += 1
+
+    # ── reporting ──
+
+    @staticmethod
+    def _percentile(sorted_values: list[float], pct: float) -> float:
+        if not sorted_values:
+            return 0.0
+        idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+        return sorted_values[idx]
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            hosts = {}
+            for host, h in self.hosts.items():
+                lat = sorted(h["latencies"])
+                hosts[host] = {
+                    "requests": h["requests"],
+                    "errors": h["errors"],
+                    "bytes": h["bytes"],
+                    "seconds": round(h["seconds"], 3),
+                    "p50_s": round(self._percentile(lat, 50), 3),
+                    "p95_s": round(self._percentile(lat, 95), 3),
+                    "max_s": round(lat[-1], 3) if lat else 0.0,
+                    "histogram": dict(zip([f"<{b}s" for b in LATENCY_BUCKETS] + [f">={LATENCY_BUCKETS[-1]}s"],
+                                          h["histogram"])),
+                }
+            return {
+                "stages": {k: {"seconds": round(v[0], 3), "calls": v[1]} for k, v in self.stages.items()},
+                "counters": dict(self.counters),
+                "caches": {k: {"hits": v[0], "misses": v[1]} for k, v in self.caches.items()},
+                "hosts": hosts,
+            }
+
+    def print_summary(self):
+        data = self.as_dict()
+        wall = self.elapsed()
+        print(f"\n-- Timing ({wall:.1f}s wall) --")
+        for name, s in sorted(data["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+            share = s["seconds"] / wall * 100 if wall else 0
+            print(f"  {name:18s} {s['seconds']:8.2f}s {share:5.1f}%  ({s['calls']} calls)")
+
+        if data["hosts"]:
+            print(f"\n-- Hosts (slowest first) --")
+            for host, h in sorted(data["hosts"].items(), key=lambda kv: -kv[1]["seconds"]):
+                print(f"  {host:32s} {h['requests']:5d} req {h['errors']:4d} err "
+                      f"{h['bytes'] / 1024:9.0f} KB  p50 {h['p50_s']:.2f}s  p95 {h['p95_s']:.2f}s  "
+                      f"max {h['max_s']:.2f}s")
+                buckets = "  ".join(f"{k} {v}" for k, v in h["histogram"].items() if v)
+                print(f"  {'':32s} {buckets}")
+
+        if data["caches"]:
+            print(f"\n-- Caches --")
+            for name, c in data["caches"].items():
+                total = c["hits"] + c["misses"]
+                ratio = c["hits"] / total * 100 if total else 0
+                print(f"  {name:18s} {c['hits']}/{total} hits ({ratio:.0f}%)")
+
+        if data["counters"]:
+            print(f"\n-- Counters --")
+            for name, value in sorted(data["counters"].items()):
+                shown = f"{value / 1024:.0f} KB" if name.endswith("bytes") else str(value)
+                print(f"  {name:18s} {shown}")
+
+
+metrics = RunMetrics()
+
+
+class MetricsHandler(urllib.request.BaseHandler):
+    """Time every urllib request and attribute latency and bytes to its host."""
+
+    def http_request(self, req):
+        req.asset_t0 = time.perf_counter()
+        return req
+
+    https_request = http_request
+
+    def http_response(self, req, response):
+        data, replacement = asset_http.buffer_response(response)
+        seconds = time.perf_counter() - getattr(req, "asset_t0", time.perf_counter())
+        url = asset_http.origin_url(req)
+        host = urllib.parse.urlsplit(url).netloc
+        metrics.record_request(host, seconds, len(data), response.status)
+        metrics.event("request", host=host, url=url, status=response.status,
+                      bytes=len(data), seconds=round(seconds, 4))
+        return replacement
+
+    https_response = http_response
+
+
+# ── CLI integration ─────────────────────────────────────────────────
+
+
+def add_cli_options(parser):
+    """Add --metrics-log, --profile and --trace-memory to a script's parser."""
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--metrics-log", type=Path, help="Append JSON-lines run events to this file")
+    group.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                       help="Profile with cProfile; print hot functions and dump stats to PATH")
+    group.add_argument("--trace-memory", action="store_true",
+                       help="Trace allocations with tracemalloc and print the top sites")
+
+
+def _print_profile(profiler: cProfile.Profile, dump_path: str):
+    if dump_path:
+        profiler.dump_stats(dump_path)
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP_N)
+    print(f"\n-- Profile (top {PROFILE_TOP_N} by cumulative time) --")
+    print(out.getvalue().rstrip())
+    if dump_path:
+        print(f"  Stats written: {dump_path}")
+
+
+def _print_memory():
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"\n-- Memory (current {current / 1024 / 1024:.1f} MB, peak {peak / 1024 / 1024:.1f} MB) --")
+    for stat in snapshot.statistics("lineno")[:MEMORY_TOP_N]:
+        print(f"  {stat.size / 1024:8.0f} KB  {stat.count:6d} blocks  {stat.traceback[0]}")
+    metrics.event("memory", current_bytes=current, peak_bytes=peak)
+
+
+@contextlib.contextmanager
+def session(script: str, args=None):
+    """
+    Instrument one script run. `args` is the parsed namespace from a parser
+    that went through add_cli_options(); None runs with timers only.
+    """
+    log_path = getattr(args, "metrics_log", None)
+    profile = getattr(args, "profile", None)
+    trace_memory = getattr(args, "trace_memory", False)
+
+    metrics.begin(script, log_path)
+    handler = asset_http.register_handler(MetricsHandler())
+    profiler = cProfile.Profile() if profile is not None else None
+    if trace_memory:
+        tracemalloc.start(10)
+    if profiler:
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler:
+            profiler.disable()
+        asset_http.unregister_handler(handler)
+        metrics.print_summary()
+        if profiler:
+            _print_profile(profiler, profile or f"{script}.prof")
+        if trace_memory:
+            _print_memory()
+        metrics.finish()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Persisted negative-result cache for the asset scrapers.
+
+Records which (source, query) lookups came back empty for each entry so that
+routine re-runs skip them instead of re-querying USFWS, Commons, Wikipedia or
+iNaturalist for results already known to be missing. A record is ignored once
+it is older than the TTL, and an entry's records are dropped as soon as its
+query list changes (tracked by fingerprint) or it succeeds.
+
+Only definitive misses belong here (empty search results, no matching taxon).
+Transient failures — timeouts, 5xx, connection errors — should not be
+recorded, or a flaky network would hide entries for a whole TTL.
+
+File format:
+    {"version": 1, "entries": {name: {"fingerprint": str,
+                                      "failures": {"source:query": unix_ts}}}}
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+from asset_metrics import metrics
+
+DEFAULT_TTL_DAYS = 7.0
+CACHE_VERSION = 1
+
+
+def fingerprint(*parts) -> str:
+    """Stable short hash of an entry's lookup inputs (queries, IDs, names)."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class NegativeCache:
+    """
+    retry=True (--retry-failures) still records and clears results but never
+    skips, so a forced run refreshes the cache without consulting it.
+    """
+
+    def __init__(self, path: Path, ttl_days: float = DEFAULT_TTL_DAYS, retry: bool = False):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.retry = retry
+        self._lock = threading.Lock()
+        self.entries: dict[str, dict] = {}
+        self._fingerprints: dict[str, str] = {}
+        self.skipped = 0
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == CACHE_VERSION:
+                    self.entries = data.get("entries", {})
+            except (json.JSONDecodeError, OSError):
+                print(f"[WARN] Ignoring unreadable failure cache: {path}")
+
+    def begin(self, name: str, fp: str):
+        """Start processing an entry; forget its records if its inputs changed."""
+        with self._lock:
+            self._fingerprints[name] = fp
+            record = self.entries.get(name)
+            if record is not None and record.get("fingerprint") != fp:
+                del self.entries[name]
+
+    def known(self, name: str, source: str, query: str) -> bool:
+        """True if this lookup failed within the TTL (ignores --retry-failures)."""
+        with self._lock:
+            failed_at = self.entries.get(name, {}).get("failures", {}).get(f"{source}:{query}")
+        return failed_at is not None and time.time() - failed_at < self.ttl_seconds
+
+    def skip(self, name: str, source: str, query: str) -> bool:
+        """True if this lookup failed within the TTL and should not be retried."""
+        hit = not self.retry and self.known(name, source, query)
+        metrics.cache("negative", hit=hit)
+        if hit:
+            with self._lock:
+                self.skipped += 1
+        return hit
+
+    def fail(self, name: str, source: str, query: str):
+        """Record a definitive miss for one lookup of an entry passed to begin()."""
+        with self._lock:
+            fp = self._fingerprints[name]
+            record = self.entries.setdefault(name, {"fingerprint": fp, "failures": {}})
+            record["fingerprint"] = fp
+            record["failures"][f"{source}:{query}"] = round(time.time())
+
+    def succeed(self, name: str):
+        """An entry resolved — its past misses no longer matter."""
+        with self._lock:
+            self.entries.pop(name, None)
+
+    def prune(self, live_names):
+        """Drop entries that are no longer in the catalogue, and expired records."""
+        live = set(live_names)
+        now = time.time()
+        with self._lock:
+            for name in list(self.entries):
+                if name not in live:
+                    del self.entries[name]
+                    continue
+                failures = self.entries[name]["failures"]
+                for key in [k for k, ts in failures.items() if now - ts >= self.ttl_seconds]:
+                    del failures[key]
+                if not failures:
+                    del self.entries[name]
+
+    def save(self):
+        with self._lock:
+            payload = {"version": CACHE_VERSION, "entries": dict(sorted(self.entries.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def add_cli_options(parser):
+    """Add --failure-ttl and --retry-failures to a scraper's parser."""
+    group = parser.add_argument_group("negative cache")
+    group.add_argument("--failure-ttl", type=float, default=DEFAULT_TTL_DAYS, metavar="DAYS",
+                       help=f"Skip lookups that failed within this many days (default {DEFAULT_TTL_DAYS:g})")
+    group.add_argument("--retry-failures", action="store_true",
+                       help="Ignore the failure cache and retry every lookup")
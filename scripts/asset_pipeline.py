@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Staged producer/consumer pipeline shared by both image scrapers.
+
+Each work unit (a species; an aircraft, or a whole dedup group) is a Job, and
+a job moves through five stages:
+
+    resolve   the job's next lookup (Wikidata, a search query, an IIIF id,
+              an iNaturalist taxon) -> its candidates              I/O threads
+    probe     the next candidate whose reported type and size could pass
+              asset_image; a lazy candidate list (Wikidata's P373
+              category) makes its request here                     I/O threads
+    fetch     download the candidate                               I/O threads
+    process   asset_image.validate(), in its process pool          pool feeders
+    commit    the scraper's commit(job): write the image and the
+              manifest entry, record the lookups tried             one thread
+
+A refused or failed download sends the job back to probe for its next
+candidate, a lookup with none left back to resolve; a job out of lookups goes
+to commit without an image. Stages are joined by queues, so while one image
+decodes in the process pool the I/O threads are already fetching the next.
+
+Backpressure: submit() blocks while `in_flight` jobs are inside, so at most
+that many downloaded images are held in memory however long the catalogue.
+Every queue is bounded by the same number. A job is in one place at a time,
+so a put never waits, not even when a job goes back a stage.
+
+Only the committer thread calls commit(), so the scraper's manifest, failure
+list, negative cache and catalogue rows have a single writer. The I/O stages
+leave what they learn on the job: `outcomes` holds (lookup, "miss" | "error")
+for every lookup that produced nothing ("error": worth trying again next run),
+`log` the lines the committer prints as one block.
+"""
+
+import queue
+import threading
+import urllib.request
+from collections import deque
+from typing import Callable, Iterable, NamedTuple
+
+import asset_image
+from asset_metrics import metrics
+
+STAGES = ("resolve", "probe", "fetch", "process", "commit")
+JOBS_PER_WORKER = 4   # default in_flight: enough queued work to keep every I/O thread busy
+
+_STOP = object()
+_current = threading.local()
+
+
+class Lookup(NamedTuple):
+    owner: str        # entry the outcome is recorded against (a dedup group member)
+    source: str       # "usfws", "wikidata", "commons", ...
+    query: str
+    find: Callable[[], Iterable[dict]]   # candidates ({"url", ...}); a request error raises
+
+
+class Job:
+    def __init__(self, key: str, lookups: Iterable[Lookup] = (), payload=None):
+        self.key = key
+        self.payload = payload          # whatever the scraper's commit() needs
+        self.lookups = deque(lookups)
+        self.lookup: Lookup | None = None       # the lookup being tried; on commit, the one that found the image
+        self.candidates = None                  # its remaining candidates
+        self.candidate: dict | None = None      # on commit, the accepted candidate (None: nothing found)
+        self.data: bytes | None = None          # downloaded bytes, until commit
+        self.verdict: asset_image.Verdict | None = None
+        self.retry = False                      # the current lookup hit an error or a transient rejection
+        self.started = False
+        self.deferred = False                   # the budget ran out before it started: no lookup was tried
+        self.outcomes: list[tuple[Lookup, str]] = []
+        self.log: list[str] = []
+
+
+def log(message: str = ""):
+    """Append to the log of the job this thread is working on, else print()."""
+    job = getattr(_current, "job", None)
+    if job is None:
+        print(message)
+    else:
+        job.log.append(message)
+
+
+def implausible(candidate: dict) -> str | None:
+    """Why a candidate's reported MIME type or size cannot pass asset_image, or None (also if unreported)."""
+    mime = candidate.get("mime")
+    if mime and not mime.startswith("image/"):
+        return f"not an image ({mime})"
+    width, height = candidate.get("width") or 0, candidate.get("height") or 0
+    if width and height:
+        if min(width, height) < asset_image.MIN_SIDE:
+            return f"{width}x{height} is too small"
+        if max(width, height) / min(width, height) > asset_image.MAX_ASPECT:
+            return f"{width}x{height} is too elongated"
+    return None
+
+
+def _short(url: str) -> str:
+    return url.rsplit("/", 1)[-1][:40]
+
+
+class Pipeline:
+    """
+    with Pipeline(commit, user_agent=...) as pipeline:
+        for job in jobs:
+            pipeline.submit(job)
+
+    Leaving the block waits for every job to be committed. An exception in a
+    stage stops the pipeline: queued jobs are dropped, and it is raised from
+    submit() or from the end of the block. Once exhausted() (a --budget
+    Schedule's) is true, jobs with lookups that have not started yet are
+    committed with `deferred` set instead.
+    """
+
+    def __init__(self, commit: Callable[[Job], None], user_agent: str, workers: int = 1,
+                 in_flight: int | None = None, accept=(".jpg", ".png"), dry_run: bool = False,
+                 timeout: float = 30, exhausted: Callable[[], bool] | None = None):
+        self.commit = commit
+        self.exhausted = exhausted
+        self.user_agent = user_agent
+        self.accept = accept
+        self.dry_run = dry_run
+        self.timeout = timeout
+        self.threads = {"resolve": workers, "probe": workers, "fetch": workers,
+                        "process": asset_image.WORKERS, "commit": 1}
+        self.in_flight = max(in_flight or JOBS_PER_WORKER * workers, *self.threads.values())
+        self._slots = threading.Semaphore(self.in_flight)
+        self._queues = {stage: queue.Queue(self.in_flight) for stage in STAGES}
+        self._workers: list[threading.Thread] = []
+        self._error: BaseException | None = None
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.downloads = 0
+
+    def __enter__(self) -> "Pipeline":
+        for stage, count in self.threads.items():
+            for i in range(count):
+                worker = threading.Thread(target=self._run, args=(stage,), name=f"{stage}-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self._fail(exc)
+        for _ in range(self.in_flight):   # every job committed (or dropped)
+            self._slots.acquire()
+        for stage, count in self.threads.items():
+            for _ in range(count):
+                self._queues[stage].put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        if exc is None and self._error is not None:
+            raise self._error
+
+    def submit(self, job: Job):
+        """Queue a job, blocking while `in_flight` jobs are already inside."""
+        self._slots.acquire()
+        if self._error is not None:
+            self._slots.release()
+            raise self._error
+        self.jobs += 1
+        self._queues["resolve"].put(job)
+
+    def _fail(self, error: BaseException):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+
+    def _run(self, stage: str):
+        inbox, handle = self._queues[stage], getattr(self, f"_{stage}")
+        while True:
+            job = inbox.get()
+            if job is _STOP:
+                return
+            following = None
+            if self._error is None:
+                _current.job = job
+                try:
+                    following = handle(job)
+                except BaseException as e:
+                    self._fail(e)
+                finally:
+                    _current.job = None
+            if following is None:
+                self._slots.release()
+            else:
+                self._queues[following].put(job)
+
+    # ── Stages ──────────────────────────────────────────────────────
+    # Each takes a job and returns the stage it goes to next (None: done)
+
+    def _resolve(self, job: Job) -> str:
+        if not job.started:
+            # asset_schedule: once the budget is spent no job starts, but one under way finishes
+            job.started = True
+            if job.lookups and self.exhausted is not None and self.exhausted():
+                job.lookups.clear()
+                job.deferred = True
+                return "commit"
+        job.candidate = job.data = None
+        while job.lookups:
+            job.lookup = lookup = job.lookups.popleft()
+            job.retry = False
+            owner = f"[{lookup.owner}] " if lookup.owner != job.key else ""
+            job.log.append(f"    {owner}{lookup.source}: '{lookup.query}'")
+            try:
+                job.candidates = iter(lookup.find())
+            except Exception as e:
+                job.log.append(f"    ! {lookup.source} lookup failed: {e}")
+                metrics.count("lookup_errors")
+                job.outcomes.append((lookup, "error"))
+                continue
+            return "probe"
+        job.lookup = job.candidates = None
+        return "commit"
+
+    def _probe(self, job: Job) -> str:
+        try:
+            for candidate in job.candidates:
+                reason = implausible(candidate)
+                if reason is None:
+                    job.candidate = candidate
+                    if self.dry_run:
+                        job.log.append(f"    [DRY RUN] Would download: {candidate['url'][:80]}...")
+                        return "commit"
+                    return "fetch"
+                job.log.append(f"    ! Skipped {_short(candidate['url'])}: {reason}")
+                metrics.count("probe_skipped")
+        except Exception as e:   # a lazy candidate list's request failed
+            job.log.append(f"    ! {job.lookup.source} lookup failed: {e}")
+            metrics.count("lookup_errors")
+            job.retry = True
+        job.outcomes.append((job.lookup, "error" if job.retry else "miss"))
+        job.candidate = None
+        return "resolve"
+
+    def _fetch(self, job: Job) -> str:
+        req = urllib.request.Request(job.candidate["url"], headers={"User-Agent": self.user_agent})
+        try:
+            with metrics.stage("download"), urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                job.data = resp.read()
+        except Exception as e:
+            job.log.append(f"    ! Download failed: {e}")
+            metrics.count("download_errors")
+            job.retry = True   # network errors may succeed next run
+            return "probe"
+        with self._lock:
+            self.downloads += 1
+        return "process"
+
+    def _process(self, job: Job) -> str:
+        with metrics.stage("validate"):
+            job.verdict = asset_image.validate(job.data, accept=self.accept)
+        if job.verdict.error is None:
+            return "commit"
+        job.log.append(f"    ! Rejected {_short(job.candidate['url'])}: {job.verdict.error}")
+        metrics.count("rejected_downloads")
+        job.retry = job.retry or job.verdict.transient   # truncated: try again next run
+        job.data = None
+        return "probe"
+
+    def _commit(self, job: Job) -> None:
+        self.commit(job)
+        job.data = None
+        if job.log:
+            print("\n".join(job.log))
+
+    def describe(self) -> str:
+        return (f"{self.jobs} jobs, {self.downloads} downloads; {self.threads['resolve']} thread(s) per I/O stage, "
+                f"{self.threads['process']} validating, at most {self.in_flight} jobs in flight")
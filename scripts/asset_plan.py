@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Offline sync plans for the asset scripts.
+
+Each script's `plan` command compares its desired catalogue (AIRCRAFT_DATABASE,
+SPECIES, SHAPE_MAP) with the current manifest and the files on disk and
+records one action per entry here — no network, no sleeps. The printed plan
+lists the fetch / copy / move / convert / drop / orphan actions with an estimated
+request range, so a sync can be scoped before spending rate-limit budget.
+
+Actions:
+    fetch    — entry needs network lookups and a download
+    copy     — entry reuses an image already on disk (dedup group)
+    move     — renamed entry; its image is moved to the new path, not refetched
+    convert  — silhouette needs (re)conversion from its source shape
+    keep     — manifest entry and file are current
+    skip     — every lookup is a cached failure (see asset_negcache)
+    drop     — manifest entry no longer in the catalogue; the run removes it
+    orphan   — file on disk referenced by no desired manifest entry
+"""
+
+import time
+from pathlib import Path
+
+ACTION_ORDER = ("fetch", "copy", "move", "convert", "skip", "drop", "orphan", "keep")
+
+
+class Plan:
+    def __init__(self, title: str):
+        self.title = title
+        self.started = time.perf_counter()
+        self.actions: list[tuple[str, str, str, tuple[int, int], tuple[float, float]]] = []
+        self.notes: list[str] = []
+
+    def add(self, action: str, key: str, detail: str = "",
+            requests: tuple[int, int] = (0, 0), seconds: tuple[float, float] = (0.0, 0.0)):
+        """Record one action; requests/seconds are (best case, worst case) estimates."""
+        assert action in ACTION_ORDER, action
+        self.actions.append((action, key, detail, requests, seconds))
+
+    def note(self, message: str):
+        self.notes.append(message)
+
+    def count(self, action: str) -> int:
+        return sum(1 for a in self.actions if a[0] == action)
+
+    def totals(self) -> tuple[tuple[int, int], tuple[float, float]]:
+        req_min = sum(a[3][0] for a in self.actions)
+        req_max = sum(a[3][1] for a in self.actions)
+        sec_min = sum(a[4][0] for a in self.actions)
+        sec_max = sum(a[4][1] for a in self.actions)
+        return (req_min, req_max), (sec_min, sec_max)
+
+    def print(self, show_keep: bool = False):
+        print(f"\n{'=' * 60}")
+        print(f"PLAN — {self.title}")
+        print(f"{'=' * 60}")
+        for action in ACTION_ORDER:
+            rows = [a for a in self.actions if a[0] == action]
+            if not rows:
+                continue
+            print(f"\n-- {action.upper()} ({len(rows)}) --")
+            if action == "keep" and not show_keep:
+                print("  (use --verbose to list)")
+                continue
+            for _, key, detail, requests, _ in rows:
+                est = ""
+                if requests[1]:
+                    est = f"  [{requests[0]}–{requests[1]} req]" if requests[0] != requests[1] else f"  [{requests[0]} req]"
+                print(f"  {key:36s} {detail}{est}")
+
+        for message in self.notes:
+            print(f"\n[NOTE] {message}")
+
+        (req_min, req_max), (sec_min, sec_max) = self.totals()
+        summary = ", ".join(f"{self.count(a)} {a}" for a in ACTION_ORDER if self.count(a))
+        print(f"\n{'=' * 60}")
+        print(f"  Actions:   {summary or 'nothing to do'}")
+        print(f"  Requests:  {req_min}–{req_max} (estimated)")
+        print(f"  Run time:  {fmt_duration(sec_min)}–{fmt_duration(sec_max)} (politeness delays only)")
+        print(f"  Planned in {(time.perf_counter() - self.started) * 1000:.0f} ms, no network used")
+        print(f"{'=' * 60}")
+
+
+def fmt_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+def files_under(root: Path, subdirs, suffixes=None) -> set[str]:
+    """Relative POSIX paths of files in root/<subdir>/ (one level), optionally filtered by suffix."""
+    found = set()
+    for sub in subdirs:
+        directory = root / sub if sub else root
+        if not directory.is_dir():
+            continue
+        for path in directory.iterdir():
+            if path.is_file() and (suffixes is None or path.suffix.lower() in suffixes):
+                found.add(path.relative_to(root).as_posix())
+    return found
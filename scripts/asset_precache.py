@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Content-hashed precache manifest for the static asset sets.
+
+The silhouette generator and both scrapers write one section each into
+public/asset_precache_manifest.json after a run — one row per file with its
+URL, sha256, byte size and tier. next.config.js reads the file at build time:
+the "core" tier goes into the service worker's precache list (revision =
+content hash), so an update re-downloads only the files whose hash changed;
+the other tiers are cached on demand by the runtime rules.
+
+Tiers (lower priority = fetched first):
+    core       0  precached at install — silhouettes
+    thumbnail  1  small previews, warmed after install
+    full       2  full-size photos, cached when first viewed
+
+The output is sorted and carries no timestamps, so an unchanged asset set
+rewrites a byte-identical file.
+
+Usage:
+    python scripts/asset_precache.py            # rebuild every section from public/
+    python scripts/asset_precache.py --check    # exit 1 if the file is out of date
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+PRECACHE_FILENAME = "asset_precache_manifest.json"
+PRECACHE_VERSION = 1
+HASH_CHUNK = 1 << 20
+
+TIERS = {"core": 0, "thumbnail": 1, "full": 2}
+PRECACHE_TIERS = ("core",)
+
+# section (= directory under public/) -> (manifest file, tier, generated files not in the manifest)
+PUBLIC_SECTIONS = {
+    "aircraft_silhouettes": ("aircraft_silhouette_manifest.json", "core", ("sprite.svg", "geometry.bin")),
+    "aircraft_images": ("image_manifest.json", "full", ()),
+    "wildlife_images": ("wildlife_image_manifest.json", "full", ()),
+}
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_entry(root: Path, rel: str, tier: str, url_prefix: str) -> dict:
+    path = root / rel
+    return {
+        "url": f"{url_prefix}/{rel}",
+        "sha256": sha256_file(path),
+        "bytes": path.stat().st_size,
+        "tier": tier,
+        "priority": TIERS[tier],
+    }
+
+
+def load(path: Path) -> dict:
+    if path.exists():
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") == PRECACHE_VERSION:
+                return data
+        except (json.JSONDecodeError, OSError):
+            print(f"[WARN] Rebuilding unreadable precache manifest: {path}")
+    return {"version": PRECACHE_VERSION, "sections": {}}
+
+
+def render(data: dict) -> str:
+    sections = {name: sorted(rows, key=lambda r: r["url"]) for name, rows in sorted(data["sections"].items())}
+    totals = {}
+    for rows in sections.values():
+        for row in rows:
+            t = totals.setdefault(row["tier"], {"priority": row["priority"], "files": 0, "bytes": 0})
+            t["files"] += 1
+            t["bytes"] += row["bytes"]
+    payload = {
+        "version": PRECACHE_VERSION,
+        "precache_tiers": list(PRECACHE_TIERS),
+        "tiers": dict(sorted(totals.items(), key=lambda kv: kv[1]["priority"])),
+        "sections": sections,
+    }
+    return json.dumps(payload, indent=2) + "\n"
+
+
+def build_section(root: Path, rel_paths, tier: str, url_prefix: str | None = None) -> list[dict]:
+    """Rows for the files in root that exist; missing files are left to the caller's report."""
+    url_prefix = url_prefix or f"/{root.name}"
+    return [file_entry(root, rel, tier, url_prefix) for rel in sorted(set(rel_paths)) if (root / rel).is_file()]
+
+
+def write_section(root: Path, rel_paths, tier: str, url_prefix: str | None = None,
+                  path: Path | None = None) -> dict:
+    """
+    Replace the section for `root` (keyed by its directory name) in the
+    precache manifest next to it and return {added, changed, removed, files, bytes}.
+    """
+    assert tier in TIERS, tier
+    path = path or root.parent / PRECACHE_FILENAME
+    data = load(path)
+    previous = {row["url"]: row["sha256"] for row in data["sections"].get(root.name, [])}
+    rows = build_section(root, rel_paths, tier, url_prefix)
+    data["sections"][root.name] = rows
+
+    current = {row["url"]: row["sha256"] for row in rows}
+    delta = {
+        "added": sum(1 for url in current if url not in previous),
+        "changed": sum(1 for url, h in current.items() if url in previous and previous[url] != h),
+        "removed": sum(1 for url in previous if url not in current),
+        "files": len(rows),
+        "bytes": sum(row["bytes"] for row in rows),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render(data), encoding="utf-8")
+    return delta
+
+
+def describe(delta: dict) -> str:
+    return (f"{delta['files']} files, {delta['bytes'] / 1024 / 1024:.1f} MB "
+            f"({delta['added']} added, {delta['changed']} changed, {delta['removed']} removed)")
+
+
+def public_rel_paths(manifest_name: str) -> list[str]:
+    manifest = json.loads((PUBLIC_DIR / manifest_name).read_text(encoding="utf-8"))
+    return [entry["filename"] for entry in manifest.values() if entry.get("filename")]
+
+
+def rebuild_public() -> str:
+    data = {"version": PRECACHE_VERSION, "sections": {}}
+    for section, (manifest_name, tier, extras) in PUBLIC_SECTIONS.items():
+        root = PUBLIC_DIR / section
+        rel_paths = public_rel_paths(manifest_name) + [name for name in extras if (root / name).is_file()]
+        data["sections"][section] = build_section(root, rel_paths, tier)
+    return render(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the asset precache manifest from public/")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if the manifest is out of date")
+    args = parser.parse_args()
+
+    path = PUBLIC_DIR / PRECACHE_FILENAME
+    rendered = rebuild_public()
+    if args.check:
+        current = path.read_text(encoding="utf-8") if path.exists() else ""
+        if current != rendered:
+            print(f"[STALE] {path} — run scripts/asset_precache.py")
+            sys.exit(1)
+        print(f"[OK] {path} is up to date")
+        return
+
+    path.write_text(rendered, encoding="utf-8")
+    for tier, totals in json.loads(rendered)["tiers"].items():
+        print(f"  {tier:10s} {totals['files']:4d} files {totals['bytes'] / 1024 / 1024:8.1f} MB")
+    print(f"Precache manifest written: {path}")
+
+
+if __name__ == "__main__":
+    main()
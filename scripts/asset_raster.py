@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Headless scanline rasterizer and mask regression check for the silhouette library.
+
+Renders the filled-path subset asset_svg reads (paths and polygons, nonzero or
+evenodd fill, no transforms) to SIZE × SIZE binary masks in the file's own
+viewBox frame, so a conversion change that drops a wing, shifts the shape or
+flips a fill rule shows up without opening every SVG. The masks are compared
+with a committed baseline by IoU and differing-pixel count.
+
+Sampling is one point per pixel centre. Every edge adds its winding direction
+at the first pixel right of its crossing on each scanline; a running sum along
+the row then gives the winding number per pixel. NumPy does all rows and edges
+at once when installed; the pure-Python fallback runs the same accumulation
+row by row and produces identical masks.
+
+Baseline (scripts/baselines/aircraft_silhouette_masks.json):
+    {"size": SIZE, "masks": {base name: base64(zlib(packed mask bits))}}
+
+Usage:
+    python scripts/asset_raster.py                  # compare public/ against the baseline
+    python scripts/asset_raster.py --update         # accept the current masks as the baseline
+    python scripts/asset_raster.py --dump DIR       # also write old/new/diff PGMs for failures
+"""
+
+import argparse
+import base64
+import json
+import math
+import re
+import sys
+import zlib
+from pathlib import Path
+
+import asset_svg
+
+try:
+    import numpy as np
+except ImportError:  # optional
+    np = None
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "aircraft_silhouette_masks.json"
+SIZE = 256
+MIN_IOU = 0.99          # below this a mask counts as changed
+MAX_DIFF_PIXELS = 32    # ... as does any larger number of flipped pixels
+
+
+# ── Rasterizing ─────────────────────────────────────────────────────
+
+
+def _frame(viewbox, size: int):
+    """(scale, dx, dy) mapping SVG units into a size × size canvas, aspect kept and centred."""
+    vx, vy, vw, vh = viewbox
+    scale = size / max(vw, vh)
+    return scale, (size - vw * scale) / 2 - vx * scale, (size - vh * scale) / 2 - vy * scale
+
+
+def _edges(lines, scale, dx, dy):
+    """Non-horizontal edges as (x0, y0, x1, y1, winding) in pixel space, y0 < y1."""
+    edges = []
+    for line in lines:
+        pts = [(x * scale + dx, y * scale + dy) for x, y in line]
+        for (xa, ya), (xb, yb) in zip(pts, pts[1:] + pts[:1]):
+            if ya < yb:
+                edges.append((xa, ya, xb, yb, 1))
+            elif ya > yb:
+                edges.append((xb, yb, xa, ya, -1))
+    return edges
+
+
+def _winding_rows_py(edges, size: int, evenodd: bool) -> list[list[bool]]:
+    rows = []
+    for row in range(size):
+        yc = row + 0.5
+        delta = [0] * (size + 1)
+        for x0, y0, x1, y1, w in edges:
+            if y0 <= yc < y1:
+                x = x0 + (yc - y0) * (x1 - x0) / (y1 - y0)
+                col = min(size, max(0, math.ceil(x - 0.5)))
+                delta[col] += 1 if evenodd else w
+        acc, out = 0, []
+        for col in range(size):
+            acc += delta[col]
+            out.append(acc % 2 == 1 if evenodd else acc != 0)
+        rows.append(out)
+    return rows
+
+
+def _winding_rows_np(edges, size: int, evenodd: bool):
+    e = np.asarray(edges, dtype=np.float64).reshape(-1, 5)
+    yc = np.arange(size) + 0.5
+    hit = (e[None, :, 1] <= yc[:, None]) & (yc[:, None] < e[None, :, 3])
+    row, idx = np.nonzero(hit)
+    x0, y0, x1, y1, w = e[idx].T
+    x = x0 + (yc[row] - y0) * (x1 - x0) / (y1 - y0)
+    col = np.clip(np.ceil(x - 0.5), 0, size).astype(np.int64)
+    delta = np.zeros((size, size + 1), dtype=np.int64)
+    np.add.at(delta, (row, col), 1 if evenodd else w.astype(np.int64))
+    acc = np.cumsum(delta[:, :size], axis=1)
+    return acc % 2 == 1 if evenodd else acc != 0
+
+
+def rasterize(shape: asset_svg.SvgShape, size: int = SIZE) -> bytes:
+    """Mask of `shape` as size × size bytes (1 = filled), elements composited by union."""
+    scale, dx, dy = _frame(shape.viewbox, size)
+    if np is not None:
+        mask = np.zeros((size, size), dtype=bool)
+        for el in shape.elements:
+            edges = _edges(asset_svg.flatten_path(el["d"]), scale, dx, dy)
+            if edges:
+                mask |= _winding_rows_np(edges, size, el["attrs"].get("fill-rule") == "evenodd")
+        return mask.astype(np.uint8).tobytes()
+
+    mask = bytearray(size * size)
+    for el in shape.elements:
+        edges = _edges(asset_svg.flatten_path(el["d"]), scale, dx, dy)
+        if not edges:
+            continue
+        for r, row in enumerate(_winding_rows_py(edges, size, el["attrs"].get("fill-rule") == "evenodd")):
+            for c, filled in enumerate(row):
+                if filled:
+                    mask[r * size + c] = 1
+    return bytes(mask)
+
+
+# ── Baseline ────────────────────────────────────────────────────────
+
+
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _to_int(mask: bytes) -> int:
+    return int(mask.translate(_TO_DIGITS), 2)
+
+
+def pack(mask: bytes) -> str:
+    bits = _to_int(mask).to_bytes((len(mask) + 7) // 8, "big")
+    return base64.b64encode(zlib.compress(bits, 9)).decode("ascii")
+
+
+def unpack(text: str, size: int) -> bytes:
+    bits = int.from_bytes(zlib.decompress(base64.b64decode(text)), "big")
+    return f"{bits:0{size * size}b}".encode("ascii").translate(_FROM_DIGITS)
+
+
+def load_baseline(path: Path | None = None) -> dict[str, bytes]:
+    try:
+        data = json.loads((path or BASELINE_PATH).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    if data.get("size") != SIZE:
+        return {}
+    return {name: unpack(text, SIZE) for name, text in data["masks"].items()}
+
+
+def save_baseline(masks: dict[str, bytes], path: Path | None = None):
+    path = path or BASELINE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"size": SIZE, "masks": {name: pack(mask) for name, mask in sorted(masks.items())}}
+    path.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+
+
+def compare(old: bytes, new: bytes) -> tuple[float, int]:
+    """(IoU, differing pixels); two empty masks count as identical."""
+    a, b = _to_int(old), _to_int(new)
+    either = (a | b).bit_count()
+    return ((a & b).bit_count() / either if either else 1.0), (a ^ b).bit_count()
+
+
+# ── Library check ───────────────────────────────────────────────────
+
+
+def render_library(files: dict[str, Path]) -> dict[str, bytes]:
+    """{name: mask} with each distinct file rendered once."""
+    by_file: dict[Path, bytes] = {}
+    masks = {}
+    for name, path in sorted(files.items()):
+        if path not in by_file:
+            by_file[path] = rasterize(asset_svg.read_svg(path.read_text(encoding="utf-8")))
+        masks[name] = by_file[path]
+    return masks
+
+
+def check(masks: dict[str, bytes], baseline: dict[str, bytes]) -> dict:
+    """
+    {"changed": [(name, iou, diff)], "added": [...], "removed": [...],
+     "worst_iou": float, "checked": int} against `baseline`.
+    """
+    changed, worst, checked = [], 1.0, 0
+    for name, mask in sorted(masks.items()):
+        if name not in baseline:
+            continue
+        iou, diff = compare(baseline[name], mask)
+        checked += 1
+        worst = min(worst, iou)
+        if iou < MIN_IOU or diff > MAX_DIFF_PIXELS:
+            changed.append((name, iou, diff))
+    return {
+        "changed": changed,
+        "added": sorted(set(masks) - set(baseline)),
+        "removed": sorted(set(baseline) - set(masks)),
+        "worst_iou": worst,
+        "checked": checked,
+    }
+
+
+def describe(result: dict) -> str:
+    text = (f"{result['checked']} masks vs baseline, worst IoU {result['worst_iou']:.4f}, "
+            f"{len(result['changed'])} changed")
+    if result["added"]:
+        text += f", {len(result['added'])} new"
+    if result["removed"]:
+        text += f", {len(result['removed'])} gone"
+    return text
+
+
+def write_pgm(path: Path, mask: bytes, size: int = SIZE, old: bytes | None = None):
+    """Greyscale dump: filled black; with `old`, pixels lost grey (160) and gained dark grey (80)."""
+    if old is None:
+        pixels = bytes(0 if v else 255 for v in mask)
+    else:
+        pixels = bytes(0 if a and b else 160 if a else 80 if b else 255 for a, b in zip(old, mask))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(f"P5 {size} {size} 255\n".encode("ascii") + pixels)
+
+
+def public_files() -> dict[str, Path]:
+    manifest = json.loads((PUBLIC_DIR / "aircraft_silhouette_manifest.json").read_text(encoding="utf-8"))
+    directory = PUBLIC_DIR / "aircraft_silhouettes"
+    return {name: directory / entry["filename"] for name, entry in manifest.items()
+            if (directory / entry["filename"]).exists()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasterize the silhouette library and diff it against the baseline")
+    parser.add_argument("--update", action="store_true", help="Write the current masks as the new baseline")
+    parser.add_argument("--dump", type=Path, help="Write <name>.pgm (and .diff.pgm) for changed masks here")
+    args = parser.parse_args()
+
+    masks = render_library(public_files())
+    baseline = load_baseline()
+    result = check(masks, baseline)
+    print(f"Raster QA ({'numpy' if np is not None else 'pure Python'}, {SIZE}px): {describe(result)}")
+    for name, iou, diff in result["changed"]:
+        print(f"  [CHANGED] {name:24s} IoU {iou:.4f}, {diff} px")
+        if args.dump:
+            stem = re.sub(r"[^A-Za-z0-9]+", "_", name)
+            write_pgm(args.dump / f"{stem}.pgm", masks[name])
+            write_pgm(args.dump / f"{stem}.diff.pgm", masks[name], old=baseline[name])
+    for name in result["added"]:
+        print(f"  [NEW] {name}")
+    for name in result["removed"]:
+        print(f"  [GONE] {name}")
+
+    if args.update:
+        save_baseline(masks)
+        print(f"Baseline written: {BASELINE_PATH}")
+    elif result["changed"] or result["removed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Compact runtime manifests for the client bundle.
+
+The full manifests (image_manifest.json, aircraft_silhouette_manifest.json,
+wildlife_image_manifest.json) stay as the scripts' working state and carry
+provenance the UI never reads. The client imports these instead:
+
+    public/runtime/<section>.<category>.json   {name: filename}, one per category
+    public/runtime/<section>.attribution.json  {name: {u, p, l, ...}}, fetched on demand
+
+Filenames are relative to /<section>/<category>/ for the photo sections and to
+/<section>/ for silhouettes. Everything is written without indentation and with
+sorted keys, so unchanged data rewrites identical files.
+
+It also owns CACHE_DIR, where every asset script keeps its local,
+uncommitted state (scripts/.cache/: the asset catalogue, compression hashes,
+lookup and parse caches, failure caches, sync snapshots). Set
+ASSET_CACHE_DIR, or CACHE_DIR itself, to move all of it at once, as
+bench_scrapers.py and the tests do.
+
+Usage:
+    python scripts/asset_runtime.py            # rebuild from the public/ manifests
+    python scripts/asset_runtime.py --check    # exit 1 if any file is out of date
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+RUNTIME_DIRNAME = "runtime"
+CACHE_DIR = Path(os.environ.get("ASSET_CACHE_DIR") or Path(__file__).resolve().parent / ".cache")
+
+def cache_path(name: str) -> Path:
+    """`name` in CACHE_DIR, resolved on each call so a redirected CACHE_DIR applies."""
+    return CACHE_DIR / name
+
+
+# Full-manifest field -> short key in the attribution file
+ATTRIBUTION_KEYS = {
+    "source_url": "u",
+    "source_page": "p",
+    "license": "l",
+    "dedup_from": "d",
+    "display_name": "n",
+    "source_shape": "s",
+}
+
+
+def compact(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=True) + "\n"
+
+
+def runtime_files(section: str, manifest: dict, category_key: str, strip_category: bool) -> dict[str, str]:
+    """{file name: content} for one section's per-category maps and attribution."""
+    split: dict[str, dict[str, str]] = {}
+    attribution = {}
+    for name, entry in manifest.items():
+        category = entry.get(category_key)
+        filename = entry.get("filename")
+        if not category or not filename:
+            continue
+        if strip_category:
+            filename = filename.removeprefix(f"{category}/")
+        split.setdefault(category, {})[name] = filename
+        credit = {short: entry[field] for field, short in ATTRIBUTION_KEYS.items() if entry.get(field)}
+        if credit:
+            attribution[name] = credit
+
+    files = {f"{section}.{category}.json": compact(rows) for category, rows in split.items()}
+    files[f"{section}.attribution.json"] = compact(attribution)
+    return files
+
+
+def write_runtime(root: Path, manifest: dict, category_key: str = "category",
+                  strip_category: bool = True) -> dict[str, int]:
+    """
+    Write the runtime files for the asset directory `root` (section = its name)
+    into root.parent/runtime/ and return {file name: bytes}.
+    """
+    out_dir = root.parent / RUNTIME_DIRNAME
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sizes = {}
+    for name, content in runtime_files(root.name, manifest, category_key, strip_category).items():
+        (out_dir / name).write_text(content, encoding="utf-8")
+        sizes[name] = len(content.encode("utf-8"))
+    return sizes
+
+
+def describe(sizes: dict[str, int]) -> str:
+    return ", ".join(f"{name} {size / 1024:.1f} KB" for name, size in sorted(sizes.items()))
+
+
+# section -> (full manifest, category field, filenames carry the category folder)
+PUBLIC_SECTIONS = {
+    "aircraft_images": ("image_manifest.json", "category", True),
+    "aircraft_silhouettes": ("aircraft_silhouette_manifest.json", "category", False),
+    "wildlife_images": ("wildlife_image_manifest.json", "group", True),
+}
+
+
+def rebuild_public() -> dict[str, str]:
+    files = {}
+    for section, (manifest_name, category_key, strip) in PUBLIC_SECTIONS.items():
+        manifest = json.loads((PUBLIC_DIR / manifest_name).read_text(encoding="utf-8"))
+        files.update(runtime_files(section, manifest, category_key, strip))
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the compact runtime manifests from public/")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any runtime file is out of date")
+    args = parser.parse_args()
+
+    out_dir = PUBLIC_DIR / RUNTIME_DIRNAME
+    files = rebuild_public()
+    if args.check:
+        stale = [name for name, content in files.items()
+                 if not (out_dir / name).exists() or (out_dir / name).read_text(encoding="utf-8") != content]
+        for name in stale:
+            print(f"[STALE] {out_dir / name}")
+        if stale:
+            sys.exit(1)
+        print(f"[OK] {len(files)} runtime manifests up to date")
+        return
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, content in sorted(files.items()):
+        (out_dir / name).write_text(content, encoding="utf-8")
+        print(f"  {name:45s} {len(content.encode('utf-8')) / 1024:7.1f} KB")
+    print(f"Runtime manifests written: {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Budgeted, priority-ordered scraper runs.
+
+`--budget` caps a run by wall time, request count or both:
+
+    --budget 30m          --budget 90s        --budget 1h
+    --budget 400req       --budget 20m,400req
+
+`--stale-days N` turns entries an incremental run would keep into work once
+their catalogue updated_at is more than N days old. Entries the catalogue has
+no record of are not considered stale.
+
+With a budget the scrapers stop working through their lists in declaration
+order. Work units (a species; an aircraft or a whole dedup group) are sorted
+by priority() instead:
+
+    1. missing first: no manifest entry, no file on disk, or failed last time
+    2. importance: strike risk for wildlife, catalogue rows served per fetch
+       for aircraft (the catalogue carries no usage data; a dedup group fetch
+       fills every member)
+    3. staleness: least recently refreshed first (asset_catalogue updated_at)
+    4. declaration order
+
+Once the budget is spent no new unit starts. A unit already under way runs to
+completion, so a group is never half-copied. Every unit not reached keeps its
+previous manifest entry if its file is still there, and the outputs are
+written as usual. The manifest stays consistent and in declaration order, and
+the next run picks up where this one stopped.
+
+Pacing is a per-host minimum interval, enforced for every request by a
+urllib handler (asset_http) rather than a sleep after every lookup. A
+request to upload.wikimedia.org does not wait out a delay owed to the
+Commons API, and time spent on the request itself counts toward the
+interval. The scrapers install a Schedule for every run, with or without a
+budget: the interval is shared by all --workers threads, so each host sees
+at most one request per --delay however many there are.
+"""
+
+import argparse
+import re
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import asset_http
+from asset_metrics import metrics
+
+_UNITS = {"s": 1, "m": 60, "h": 3600}
+_active = None   # the installed Schedule, see pace()
+
+
+class Budget:
+    def __init__(self, seconds: float | None = None, requests: int | None = None):
+        self.seconds = seconds
+        self.requests = requests
+
+    def __str__(self):
+        parts = []
+        if self.seconds is not None:
+            parts.append(f"{self.seconds:g}s")
+        if self.requests is not None:
+            parts.append(f"{self.requests} requests")
+        return " / ".join(parts)
+
+
+def parse_budget(text: str) -> Budget:
+    """argparse type for "30m", "400req" or both, comma-separated."""
+    budget = Budget()
+    for part in filter(None, (p.strip().lower() for p in text.split(","))):
+        m = re.fullmatch(r"(\d+(?:\.\d+)?)\s*(s|m|h|req|requests?)", part)
+        if not m:
+            raise argparse.ArgumentTypeError(f"expected e.g. 30m, 90s, 1h or 400req, got {part!r}")
+        value, unit = float(m.group(1)), m.group(2)
+        if unit in _UNITS:
+            budget.seconds = value * _UNITS[unit]
+        else:
+            budget.requests = int(value)
+    if budget.seconds is None and budget.requests is None:
+        raise argparse.ArgumentTypeError("empty budget")
+    return budget
+
+
+def add_cli_options(parser: argparse.ArgumentParser):
+    parser.add_argument("--budget", type=parse_budget, metavar="TIME|Nreq",
+                        help="Stop starting new work after this much wall time (30m, 1h) and/or this many "
+                             "requests (400req); work is done missing-first, by priority")
+    parser.add_argument("--stale-days", type=float, metavar="N",
+                        help="Refetch entries that would be kept once they are older than N days "
+                             "(asset catalogue); with --budget they run after missing ones")
+
+
+def stale(refreshed: dict[str, float], days: float | None) -> set[str]:
+    """Names last refreshed more than `days` ago ({name: updated_at} from asset_catalogue)."""
+    if days is None:
+        return set()
+    cutoff = time.time() - days * 86400
+    return {name for name, at in refreshed.items() if at < cutoff}
+
+
+def priority(missing: bool, rank: float, refreshed_at: float | None, position: int) -> tuple:
+    """Sort key for one work unit (lower runs first); `rank` 0 is most important."""
+    return (0 if missing else 1, rank, refreshed_at or 0.0, position)
+
+
+class HostLimiter:
+    """Minimum interval between request starts, per host, shared by all threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next: dict[str, float] = {}
+
+    def wait(self, host: str):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, 0.0))
+            self._next[host] = start + self.interval
+        metrics.sleep(start - now)
+
+
+class _ScheduleHandler(urllib.request.BaseHandler):
+    def __init__(self, schedule: "Schedule"):
+        self.schedule = schedule
+
+    def http_request(self, req):
+        # Paced by the host the scraper asked for, even when a fixture replay redirects it
+        self.schedule.before_request(asset_http.origin_url(req))
+        return req
+
+    https_request = http_request
+
+
+class Schedule:
+    """
+    One scraper run. install() starts the clock and the per-host pacing;
+    exhausted() tells the scraper whether to start another unit (never,
+    without a budget, once it is spent).
+    """
+
+    def __init__(self, budget: Budget | None, interval: float):
+        self.budget = budget
+        self.limiter = HostLimiter(interval)
+        self.requests = 0
+        self.deferred = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._handler = None
+
+    def install(self) -> "Schedule":
+        global _active
+        self.started = time.monotonic()
+        self._handler = asset_http.register_handler(_ScheduleHandler(self))
+        _active = self
+        return self
+
+    def uninstall(self):
+        global _active
+        if self._handler is not None:
+            asset_http.unregister_handler(self._handler)
+            self._handler = None
+        if _active is self:
+            _active = None
+
+    def before_request(self, url: str):
+        self.limiter.wait(urllib.parse.urlsplit(url).netloc)
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def exhausted(self) -> bool:
+        """True once either limit is reached; never turns False again."""
+        b = self.budget
+        return b is not None and ((b.seconds is not None and self.elapsed >= b.seconds)
+                                  or (b.requests is not None and self.requests >= b.requests))
+
+    def defer(self):
+        with self._lock:
+            self.deferred += 1
+        metrics.count("budget_deferred")
+
+    def describe(self) -> str:
+        text = f"{self.budget or 'no budget'} — used {self.requests} requests, {self.elapsed:.0f}s"
+        if self.deferred:
+            text += f"; {self.deferred} deferred to the next run"
+        return text
+
+
+def pace(seconds: float):
+    """The scrapers' politeness pause: skipped while a Schedule paces per host."""
+    if _active is None:
+        metrics.sleep(seconds)
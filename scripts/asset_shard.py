@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Sharded runs and deterministic manifest merge for the asset scripts.
+
+`--shard i/N` (1 ≤ i ≤ N) makes a script process only the catalogue keys that
+hash into shard i, so a refresh can be split across CI runners or hosts, each
+with its own rate budget. Keys are assigned by sha256, not Python's salted
+hash(), so every host agrees on the split. Scripts choose the key so work that
+must stay together does: the aircraft scraper shards by dedup group, the
+silhouette generator by source shape.
+
+A sharded run writes only its partial manifest next to the real one:
+
+    <manifest stem>.shard-<i>-of-<N>.json
+        {"shard": [i, N], "catalogue": fingerprint, "entries": {key: entry},
+         "records": [[key, record], ...]}
+
+`merge` then checks that all N partials are present and were built from the
+same catalogue, and returns entries and records in catalogue order. That is
+the order a single unsharded run produces, so the merged manifest is
+byte-identical whatever N was. The partials are deleted after a successful
+merge.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+
+class Shard(NamedTuple):
+    index: int   # 1-based
+    count: int
+
+    def owns(self, key: str) -> bool:
+        return shard_of(key, self.count) == self.index
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+
+def shard_of(key: str, count: int) -> int:
+    """Stable 1-based shard for `key`."""
+    return 1 + int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big") % count
+
+
+def parse_shard(text: str) -> Shard:
+    """argparse type for "i/N"."""
+    m = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", text)
+    if not m or not 1 <= int(m.group(1)) <= int(m.group(2)):
+        raise argparse.ArgumentTypeError(f"expected i/N with 1 <= i <= N, got {text!r}")
+    return Shard(int(m.group(1)), int(m.group(2)))
+
+
+def add_cli_options(parser: argparse.ArgumentParser):
+    parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                        help="Process only shard i of N and write a partial manifest; "
+                             "combine the partials with the merge command")
+
+
+def catalogue_fingerprint(keys) -> str:
+    return hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+
+
+def partial_path(manifest_path: Path, shard: Shard) -> Path:
+    return manifest_path.with_name(f"{manifest_path.stem}.shard-{shard.index}-of-{shard.count}.json")
+
+
+def write_partial(manifest_path: Path, shard: Shard, catalogue: list[str],
+                  entries: dict, records: list[tuple[str, dict]] = ()) -> Path:
+    path = partial_path(manifest_path, shard)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "shard": [shard.index, shard.count],
+        "catalogue": catalogue_fingerprint(catalogue),
+        "entries": entries,
+        "records": [[key, record] for key, record in records],
+    }
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def merge(manifest_path: Path, catalogue: list[str], shard_key=None) -> tuple[dict, list, list[Path]]:
+    """
+    (entries, records, partial paths) from every partial beside `manifest_path`,
+    ordered by `catalogue`. `shard_key` maps a catalogue key to the key it was
+    sharded by (default: itself). Raises ValueError if shards are missing,
+    mixed, built from another catalogue, or hold keys they do not own.
+    """
+    paths = sorted(manifest_path.parent.glob(f"{manifest_path.stem}.shard-*-of-*.json"))
+    if not paths:
+        raise ValueError(f"no partial manifests beside {manifest_path}")
+    partials = {}
+    for path in paths:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        partials[Shard(*data["shard"])] = data
+    counts = {shard.count for shard in partials}
+    if len(counts) != 1:
+        raise ValueError(f"partials from different shard counts: {sorted(counts)}")
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - {shard.index for shard in partials})
+    if missing:
+        raise ValueError(f"missing shard(s) {', '.join(f'{i}/{count}' for i in missing)}")
+    expected = catalogue_fingerprint(catalogue)
+    stale = [str(shard) for shard, data in sorted(partials.items()) if data["catalogue"] != expected]
+    if stale:
+        raise ValueError(f"shard(s) {', '.join(stale)} were built from a different catalogue")
+
+    position = {key: i for i, key in enumerate(catalogue)}
+    entries, records = {}, []
+    for shard, data in sorted(partials.items()):
+        for key in list(data["entries"]) + [key for key, _ in data["records"]]:
+            if key not in position or not shard.owns((shard_key or str)(key)):
+                raise ValueError(f"shard {shard} holds {key!r}, which it does not own")
+        entries.update(data["entries"])
+        records.extend(data["records"])
+    ordered = {key: entries[key] for key in sorted(entries, key=position.__getitem__)}
+    records.sort(key=lambda item: position[item[0]])
+    return ordered, [record for _, record in records], paths
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+WILDLIFE_SPECIES from lib/wildlife-species-data.ts, read by the wildlife scraper.
+
+The TypeScript table is the single source of truth. This module parses its
+object literals, without a JS toolchain, into one record per species:
+
+    {"common_name", "scientific_name", "group", "size_category", "mean_mass_g",
+     "strike_risk", "image_url", "image_credit", "natdiglib_id"}
+
+natdiglib_id is the USFWS IIIF id embedded in image_url
+(`${IIIF}/<id>/full/...`), or None. A species listed twice keeps its first
+record. The filename rule is read from resolveWildlifeImage() as well (its
+toLowerCase() + replace() chain), so safe_filename() here cannot drift from
+the path the app requests.
+
+The parse is cached in scripts/.cache/wildlife_species.json and redone only
+when the .ts file's size or mtime changes.
+
+Snapshots and diff: a snapshot is {common_name: {"scientific_name", "group",
+"natdiglib_id"}}, the species list the last completed run synced. diff()
+compares it with the current table:
+
+    added    — new common name; fetch
+    changed  — same common name, new scientific name or IIIF id; refetch
+    renamed  — (old, new) with the same scientific name and IIIF id; the image
+               is moved, not fetched again
+    removed  — gone from the table; its image is deleted
+
+Usage:
+    python scripts/asset_species.py            # species count, groups, diff vs the last sync
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+import asset_runtime
+
+SPECIES_TS = Path(__file__).resolve().parent.parent / "lib" / "wildlife-species-data.ts"
+CACHE_NAME = "wildlife_species.json"   # in asset_runtime.CACHE_DIR
+CACHE_VERSION = 1
+
+SNAPSHOT_FIELDS = ("scientific_name", "group", "natdiglib_id")
+
+_STRING = r"""'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)"|`((?:[^`\\]|\\.)*)`"""
+_FIELD = re.compile(r"\b(\w+)\s*:\s*(?:" + _STRING + r"|(null|true|false|-?[\d.]+))")
+_IIIF_ID = re.compile(r"\$\{IIIF\}/(\d+)/")
+_REPLACE = re.compile(r"\.replace\(\s*/((?:[^/\\]|\\.)+)/g\s*,\s*(?:" + _STRING + r")\s*\)")
+
+
+# ── Parsing ─────────────────────────────────────────────────────────
+
+
+def _unescape(text: str) -> str:
+    return re.sub(r"\\(.)", r"\1", text)
+
+
+def _objects(source: str, start: int) -> list[str]:
+    """Top-level {...} literals of the array opening at `start`, skipping strings and comments."""
+    objects, depth, i, begin = [], 0, start, 0
+    while i < len(source):
+        c = source[i]
+        if c in "'\"`":
+            i += 1
+            while source[i] != c:
+                i += 2 if source[i] == "\\" else 1
+        elif source.startswith("//", i):
+            i = source.index("\n", i)
+        elif source.startswith("/*", i):
+            i = source.index("*/", i) + 1
+        elif c == "{":
+            if depth == 0:
+                begin = i
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                objects.append(source[begin:i + 1])
+        elif c == "]" and depth == 0:
+            return objects
+        i += 1
+    raise ValueError("unterminated WILDLIFE_SPECIES array")
+
+
+def _record(literal: str) -> dict:
+    record = {}
+    for m in _FIELD.finditer(literal):
+        key, *strings, scalar = m.groups()
+        text = next((s for s in strings if s is not None), None)
+        if text is not None:
+            record[key] = _unescape(text)
+        else:
+            record[key] = json.loads(scalar) if scalar != "null" else None
+    url = record.get("image_url") or ""
+    m = _IIIF_ID.search(url)
+    record["natdiglib_id"] = int(m.group(1)) if m else None
+    return record
+
+
+def _filename_rule(source: str) -> list[tuple[str, str]]:
+    """resolveWildlifeImage()'s replace chain as [(python regex, replacement)]."""
+    m = re.search(r"function resolveWildlifeImage\b.*?\.toLowerCase\(\)(.*?)\n\s*return", source, re.S)
+    if not m:
+        raise ValueError("resolveWildlifeImage() no longer lowercases then replaces; update asset_species.py")
+    rule = []
+    for r in _REPLACE.finditer(m.group(1)):
+        pattern, *strings = r.groups()
+        rule.append((pattern, _unescape(next(s for s in strings if s is not None))))
+    if not rule:
+        raise ValueError("no .replace(/.../g, '...') steps in resolveWildlifeImage()")
+    return rule
+
+
+def parse(source: str) -> dict:
+    """{"species": [record, ...], "filename_rule": [[regex, replacement], ...]} from the .ts source."""
+    m = re.search(r"export const WILDLIFE_SPECIES\b[^=]*=\s*\[", source)
+    if not m:
+        raise ValueError("WILDLIFE_SPECIES array not found")
+    species, seen = [], set()
+    for literal in _objects(source, m.end()):
+        record = _record(literal)
+        missing = [k for k in ("common_name", "scientific_name", "group") if not record.get(k)]
+        if missing:
+            raise ValueError(f"species entry without {', '.join(missing)}: {literal[:60]}...")
+        if record["common_name"] not in seen:
+            seen.add(record["common_name"])
+            species.append(record)
+    return {"species": species, "filename_rule": [list(step) for step in _filename_rule(source)]}
+
+
+def _stat_key(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def load(path: Path | None = None, cache_path: Path | None = None) -> dict:
+    """parse() of the .ts file, from the cache when the file is unchanged."""
+    path = path or SPECIES_TS
+    cache_path = cache_path or asset_runtime.cache_path(CACHE_NAME)
+    key = _stat_key(path)
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached.get("version") == CACHE_VERSION and cached.get("source") == [str(path)] + key:
+            return cached["data"]
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    data = parse(path.read_text(encoding="utf-8"))
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": CACHE_VERSION, "source": [str(path)] + key, "data": data},
+                              ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, cache_path)
+    return data
+
+
+def safe_filename(name: str, rule: list) -> str:
+    """resolveWildlifeImage()'s file stem for `name`."""
+    name = name.lower()
+    for pattern, replacement in rule:
+        name = re.sub(pattern, replacement, name)
+    return name
+
+
+# ── Snapshots ───────────────────────────────────────────────────────
+
+
+def snapshot(species: list[dict]) -> dict:
+    return {s["common_name"]: {k: s[k] for k in SNAPSHOT_FIELDS} for s in species}
+
+
+def load_snapshot(path: Path) -> dict | None:
+    """The last synced snapshot, or None if there is none (first run: no diff, full pass)."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["species"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+
+
+def save_snapshot(path: Path, species: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"species": species}, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def diff(previous: dict, current: dict) -> dict:
+    """{"added", "changed", "removed": [name], "renamed": [(old, new)]} between two snapshots."""
+    gone = [name for name in previous if name not in current]
+    new = [name for name in current if name not in previous]
+    changed = [name for name in current if name in previous
+               and any(previous[name][k] != current[name][k] for k in ("scientific_name", "natdiglib_id"))]
+
+    # A rename keeps the scientific name and IIIF id; the group may change too
+    identity = lambda rec: (rec["scientific_name"], rec["natdiglib_id"])
+    candidates: dict[tuple, list[str]] = {}
+    for name in gone:
+        candidates.setdefault(identity(previous[name]), []).append(name)
+    renamed = []
+    for name in new:
+        olds = candidates.get(identity(current[name]))
+        if olds and len(olds) == 1:
+            renamed.append((olds.pop(), name))
+    moved_from = {old for old, _ in renamed}
+    moved_to = {new_name for _, new_name in renamed}
+    return {
+        "added": [name for name in new if name not in moved_to],
+        "changed": changed,
+        "renamed": renamed,
+        "removed": [name for name in gone if name not in moved_from],
+    }
+
+
+def describe(changes: dict) -> str:
+    parts = [f"{len(changes[k])} {k}" for k in ("added", "changed", "renamed", "removed") if changes[k]]
+    return ", ".join(parts) or "no changes"
+
+
+def main():
+    import scrape_wildlife_images as wildlife
+
+    data = load()
+    groups: dict[str, int] = {}
+    for s in data["species"]:
+        groups[s["group"]] = groups.get(s["group"], 0) + 1
+    print(f"{SPECIES_TS.name}: {len(data['species'])} species "
+          f"({', '.join(f'{n} {g}' for g, n in sorted(groups.items()))})")
+    previous = load_snapshot(asset_runtime.cache_path(wildlife.SNAPSHOT_NAME))
+    if previous is None:
+        print("No snapshot yet — the next run is a full pass")
+        return
+    changes = diff(previous, snapshot(data["species"]))
+    print(f"Since the last sync: {describe(changes)}")
+    for key in ("added", "changed", "removed"):
+        for name in changes[key]:
+            print(f"  [{key}] {name}")
+    for old, new in changes["renamed"]:
+        print(f"  [renamed] {old} -> {new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Minimal SVG geometry helpers for the silhouette pipeline.
+
+Covers the subset generate_aircraft_silhouettes.py emits and the hand-added
+library files use: <path d> (all path commands, absolute and relative,
+including arcs) and <polygon points>, no transforms. Paths are flattened to
+polylines — one per subpath, implicitly closed for filling — which the sprite,
+geometry, LOD and raster stages all build on.
+"""
+
+import math
+import re
+import xml.etree.ElementTree as ET
+
+SVG_NS = "http://www.w3.org/2000/svg"
+FLATTEN_TOLERANCE = 0.05   # max chord error for curves, in SVG units
+MAX_CURVE_STEPS = 64
+
+_TOKEN = re.compile(r"[MmZzLlHhVvCcSsQqTtAa]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_ARG_COUNTS = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+
+class SvgShape:
+    """The fillable content of one silhouette file."""
+
+    def __init__(self, viewbox: tuple[float, float, float, float], title: str, elements: list[dict]):
+        self.viewbox = viewbox
+        self.title = title
+        self.elements = elements   # [{"d": str, "attrs": {fill, stroke, ...}}]
+
+    @property
+    def path_data(self) -> list[str]:
+        return [el["d"] for el in self.elements]
+
+    def polylines(self, tolerance: float = FLATTEN_TOLERANCE) -> list[list[tuple[float, float]]]:
+        return [line for d in self.path_data for line in flatten_path(d, tolerance)]
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def read_svg(text: str) -> SvgShape:
+    root = ET.fromstring(text.encode("utf-8") if isinstance(text, str) else text)
+    viewbox = tuple(float(v) for v in re.split(r"[\s,]+", root.get("viewBox", "0 0 80 80").strip()))
+    title = ""
+    elements = []
+    for el in root.iter():
+        tag = _local(el.tag)
+        if tag == "title" and not title:
+            title = (el.text or "").strip()
+            continue
+        if tag == "path" and el.get("d"):
+            d = el.get("d").strip()
+        elif tag == "polygon" and el.get("points"):
+            coords = [float(v) for v in re.split(r"[\s,]+", el.get("points").strip()) if v]
+            pairs = " ".join(f"{fmt(coords[i])},{fmt(coords[i + 1])}" for i in range(0, len(coords) - 1, 2))
+            d = f"M {pairs} Z"
+        else:
+            continue
+        attrs = {k: v for k, v in el.attrib.items() if k in ("fill", "stroke", "stroke-width", "fill-rule")}
+        elements.append({"d": d, "attrs": attrs})
+    return SvgShape(viewbox, title, elements)
+
+
+def fmt(value: float, digits: int = 4) -> str:
+    """Shortest decimal for `value` rounded to `digits` places."""
+    text = f"{value:.{digits}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("", "-0") else text
+
+
+# ── Path parsing ────────────────────────────────────────────────────
+
+
+def parse_path(d: str) -> list[tuple[str, list[float]]]:
+    """Split path data into (command, args) with implicit repeats expanded; case preserved."""
+    commands = []
+    cmd = None
+    args: list[float] = []
+
+    def flush():
+        n = _ARG_COUNTS[cmd.upper()]
+        if n == 0:
+            commands.append((cmd, []))
+            return
+        for i in range(0, len(args) - n + 1, n):
+            # Extra pairs after a moveto are implicit linetos
+            c = cmd if i == 0 or cmd.upper() != "M" else ("l" if cmd == "m" else "L")
+            commands.append((c, args[i:i + n]))
+
+    for token in _TOKEN.findall(d):
+        if token.isalpha():
+            if cmd is not None:
+                flush()
+            cmd, args = token, []
+        else:
+            args.append(float(token))
+    if cmd is not None:
+        flush()
+    return commands
+
+
+def _curve_steps(points: list[tuple[float, float]], tolerance: float) -> int:
+    length = sum(math.dist(points[i], points[i + 1]) for i in range(len(points) - 1))
+    return max(2, min(MAX_CURVE_STEPS, int(math.ceil(math.sqrt(length / max(tolerance, 1e-9))))))
+
+
+def _cubic(p0, p1, p2, p3, tolerance):
+    steps = _curve_steps([p0, p1, p2, p3], tolerance)
+    out = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        u = 1 - t
+        out.append((u ** 3 * p0[0] + 3 * u * u * t * p1[0] + 3 * u * t * t * p2[0] + t ** 3 * p3[0],
+                    u ** 3 * p0[1] + 3 * u * u * t * p1[1] + 3 * u * t * t * p2[1] + t ** 3 * p3[1]))
+    return out
+
+
+def _quad(p0, p1, p2, tolerance):
+    steps = _curve_steps([p0, p1, p2], tolerance)
+    out = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        u = 1 - t
+        out.append((u * u * p0[0] + 2 * u * t * p1[0] + t * t * p2[0],
+                    u * u * p0[1] + 2 * u * t * p1[1] + t * t * p2[1]))
+    return out
+
+
+def _arc(p0, rx, ry, phi_deg, large, sweep, p1, tolerance):
+    """Endpoint-parameterised elliptical arc (SVG 1.1 F.6.5) as a polyline."""
+    if p0 == p1:
+        return []
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        return [p1]
+    phi = math.radians(phi_deg)
+    cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+    dx, dy = (p0[0] - p1[0]) / 2, (p0[1] - p1[1]) / 2
+    x1p = cos_phi * dx + sin_phi * dy
+    y1p = -sin_phi * dx + cos_phi * dy
+    scale = (x1p * x1p) / (rx * rx) + (y1p * y1p) / (ry * ry)
+    if scale > 1:
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+    num = rx * rx * ry * ry - rx * rx * y1p * y1p - ry * ry * x1p * x1p
+    den = rx * rx * y1p * y1p + ry * ry * x1p * x1p
+    coef = math.sqrt(max(0.0, num / den)) if den else 0.0
+    if large == sweep:
+        coef = -coef
+    cxp, cyp = coef * rx * y1p / ry, -coef * ry * x1p / rx
+    cx = cos_phi * cxp - sin_phi * cyp + (p0[0] + p1[0]) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (p0[1] + p1[1]) / 2
+
+    def angle(ux, uy, vx, vy):
+        return math.atan2(ux * vy - uy * vx, ux * vx + uy * vy)
+
+    theta = angle(1, 0, (x1p - cxp) / rx, (y1p - cyp) / ry)
+    delta = angle((x1p - cxp) / rx, (y1p - cyp) / ry, (-x1p - cxp) / rx, (-y1p - cyp) / ry)
+    if not sweep and delta > 0:
+        delta -= 2 * math.pi
+    elif sweep and delta < 0:
+        delta += 2 * math.pi
+    arc_len = abs(delta) * max(rx, ry)
+    steps = max(2, min(MAX_CURVE_STEPS, int(math.ceil(math.sqrt(arc_len / max(tolerance, 1e-9))))))
+    out = []
+    for i in range(1, steps + 1):
+        t = theta + delta * i / steps
+        x, y = rx * math.cos(t), ry * math.sin(t)
+        out.append((cos_phi * x - sin_phi * y + cx, sin_phi * x + cos_phi * y + cy))
+    out[-1] = p1
+    return out
+
+
+def flatten_path(d: str, tolerance: float = FLATTEN_TOLERANCE) -> list[list[tuple[float, float]]]:
+    """Absolute-coordinate polylines, one per subpath (closing point not repeated)."""
+    lines: list[list[tuple[float, float]]] = []
+    current: list[tuple[float, float]] = []
+    x = y = 0.0
+    start = (0.0, 0.0)
+    last_ctrl = None       # reflected control point for S / T
+    last_cmd = ""
+
+    def finish():
+        nonlocal current
+        if len(current) > 1 and current[0] == current[-1]:
+            current.pop()
+        if len(current) >= 2:
+            lines.append(current)
+        current = []
+
+    for cmd, a in parse_path(d):
+        rel = cmd.islower()
+        c = cmd.upper()
+        ox, oy = (x, y) if rel else (0.0, 0.0)
+        if c == "M":
+            finish()
+            x, y = ox + a[0], oy + a[1]
+            start = (x, y)
+            current = [start]
+        elif c == "Z":
+            finish()
+            x, y = start
+        else:
+            if not current:
+                current = [(x, y)]
+            if c == "L":
+                x, y = ox + a[0], oy + a[1]
+                current.append((x, y))
+            elif c == "H":
+                x = ox + a[0]
+                current.append((x, y))
+            elif c == "V":
+                y = oy + a[0]
+                current.append((x, y))
+            elif c == "C":
+                p1, p2, p3 = (ox + a[0], oy + a[1]), (ox + a[2], oy + a[3]), (ox + a[4], oy + a[5])
+                current.extend(_cubic((x, y), p1, p2, p3, tolerance))
+                last_ctrl, (x, y) = p2, p3
+            elif c == "S":
+                p1 = (2 * x - last_ctrl[0], 2 * y - last_ctrl[1]) if last_cmd in "CS" and last_ctrl else (x, y)
+                p2, p3 = (ox + a[0], oy + a[1]), (ox + a[2], oy + a[3])
+                current.extend(_cubic((x, y), p1, p2, p3, tolerance))
+                last_ctrl, (x, y) = p2, p3
+            elif c == "Q":
+                p1, p2 = (ox + a[0], oy + a[1]), (ox + a[2], oy + a[3])
+                current.extend(_quad((x, y), p1, p2, tolerance))
+                last_ctrl, (x, y) = p1, p2
+            elif c == "T":
+                p1 = (2 * x - last_ctrl[0], 2 * y - last_ctrl[1]) if last_cmd in "QT" and last_ctrl else (x, y)
+                p2 = (ox + a[0], oy + a[1])
+                current.extend(_quad((x, y), p1, p2, tolerance))
+                last_ctrl, (x, y) = p1, p2
+            elif c == "A":
+                p1 = (ox + a[5], oy + a[6])
+                current.extend(_arc((x, y), a[0], a[1], a[2], bool(a[3]), bool(a[4]), p1, tolerance))
+                x, y = p1
+        last_cmd = c
+    finish()
+    return lines
+
+
+# ── Polyline helpers ────────────────────────────────────────────────
+
+
+def bbox(lines) -> tuple[float, float, float, float] | None:
+    """(min_x, min_y, max_x, max_y) over all points, or None if empty."""
+    xs = [p[0] for line in lines for p in line]
+    ys = [p[1] for line in lines for p in line]
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def signed_area(points) -> float:
+    """Shoelace area of a closed ring (positive = counter-clockwise in y-up)."""
+    n = len(points)
+    return sum(points[i][0] * points[(i + 1) % n][1] - points[(i + 1) % n][0] * points[i][1]
+               for i in range(n)) / 2
+
+
+def polyline_to_d(line, digits: int = 3) -> str:
+    """Closed polyline as compact absolute path data."""
+    head = line[0]
+    rest = " ".join(f"{fmt(x, digits)},{fmt(y, digits)}" for x, y in line[1:])
+    return f"M{fmt(head[0], digits)},{fmt(head[1], digits)} {rest}Z" if rest else ""
+
+
+def tight_viewbox(lines, pad: float = 0.5) -> tuple[float, float, float, float] | None:
+    box = bbox(lines)
+    if box is None:
+        return None
+    min_x, min_y, max_x, max_y = box
+    return min_x - pad, min_y - pad, max_x - min_x + 2 * pad, max_y - min_y + 2 * pad
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Integrity check and orphan collector for the public asset directories.
+
+Cross-checks the three manifests (image_manifest.json,
+wildlife_image_manifest.json, aircraft_silhouette_manifest.json) against the
+files on disk, the hashes in asset_precache_manifest.json and the paths the
+app derives on its own, and reports:
+
+    missing   — manifest entry whose file is not there
+    empty     — referenced file of zero bytes
+    mismatch  — sha256 or size differs from the precache manifest, the file
+                has no precache row (or a row has no manifest entry), or the
+                filename is not the one the app requests (wildlife: group +
+                resolveWildlifeImage() stem; aircraft: category folder;
+                silhouettes: path = /aircraft_silhouettes/<filename>)
+    orphan    — file under a section directory that nothing references
+
+Generated files listed in asset_precache.PUBLIC_SECTIONS (sprite.svg,
+geometry.bin), the crops an entry records (asset_crop.py) and .gz/.br
+siblings of referenced files are not orphans.
+
+Every file is hashed once, in a thread pool, from a read-only mmap:
+hashlib releases the GIL on large buffers, so the threads hash in parallel
+and no file is copied through Python buffers.
+
+Usage:
+    python scripts/asset_verify.py              # report; exit 1 on any finding
+    python scripts/asset_verify.py --prune      # also delete orphaned files
+    python scripts/asset_verify.py --jobs 8 --section wildlife_images
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import asset_precache
+import asset_species
+from asset_precache import PUBLIC_SECTIONS
+
+PUBLIC_DIR = asset_precache.PUBLIC_DIR
+KINDS = ("missing", "empty", "mismatch", "orphan")
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+# ── Hashing ─────────────────────────────────────────────────────────
+
+
+def hash_file(path: Path) -> tuple[str, int]:
+    """(sha256, bytes) of `path`, read through a read-only mmap."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:   # mmap refuses empty files
+            return hashlib.sha256().hexdigest(), 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return hashlib.sha256(view).hexdigest(), size
+
+
+def hash_all(paths, jobs: int | None = None) -> dict[Path, tuple[str, int]]:
+    """{path: (sha256, bytes)}, largest files first so the pool drains evenly."""
+    paths = sorted(paths, key=lambda p: p.stat().st_size, reverse=True)
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 4, thread_name_prefix="verify") as pool:
+        return dict(zip(paths, pool.map(hash_file, paths)))
+
+
+def present(path: Path) -> bool:
+    """A non-empty regular file: what the scrapers count as "already downloaded"."""
+    try:
+        return path.is_file() and path.stat().st_size > 0
+    except OSError:
+        return False
+
+
+def files_in(root: Path) -> set[str]:
+    """Relative POSIX paths of every file below root."""
+    found, stack = set(), [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for item in it:
+                if item.is_dir(follow_symlinks=False):
+                    stack.append(Path(item.path))
+                elif item.is_file(follow_symlinks=False):
+                    found.add(Path(item.path).relative_to(root).as_posix())
+    return found
+
+
+# ── App filename rules ──────────────────────────────────────────────
+
+
+def expected_filename(section: str, name: str, entry: dict, species_rule: list) -> str | None:
+    """The filename the app resolves for this entry, or None if it reads the manifest's own."""
+    if section == "wildlife_images":
+        return f"{entry.get('group')}/{asset_species.safe_filename(name, species_rule)}.jpg"
+    return None
+
+
+def convention_error(section: str, name: str, entry: dict, species_rule: list) -> str | None:
+    filename = entry["filename"]
+    expected = expected_filename(section, name, entry, species_rule)
+    if expected is not None and filename != expected:
+        return f"app requests {expected}"
+    if section == "aircraft_images" and filename.split("/", 1)[0] != entry.get("category"):
+        return f"not in its category folder ({entry.get('category')}/)"
+    if section == "aircraft_silhouettes" and entry.get("path") != f"/{section}/{filename}":
+        return f"path {entry.get('path')} does not match"
+    return None
+
+
+# ── Verify ──────────────────────────────────────────────────────────
+
+
+def verify_section(section: str, public_dir: Path, precache: dict, species_rule: list,
+                   jobs: int | None = None) -> dict:
+    """{kind: [(relative path, detail)]} for one section, plus "files" and "bytes" scanned."""
+    manifest_name, _, extras = PUBLIC_SECTIONS[section]
+    root = public_dir / section
+    manifest_path = public_dir / manifest_name
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+    found = files_in(root) if root.is_dir() else set()
+    hashes = {path.relative_to(root).as_posix(): value
+              for path, value in hash_all([root / rel for rel in found], jobs).items()}
+    rows = {row["url"].removeprefix(f"/{section}/"): row for row in precache.get(section, [])}
+
+    result = {kind: [] for kind in KINDS}
+    referenced = {}
+    for name, entry in manifest.items():
+        filename = entry.get("filename")
+        if filename:
+            referenced.setdefault(filename, name)
+            for record in (entry.get("crops") or {}).values():   # asset_crop.py outputs
+                if isinstance(record, dict) and record.get("file"):
+                    referenced.setdefault(record["file"], name)
+            error = convention_error(section, name, entry, species_rule)
+            if error:
+                result["mismatch"].append((filename, f"{name}: {error}"))
+    referenced.update({name: None for name in extras if name in found})
+
+    for rel, owner in sorted(referenced.items()):
+        label = f" ({owner})" if owner else ""
+        if rel not in found:
+            result["missing"].append((rel, f"manifest entry{label}"))
+            continue
+        sha, size = hashes[rel]
+        if size == 0:
+            result["empty"].append((rel, f"0 bytes{label}"))
+        row = rows.get(rel)
+        if row is None:
+            result["mismatch"].append((rel, "no row in the precache manifest"))
+        elif row["sha256"] != sha or row["bytes"] != size:
+            result["mismatch"].append((rel, f"precache has {row['bytes']} bytes / {row['sha256'][:12]}, "
+                                            f"file is {size} bytes / {sha[:12]}"))
+    for rel in sorted(set(rows) - set(referenced)):
+        result["mismatch"].append((rel, "precache row without a manifest entry"))
+
+    siblings = {rel + suffix for rel in referenced for suffix in COMPRESSED_SUFFIXES}
+    for rel in sorted(found - set(referenced) - siblings):
+        result["orphan"].append((rel, f"{hashes[rel][1]} bytes"))
+
+    result["files"] = len(found)
+    result["bytes"] = sum(size for _, size in hashes.values())
+    return result
+
+
+def verify(public_dir: Path | None = None, sections=None, jobs: int | None = None) -> dict[str, dict]:
+    """{section: verify_section()} for every public section (or `sections`)."""
+    public_dir = public_dir or PUBLIC_DIR
+    precache = asset_precache.load(public_dir / asset_precache.PRECACHE_FILENAME)["sections"]
+    species_rule = asset_species.load()["filename_rule"]
+    return {section: verify_section(section, public_dir, precache, species_rule, jobs)
+            for section in (sections or PUBLIC_SECTIONS)}
+
+
+def prune(public_dir: Path, results: dict[str, dict]) -> int:
+    """Delete every orphan in `results`. Returns files deleted."""
+    deleted = 0
+    for section, result in results.items():
+        root = public_dir / section
+        for rel, _ in result["orphan"]:
+            path = root / rel
+            path.unlink(missing_ok=True)
+            deleted += 1
+            while path.parent != root and not any(path.parent.iterdir()):
+                path = path.parent
+                path.rmdir()
+    return deleted
+
+
+def describe(result: dict) -> str:
+    counts = ", ".join(f"{len(result[kind])} {kind}" for kind in KINDS if result[kind])
+    return f"{result['files']} files, {result['bytes'] / 1024 / 1024:.1f} MB — {counts or 'clean'}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify public asset files against the manifests")
+    parser.add_argument("--prune", action="store_true", help="Delete orphaned files")
+    parser.add_argument("--jobs", type=int, help="Hashing threads (default: CPU count)")
+    parser.add_argument("--section", action="append", choices=list(PUBLIC_SECTIONS),
+                        help="Check only this section (repeatable)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = verify(sections=args.section, jobs=args.jobs)
+    elapsed = time.perf_counter() - started
+
+    print("=" * 60)
+    print("Asset verify")
+    print("=" * 60)
+    findings = 0
+    for section, result in results.items():
+        print(f"\n{section}: {describe(result)}")
+        for kind in KINDS:
+            for rel, detail in result[kind]:
+                print(f"  [{kind.upper()}] {rel} — {detail}")
+        findings += sum(len(result[kind]) for kind in KINDS)
+
+    if args.prune:
+        deleted = prune(PUBLIC_DIR, results)
+        findings -= deleted
+        print(f"\nPruned {deleted} orphaned files")
+    total_files = sum(r["files"] for r in results.values())
+    total_mb = sum(r["bytes"] for r in results.values()) / 1024 / 1024
+    print(f"\n{'=' * 60}")
+    print(f"Hashed {total_files} files ({total_mb:.1f} MB) in {elapsed:.2f}s")
+    print("=" * 60)
+    if findings:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
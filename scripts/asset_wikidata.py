@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Wikidata-backed image lookups for both scrapers, in bulk.
+
+Full-text Commons search (gsrsearch) costs a request per query, ranks poorly
+("Falco sparverius animal") and needs several fallback queries per entry.
+Wikidata already records the curated image of a species or aircraft type
+(P18) and its Commons category (P373). For a run's whole work list:
+
+    resolve   title -> Wikidata item, BATCH_SIZE titles per request, through
+              the English Wikipedia page (redirects followed, so "Falco
+              sparverius" lands on "American kestrel"). Titles are the
+              scientific name for species and the first search query for
+              aircraft, the page the Wikipedia fallback already used. Item
+              IDs are kept in scripts/.cache/wikidata_entities.json
+    claims    wbgetentities for BATCH_SIZE items per request: P18 and P373
+              (preferred rank first, deprecated statements ignored)
+    images    one imageinfo query per BATCH_SIZE P18 files: thumbnail URL,
+              size, MIME type and licence
+
+so ~3 requests per 50 entries replace one search (or several) per entry.
+When the P18 image is missing or refused, candidates() lists files from the
+P373 category: one request, and only for those entries.
+
+Only resolved titles are cached. A title with no Wikipedia page or no item is
+a miss for the scraper's negative cache (asset_negcache.py). Claims and image
+data are fetched fresh each run, since P18 gets re-curated.
+
+File format:
+    {"version": 1, "items": {title: "Q..."}}
+"""
+
+import json
+import threading
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+import asset_runtime
+from asset_metrics import metrics
+
+WIKIPEDIA_API = "https://en.wikipedia.org/w/api.php"
+WIKIDATA_API = "https://www.wikidata.org/w/api.php"
+COMMONS_API = "https://commons.wikimedia.org/w/api.php"
+CACHE_NAME = "wikidata_entities.json"   # in asset_runtime.CACHE_DIR
+CACHE_VERSION = 1
+BATCH_SIZE = 50   # most titles / ids a MediaWiki API request takes
+
+
+def _batches(items: list, size: int = BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _claim(entity: dict, prop: str) -> str | None:
+    """Best-ranked string value of a property: preferred, else normal."""
+    statements = [s for s in entity.get("claims", {}).get(prop, []) if s.get("rank") != "deprecated"]
+    statements.sort(key=lambda s: s.get("rank") != "preferred")
+    for statement in statements:
+        value = statement.get("mainsnak", {}).get("datavalue", {}).get("value")
+        if isinstance(value, str) and value:
+            return value
+    return None
+
+
+def _image_record(page: dict) -> dict | None:
+    """Commons imageinfo page -> the scrapers' candidate shape, or None if it is not an image."""
+    info = (page.get("imageinfo") or [{}])[0]
+    url = info.get("thumburl") or info.get("url", "")
+    mime = info.get("mime", "")
+    if not url or "image/" not in mime:
+        return None
+    return {
+        "title": page.get("title", ""),
+        "url": url,
+        "desc_url": info.get("descriptionurl", ""),
+        "mime": mime,
+        "width": info.get("thumbwidth") or info.get("width", 0),
+        "height": info.get("thumbheight") or info.get("height", 0),
+        "license": info.get("extmetadata", {}).get("LicenseShortName", {}).get("value", "unknown"),
+    }
+
+
+class Resolver:
+    """
+    prefetch() a run's titles once, then entity() / candidates() per entry.
+    Reads after prefetch() are plain dict lookups, safe from worker threads.
+    """
+
+    def __init__(self, user_agent: str, width: int, path: Path | None = None):
+        self.user_agent = user_agent
+        self.width = width
+        self.path = path = path or asset_runtime.cache_path(CACHE_NAME)
+        self.items: dict[str, str] = {}
+        self.entities: dict[str, dict | None] = {}   # this run: title -> entity record (None: no item)
+        self.requests = {"resolve": 0, "claims": 0, "images": 0, "category": 0}
+        self._lock = threading.Lock()
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == CACHE_VERSION:
+                    self.items = data.get("items", {})
+            except (json.JSONDecodeError, OSError):
+                print(f"[WARN] Ignoring unreadable Wikidata cache: {path}")
+
+    def _get(self, api: str, params: dict, kind: str) -> dict:
+        query = urllib.parse.urlencode({**params, "format": "json"})
+        req = urllib.request.Request(f"{api}?{query}", headers={"User-Agent": self.user_agent})
+        with metrics.stage(f"wikidata_{kind}"), urllib.request.urlopen(req, timeout=30) as resp:
+            data = json.loads(resp.read().decode("utf-8"))
+        with self._lock:
+            self.requests[kind] += 1
+        return data
+
+    # ── Bulk passes ─────────────────────────────────────────────────
+
+    def prefetch(self, titles) -> int:
+        """
+        Resolve, fetch claims and image info for every title. A batch whose
+        request fails is left out (entity() then returns None for its titles
+        and known() False), so nothing is recorded as a miss for it.
+        Returns the number of titles with an entity record.
+        """
+        titles = [t for t in dict.fromkeys(titles) if t not in self.entities]
+        for title in titles:
+            metrics.cache("wikidata_item", hit=title in self.items)
+        unresolved = [t for t in titles if t not in self.items]
+        for batch in _batches(unresolved):
+            try:
+                self._resolve(batch)
+            except Exception as e:
+                print(f"  [WARN] Wikidata: resolving {len(batch)} titles failed: {e}")
+                continue
+            for title in batch:
+                if title not in self.items:
+                    self.entities[title] = None
+
+        by_item: dict[str, list[str]] = {}
+        for title in titles:
+            if title in self.items:
+                by_item.setdefault(self.items[title], []).append(title)
+        files: dict[str, list[str]] = {}   # "File:..." -> titles
+        for batch in _batches(list(by_item)):
+            try:
+                data = self._get(WIKIDATA_API, {"action": "wbgetentities", "ids": "|".join(batch),
+                                                "props": "claims"}, "claims")
+            except Exception as e:
+                print(f"  [WARN] Wikidata: claims for {len(batch)} items failed: {e}")
+                continue
+            for qid in batch:
+                entity = data.get("entities", {}).get(qid, {})
+                if "missing" in entity:   # deleted item: resolve the titles again next run
+                    for title in by_item[qid]:
+                        del self.items[title]
+                        self.entities[title] = None
+                    continue
+                image, category = _claim(entity, "P18"), _claim(entity, "P373")
+                for title in by_item[qid]:
+                    self.entities[title] = {"item": qid, "file": image, "category": category, "image": None}
+                if image:
+                    files.setdefault(f"File:{image}", []).extend(by_item[qid])
+
+        for batch in _batches(list(files)):
+            try:
+                pages = self._imageinfo({"titles": "|".join(batch)}, "images")
+            except Exception as e:
+                print(f"  [WARN] Wikidata: image info for {len(batch)} files failed: {e}")
+                for name in batch:   # P18 unknown, not absent: leave these titles to search
+                    for title in files[name]:
+                        self.entities.pop(title, None)
+                continue
+            for name, page in pages.items():
+                record = _image_record(page)
+                for title in files.get(name, []):
+                    self.entities[title]["image"] = record
+        return sum(1 for t in titles if self.entities.get(t))
+
+    def _resolve(self, titles: list[str]):
+        """Wikipedia titles -> item IDs through pageprops, following normalisation and redirects."""
+        data = self._get(WIKIPEDIA_API, {"action": "query", "titles": "|".join(titles), "redirects": "1",
+                                         "prop": "pageprops", "ppprop": "wikibase_item"}, "resolve")
+        query = data.get("query", {})
+        hops = {step["from"]: step["to"] for key in ("normalized", "redirects") for step in query.get(key, [])}
+        items = {page.get("title"): page.get("pageprops", {}).get("wikibase_item")
+                 for page in query.get("pages", {}).values()}
+        for title in titles:
+            target, seen = title, set()
+            while target in hops and target not in seen:
+                seen.add(target)
+                target = hops[target]
+            if items.get(target):
+                self.items[title] = items[target]
+
+    def _imageinfo(self, params: dict, kind: str) -> dict[str, dict]:
+        """Commons imageinfo pages keyed by the title that was asked for."""
+        data = self._get(COMMONS_API, {"action": "query", "prop": "imageinfo",
+                                       "iiprop": "url|size|mime|extmetadata",
+                                       "iiurlwidth": str(self.width), **params}, kind)
+        query = data.get("query", {})
+        asked = {step["to"]: step["from"] for step in query.get("normalized", [])}
+        return {asked.get(page.get("title"), page.get("title")): page
+                for page in query.get("pages", {}).values() if "missing" not in page}
+
+    # ── Per entry ───────────────────────────────────────────────────
+
+    def known(self, title: str) -> bool:
+        """prefetch() got an answer for title (an entity or a definite "no item")."""
+        return title in self.entities
+
+    def entity(self, title: str) -> dict | None:
+        """{"item", "file", "category", "image"} for a prefetched title, or None."""
+        return self.entities.get(title)
+
+    def candidates(self, title: str, limit: int = 5):
+        """
+        The P18 image, then up to `limit` files from the P373 category (one
+        request, made only if the caller gets that far). Request errors raise.
+        """
+        entity = self.entities.get(title)
+        if not entity:
+            return
+        if entity["image"]:
+            yield entity["image"]
+        if entity["category"]:
+            pages = self._imageinfo({"generator": "categorymembers", "gcmtype": "file",
+                                     "gcmtitle": f"Category:{entity['category']}", "gcmlimit": str(limit)},
+                                    "category")
+            for page in pages.values():
+                record = _image_record(page)
+                if record and record["title"] != f"File:{entity['file']}":
+                    yield record
+
+    def describe(self) -> str:
+        found = sum(1 for e in self.entities.values() if e and e["image"])
+        return (f"{found}/{len(self.entities)} entries with a P18 image, "
+                + ", ".join(f"{n} {kind}" for kind, n in self.requests.items()) + " requests")
+
+    def save(self):
+        payload = {"version": CACHE_VERSION, "items": dict(sorted(self.items.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
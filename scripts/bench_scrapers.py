@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the asset scrapers.
+
+Starts the fixture replay server (asset_fixtures.ReplayServer) in-process and
+runs scrape_aircraft_images.scrape_all() and scrape_wildlife_images.main()
+against it, each in a fresh subprocess writing to a temp directory — its
+cache dir included (asset_runtime.CACHE_DIR: catalogue, lookup caches,
+snapshots), so every scenario starts cold and the real cache dir is checked
+to be unchanged afterwards. Reports wall time,
+requests, bytes and peak RSS per scenario.
+
+Record the fixtures once with live network access:
+    python scripts/asset_fixtures.py record --archive fixtures.zip -- scripts/scrape_aircraft_images.py --delay 0 --output-dir /tmp/ac
+    python scripts/asset_fixtures.py record --archive fixtures.zip --append -- scripts/scrape_wildlife_images.py
+
+Usage:
+    python scripts/bench_scrapers.py --archive fixtures.zip
+    python scripts/bench_scrapers.py --archive fixtures.zip --latency 0.08 --bandwidth 2000000 --repeat 3
+    python scripts/bench_scrapers.py --archive fixtures.zip --only wildlife --json bench.json
+    python scripts/bench_scrapers.py --archive fixtures.zip --only aircraft --workers 8
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import asset_fixtures
+import asset_runtime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+CACHE_DIR = asset_runtime.CACHE_DIR   # the real one, before any scenario redirects it
+SCENARIOS = ("aircraft", "wildlife")
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of the current process, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def cache_state() -> dict[str, tuple[int, int]]:
+    """(size, mtime_ns) of every file in the real cache dir (scripts/.cache/)."""
+    if not CACHE_DIR.is_dir():
+        return {}
+    return {str(path.relative_to(CACHE_DIR)): (stat.st_size, stat.st_mtime_ns)
+            for path in sorted(CACHE_DIR.rglob("*")) if path.is_file() for stat in [path.stat()]}
+
+
+def _run_scenario(name: str, base_url: str, workdir: str, delay: float, workers: int, conn):
+    """Subprocess body: point one scraper at the replay server and time it."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import asset_http
+
+    asset_http.register_handler(asset_fixtures.ReplayRedirectHandler(base_url))
+    work = Path(workdir)
+
+    # Persistent state goes to the workdir too: every scenario starts cold, and
+    # replays and injected errors never reach the real cache dir
+    asset_runtime.CACHE_DIR = work / ".cache"
+
+    if name == "aircraft":
+        import scrape_aircraft_images as scraper
+        scraper.OUTPUT_DIR = work / "aircraft_images"
+        scraper.DELAY_SECONDS = delay
+        manifest_path = scraper.OUTPUT_DIR / "image_manifest.json"
+        run = lambda: scraper.scrape_all(workers=workers)
+    else:
+        import scrape_wildlife_images as scraper
+        scraper.PUBLIC_DIR = work
+        scraper.IMAGE_DIR = work / "wildlife_images"
+        scraper.MANIFEST_PATH = work / "wildlife_image_manifest.json"
+        scraper.DELAY_SECONDS = delay
+        manifest_path = scraper.MANIFEST_PATH
+        run = lambda: scraper.main([])
+
+    log_path = work / f"{name}.log"
+    with open(log_path, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+        start = time.perf_counter()
+        run()
+        wall = time.perf_counter() - start
+
+    entries = len(json.loads(manifest_path.read_text())) if manifest_path.exists() else 0
+    conn.send({"wall": wall, "peak_rss": peak_rss_bytes(), "entries": entries, "log": str(log_path)})
+    conn.close()
+
+
+def run_once(name: str, server: asset_fixtures.ReplayServer, delay: float, workers: int = 1) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    before, cached = server.stats.snapshot(), cache_state()
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+        parent, child = ctx.Pipe(duplex=False)
+        proc = ctx.Process(target=_run_scenario, args=(name, server.base_url, workdir, delay, workers, child))
+        proc.start()
+        child.close()
+        result = parent.recv()
+        proc.join()
+    after, now = server.stats.snapshot(), cache_state()
+    if now != cached:
+        touched = sorted(name for name in cached.keys() | now.keys() if cached.get(name) != now.get(name))
+        raise RuntimeError(f"{name} scenario changed {CACHE_DIR}: {', '.join(touched)}")
+    result.update({key: after[key] - before[key] for key in after})
+    return result
+
+
+def fmt_bytes(n: int | None) -> str:
+    if n is None:
+        return "n/a"
+    return f"{n / 1024 / 1024:.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against recorded fixtures")
+    parser.add_argument("--archive", type=Path, required=True, help="Fixture archive from asset_fixtures.py record")
+    parser.add_argument("--only", choices=SCENARIOS, help="Run a single scenario")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario (median reported)")
+    parser.add_argument("--delay", type=float, default=0.0, help="Scraper politeness delay (seconds)")
+    parser.add_argument("--workers", type=int, default=1, help="Aircraft scraper worker pool size")
+    parser.add_argument("--json", type=Path, help="Also write results as JSON")
+    asset_fixtures.add_replay_options(parser)
+    args = parser.parse_args()
+
+    archive = asset_fixtures.FixtureArchive.load(args.archive)
+    server = asset_fixtures.ReplayServer(archive, latency=args.latency, jitter=args.jitter,
+                                         bandwidth=args.bandwidth, error_rate=args.error_rate,
+                                         seed=args.seed)
+    server.start_background()
+    print(f"Replaying {len(archive.entries)} fixtures at {server.base_url} "
+          f"(latency {args.latency}s, bandwidth {args.bandwidth or 'unlimited'}, "
+          f"error rate {args.error_rate})")
+
+    results = {}
+    try:
+        for name in ([args.only] if args.only else SCENARIOS):
+            runs = []
+            for i in range(args.repeat):
+                run = run_once(name, server, args.delay, args.workers)
+                runs.append(run)
+                print(f"  {name} run {i + 1}/{args.repeat}: {run['wall']:.2f}s, "
+                      f"{run['requests']} requests, {run['misses']} misses")
+            results[name] = {
+                "wall_s": statistics.median(r["wall"] for r in runs),
+                "requests": runs[-1]["requests"],
+                "bytes": runs[-1]["bytes"],
+                "misses": runs[-1]["misses"],
+                "injected_errors": runs[-1]["injected_errors"],
+                "peak_rss": max((r["peak_rss"] or 0) for r in runs) or None,
+                "entries": runs[-1]["entries"],
+                "runs": [r["wall"] for r in runs],
+            }
+    finally:
+        server.shutdown()
+
+    print(f"\n{'scenario':10s} {'wall':>9s} {'requests':>9s} {'bytes':>10s} {'peak RSS':>10s} {'entries':>8s}")
+    for name, r in results.items():
+        print(f"{name:10s} {r['wall_s']:8.2f}s {r['requests']:9d} {fmt_bytes(r['bytes']):>10s} "
+              f"{fmt_bytes(r['peak_rss']):>10s} {r['entries']:8d}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
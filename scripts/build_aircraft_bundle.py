@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Pre-joined, columnar aircraft bundle for the client.
+
+military_aircraft.json and commercial_aircraft.json keep every number as a
+display string ("3,600", "132.6"), and the client used to join them with the
+image runtime maps at import and with the silhouette maps through fuzzy name
+matching on the parking page. This stage does all of that once, at build time:
+
+    - every numeric field is parsed and validated (digits, optional thousands
+      commas and decimals, nothing else); a bad value fails the build. The
+      parsed value is for sorting and arithmetic; the source string is kept
+      as its display text, character for character
+    - each aircraft's photo comes from image_manifest.json by name (else the
+      source row's own image_url, as lib/aircraft-data.ts did)
+    - its 16:9 card crop, where asset_crop.py has rendered one, is the
+      image_card column
+    - each aircraft's silhouette comes from aircraft_silhouette_manifest.json by
+      its base name — asset_aircraft.get_base_name(), the key
+      generate_aircraft_silhouettes.py writes, so the join is exact instead of fuzzy
+    - rows are in the order lib/aircraft-data.ts shows them: military, then
+      commercial, each A–Z
+
+and writes public/runtime/aircraft_bundle.json, one object of columns:
+
+    v        format version
+    names    aircraft names, row order
+    strings  string table shared by every text column
+    text     {column: [index into strings, or -1]}
+             category, manufacturer, base, image, image_card, silhouette, gear fields, ...
+             and every string-valued numeric field as the source wrote it ("3,600", "175.0")
+    num      {column: {"scale": d, "values": [int or null]}}
+             fixed point: value = int / 10**d, d = most decimals in the column,
+             so "132.6" is 1326 (d=1) and no source digit is lost;
+             ACN columns are "acn.<key>" in both text and num
+
+Written compact with sorted keys, so unchanged data rewrites an identical file.
+The aircraft scraper and the silhouette generator rebuild it after writing
+their runtime maps. lib/aircraft-bundle.ts reads it, and lib/aircraft-data.ts
+builds its aircraft list from it alone, without importing the source JSON.
+
+Usage:
+    python scripts/build_aircraft_bundle.py            # rebuild from public/
+    python scripts/build_aircraft_bundle.py --check    # exit 1 if out of date or invalid
+"""
+
+import argparse
+import json
+import re
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import asset_aircraft
+import asset_runtime
+
+PUBLIC_DIR = asset_runtime.PUBLIC_DIR
+BUNDLE_FILENAME = "aircraft_bundle.json"
+VERSION = 2   # 2: numeric fields keep their source strings in text
+SOURCES = (("military", "military_aircraft.json"), ("commercial", "commercial_aircraft.json"))
+
+# Columns, in AircraftCharacteristics (lib/aircraft_database_schema.ts) order
+NUMERIC_FIELDS = (
+    "wing_span_ft", "length_ft", "height_ft", "vertical_clearance_in",
+    "pivot_point_ft", "nose_gear_ft", "turn_radius_ft", "turn_diameter_180_ft",
+    "basic_empty_wt_klbs", "basic_mission_to_wt_klbs", "max_to_wt_klbs",
+    "basic_mission_ldg_wt_klbs", "max_ldg_wt_klbs", "to_dist", "ldg_dist",
+    "main_pct_gross_load", "main_max_assembly_load_klbs", "main_max_single_wheel_load_klbs",
+    "main_contact_pressure_psi", "main_contact_area_sqin", "main_footprint_width_in",
+    "nose_pct_gross_load", "nose_max_assembly_load_klbs", "nose_max_single_wheel_load_klbs",
+    "nose_contact_pressure_psi", "nose_contact_area_sqin", "nose_footprint_width_in",
+    "source_page",
+)
+ACN_FIELDS = tuple(f"{bound}_{kind}" for bound in ("min", "max")
+                   for kind in ("wt", *(f"{p}_{s}" for p in ("rigid", "flex") for s in "ABCD")))
+ACN_COLUMNS = tuple(f"acn.{key}" for key in ACN_FIELDS)
+TEXT_FIELDS = (
+    "manufacturer", "alc_manager", "group_index", "controlling_gear",
+    "gear_config", "nose_assemblies_tires", "main_assemblies_tires", "notes",
+)
+# Source fields the bundle replaces (category comes from the file, images from the manifest)
+SUPERSEDED_FIELDS = ("aircraft", "category", "image_url", "image_license", "image_source_url")
+PERCENT_FIELDS = ("main_pct_gross_load", "nose_pct_gross_load")
+
+NUMBER = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?")
+
+
+# ── Parsing and validation ──────────────────────────────────────────
+
+
+def parse_number(value) -> Decimal:
+    """Decimal for a source value such as "3,600", "132.6" or 21; ValueError if it is not one."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return Decimal(value)
+    if not isinstance(value, str) or not NUMBER.fullmatch(value.strip()):
+        raise ValueError(f"not a number: {value!r}")
+    return Decimal(value.strip().replace(",", ""))
+
+
+def load_rows(public_dir: Path) -> tuple[list[dict], list[str]]:
+    """(rows, errors): every source aircraft with category set and numbers parsed."""
+    rows, errors, seen = [], [], set()
+    for category, filename in SOURCES:
+        for entry in json.loads((public_dir / filename).read_text(encoding="utf-8")):
+            name = entry.get("aircraft", "").strip()
+            if not name:
+                errors.append(f"{filename}: entry without an aircraft name")
+                continue
+            if name in seen:
+                errors.append(f"{name}: listed twice")
+                continue
+            seen.add(name)
+            row = {"name": name, "category": category, "numbers": {}, "text": {}, "image_url": entry.get("image_url")}
+            fields = dict(entry)
+            for key, value in (fields.pop("acn", None) or {}).items():
+                fields[f"acn.{key}"] = value
+            for field, value in fields.items():
+                if value in ("", None) or field in SUPERSEDED_FIELDS:
+                    continue
+                if field in NUMERIC_FIELDS or field in ACN_COLUMNS:
+                    try:
+                        row["numbers"][field] = parse_number(value)
+                    except ValueError as e:
+                        errors.append(f"{name}: {field} {e}")
+                    if isinstance(value, str):
+                        row["text"][field] = value
+                elif field in TEXT_FIELDS:
+                    row["text"][field] = str(value)
+                else:
+                    errors.append(f"{name}: unknown field {field!r}")
+            for field in PERCENT_FIELDS:
+                if row["numbers"].get(field, 0) > 100:
+                    errors.append(f"{name}: {field} over 100")
+            rows.append(row)
+    return rows, errors
+
+
+# ── Joins ───────────────────────────────────────────────────────────
+
+
+def image_paths(public_dir: Path, profile: str | None = None) -> dict[str, str]:
+    """{aircraft name: public URL path} from image_manifest.json; the asset_crop.py crop if profile is set."""
+    path = public_dir / "image_manifest.json"
+    manifest = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    if profile:
+        return {name: f"/aircraft_images/{entry['crops'][profile]['file']}" for name, entry in manifest.items()
+                if ((entry.get("crops") or {}).get(profile) or {}).get("file")}
+    return {name: f"/aircraft_images/{entry['filename']}" for name, entry in manifest.items() if entry.get("filename")}
+
+
+def silhouette_paths(public_dir: Path) -> dict[str, str]:
+    """{base name: public URL path} from aircraft_silhouette_manifest.json."""
+    path = public_dir / "aircraft_silhouette_manifest.json"
+    manifest = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    return {base: entry.get("path") or f"/aircraft_silhouettes/{entry['filename']}"
+            for base, entry in manifest.items() if entry.get("filename")}
+
+
+# ── Bundle ──────────────────────────────────────────────────────────
+
+
+def build(public_dir: Path | None = None) -> tuple[str | None, list[str]]:
+    """(bundle JSON, errors); the JSON is None when there are errors."""
+    public_dir = public_dir or PUBLIC_DIR
+    rows, errors = load_rows(public_dir)
+    if errors:
+        return None, errors
+    images, cards, outlines = image_paths(public_dir), image_paths(public_dir, "card"), silhouette_paths(public_dir)
+
+    order = {category: i for i, (category, _) in enumerate(SOURCES)}
+    rows.sort(key=lambda row: (order[row["category"]], row["name"].casefold(), row["name"]))
+    for row in rows:
+        base = asset_aircraft.get_base_name(row["name"])
+        row["text"].update(category=row["category"], base=base,
+                           image=images.get(row["name"]) or row["image_url"],
+                           image_card=cards.get(row["name"]),
+                           silhouette=outlines.get(base))
+
+    strings: dict[str, int] = {}
+    text = {}
+    for column in ("category", "base", "image", "image_card", "silhouette", *TEXT_FIELDS,
+                   *NUMERIC_FIELDS, *ACN_COLUMNS):
+        values = [row["text"].get(column) for row in rows]
+        if any(v is not None for v in values):
+            text[column] = [-1 if v is None else strings.setdefault(v, len(strings)) for v in values]
+
+    num = {}
+    for column in (*NUMERIC_FIELDS, *ACN_COLUMNS):
+        values = [row["numbers"].get(column) for row in rows]
+        present = [v for v in values if v is not None]
+        if not present:
+            continue
+        scale = max(max(-v.as_tuple().exponent, 0) for v in present)
+        num[column] = {"scale": scale,
+                       "values": [None if v is None else int(v.scaleb(scale)) for v in values]}
+
+    bundle = {"v": VERSION, "names": [row["name"] for row in rows],
+              "strings": list(strings), "text": text, "num": num}
+    return asset_runtime.compact(bundle), []
+
+
+def unmatched_families(public_dir: Path | None = None) -> list[str]:
+    """Base names (load_aircraft()'s families) that no silhouette covers."""
+    public_dir = public_dir or PUBLIC_DIR
+    families = asset_aircraft.load_aircraft([(public_dir / filename, category) for category, filename in SOURCES])
+    return sorted(set(families) - set(silhouette_paths(public_dir)))
+
+
+def write_bundle(public_dir: Path | None = None) -> Path | None:
+    """Rebuild the bundle in public_dir/runtime/. None (and [WARN]) if the sources are missing or invalid."""
+    public_dir = public_dir or PUBLIC_DIR
+    if not all((public_dir / filename).exists() for _, filename in SOURCES):
+        return None
+    content, errors = build(public_dir)
+    for error in errors:
+        print(f"  [WARN] aircraft bundle: {error}")
+    if content is None:
+        return None
+    path = public_dir / asset_runtime.RUNTIME_DIRNAME / BUNDLE_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists() or path.read_text(encoding="utf-8") != content:
+        path.write_text(content, encoding="utf-8")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the pre-joined columnar aircraft bundle")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if the bundle is out of date or a value is invalid")
+    args = parser.parse_args()
+
+    content, errors = build()
+    for error in errors:
+        print(f"[ERROR] {error}")
+    if content is None:
+        sys.exit(1)
+    path = PUBLIC_DIR / asset_runtime.RUNTIME_DIRNAME / BUNDLE_FILENAME
+    bundle = json.loads(content)
+    joined = {column: sum(i >= 0 for i in bundle["text"].get(column, [])) for column in ("image", "silhouette")}
+    summary = (f"{len(bundle['names'])} aircraft, {len(bundle['num'])} numeric / {len(bundle['text'])} text columns, "
+               f"{joined['image']} photos, {joined['silhouette']} silhouettes "
+               f"({len(unmatched_families())} families without one), "
+               f"{len(content.encode('utf-8')) / 1024:.1f} KB")
+    if args.check:
+        if not path.exists() or path.read_text(encoding="utf-8") != content:
+            print(f"[STALE] {path}")
+            sys.exit(1)
+        print(f"[OK] {BUNDLE_FILENAME} up to date — {summary}")
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    print(f"  {BUNDLE_FILENAME}: {summary}")
+    print(f"Aircraft bundle written: {path}")
+
+
+if __name__ == "__main__":
+    main()
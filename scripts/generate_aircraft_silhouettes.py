@@ -4,31 +4,76 @@ Build aircraft silhouette library from RexKramer1/AircraftShapesSVG repo.
 
 Reads military_aircraft.json and commercial_aircraft.json, deduplicates by
 base aircraft name, maps each to an SVG from the shapes repo, and converts
-outline SVGs to solid black filled silhouettes.
+outline SVGs to solid black filled silhouettes. Each source shape is written
+once (e.g. c130.svg); every base mapped to it (AC-130, C-130, EC-130, ...) is a
+manifest entry aliasing that file and carrying its own display_name.
 
 Prerequisites:
     git clone https://github.com/RexKramer1/AircraftShapesSVG.git /tmp/aircraft-shapes
 
+Each run is committed to the "aircraft_silhouettes" section of the asset
+catalogue (scripts/.cache/asset_catalogue.sqlite3, see asset_catalogue.py),
+including bases with no usable shape, and the manifest is exported from it.
+Every run also rewrites the compact public/runtime/aircraft_silhouettes.*.json
+maps the parking page imports (asset_runtime.py) and the "aircraft_silhouettes"
+section (core tier) of public/asset_precache_manifest.json (asset_precache.py),
+then writes .gz/.br siblings for the changed SVGs and JSON (asset_compress.py).
+It also rebuilds public/runtime/aircraft_bundle.json, whose silhouette column
+joins on get_base_name() (asset_aircraft.py, build_aircraft_bundle.py).
+Every silhouette is also rasterized and diffed against the committed mask
+baseline (asset_raster.py) so a conversion change that alters the output is
+reported; new and dropped bases update the baseline, changed masks only with
+--update-masks.
+
 Usage:
     python scripts/generate_aircraft_silhouettes.py
     python scripts/generate_aircraft_silhouettes.py --dry-run
     python scripts/generate_aircraft_silhouettes.py --force F-16
+    python scripts/generate_aircraft_silhouettes.py --sprite   # + aircraft_silhouettes/sprite.svg
+    python scripts/generate_aircraft_silhouettes.py --update-masks   # accept changed raster masks
+    python scripts/generate_aircraft_silhouettes.py --watch    # regenerate on source/SHAPE_MAP edits
+    python scripts/generate_aircraft_silhouettes.py --watch --watch-settle 2   # precache/compress after 2s idle
+    python scripts/generate_aircraft_silhouettes.py --shard 2/4   # convert one slice (by source shape)
+    python scripts/generate_aircraft_silhouettes.py merge         # partials -> manifest + library outputs
+    python scripts/asset_geometry.py                           # check geometry.bin round trip only
+    python scripts/generate_aircraft_silhouettes.py --profile --trace-memory
+    python scripts/generate_aircraft_silhouettes.py plan   # offline: convert/drop actions
 """
 
+import ast
+import html
 import json
 import os
 import re
 import sys
+import time
 import argparse
 from pathlib import Path
 
+from asset_metrics import metrics
+import asset_aircraft
+import asset_catalogue
+import asset_compress
+import asset_geometry
+import asset_metrics
+import asset_precache
+import asset_raster
+import asset_runtime
+import asset_shard
+import asset_svg
+import build_aircraft_bundle
+from asset_plan import Plan, files_under
+
 # ── Config ──────────────────────────────────────────────────────────
 
-PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+SCRIPT_PATH = Path(__file__).resolve()   # watched for SHAPE_MAP edits
+PUBLIC_DIR = SCRIPT_PATH.parent.parent / "public"
 MILITARY_JSON = PUBLIC_DIR / "military_aircraft.json"
 COMMERCIAL_JSON = PUBLIC_DIR / "commercial_aircraft.json"
 OUTPUT_DIR = PUBLIC_DIR / "aircraft_silhouettes"
 MANIFEST_PATH = PUBLIC_DIR / "aircraft_silhouette_manifest.json"
+SPRITE_FILENAME = "sprite.svg"   # inside OUTPUT_DIR; see build_sprite()
+GEOMETRY_FILENAME = "geometry.bin"   # inside OUTPUT_DIR; see asset_geometry.py
 
 # Clone location for the shapes repo
 SHAPES_DIR = Path(os.environ.get("SHAPES_DIR", str(Path.home() / "AppData/Local/Temp/aircraft-shapes/Shapes SVG")))
@@ -159,55 +204,33 @@ def sanitize_filename(name):
     return s
 
 
-def get_base_name(aircraft_name):
-    """Extract the base aircraft name for deduplication."""
-    name = aircraft_name.strip()
-    mil_match = re.match(r'^([A-Z]{1,3}-\d{1,3})', name)
-    if mil_match:
-        return mil_match.group(1)
-    comm_match = re.match(
-        r'^(?:Airbus|Boeing|Bombardier|Embraer|McDonnell Douglas|Cessna|ATR|Saab|'
-        r'de Havilland|BAe|Fokker|Lockheed|Beech|Gulfstream|Dassault|Pilatus)?\s*'
-        r'([A-Z]?\d{2,4})', name
-    )
-    if comm_match:
-        return comm_match.group(1)
-    return name
+def load_aircraft():
+    """Load and deduplicate aircraft from both JSON files by base name (asset_aircraft.py)."""
+    return asset_aircraft.load_aircraft([(MILITARY_JSON, "military"), (COMMERCIAL_JSON, "commercial")])
 
 
-def load_aircraft():
-    """Load and deduplicate aircraft from both JSON files."""
-    aircraft_map = {}
-    for json_path, category in [(MILITARY_JSON, "military"), (COMMERCIAL_JSON, "commercial")]:
-        if not json_path.exists():
-            print(f"[WARN] {json_path.name} not found, skipping")
-            continue
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        for entry in data:
-            full_name = entry.get("aircraft", "").strip()
-            if not full_name:
-                continue
-            base = get_base_name(full_name)
-            if base not in aircraft_map:
-                aircraft_map[base] = {
-                    "base_name": base,
-                    "display_name": full_name,
-                    "category": category,
-                }
-    return aircraft_map
+catalogue_db = None   # asset_catalogue.Catalogue, opened by main() for run/merge
 
 
 def load_manifest():
-    if MANIFEST_PATH.exists():
-        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    return asset_catalogue.load_manifest(OUTPUT_DIR, MANIFEST_PATH)
+
 
+def save_manifest(manifest, failures=None):
+    """Commit to the catalogue and export the manifest JSON from it; returns the commit stats."""
+    stats = catalogue_db.commit(OUTPUT_DIR.name, "generate_aircraft_silhouettes", OUTPUT_DIR, manifest, failures)
+    catalogue_db.export(OUTPUT_DIR.name, MANIFEST_PATH, lambda m: json.dumps(m, indent=2, ensure_ascii=False))
+    return stats
 
-def save_manifest(manifest):
-    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+def unmapped_records(aircraft_map, manifest):
+    """{base: record} for catalogue bases with no usable shape and no hand-added entry."""
+    _, unmapped = map_shapes(aircraft_map, warn=False)
+    return {
+        base: {"base_name": base, "display_name": info["display_name"], "category": info["category"],
+               "reason": "shape file missing" if base in SHAPE_MAP else "no SHAPE_MAP entry"}
+        for base, info in unmapped if base not in manifest
+    }
 
 
 def convert_to_filled_silhouette(svg_content, title=""):
@@ -265,22 +288,78 @@ def convert_to_filled_silhouette(svg_content, title=""):
 '''
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Build aircraft silhouette library")
-    parser.add_argument("--dry-run", action="store_true", help="List mappings without copying")
-    parser.add_argument("--force", type=str, help="Force re-process a specific base name")
-    args = parser.parse_args()
+def shape_filename(shape_file):
+    """Canonical output file for a source shape, shared by every base mapped to it."""
+    return sanitize_filename(Path(shape_file).stem) + ".svg"
 
-    # Check shapes repo
-    if not SHAPES_DIR.exists():
-        print("[ERROR] Shapes repo not found. Run:")
-        print("  git clone https://github.com/RexKramer1/AircraftShapesSVG.git /tmp/aircraft-shapes")
-        sys.exit(1)
 
-    aircraft_map = load_aircraft()
-    print(f"Found {len(aircraft_map)} unique aircraft")
+def sprite_id(filename):
+    """Symbol id for a silhouette file — prefixed, since ids may not start with a digit."""
+    return "ac-" + Path(filename).stem
 
-    # Build processing list
+
+_library_cache = {}   # filename -> ((mtime_ns, size), SvgShape); reused across watch-mode passes
+_lod_cache = {}       # filename -> (SvgShape, shapes, lod) for the parse above
+_symbol_cache = {}    # filename -> (SvgShape, <symbol> line) for the parse above
+_geometry_cache = {}  # shape id -> quantized rings, kept by asset_geometry.encode()
+
+
+def load_library(manifest):
+    """{filename: SvgShape} for every distinct silhouette file on disk, sorted."""
+    shapes = {}
+    for filename in sorted({entry["filename"] for entry in manifest.values()}):
+        path = OUTPUT_DIR / filename
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        key = (st.st_mtime_ns, st.st_size)
+        cached = _library_cache.get(filename)
+        if cached is None or cached[0] != key:
+            cached = _library_cache[filename] = (key, asset_svg.read_svg(path.read_text(encoding="utf-8")))
+        shapes[filename] = cached[1]
+    return shapes
+
+
+def geometry_shapes(library):
+    """asset_geometry.lod_shapes() over the library, simplifying only files parsed anew."""
+    shapes, lod = {}, {}
+    for filename, shape in library.items():
+        cached = _lod_cache.get(filename)
+        if cached is None or cached[0] is not shape:
+            cached = _lod_cache[filename] = (
+                shape, *asset_geometry.lod_shapes({Path(filename).stem: shape.polylines()}))
+        shapes.update(cached[1])
+        lod.update(cached[2])
+    return shapes, lod
+
+
+def build_sprite(library):
+    """
+    One <svg> holding every silhouette file as a <symbol>, each with its viewBox
+    tightened to the path bounds (same 0.5-unit pad the parking page applies),
+    so the client loads the library in one request and skips the DOM getBBox pass.
+    """
+    symbols = []
+    for filename, shape in library.items():
+        cached = _symbol_cache.get(filename)
+        if cached is None or cached[0] is not shape:
+            viewbox = asset_svg.tight_viewbox(shape.polylines()) or shape.viewbox
+            elements = "".join(
+                "<path" + "".join(f' {k}="{html.escape(v)}"' for k, v in el["attrs"].items())
+                + f' d="{html.escape(el["d"])}"/>'
+                for el in shape.elements
+            )
+            vb = " ".join(asset_svg.fmt(v) for v in viewbox)
+            cached = _symbol_cache[filename] = (
+                shape, f'  <symbol id="{sprite_id(filename)}" viewBox="{vb}">{elements}</symbol>')
+        symbols.append(cached[1])
+    return ('<svg xmlns="http://www.w3.org/2000/svg" style="display:none">\n'
+            + "\n".join(symbols) + "\n</svg>\n")
+
+
+def map_shapes(aircraft_map, warn=True):
+    """Split the catalogue into (mapped, unmapped) by SHAPE_MAP and shape files on disk."""
     mapped = []
     unmapped = []
     for base in sorted(aircraft_map.keys()):
@@ -290,71 +369,482 @@ def main():
             if shape_file.exists():
                 mapped.append((base, info, shape_file))
             else:
-                print(f"[WARN] Shape file missing: {SHAPE_MAP[base]}.svg for {base}")
+                if warn:
+                    print(f"[WARN] Shape file missing: {SHAPE_MAP[base]}.svg for {base}")
                 unmapped.append((base, info))
         else:
             unmapped.append((base, info))
+    return mapped, unmapped
 
-    print(f"Mapped: {len(mapped)}, Unmapped: {len(unmapped)}")
 
-    if args.dry_run:
-        print("\n-- MAPPED --")
-        for base, info, shape_file in mapped:
-            print(f"  {base:30s} <- {info['display_name']:40s} -> {shape_file.name}")
-        print(f"\n-- UNMAPPED ({len(unmapped)}) --")
-        for base, info in unmapped:
-            print(f"  {base:30s} <- {info['display_name']}")
-        return
+def needs_conversion(base, manifest, shape_file, force=None):
+    """
+    --force picks exactly one base; otherwise any base missing from the manifest
+    or disk, or not yet pointing at its shape's canonical file, needs work.
+    """
+    if force:
+        return force == base
+    entry = manifest.get(base)
+    return (entry is None or entry["filename"] != shape_filename(shape_file)
+            or not (OUTPUT_DIR / entry["filename"]).exists())
 
-    # Process mapped aircraft
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+def stale_bases(manifest, aircraft_map):
+    """Manifest entries whose base aircraft left the catalogue (hand-added entries stay)."""
+    return [base for base in manifest if base not in aircraft_map]
+
+
+def plan(args):
+    """Offline: compare catalogue + SHAPE_MAP with the manifest and SVGs on disk."""
+    result = Plan(f"aircraft silhouettes ({OUTPUT_DIR})")
+    aircraft_map = load_aircraft()
     manifest = load_manifest()
+    mapped, unmapped = map_shapes(aircraft_map, warn=False)
 
-    processed = 0
+    desired = set()
     for base, info, shape_file in mapped:
-        if args.force and args.force != base:
-            continue
-        if not args.force and base in manifest:
+        filename = shape_filename(shape_file)
+        if not needs_conversion(base, manifest, shape_file, args.force):
+            result.add("keep", base, filename)
+        elif filename in desired or (not args.force and (OUTPUT_DIR / filename).exists()):
+            result.add("copy", base, f"alias of {filename}")
+        else:
+            result.add("convert", base, f"{shape_file.name} -> {filename}")
+        desired.add(filename)
+
+    for base, info in unmapped:
+        if base in manifest:
+            desired.add(manifest[base]["filename"])
+            result.add("keep", base, f"{manifest[base]['filename']} (not regenerated)")
+
+    for base in stale_bases(manifest, aircraft_map):
+        result.add("drop", base, manifest[base]["filename"])
+
+    for rel in sorted(files_under(OUTPUT_DIR, [""], {".svg"}) - desired - {SPRITE_FILENAME}):
+        result.add("orphan", rel)
+
+    if not SHAPES_DIR.exists():
+        result.note(f"Shapes repo not found at {SHAPES_DIR}; every mapped aircraft is blocked.")
+    missing_shapes = [base for base, _ in unmapped if base in SHAPE_MAP]
+    if missing_shapes and SHAPES_DIR.exists():
+        result.note(f"Shape file missing for: {', '.join(missing_shapes)}")
+    unmapped_new = [base for base, _ in unmapped if base not in SHAPE_MAP and base not in manifest]
+    if unmapped_new:
+        result.note(f"{len(unmapped_new)} aircraft have no SHAPE_MAP entry (see --dry-run).")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build aircraft silhouette library")
+    parser.add_argument("command", nargs="?", choices=["run", "plan", "merge"], default="run",
+                        help="run (default) converts; plan prints the work set offline; "
+                             "merge combines --shard partial manifests")
+    parser.add_argument("--dry-run", action="store_true", help="List mappings without copying")
+    parser.add_argument("--force", type=str, help="Force re-process a specific base name")
+    parser.add_argument("--sprite", action="store_true",
+                        help=f"Also write {SPRITE_FILENAME} with every silhouette as a <symbol> "
+                             "(kept up to date on later runs once it exists)")
+    parser.add_argument("--update-masks", action="store_true",
+                        help="Accept changed silhouettes as the new raster QA baseline")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the run, keep polling the shapes repo, catalogue JSON and SHAPE_MAP "
+                             "and regenerate only what a change affects")
+    parser.add_argument("--watch-interval", type=float, default=0.5, help="Watch poll interval in seconds")
+    parser.add_argument("--watch-settle", type=float, default=5.0,
+                        help="Seconds without changes before watch mode rewrites the precache "
+                             "section and compressed siblings (also done on exit)")
+    parser.add_argument("--verbose", action="store_true", help="plan: also list unchanged entries")
+    asset_metrics.add_cli_options(parser)
+    asset_shard.add_cli_options(parser)
+    args = parser.parse_args()
+    if args.shard and args.watch:
+        parser.error("--watch cannot be combined with --shard")
+
+    if args.command == "plan":
+        plan(args).print(show_keep=args.verbose)
+        return
+
+    global catalogue_db
+    with asset_metrics.session("generate_aircraft_silhouettes", args):
+        if not args.shard:
+            catalogue_db = asset_catalogue.Catalogue()
+        if args.command == "merge":
+            merge(args)
+        else:
+            run(args)
+
+
+def convert_entries(mapped, manifest, only=None):
+    """
+    Convert or alias the mapped bases that need it and update their manifest
+    entries; returns (processed, aliased). With `only` (--force, watch mode)
+    exactly those bases are processed and their shape files rewritten.
+
+    One file per source shape: the first base needing it converts the shape,
+    every other base is a manifest alias of that file.
+    """
+    processed = aliased = 0
+    written = set()
+    for base, info, shape_file in mapped:
+        convert = base in only if only is not None else needs_conversion(base, manifest, shape_file)
+        if only is None:
+            metrics.cache("manifest", hit=not convert)
+        if not convert:
             continue
 
-        filename = sanitize_filename(base) + ".svg"
+        filename = shape_filename(shape_file)
         output_path = OUTPUT_DIR / filename
+        entry = {
+            "base_name": base,
+            "display_name": info["display_name"],
+            "category": info["category"],
+            "filename": filename,
+            "path": f"/aircraft_silhouettes/{filename}",
+            "source_shape": shape_file.name,
+        }
+        if filename in written or (only is None and output_path.exists()):
+            manifest[base] = entry
+            aliased += 1
+            metrics.event("entry", name=base, status="alias", shape=shape_file.name)
+            if catalogue_db is not None:
+                catalogue_db.attempt(base, "alias", "shapes", shape_file.name)
+            print(f"  [ALIAS] {base:17s} -> {filename}")
+            continue
 
         # Read source SVG
-        with open(shape_file, 'r', encoding='utf-8') as f:
+        with metrics.stage("read_svg"), open(shape_file, 'r', encoding='utf-8') as f:
             svg_content = f.read()
 
         # Convert to solid black fill
-        filled_svg = convert_to_filled_silhouette(svg_content, title=info["display_name"])
+        with metrics.stage("convert"):
+            filled_svg = convert_to_filled_silhouette(svg_content, title=shape_file.stem)
 
         # Write output
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with metrics.stage("write_svg"), open(output_path, 'w', encoding='utf-8') as f:
             f.write(filled_svg)
 
-        size_kb = len(filled_svg.encode('utf-8')) / 1024
+        size_bytes = len(filled_svg.encode('utf-8'))
+        metrics.count("svg_bytes", size_bytes)
+        metrics.event("entry", name=base, status="ok", shape=shape_file.name, bytes=size_bytes)
+        if catalogue_db is not None:
+            catalogue_db.attempt(base, "ok", "shapes", shape_file.name)
+        size_kb = size_bytes / 1024
         print(f"  [OK] {base:20s} -> {filename} ({size_kb:.0f} KB)")
 
-        manifest[base] = {
-            "base_name": base,
-            "display_name": info["display_name"],
-            "category": info["category"],
-            "filename": filename,
-            "path": f"/aircraft_silhouettes/{filename}",
-            "source_shape": shape_file.name,
-        }
+        manifest[base] = entry
+        written.add(filename)
         processed += 1
+    return processed, aliased
 
-    save_manifest(manifest)
 
-    print(f"\n-- Results --")
-    print(f"  Processed: {processed}")
-    print(f"  Total in manifest: {len(manifest)}")
+def finish(args, manifest, previous_files, aircraft_map, drop=True, qa_bases=None, publish=True):
+    """
+    Everything after conversion: drops, cleanup, raster QA, sprite, geometry,
+    catalogue commit, manifest/runtime writes, then publish(). `qa_bases` limits the
+    raster check to those bases and publish=False leaves publish() to the caller
+    (watch mode). Returns the figures run() prints.
+    """
+    dropped = stale_bases(manifest, aircraft_map) if drop else []
+    for base in dropped:
+        entry = manifest.pop(base)
+        print(f"  [DROP] {base:20s} -> {entry['filename']} (no longer in catalogue)")
+
+    # Files no entry points at any more: dropped bases, per-base files replaced by a shape file
+    superseded = sorted(previous_files - {entry["filename"] for entry in manifest.values()})
+    for filename in superseded:
+        for name in (filename, filename + ".gz", filename + ".br"):   # and asset_compress siblings
+            (OUTPUT_DIR / name).unlink(missing_ok=True)
+    if superseded:
+        print(f"  [CLEAN] removed {len(superseded)} superseded file(s)")
+
+    with metrics.stage("read_svg"):
+        library = load_library(manifest)
+
+    # Raster QA: silhouettes vs the committed mask baseline
+    with metrics.stage("raster_qa"):
+        masks = asset_raster.render_library(
+            {base: OUTPUT_DIR / entry["filename"] for base, entry in manifest.items()
+             if entry["filename"] in library and (qa_bases is None or base in qa_bases)})
+        baseline = asset_raster.load_baseline()
+        qa = asset_raster.check(masks, {k: v for k, v in baseline.items() if k in masks or k not in manifest})
+        updated = {k: v for k, v in baseline.items() if k in manifest}
+        updated.update(masks if args.update_masks else {k: masks[k] for k in qa["added"]})
+        if updated.keys() != baseline.keys() or args.update_masks:
+            asset_raster.save_baseline(updated)
+    metrics.count("mask_regressions", len(qa["changed"]))
+
+    sprite_path = OUTPUT_DIR / SPRITE_FILENAME
+    sprite = None
+    if args.sprite or sprite_path.exists():
+        with metrics.stage("sprite"):
+            sprite = build_sprite(library)
+            sprite_path.write_text(sprite, encoding="utf-8")
+        for entry in manifest.values():
+            entry["sprite_id"] = sprite_id(entry["filename"])
+
+    # Quantized geometry (full outline + LOD tiers) for canvas/WebGL rendering,
+    # verified before it is written. Shapes whose files were not parsed anew
+    # keep their quantized rings, so a watch pass re-encodes and checks only those.
+    geometry_path = OUTPUT_DIR / GEOMETRY_FILENAME
+    with metrics.stage("geometry"):
+        shapes, lod = geometry_shapes(library)
+        fresh = {i for i, lines in shapes.items() if _geometry_cache.get(i, (None,))[0] is not lines}
+        blob = asset_geometry.encode(shapes, cache=_geometry_cache)
+        asset_geometry.verify(blob, shapes, only=fresh)
+        geometry_path.write_bytes(blob)
+    for entry in manifest.values():
+        entry["lod"] = lod[Path(entry["filename"]).stem]
+
+    with metrics.stage("catalogue"):
+        catalogue = save_manifest(manifest, unmapped_records(aircraft_map, manifest))
+    with metrics.stage("write_manifest"):
+        runtime = asset_runtime.write_runtime(OUTPUT_DIR, manifest, strip_category=False)
+        bundle = build_aircraft_bundle.write_bundle(OUTPUT_DIR.parent)
+    result = {
+        "dropped": dropped,
+        "sprite": sprite,
+        "geometry": (blob, library),
+        "lod": lod,
+        "qa": qa,
+        "catalogue": catalogue,
+        "runtime": runtime,
+        "bundle": bundle,
+    }
+    if publish:
+        result.update(publish_outputs(manifest, bundle))
+    return result
+
+
+def publish_outputs(manifest, bundle):
+    """The precache section and the .gz/.br siblings, over every file the manifest lists."""
+    with metrics.stage("precache"):
+        precache = asset_precache.write_section(
+            OUTPUT_DIR, [*(e["filename"] for e in manifest.values()), SPRITE_FILENAME, GEOMETRY_FILENAME], "core")
+    compression = asset_compress.finalize(
+        [*(OUTPUT_DIR / e["filename"] for e in manifest.values()),
+         OUTPUT_DIR / SPRITE_FILENAME, OUTPUT_DIR / GEOMETRY_FILENAME,
+         *asset_compress.section_outputs(OUTPUT_DIR, MANIFEST_PATH), *([bundle] if bundle else [])])
+    return {"precache": precache, "compression": compression}
+
+
+def run(args):
+    # Check shapes repo
+    if not SHAPES_DIR.exists():
+        print("[ERROR] Shapes repo not found. Run:")
+        print("  git clone https://github.com/RexKramer1/AircraftShapesSVG.git /tmp/aircraft-shapes")
+        sys.exit(1)
+
+    with metrics.stage("load_catalogue"):
+        aircraft_map = load_aircraft()
+    print(f"Found {len(aircraft_map)} unique aircraft")
+
+    # Build processing list
+    mapped, unmapped = map_shapes(aircraft_map)
+    catalogue = [base for base, _, _ in mapped]
+    if args.shard:
+        # By source shape, so a shape and all its aliases land in one shard
+        mapped = [m for m in mapped if args.shard.owns(m[2].stem)]
+        print(f"Shard {args.shard}: {len(mapped)} of {len(catalogue)} mapped aircraft")
+
+    print(f"Mapped: {len(mapped)}, Unmapped: {len(unmapped)}")
+
+    if args.dry_run:
+        print("\n-- MAPPED --")
+        for base, info, shape_file in mapped:
+            print(f"  {base:30s} <- {info['display_name']:40s} -> {shape_file.name}")
+        print(f"\n-- UNMAPPED ({len(unmapped)}) --")
+        for base, info in unmapped:
+            print(f"  {base:30s} <- {info['display_name']}")
+        return
+
+    # Process mapped aircraft
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest()
+    previous_files = {entry["filename"] for entry in manifest.values()}
+    before = dict(manifest)
+    processed, aliased = convert_entries(mapped, manifest, only={args.force} if args.force else None)
+    if args.shard:
+        # Library-wide outputs (sprite, geometry, raster QA, runtime, precache) wait for merge
+        touched = {base: entry for base, entry in manifest.items() if entry is not before.get(base)}
+        partial = asset_shard.write_partial(MANIFEST_PATH, args.shard, catalogue, touched)
+        print(f"\n-- Results (shard {args.shard}) --")
+        print(f"  Processed: {processed}")
+        print(f"  Aliased: {aliased}")
+        print(f"  Partial manifest: {partial} (combine with the merge command)")
+        return
+    result = finish(args, manifest, previous_files, aircraft_map, drop=not args.force)
+    print_results(args, manifest, result, processed, aliased)
 
     if unmapped:
         print(f"\n-- Missing ({len(unmapped)}) --")
         for base, info in unmapped:
             print(f"  - {base} ({info['display_name']})")
 
+    if args.watch:
+        watch(args, aircraft_map, manifest)
+
+
+def merge(args):
+    """Apply the --shard partial manifests in catalogue order, then build the library outputs once."""
+    aircraft_map = load_aircraft()
+    mapped, _ = map_shapes(aircraft_map, warn=False)
+    shapes = {base: shape_file.stem for base, _, shape_file in mapped}
+    try:
+        entries, _, partials = asset_shard.merge(MANIFEST_PATH, list(shapes), shard_key=shapes.__getitem__)
+    except ValueError as e:
+        print(f"[ERROR] Cannot merge: {e}")
+        sys.exit(1)
+
+    manifest = load_manifest()
+    previous_files = {entry["filename"] for entry in manifest.values()}
+    manifest.update(entries)
+    result = finish(args, manifest, previous_files, aircraft_map)
+    for path in partials:
+        path.unlink()
+    print(f"Merged {len(partials)} shards: {len(entries)} updated entries")
+    print_results(args, manifest, result, None, 0)
+
+
+def print_results(args, manifest, result, processed, aliased):
+    blob, library = result["geometry"]
+    geometry_sizes = asset_geometry.size_report(blob, [OUTPUT_DIR / f for f in library])
+    qa = result["qa"]
+    print(f"\n-- Results --")
+    if processed is not None:
+        print(f"  Processed: {processed}")
+    if aliased:
+        print(f"  Aliased: {aliased}")
+    if result["dropped"]:
+        print(f"  Dropped: {len(result['dropped'])}")
+    print(f"  Total in manifest: {len(manifest)} ({len({e['filename'] for e in manifest.values()})} files)")
+    if result["sprite"]:
+        print(f"  Sprite: {SPRITE_FILENAME} ({len(result['sprite'].encode('utf-8')) / 1024:.0f} KB, "
+              f"{result['sprite'].count('<symbol')} symbols)")
+    print(f"  Geometry: {GEOMETRY_FILENAME} {asset_geometry.describe(geometry_sizes)}, round trip OK")
+    print(f"  LOD: {asset_geometry.describe_lod(result['lod'])}")
+    print(f"  Raster QA: {asset_raster.describe(qa)}"
+          + (" (baseline updated)" if args.update_masks else ""))
+    print_mask_warnings(args, qa)
+    print(f"  Catalogue: {asset_catalogue.describe(result['catalogue'])}")
+    print(f"  Runtime: {asset_runtime.describe(result['runtime'])}")
+    if result["bundle"]:
+        print(f"  Aircraft bundle: {result['bundle'].name} ({result['bundle'].stat().st_size / 1024:.1f} KB)")
+    print(f"  Precache: {asset_precache.describe(result['precache'])}")
+
+    asset_compress.print_report(result["compression"])
+
+
+def print_mask_warnings(args, qa):
+    for base, iou, diff in qa["changed"]:
+        print(f"    [WARN] {base:20s} mask changed: IoU {iou:.4f}, {diff} px"
+              + ("" if args.update_masks else " (check it, then --update-masks)"))
+
+
+# ── Watch mode ──────────────────────────────────────────────────────
+
+
+def load_shape_map(path=None):
+    """SHAPE_MAP as currently written in this file, read with ast (nothing is executed)."""
+    tree = ast.parse(Path(path or SCRIPT_PATH).read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "SHAPE_MAP" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError("SHAPE_MAP not found")
+
+
+def source_snapshot():
+    """{path: (mtime_ns, size)} for the catalogue JSON, this file and SHAPES_DIR/*.svg."""
+    snapshot = {}
+    for path in (MILITARY_JSON, COMMERCIAL_JSON, SCRIPT_PATH):
+        try:
+            st = path.stat()
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+    try:
+        with os.scandir(SHAPES_DIR) as it:
+            for e in it:
+                if e.name.endswith(".svg") and e.is_file():
+                    st = e.stat()
+                    snapshot[SHAPES_DIR / e.name] = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        pass
+    return snapshot
+
+
+def watch(args, aircraft_map, manifest):
+    """
+    Poll the sources and regenerate only the bases a change touches, keeping
+    the catalogue, SHAPE_MAP and manifest in memory between changes. Sprite
+    symbols and geometry are redone only for files parsed anew; the precache
+    section and compression wait until --watch-settle seconds pass without a
+    change, or the watch stops.
+    """
+    global SHAPE_MAP
+    state = source_snapshot()
+    owed, bundle, settle_at = False, None, 0.0   # publish_outputs() after the last pass
+    print(f"\nWatching {SHAPES_DIR}, {MILITARY_JSON.name}, {COMMERCIAL_JSON.name} and SHAPE_MAP "
+          f"every {args.watch_interval:g}s (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(args.watch_interval)
+            current = source_snapshot()
+            changed = {p for p in current.keys() | state.keys() if current.get(p) != state.get(p)}
+            if not changed:
+                if owed and time.monotonic() >= settle_at:
+                    print_published(publish_outputs(manifest, bundle))
+                    owed = False
+                continue
+            state = current
+            started = time.perf_counter()
+
+            previous_map = SHAPE_MAP
+            affected, sources = set(), []
+            if changed & {MILITARY_JSON, COMMERCIAL_JSON}:
+                fresh = load_aircraft()
+                affected |= {b for b in fresh.keys() | aircraft_map.keys() if fresh.get(b) != aircraft_map.get(b)}
+                aircraft_map = fresh
+                sources.append("catalogue")
+            if SCRIPT_PATH in changed:
+                try:
+                    fresh = load_shape_map()
+                except (SyntaxError, ValueError) as e:
+                    print(f"[WARN] SHAPE_MAP not readable, keeping the previous one: {e}")
+                else:
+                    affected |= {b for b in fresh.keys() | SHAPE_MAP.keys() if fresh.get(b) != SHAPE_MAP.get(b)}
+                    SHAPE_MAP = fresh
+                    sources.append("SHAPE_MAP")
+            shape_names = {p.stem for p in changed if p.parent == SHAPES_DIR}
+            if shape_names:
+                affected |= {b for b, shape in SHAPE_MAP.items() if shape in shape_names}
+                sources.append(f"{len(shape_names)} shape file(s)")
+            if not affected:
+                continue
+
+            mapped, _ = map_shapes(aircraft_map)
+            previous_files = {entry["filename"] for entry in manifest.values()}
+            # Bases that lost their shape (SHAPE_MAP key removed, shape file deleted):
+            # their entries go, and finish() removes the file once no alias is left on it
+            unmapped = sorted((affected & previous_map.keys() & manifest.keys()) - {b for b, _, _ in mapped})
+            for base in unmapped:
+                entry = manifest.pop(base)
+                print(f"  [DROP] {base:20s} -> {entry['filename']} (no longer mapped to a shape)")
+            processed, aliased = convert_entries(mapped, manifest, only=affected)
+            result = finish(args, manifest, previous_files, aircraft_map, qa_bases=affected, publish=False)
+            owed, bundle, settle_at = True, result["bundle"], time.monotonic() + args.watch_settle
+            print(f"[WATCH] {', '.join(sources)}: {len(affected)} base(s) affected, {processed} converted, "
+                  f"{aliased} aliased, {len(result['dropped']) + len(unmapped)} dropped, raster QA "
+                  f"{len(result['qa']['changed'])} changed — {(time.perf_counter() - started) * 1000:.0f} ms")
+            print_mask_warnings(args, result["qa"])
+    except KeyboardInterrupt:
+        if owed:
+            print_published(publish_outputs(manifest, bundle))
+        print("\nWatch stopped")
+
+
+def print_published(published):
+    print(f"[WATCH] Precache: {asset_precache.describe(published['precache'])}")
+    asset_compress.print_report(published["compression"])
 
 if __name__ == "__main__":
     main()
@@ -1,37 +1,88 @@
 #!/usr/bin/env python3
 """
-Aircraft Image Scraper — Wikimedia Commons API
-================================================
+Aircraft Image Scraper — Wikidata / Wikimedia Commons API
+==========================================================
 Fetches representative images for 211 aircraft from Wikimedia Commons.
 Designed to run via Claude Code or standalone Python 3.10+.
 
 Usage:
     python3 scrape_aircraft_images.py [--dry-run] [--output-dir ./aircraft_images] [--delay 1.5]
+    python3 scrape_aircraft_images.py --workers 4
+    python3 scrape_aircraft_images.py --failure-ttl 30 | --retry-failures
+    python3 scrape_aircraft_images.py --incremental        # keep entries whose image is on disk
+    python3 scrape_aircraft_images.py plan [--incremental]  # offline: print the work set, no network
+    python3 scrape_aircraft_images.py --shard 2/4          # one slice; writes image_manifest.shard-2-of-4.json
+    python3 scrape_aircraft_images.py --budget 20m,400req  # missing first, by priority; stop cleanly when spent
+    python3 scrape_aircraft_images.py --incremental --stale-days 180   # also refresh images older than that
+    python3 scrape_aircraft_images.py merge                # partials -> the outputs below
+    python3 asset_catalogue.py needs-work --stale-days 90  # query the run history (see asset_catalogue.py)
+    python3 asset_verify.py [--prune]                      # files vs manifests vs precache hashes; orphans
+    python3 asset_crop.py                                  # subject-aware 16:9 card / 1:1 thumb crops
+    python3 scrape_aircraft_images.py --metrics-log run.jsonl --profile --trace-memory
 
 Outputs:
     - ./aircraft_images/commercial/  — Commercial aircraft images
     - ./aircraft_images/military/    — Military aircraft images
-    - ./aircraft_images/image_manifest.json — Maps aircraft → image path + metadata
+    - scripts/.cache/asset_catalogue.sqlite3 — "aircraft_images" section: entries, files, fetch attempts
+    - ./aircraft_images/image_manifest.json — Maps aircraft → image path + metadata (catalogue export)
     - ./aircraft_images/failures.json — Aircraft that couldn't be matched (for manual review)
+    - ./aircraft_images/failure_cache.json — Queries that found nothing, skipped until --failure-ttl expires
+    - ./runtime/aircraft_images.{military,commercial,attribution}.json — compact client maps
+    - ./runtime/aircraft_bundle.json — characteristics + photo + silhouette columns (build_aircraft_bundle.py)
+    - ./asset_precache_manifest.json — "aircraft_images" section: URL, sha256, bytes, tier per image
+    - *.gz / *.br siblings of the JSON outputs above (brotli only if installed)
 
 Notes:
     - Wikimedia Commons images are typically CC BY-SA or public domain
     - U.S. military photos are public domain (USGov works)
     - The script respects Wikimedia API etiquette (User-Agent, rate limiting)
+    - Wikidata comes first (asset_wikidata.py): one bulk pass maps each aircraft's first query
+      to its item and reads the curated P18 image, ~3 requests per 50 aircraft; Commons search
+      and the Wikipedia article are the fallbacks
     - Deduplication groups are built in — visually identical variants share images
+    - Every aircraft, or dedup group, is a job in a staged pipeline (asset_pipeline.py):
+      resolve -> probe -> fetch -> process -> commit. Lookups and downloads run on I/O threads
+      (--workers N per stage), validation in a process pool, and a single committer writes the
+      images and the manifest. A dedup group's members are tried in order within one job
+    - Requests are paced per host, --delay apart however many --workers, instead of by a
+      sleep after every lookup (asset_schedule.py)
+    - Downloads are validated before they are saved (asset_image.py): the extension comes
+      from the file's magic bytes, and a truncated, tiny, blank or skewed image moves on
+      to the next search result
 """
 
 import json
 import os
 import re
+import shutil
 import sys
+import threading
 import time
 import urllib.request
 import urllib.parse
 import urllib.error
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
+from asset_metrics import metrics
+from asset_negcache import NegativeCache, fingerprint
+import asset_catalogue
+import asset_compress
+import asset_crop
+import asset_image
+import asset_metrics
+import asset_negcache
+import asset_pipeline
+import asset_precache
+import asset_runtime
+import asset_schedule
+import asset_shard
+import asset_verify
+import asset_wikidata
+import build_aircraft_bundle
+from asset_plan import Plan, files_under
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -41,6 +92,12 @@ DRY_RUN = False       # Set True to skip downloads, just test search queries
 USER_AGENT = "AOMS-AircraftImageScraper/1.0 (Airfield Operations Management Suite; contact: csproctor88@gmail.com)"
 MAX_IMAGE_WIDTH = 1280  # Request thumbnail at this max width (pixels)
 PREFERRED_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+FAILURE_TTL_DAYS = asset_negcache.DEFAULT_TTL_DAYS
+RETRY_FAILURES = False  # Set True to ignore failure_cache.json for one run
+INCREMENTAL = False     # Set True to keep manifest entries whose image file exists
+SHARD = None            # asset_shard.Shard: process only this slice of AIRCRAFT_DATABASE
+BUDGET = None           # asset_schedule.Budget: priority order, stop starting work once spent
+STALE_DAYS = None       # with INCREMENTAL: refetch kept entries older than this (asset catalogue)
 
 # Wikimedia API endpoints
 COMMONS_API = "https://commons.wikimedia.org/w/api.php"
@@ -334,8 +391,17 @@ AIRCRAFT_DATABASE = [
 # API Helper Functions
 # ---------------------------------------------------------------------------
 
+_api_state = threading.local()
+
+
+def last_api_call_failed() -> bool:
+    """True if this thread's most recent api_request() errored (vs. returned no hits)."""
+    return getattr(_api_state, "failed", False)
+
+
 def api_request(url: str, params: dict) -> Optional[dict]:
     """Make a GET request to a MediaWiki API endpoint."""
+    _api_state.failed = False
     params["format"] = "json"
     query_string = urllib.parse.urlencode(params)
     full_url = f"{url}?{query_string}"
@@ -344,7 +410,9 @@ def api_request(url: str, params: dict) -> Optional[dict]:
         with urllib.request.urlopen(req, timeout=15) as resp:
             return json.loads(resp.read().decode("utf-8"))
     except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError) as e:
-        print(f"    API error: {e}")
+        log(f"    API error: {e}")
+        metrics.count("api_errors")
+        _api_state.failed = True
         return None
 
 
@@ -363,7 +431,8 @@ def search_commons_images(query: str, limit: int = 5) -> list[dict]:
         "iiprop": "url|size|mime|extmetadata",
         "iiurlwidth": str(MAX_IMAGE_WIDTH),
     }
-    data = api_request(COMMONS_API, params)
+    with metrics.stage("commons_search"):
+        data = api_request(COMMONS_API, params)
     if not data or "query" not in data:
         return []
 
@@ -425,7 +494,8 @@ def try_wikipedia_image(query: str) -> Optional[dict]:
         "piprop": "original|name",
         "pilimit": "1",
     }
-    data = api_request(WIKIPEDIA_API, params)
+    with metrics.stage("wikipedia_lookup"):
+        data = api_request(WIKIPEDIA_API, params)
     if not data or "query" not in data:
         return None
 
@@ -447,19 +517,9 @@ def try_wikipedia_image(query: str) -> Optional[dict]:
     return None
 
 
-def download_image(url: str, filepath: Path) -> bool:
-    """Download an image from URL to local file."""
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            data = resp.read()
-            filepath.parent.mkdir(parents=True, exist_ok=True)
-            with open(filepath, "wb") as f:
-                f.write(data)
-            return True
-    except Exception as e:
-        print(f"    Download failed: {e}")
-        return False
+def guess_extension(url: str) -> str:
+    """Extension from the URL alone (dry runs, which download nothing to sniff)."""
+    return ".png" if ".png" in url.lower() else ".jpg"
 
 
 def sanitize_filename(name: str) -> str:
@@ -477,167 +537,368 @@ def sanitize_filename(name: str) -> str:
 # Main Scraper Logic
 # ---------------------------------------------------------------------------
 
-def scrape_all():
+negative_cache: Optional[NegativeCache] = None  # set by scrape_all()
+catalogue_db: Optional[asset_catalogue.Catalogue] = None  # set by scrape_all() / merge_all()
+schedule: Optional[asset_schedule.Schedule] = None  # set by scrape_all(): per-host pacing and the --budget
+wikidata: Optional[asset_wikidata.Resolver] = None  # set by scrape_all()
+earlier_failures: dict = {}  # aircraft -> failure record from the last run, kept for deferred aircraft
+
+
+def log(message: str = ""):
+    """print(), or append to the log of the pipeline job this thread is working on."""
+    asset_pipeline.log(message)
+
+
+def record_attempt(aircraft_name: str, status: str, source: Optional[str] = None, query: Optional[str] = None):
+    if catalogue_db is not None and not DRY_RUN:
+        catalogue_db.attempt(aircraft_name, status, source, query)
+
+
+def api_lookup(fn, query: str) -> list[dict]:
+    """
+    search_commons_images() or try_wikipedia_image() as a pipeline lookup. An
+    errored API call raises, so it is retried next run instead of cached as a miss.
+    """
+    result = fn(query)
+    failed = last_api_call_failed()
+    asset_schedule.pace(DELAY_SECONDS)
+    if failed:
+        raise ConnectionError("API request failed")
+    if isinstance(result, list):
+        return result
+    return [result] if result else []
+
+
+def entry_lookups(aircraft_name: str, queries: list[str], job: asset_pipeline.Job) -> list[asset_pipeline.Lookup]:
+    """
+    Every lookup for one aircraft, in the order the pipeline tries them:
+    Wikidata's image (the curated P18, then the P373 category; prefetched in
+    bulk), each Commons search query, then the Wikipedia article. Cached
+    misses are left out and noted in the job's log.
+    """
+    negative_cache.begin(aircraft_name, fingerprint(queries))
+    title = queries[0]
+    lookups = []
+    if wikidata is not None and wikidata.known(title):
+        lookups.append(("wikidata", title, partial(wikidata.candidates, title)))
+    lookups += [("commons", q, partial(api_lookup, search_commons_images, q)) for q in queries]
+    lookups.append(("wikipedia", title, partial(api_lookup, try_wikipedia_image, title)))
+
+    open_lookups = []
+    for source, q, find in lookups:
+        if negative_cache.skip(aircraft_name, source, q):
+            job.log.append(f"    [cached miss] {source}: '{q}'")
+        else:
+            open_lookups.append(asset_pipeline.Lookup(aircraft_name, source, q, find))
+    return open_lookups
+
+
+def record_outcomes(job: asset_pipeline.Job):
+    """Catalogue attempts (and negative cache misses) for every lookup that found nothing."""
+    for lookup, status in job.outcomes:
+        record_attempt(lookup.owner, status, lookup.source, lookup.query)
+        # Only definitive misses — an error is retried next run
+        if status == "miss" and not DRY_RUN:
+            negative_cache.fail(lookup.owner, lookup.source, lookup.query)
+
+
+def saved_entry(job: asset_pipeline.Job, aircraft_name: str, category: str) -> tuple[dict, Path, dict]:
+    """
+    Write the image the pipeline accepted for aircraft_name, named by the
+    extension its bytes declare. Returns (manifest_entry, filepath, dedup_meta).
+    """
+    best, source, q = job.candidate, job.lookup.source, job.lookup.query
+    ext = guess_extension(best["url"]) if DRY_RUN else job.verdict.ext
+    filepath = OUTPUT_DIR / category / f"{sanitize_filename(aircraft_name)}{ext}"
+    if DRY_RUN:
+        log(f"    License: {best.get('license', 'unknown')} | {best.get('width', 0)}x{best.get('height', 0)}")
+    else:
+        with metrics.stage("write_image"):
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            filepath.write_bytes(job.data)
+        metrics.count("image_bytes", len(job.data))
+
+    license_short = best.get("license", "unknown")
+    meta = {
+        "url": best["url"],
+        "desc_url": best.get("desc_url", ""),
+        "license": license_short,
+        "width": best.get("width", 0),
+        "height": best.get("height", 0),
+        "original_aircraft": aircraft_name,
+    }
+    entry = {
+        "filename": f"{category}/{filepath.name}",
+        "source_url": best["url"],
+        "source_page": "Wikipedia" if source == "wikipedia" else best.get("desc_url", ""),
+        "license": license_short,
+        "category": category,
+    }
+    log(f"    -> Saved: {filepath.name} ({license_short}, {source})")
+    metrics.event("entry", name=aircraft_name, status="ok", source=source, query=q)
+    record_attempt(aircraft_name, "ok", source, q)
+    negative_cache.succeed(aircraft_name)
+    return entry, filepath, meta
+
+
+def dedup_entry(aircraft_name: str, category: str, dedup_group: str, src_path: Path, src_meta: dict) -> dict:
+    """Copy a dedup group's image for one aircraft and return its manifest entry."""
+    safe_name = sanitize_filename(aircraft_name)
+    ext = src_path.suffix
+    dest_path = OUTPUT_DIR / category / f"{safe_name}{ext}"
+
+    if not DRY_RUN and src_path.exists():
+        # Copy the file
+        with metrics.stage("dedup_copy"):
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src_path, dest_path)
+
+    log(f"    -> Dedup from group '{dedup_group}' ({src_meta.get('original_aircraft', '')})")
+    metrics.event("entry", name=aircraft_name, status="dedup", group=dedup_group)
+    record_attempt(aircraft_name, "dedup", "group", dedup_group)
+    return {
+        "filename": f"{category}/{safe_name}{ext}",
+        "source_url": src_meta["url"],
+        "source_page": src_meta.get("desc_url", ""),
+        "license": src_meta.get("license", "unknown"),
+        "dedup_from": src_meta.get("original_aircraft", ""),
+        "category": category,
+    }
+
+
+def failure_record(aircraft_name: str, category: str, queries: list[str]) -> dict:
+    log(f"    !! FAILED — no image found")
+    metrics.event("entry", name=aircraft_name, status="failed", queries=queries)
+    return {
+        "aircraft": aircraft_name,
+        "category": category,
+        "queries_tried": queries,
+    }
+
+
+def catalogue() -> list:
+    """
+    AIRCRAFT_DATABASE rows this run processes: all of them, or the --shard
+    slice. Shards split by dedup group so a group's members stay together.
+    """
+    if SHARD is None:
+        return AIRCRAFT_DATABASE
+    return [row for row in AIRCRAFT_DATABASE if SHARD.owns(shard_key(row))]
+
+
+def shard_key(row) -> str:
+    aircraft_name, _, _, dedup_group = row
+    return dedup_group or aircraft_name
+
+
+def load_existing_manifest() -> dict:
+    return asset_catalogue.load_manifest(OUTPUT_DIR, OUTPUT_DIR / "image_manifest.json")
+
+
+def scheduled_rows(existing: dict) -> list:
+    """
+    catalogue() in --budget priority order (asset_schedule.priority): a dedup
+    group is one unit, its members kept together in declaration order, and
+    ranks by the number of rows its fetch fills.
+    """
+    units: dict[str, list] = {}
+    for row in catalogue():
+        units.setdefault(shard_key(row), []).append(row)
+    refreshed = catalogue_db.refreshed(OUTPUT_DIR.name) if catalogue_db else {}
+
+    def key(item):
+        position, members = item
+        missing = any(not on_disk(existing.get(name)) for name, *_ in members)
+        oldest = min(refreshed.get(name, 0.0) for name, *_ in members)
+        return asset_schedule.priority(missing, -len(members), oldest, position)
+
+    return [row for _, members in sorted(enumerate(units.values()), key=key) for row in members]
+
+
+def load_json(path: Path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def on_disk(entry: Optional[dict]) -> bool:
+    return bool(entry) and asset_verify.present(OUTPUT_DIR / entry["filename"])
+
+
+def defer_entry(aircraft_name: str, existing: dict, manifest: dict, failures: list):
+    """The budget ran out before this aircraft: carry over its last entry (image still there) or failure."""
+    if on_disk(existing.get(aircraft_name)):
+        manifest[aircraft_name] = existing[aircraft_name]
+    elif aircraft_name in earlier_failures:
+        failures.append(earlier_failures[aircraft_name])
+    schedule.defer()
+
+
+def kept_entries(existing: dict) -> dict:
+    """
+    Incremental mode: catalogue entries whose manifest entry and image file
+    both exist, less those older than --stale-days.
+    """
+    outdated = (asset_schedule.stale(asset_catalogue.refreshed_at(OUTPUT_DIR.name), STALE_DAYS)
+                if STALE_DAYS is not None else set())
+    return {aircraft_name: existing[aircraft_name] for aircraft_name, *_ in catalogue()
+            if on_disk(existing.get(aircraft_name)) and aircraft_name not in outdated}
+
+
+def kept_group_sources(kept: dict) -> dict:
+    """group -> (image_path, metadata) from the first kept member of each dedup group."""
+    sources = {}
+    for aircraft_name, category, queries, dedup_group in catalogue():
+        if dedup_group and dedup_group not in sources and aircraft_name in kept:
+            entry = kept[aircraft_name]
+            sources[dedup_group] = (OUTPUT_DIR / entry["filename"], {
+                "url": entry["source_url"],
+                "desc_url": entry.get("source_page", ""),
+                "license": entry.get("license", "unknown"),
+                "original_aircraft": entry.get("dedup_from") or aircraft_name,
+            })
+    return sources
+
+
+def scrape_pipeline(manifest: dict, failures: list, kept: dict, existing: dict, workers: int) -> int:
+    """
+    Run catalogue() through asset_pipeline, one job per unit: an aircraft, or
+    a dedup group whose members are tried in declaration order until one finds
+    an image that the others copy. With --budget units are submitted in
+    priority order, and one not yet started when the budget is spent is
+    deferred. The committer fills manifest and failures in completion order;
+    scrape_all() sorts them. Returns the number of dedup groups resolved.
+    """
+    rows = scheduled_rows(existing) if BUDGET else catalogue()
+    total = len(rows)
+    units: dict[str, list] = {}
+    for row in rows:
+        units.setdefault(shard_key(row), []).append(row)
+    group_sources = kept_group_sources(kept)  # group_name -> (image_path, metadata)
+
+    def commit(job: asset_pipeline.Job):
+        members = job.payload
+        record_outcomes(job)
+        winner = job.lookup.owner if job.candidate else None
+        for aircraft_name, category, queries, dedup_group in members:
+            if len(members) > 1:
+                log(f"  {aircraft_name}")
+            if aircraft_name in kept:
+                manifest[aircraft_name] = kept[aircraft_name]
+                log(f"    [skip] already downloaded")
+            elif job.deferred:
+                log(f"    [deferred] budget spent")
+                defer_entry(aircraft_name, existing, manifest, failures)
+            elif aircraft_name == winner:
+                entry, filepath, meta = saved_entry(job, aircraft_name, category)
+                manifest[aircraft_name] = entry
+                if dedup_group:
+                    metrics.cache("dedup", hit=False)
+                    group_sources[dedup_group] = (filepath, meta)
+            elif dedup_group in group_sources:
+                metrics.cache("dedup", hit=True)
+                src_path, src_meta = group_sources[dedup_group]
+                manifest[aircraft_name] = dedup_entry(aircraft_name, category, dedup_group, src_path, src_meta)
+            else:
+                # Tried before the winner, or there was none: nothing found for it
+                failures.append(failure_record(aircraft_name, category, queries))
+
+    position = 0
+    with asset_pipeline.Pipeline(commit, USER_AGENT, workers=workers, accept=PREFERRED_EXTENSIONS, dry_run=DRY_RUN,
+                                 exhausted=schedule.exhausted) as pipeline:
+        for key, members in units.items():
+            names = [aircraft_name for aircraft_name, *_ in members]
+            dedup_group = members[0][3]
+            job = asset_pipeline.Job(names[0] if len(members) == 1 else key, payload=members)
+            job.log.append(f"[{position + 1}/{total}] {names[0]}" if len(members) == 1 else
+                           f"[{position + 1}-{position + len(members)}/{total}] group '{key}': {', '.join(names)}")
+            position += len(members)
+            if not (dedup_group and dedup_group in group_sources):
+                for aircraft_name, category, queries, _ in members:
+                    if aircraft_name not in kept:
+                        job.lookups.extend(entry_lookups(aircraft_name, queries, job))
+            pipeline.submit(job)
+    print(f"Pipeline: {pipeline.describe()}")
+
+    return len(group_sources)
+
+
+def scrape_all(workers: int = 1):
     """Main entry point — scrape images for all aircraft."""
+    global negative_cache, catalogue_db, schedule, earlier_failures, wikidata
     manifest = {}
     failures = []
-    dedup_cache = {}  # group_name -> (image_path, metadata)
+    started_at = time.time()
+    negative_cache = NegativeCache(OUTPUT_DIR / "failure_cache.json", FAILURE_TTL_DAYS, RETRY_FAILURES)
+    catalogue_db = asset_catalogue.Catalogue() if SHARD is None else None
+    wikidata = asset_wikidata.Resolver(USER_AGENT, MAX_IMAGE_WIDTH)
 
     # Create output dirs
     (OUTPUT_DIR / "commercial").mkdir(parents=True, exist_ok=True)
     (OUTPUT_DIR / "military").mkdir(parents=True, exist_ok=True)
 
-    total = len(AIRCRAFT_DATABASE)
+    total = len(catalogue())
     print(f"\n{'='*60}")
     print(f"Aircraft Image Scraper — {total} aircraft to process")
     print(f"Output: {OUTPUT_DIR.resolve()}")
     print(f"Dry run: {DRY_RUN}")
+    if workers > 1:
+        print(f"Workers: {workers}")
+    if BUDGET:
+        print(f"Budget: {BUDGET} (missing first, by priority; {DELAY_SECONDS:g}s per host)")
     print(f"{'='*60}\n")
 
-    for idx, (aircraft_name, category, queries, dedup_group) in enumerate(AIRCRAFT_DATABASE, 1):
-        safe_name = sanitize_filename(aircraft_name)
-        print(f"[{idx}/{total}] {aircraft_name}")
-
-        # Check dedup cache first
-        if dedup_group and dedup_group in dedup_cache:
-            src_path, src_meta = dedup_cache[dedup_group]
-            ext = src_path.suffix
-            dest_path = OUTPUT_DIR / category / f"{safe_name}{ext}"
-
-            if not DRY_RUN and src_path.exists():
-                # Copy the file
-                import shutil
-                dest_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(src_path, dest_path)
-
-            manifest[aircraft_name] = {
-                "filename": f"{category}/{safe_name}{ext}",
-                "source_url": src_meta["url"],
-                "source_page": src_meta.get("desc_url", ""),
-                "license": src_meta.get("license", "unknown"),
-                "dedup_from": src_meta.get("original_aircraft", ""),
-                "category": category,
-            }
-            print(f"    -> Dedup from group '{dedup_group}' ({src_meta.get('original_aircraft', '')})")
-            continue
-
-        # Try each search query
-        found = False
-        for q in queries:
-            print(f"    Searching: '{q}'")
-            results = search_commons_images(q, limit=5)
-
-            if results:
-                best = results[0]
-                ext = ".jpg"
-                url_lower = best["url"].lower()
-                if ".png" in url_lower:
-                    ext = ".png"
-                elif ".jpeg" in url_lower:
-                    ext = ".jpg"
-
-                filepath = OUTPUT_DIR / category / f"{safe_name}{ext}"
-
-                if DRY_RUN:
-                    print(f"    [DRY RUN] Would download: {best['url'][:80]}...")
-                    print(f"    License: {best['license']} | {best['width']}x{best['height']}")
-                    success = True
-                else:
-                    success = download_image(best["url"], filepath)
-
-                if success:
-                    meta = {
-                        "url": best["url"],
-                        "desc_url": best.get("desc_url", ""),
-                        "license": best.get("license", "unknown"),
-                        "width": best.get("width", 0),
-                        "height": best.get("height", 0),
-                        "original_aircraft": aircraft_name,
-                    }
-                    manifest[aircraft_name] = {
-                        "filename": f"{category}/{safe_name}{ext}",
-                        "source_url": best["url"],
-                        "source_page": best.get("desc_url", ""),
-                        "license": best.get("license", "unknown"),
-                        "category": category,
-                    }
-                    # Cache for dedup
-                    if dedup_group:
-                        dedup_cache[dedup_group] = (filepath, meta)
-
-                    print(f"    -> Saved: {filepath.name} ({best['license']})")
-                    found = True
-                    break
-
-            time.sleep(DELAY_SECONDS)
-
-        # Fallback: try Wikipedia article image
-        if not found:
-            print(f"    Commons failed, trying Wikipedia fallback...")
-            for q in queries[:1]:
-                wp_result = try_wikipedia_image(q)
-                if wp_result:
-                    ext = ".jpg"
-                    if ".png" in wp_result["url"].lower():
-                        ext = ".png"
-
-                    filepath = OUTPUT_DIR / category / f"{safe_name}{ext}"
-
-                    if DRY_RUN:
-                        print(f"    [DRY RUN] Wikipedia: {wp_result['url'][:80]}...")
-                        success = True
-                    else:
-                        success = download_image(wp_result["url"], filepath)
-
-                    if success:
-                        meta = {
-                            "url": wp_result["url"],
-                            "desc_url": wp_result.get("desc_url", ""),
-                            "license": wp_result.get("license", "see Wikipedia"),
-                            "original_aircraft": aircraft_name,
-                        }
-                        manifest[aircraft_name] = {
-                            "filename": f"{category}/{safe_name}{ext}",
-                            "source_url": wp_result["url"],
-                            "source_page": "Wikipedia",
-                            "license": wp_result.get("license", "see Wikipedia"),
-                            "category": category,
-                        }
-                        if dedup_group:
-                            dedup_cache[dedup_group] = (filepath, meta)
-                        print(f"    -> Wikipedia fallback saved: {filepath.name}")
-                        found = True
-                        break
-
-                time.sleep(DELAY_SECONDS)
-
-        if not found:
-            failures.append({
-                "aircraft": aircraft_name,
-                "category": category,
-                "queries_tried": queries,
-            })
-            print(f"    !! FAILED — no image found")
-
-    # Write manifest
-    manifest_path = OUTPUT_DIR / "image_manifest.json"
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2)
-    print(f"\nManifest written: {manifest_path}")
+    existing = load_existing_manifest() if INCREMENTAL or BUDGET else {}
+    kept = kept_entries(existing) if INCREMENTAL else {}
+    for aircraft_name, *_ in catalogue():
+        metrics.cache("incremental", hit=aircraft_name in kept)
 
-    # Write failures
-    failures_path = OUTPUT_DIR / "failures.json"
-    with open(failures_path, "w") as f:
-        json.dump(failures, f, indent=2)
-    print(f"Failures written: {failures_path}")
+    if BUDGET:
+        earlier_failures = {f_item["aircraft"]: f_item for f_item in load_json(OUTPUT_DIR / "failures.json", [])}
+    schedule = asset_schedule.Schedule(BUDGET, DELAY_SECONDS).install()
+    try:
+        # One bulk Wikidata pass for every aircraft this run may fetch (asset_wikidata.py)
+        titles = [queries[0] for aircraft_name, _, queries, _ in catalogue() if aircraft_name not in kept
+                  and not (negative_cache.known(aircraft_name, "wikidata", queries[0]) and not RETRY_FAILURES)]
+        if titles:
+            print(f"Wikidata: {wikidata.prefetch(titles)}/{len(set(titles))} titles resolved\n")
+        dedup_groups = scrape_pipeline(manifest, failures, kept, existing, workers)
+    finally:
+        asset_image.shutdown()
+        schedule.uninstall()
+    # Written in declaration order whatever order the work ran (and committed) in
+    order = {aircraft_name: i for i, (aircraft_name, *_) in enumerate(AIRCRAFT_DATABASE)}
+    manifest = dict(sorted(manifest.items(), key=lambda item: order[item[0]]))
+    failures.sort(key=lambda f_item: order[f_item["aircraft"]])
+
+    if not DRY_RUN:
+        negative_cache.prune(name for name, *_ in AIRCRAFT_DATABASE)
+        negative_cache.save()
+        wikidata.save()
+        # Crop boxes follow unchanged images; manual ones survive a refetch
+        asset_crop.carry_over(manifest, existing or load_existing_manifest(), OUTPUT_DIR)
+
+    if SHARD is None:
+        write_outputs(manifest, failures, started_at)
+    else:
+        with metrics.stage("write_manifest"):
+            partial = asset_shard.write_partial(
+                OUTPUT_DIR / "image_manifest.json", SHARD, [name for name, *_ in AIRCRAFT_DATABASE],
+                manifest, [(f_item["aircraft"], f_item) for f_item in failures])
+        print(f"\nPartial manifest written: {partial} (shard {SHARD}; combine with the merge command)")
 
     # Summary
     print(f"\n{'='*60}")
-    print(f"COMPLETE")
+    print(f"COMPLETE" + (f" — shard {SHARD}" if SHARD else ""))
     print(f"  Total aircraft: {total}")
-    print(f"  Images found:   {len(manifest)}")
+    print(f"  Images found:   {len(manifest)} ({len(kept)} kept from previous run)")
     print(f"  Failures:       {len(failures)}")
-    print(f"  Dedup groups:   {len(dedup_cache)} groups saved downloads")
+    print(f"  Dedup groups:   {dedup_groups} groups saved downloads")
+    print(f"  Cached misses:  {negative_cache.skipped} lookups skipped (failure_cache.json)")
+    print(f"  Wikidata:       {wikidata.describe()}")
+    if BUDGET:
+        print(f"  Budget:         {schedule.describe()}")
     print(f"{'='*60}")
 
     if failures:
@@ -646,6 +907,138 @@ def scrape_all():
             print(f"  - {f_item['aircraft']} ({f_item['category']})")
 
 
+def write_outputs(manifest: dict, failures: list, started_at: Optional[float] = None):
+    """
+    Catalogue commit (one transaction), then its exports: manifest, failures,
+    runtime maps, precache section and compressed siblings. A dry run writes
+    the JSON directly and leaves the catalogue alone.
+    """
+    manifest_path = OUTPUT_DIR / "image_manifest.json"
+    if DRY_RUN:
+        with metrics.stage("write_manifest"), open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+    else:
+        with metrics.stage("catalogue"):
+            stats = catalogue_db.commit(OUTPUT_DIR.name, "scrape_aircraft_images", OUTPUT_DIR, manifest,
+                                        {f_item["aircraft"]: f_item for f_item in failures}, started_at)
+            manifest = catalogue_db.export(OUTPUT_DIR.name, manifest_path, lambda m: json.dumps(m, indent=2))
+            failures = catalogue_db.failures(OUTPUT_DIR.name)
+    print(f"\nManifest written: {manifest_path}")
+    if not DRY_RUN:
+        print(f"Catalogue: {asset_catalogue.describe(stats)} ({catalogue_db.path})")
+    with metrics.stage("write_manifest"):
+        runtime = asset_runtime.write_runtime(OUTPUT_DIR, manifest)
+        bundle = build_aircraft_bundle.write_bundle(OUTPUT_DIR.parent)
+    print(f"Runtime maps written: {asset_runtime.describe(runtime)}")
+    if bundle:
+        print(f"Aircraft bundle written: {bundle}")
+
+    # Write failures
+    failures_path = OUTPUT_DIR / "failures.json"
+    with metrics.stage("write_manifest"), open(failures_path, "w") as f:
+        json.dump(failures, f, indent=2)
+    print(f"Failures written: {failures_path}")
+
+    if not DRY_RUN:
+        with metrics.stage("precache"):
+            precache = asset_precache.write_section(OUTPUT_DIR, asset_crop.crop_files(manifest), "full")
+        print(f"Precache section: {asset_precache.describe(precache)}")
+        asset_compress.print_report(asset_compress.finalize(
+            [*asset_compress.section_outputs(OUTPUT_DIR, manifest_path), *([bundle] if bundle else [])]))
+
+
+def merge_all():
+    """Combine the --shard partial manifests into the outputs an unsharded run writes."""
+    global catalogue_db
+    keys = {row[0]: shard_key(row) for row in AIRCRAFT_DATABASE}
+    try:
+        manifest, failures, partials = asset_shard.merge(
+            OUTPUT_DIR / "image_manifest.json", list(keys), shard_key=keys.__getitem__)
+    except ValueError as e:
+        print(f"[ERROR] Cannot merge: {e}")
+        sys.exit(1)
+    catalogue_db = asset_catalogue.Catalogue()
+    write_outputs(manifest, failures)
+    for path in partials:
+        path.unlink()
+    print(f"\nMerged {len(partials)} shards: {len(manifest)} images, {len(failures)} failures")
+
+
+def plan_all() -> Plan:
+    """Offline: what would scrape_all() do with the current flags? No network, no sleeps."""
+    plan = Plan(f"aircraft images ({OUTPUT_DIR})" + (f", shard {SHARD}" if SHARD else ""))
+    existing = load_existing_manifest()
+    kept = kept_entries(existing) if INCREMENTAL else {}
+    group_sources = kept_group_sources(kept)
+    negatives = NegativeCache(OUTPUT_DIR / "failure_cache.json", FAILURE_TTL_DAYS, RETRY_FAILURES)
+    fetching_groups = set()
+    titles = []   # first queries whose Wikidata lookup is open
+
+    def open_lookups(aircraft_name: str, queries: list[str]) -> tuple[list[str], list[str], list[str]]:
+        stale = negatives.entries.get(aircraft_name, {}).get("fingerprint") != fingerprint(queries)
+        known = lambda source, q: not RETRY_FAILURES and not stale and negatives.known(aircraft_name, source, q)
+        return ([q for q in queries[:1] if not known("wikidata", q)],
+                [q for q in queries if not known("commons", q)],
+                [q for q in queries[:1] if not known("wikipedia", q)])
+
+    desired_stems = {f"{category}/{sanitize_filename(aircraft_name)}"
+                     for aircraft_name, category, *_ in AIRCRAFT_DATABASE}
+    for aircraft_name, category, queries, dedup_group in catalogue():
+        if aircraft_name in kept:
+            plan.add("keep", aircraft_name, kept[aircraft_name]["filename"])
+            continue
+
+        wd, commons, wiki = open_lookups(aircraft_name, queries)
+        # Worst case: P18 and five category files fail, every open search hits and
+        # every download fails, then Wikipedia (the bulk Wikidata pass is a note below)
+        worst = (7 * len(wd) + 2 * len(commons) + 2 * len(wiki), DELAY_SECONDS * (len(commons) + len(wiki)))
+
+        if dedup_group and dedup_group in group_sources:
+            source = group_sources[dedup_group][1]["original_aircraft"]
+            plan.add("copy", aircraft_name, f"from {source} (group '{dedup_group}')")
+            continue
+        if dedup_group and dedup_group in fetching_groups:
+            # Copies from this run's group fetch unless every earlier member fails
+            plan.add("copy", aircraft_name, f"from group '{dedup_group}' fetch",
+                     requests=(0, worst[0]), seconds=(0.0, worst[1]))
+            continue
+        if dedup_group:
+            fetching_groups.add(dedup_group)
+        titles += wd
+
+        if not wd and not commons and not wiki:
+            plan.add("skip", aircraft_name, "all lookups are cached failures")
+            continue
+        # Best case: the first open lookup hits and its download succeeds
+        plan.add("fetch", aircraft_name,
+                 ("Wikidata, " if wd else "") + f"{len(commons)}/{len(queries)} Commons queries"
+                 + (", Wikipedia fallback" if wiki else ""),
+                 requests=(1 if wd else 2, worst[0]), seconds=(0.0, worst[1]))
+
+    names = {aircraft_name for aircraft_name, *_ in AIRCRAFT_DATABASE}
+    for aircraft_name, entry in existing.items():
+        if aircraft_name not in names:
+            plan.add("drop", aircraft_name, entry.get("filename", ""))
+
+    # Images under any extension, plus the crops asset_crop.py recorded for entries still wanted
+    recorded = set(asset_crop.crop_files({name: entry for name, entry in existing.items() if name in names}))
+    for rel in sorted(files_under(OUTPUT_DIR, ["commercial", "military"]) - recorded):
+        if rel.rsplit(".", 1)[0] not in desired_stems:
+            plan.add("orphan", rel)
+
+    if titles:
+        items = asset_wikidata.Resolver(USER_AGENT, MAX_IMAGE_WIDTH).items
+        cached = sum(title in items for title in set(titles))
+        batches = -(-len(set(titles)) // asset_wikidata.BATCH_SIZE)
+        plan.note(f"Wikidata: {cached}/{len(set(titles))} titles have a cached item; the bulk pass adds "
+                  f"up to {3 * batches} requests ({asset_wikidata.BATCH_SIZE} titles each).")
+    if DRY_RUN:
+        plan.note("--dry-run still performs the searches; only downloads are skipped.")
+    if BUDGET:
+        plan.note(f"--budget {BUDGET}: fetches run missing-first by priority and stop once it is spent.")
+    return plan
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
@@ -654,13 +1047,39 @@ if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Scrape aircraft images from Wikimedia Commons")
+    parser.add_argument("command", nargs="?", choices=["run", "plan", "merge"], default="run",
+                        help="run (default) scrapes; plan prints the work set offline; "
+                             "merge combines --shard partial manifests")
     parser.add_argument("--dry-run", action="store_true", help="Test searches without downloading")
     parser.add_argument("--output-dir", type=str, default="./aircraft_images", help="Output directory")
-    parser.add_argument("--delay", type=float, default=1.5, help="Delay between API calls (seconds)")
+    parser.add_argument("--delay", type=float, default=1.5, help="Minimum interval between requests to one host (seconds)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Threads per network stage of the pipeline (sharing the per-host --delay)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep aircraft whose manifest entry and image file already exist")
+    parser.add_argument("--verbose", action="store_true", help="plan: also list unchanged entries")
+    asset_negcache.add_cli_options(parser)
+    asset_metrics.add_cli_options(parser)
+    asset_shard.add_cli_options(parser)
+    asset_schedule.add_cli_options(parser)
     args = parser.parse_args()
 
     DRY_RUN = args.dry_run
     OUTPUT_DIR = Path(args.output_dir)
     DELAY_SECONDS = args.delay
-
-    scrape_all()
+    FAILURE_TTL_DAYS = args.failure_ttl
+    RETRY_FAILURES = args.retry_failures
+    INCREMENTAL = args.incremental
+    SHARD = args.shard
+    BUDGET = args.budget
+    STALE_DAYS = args.stale_days
+
+    if args.command == "plan":
+        plan_all().print(show_keep=args.verbose)
+        sys.exit(0)
+    if args.command == "merge":
+        merge_all()
+        sys.exit(0)
+
+    with asset_metrics.session("scrape_aircraft_images", args):
+        scrape_all(workers=args.workers)
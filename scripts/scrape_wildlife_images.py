@@ -4,28 +4,93 @@ Download wildlife species images for offline use.
 
 Sources (in priority order):
   1. USFWS Digital Media Library (public domain, U.S. Government work)
-  2. Wikimedia Commons API (CC-licensed, proper API — not page scraping)
-  3. iNaturalist API (CC-licensed, no API key needed)
+  2. Wikidata: the species item's P18 image, else its P373 Commons category
+     (asset_wikidata.py; one bulk pass per run, ~3 requests per 50 species)
+  3. Wikimedia Commons search (CC-licensed, proper API — not page scraping)
+  4. iNaturalist API (CC-licensed, no API key needed)
 
 Follows the same pattern as scrape_aircraft_images.py:
   - Downloads images to /public/wildlife_images/{group}/
-  - Generates /public/wildlife_image_manifest.json
+  - Commits the run to the "wildlife_images" section of the asset catalogue
+    (scripts/.cache/asset_catalogue.sqlite3, see asset_catalogue.py) and
+    exports /public/wildlife_image_manifest.json from it
+  - Writes compact per-group maps + attribution to /public/runtime/wildlife_images.*.json
+  - Refreshes the "wildlife_images" section of /public/asset_precache_manifest.json
+  - Writes .gz/.br siblings for the JSON outputs that changed (asset_compress.py)
   - wildlife-species-data.ts resolveWildlifeImage() picks up the local path
 
 Usage:
     python scripts/scrape_wildlife_images.py
+    python scripts/scrape_wildlife_images.py --metrics-log run.jsonl --profile --trace-memory
+    python scripts/scrape_wildlife_images.py --failure-ttl 30 | --retry-failures
+    python scripts/scrape_wildlife_images.py plan   # offline: print the work set, no network
+    python scripts/asset_species.py                 # what changed in wildlife-species-data.ts since the last sync
+    python scripts/asset_verify.py --section wildlife_images   # missing, empty, mismatched, orphaned files
+    python scripts/asset_crop.py --section wildlife_images     # subject-aware 4:3 card / 1:1 thumb crops
+    python scripts/asset_inat.py [--resolve]        # cached iNaturalist taxon IDs; warm the map
+    python scripts/scrape_wildlife_images.py --shard 2/4   # one slice -> wildlife_image_manifest.shard-2-of-4.json
+    python scripts/scrape_wildlife_images.py merge         # partials -> manifest, runtime, precache
+    python scripts/scrape_wildlife_images.py --budget 15m  # missing first, then by strike risk (asset_schedule.py)
+    python scripts/scrape_wildlife_images.py --stale-days 365   # also refresh images older than a year
+    python scripts/scrape_wildlife_images.py --workers 3   # threads per network stage of the pipeline
+
+The species list is WILDLIFE_SPECIES in lib/wildlife-species-data.ts, parsed
+(and cached) by asset_species.py, IIIF ids and filename rule included. Each run
+diffs it against scripts/.cache/wildlife_species_snapshot.json, the list the
+last run synced: species whose scientific name or IIIF id changed are
+refetched, renamed species have their image moved instead of fetched again,
+and images of removed species are deleted. Unchanged species cost a stat.
+
+Species whose lookups all came back empty are recorded in
+scripts/.cache/wildlife_failure_cache.json and skipped (including the
+politeness delay) until --failure-ttl expires or their names/IDs change.
+
+iNaturalist lookups go through asset_inat.py: each scientific name is
+searched once and its taxon ID kept in scripts/.cache/inat_taxa.json; after
+that, photo data comes 30 taxa per request from the multi-ID endpoint.
+
+Every download is validated before it is written (asset_image.py): anything
+that is not a complete JPEG of sensible size and shape, or is blank, is
+refused and the next candidate (search result, medium size, next source) tried.
+
+Species go through a staged pipeline (asset_pipeline.py): resolve -> probe ->
+fetch -> process -> commit. Lookups and downloads run on I/O threads (--workers
+per stage), validation in asset_image's process pool, and a single committer
+writes the images, the manifest and the negative cache. At most a few species
+per worker are in flight, so memory does not grow with the species list.
+Requests are paced per host (asset_schedule.py): each host sees at most one
+request per DELAY_SECONDS however many workers there are.
 """
 
+import argparse
 import json
 import os
-import re
 import sys
 import time
 import urllib.request
-import urllib.error
 import urllib.parse
+from functools import partial
 from pathlib import Path
 
+from asset_metrics import metrics
+from asset_negcache import NegativeCache, fingerprint
+import asset_catalogue
+import asset_compress
+import asset_crop
+import asset_image
+import asset_inat
+import asset_metrics
+import asset_negcache
+import asset_pipeline
+import asset_precache
+import asset_runtime
+import asset_schedule
+import asset_shard
+import asset_species
+import asset_verify
+import asset_wikidata
+from asset_plan import Plan, files_under
+
 # ── Config ──────────────────────────────────────────────────────────
 
 IIIF_BASE = "https://digitalmedia.fws.gov/digital/iiif/natdiglib"
@@ -38,573 +103,591 @@ PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
 IMAGE_DIR = PUBLIC_DIR / "wildlife_images"
 MANIFEST_PATH = PUBLIC_DIR / "wildlife_image_manifest.json"
 
-# Species list: (common_name, scientific_name, group, natdiglib_id_or_none)
-# Extracted from lib/wildlife-species-data.ts
-SPECIES = [
-    # Large birds
-    ("Canada Goose", "Branta canadensis", "bird", 1489),
-    ("Snow Goose", "Anser caerulescens", "bird", 15275),
-    ("Turkey Vulture", "Cathartes aura", "bird", 1611),
-    ("Black Vulture", "Coragyps atratus", "bird", 7747),
-    ("Red-tailed Hawk", "Buteo jamaicensis", "bird", 18455),
-    ("Great Blue Heron", "Ardea herodias", "bird", 6891),
-    ("Great Horned Owl", "Bubo virginianus", "bird", 8058),
-    ("Bald Eagle", "Haliaeetus leucocephalus", "bird", 6773),
-    ("Osprey", "Pandion haliaetus", "bird", 8094),
-    ("Sandhill Crane", "Antigone canadensis", "bird", 5590),
-    ("Great Egret", "Ardea alba", "bird", 6879),
-    ("Wild Turkey", "Meleagris gallopavo", "bird", 8756),
-    ("Double-crested Cormorant", "Nannopterum auritum", "bird", 7289),
-    ("Brown Pelican", "Pelecanus occidentalis", "bird", 3771),
-    ("American White Pelican", "Pelecanus erythrorhynchos", "bird", 8136),
-    ("Red-shouldered Hawk", "Buteo lineatus", "bird", 7515),
-    ("Cooper's Hawk", "Accipiter cooperii", "bird", 7494),
-    ("Northern Harrier", "Circus hudsonius", "bird", 7501),
-    ("Snowy Owl", "Bubo scandiacus", "bird", 8072),
-    # Medium birds
-    ("Mallard", "Anas platyrhynchos", "bird", 9090),
-    ("Herring Gull", "Larus argentatus", "bird", 6800),
-    ("Ring-billed Gull", "Larus delawarensis", "bird", 6804),
-    ("Laughing Gull", "Leucophaeus atricilla", "bird", 6796),
-    ("Rock Pigeon", "Columba livia", "bird", 17706),
-    ("Mourning Dove", "Zenaida macroura", "bird", 7372),
-    ("American Crow", "Corvus brachyrhynchos", "bird", 7330),
-    ("American Kestrel", "Falco sparverius", "bird", 776),
-    ("Barn Owl", "Tyto alba", "bird", 8038),
-    ("Killdeer", "Charadrius vociferus", "bird", 12311),
-    ("Common Nighthawk", "Chordeiles minor", "bird", 7938),
-    ("Peregrine Falcon", "Falco peregrinus", "bird", 7474),
-    ("Short-eared Owl", "Asio flammeus", "bird", 8066),
-    ("American Robin", "Turdus migratorius", "bird", 7691),
-    ("Northern Mockingbird", "Mimus polyglottos", "bird", 7680),
-    ("Blue Jay", "Cyanocitta cristata", "bird", 7326),
-    ("Northern Flicker", "Colaptes auratus", "bird", 8000),
-    ("Red-winged Blackbird", "Agelaius phoeniceus", "bird", 7205),
-    ("Common Grackle", "Quiscalus quiscula", "bird", 7215),
-    ("Eastern Meadowlark", "Sturnella magna", "bird", 7218),
-    ("Brown-headed Cowbird", "Molothrus ater", "bird", 7210),
-    ("Great-tailed Grackle", "Quiscalus mexicanus", "bird", 7217),
-    ("Cattle Egret", "Bubulcus ibis", "bird", 6876),
-    ("Green Heron", "Butorides virescens", "bird", 6895),
-    ("Black-crowned Night-Heron", "Nycticorax nycticorax", "bird", 6903),
-    ("Chimney Swift", "Chaetura pelagica", "bird", 7928),
-    ("Scissor-tailed Flycatcher", "Tyrannus forficatus", "bird", 7633),
-    ("Loggerhead Shrike", "Lanius ludovicianus", "bird", 7670),
-    ("Mississippi Kite", "Ictinia mississippiensis", "bird", 7507),
-    ("Upland Sandpiper", "Bartramia longicauda", "bird", 4358),
-    ("Eurasian Collared-Dove", "Streptopelia decaocto", "bird", 7369),
-    ("Boat-tailed Grackle", "Quiscalus major", "bird", None),
-    ("Great Black-backed Gull", "Larus marinus", "bird", 6808),
-    ("Bonaparte's Gull", "Chroicocephalus philadelphia", "bird", 6792),
-    # Small birds
-    ("European Starling", "Sturnus vulgaris", "bird", 7700),
-    ("Horned Lark", "Eremophila alpestris", "bird", 7649),
-    ("Barn Swallow", "Hirundo rustica", "bird", 7584),
-    ("House Sparrow", "Passer domesticus", "bird", 7697),
-    ("Song Sparrow", "Melospiza melodia", "bird", 7254),
-    ("Savannah Sparrow", "Passerculus sandwichensis", "bird", 7248),
-    ("Cliff Swallow", "Petrochelidon pyrrhonota", "bird", 7590),
-    ("Tree Swallow", "Tachycineta bicolor", "bird", 7598),
-    ("Eastern Bluebird", "Sialia sialis", "bird", 7684),
-    ("Purple Martin", "Progne subis", "bird", 7594),
-    ("American Goldfinch", "Spinus tristis", "bird", 7232),
-    ("House Finch", "Haemorhous mexicanus", "bird", 7226),
-    ("Cedar Waxwing", "Bombycilla cedrorum", "bird", 7711),
-    # Waterfowl
-    ("American Black Duck", "Anas rubripes", "bird", 9082),
-    ("Northern Pintail", "Anas acuta", "bird", 9104),
-    ("Green-winged Teal", "Anas crecca", "bird", 9118),
-    ("Blue-winged Teal", "Spatula discors", "bird", 9114),
-    ("Wood Duck", "Aix sponsa", "bird", 9072),
-    # Shorebirds
-    ("American Woodcock", "Scolopax minor", "bird", 4345),
-    ("Wilson's Snipe", "Gallinago delicata", "bird", 4389),
-    ("Semipalmated Plover", "Charadrius semipalmatus", "bird", 4367),
-    # Gamebirds
-    ("Ring-necked Pheasant", "Phasianus colchicus", "bird", 8747),
-    ("Northern Bobwhite", "Colinus virginianus", "bird", 8741),
-    # Mammals — Large
-    ("White-tailed Deer", "Odocoileus virginianus", "mammal", 17496),
-    ("Mule Deer", "Odocoileus hemionus", "mammal", 5010),
-    ("Coyote", "Canis latrans", "mammal", 11774),
-    ("Red Fox", "Vulpes vulpes", "mammal", 4915),
-    ("Gray Fox", "Urocyon cinereoargenteus", "mammal", 4911),
-    ("Feral Pig", "Sus scrofa", "mammal", 5031),
-    ("Pronghorn", "Antilocapra americana", "mammal", 4998),
-    # Mammals — Medium/Small
-    ("Eastern Cottontail", "Sylvilagus floridanus", "mammal", 12317),
-    ("Striped Skunk", "Mephitis mephitis", "mammal", 4960),
-    ("Raccoon", "Procyon lotor", "mammal", 4946),
-    ("Virginia Opossum", "Didelphis virginiana", "mammal", 4865),
-    ("Nine-banded Armadillo", "Dasypus novemcinctus", "mammal", 4860),
-    ("Woodchuck", "Marmota monax", "mammal", 4932),
-    ("Thirteen-lined Ground Squirrel", "Ictidomys tridecemlineatus", "mammal", 4928),
-    ("Black-tailed Prairie Dog", "Cynomys ludovicianus", "mammal", 4920),
-    # Reptiles
-    ("American Alligator", "Alligator mississippiensis", "reptile", 4777),
-    ("Common Snapping Turtle", "Chelydra serpentina", "reptile", 4800),
-    ("Eastern Box Turtle", "Terrapene carolina", "reptile", 4815),
-    ("Black Rat Snake", "Pantherophis obsoletus", "reptile", None),
-    # Bats
-    ("Brazilian Free-tailed Bat", "Tadarida brasiliensis", "bat", 4841),
-    ("Big Brown Bat", "Eptesicus fuscus", "bat", 4835),
-    ("Little Brown Bat", "Myotis lucifugus", "bat", 4845),
-    ("Hoary Bat", "Lasiurus cinereus", "bat", 4849),
-    ("Eastern Red Bat", "Lasiurus borealis", "bat", 4838),
-    # ── Additional species (comprehensive BASH coverage) ──
-    # Swans
-    ("Mute Swan", "Cygnus olor", "bird", None),
-    ("Tundra Swan", "Cygnus columbianus", "bird", None),
-    ("Trumpeter Swan", "Cygnus buccinator", "bird", None),
-    # Additional Geese
-    ("Greater White-fronted Goose", "Anser albifrons", "bird", None),
-    ("Cackling Goose", "Branta hutchinsii", "bird", None),
-    ("Ross's Goose", "Anser rossii", "bird", None),
-    ("Hawaiian Goose (Nene)", "Branta sandvicensis", "bird", None),
-    # Additional Raptors
-    ("Golden Eagle", "Aquila chrysaetos", "bird", None),
-    ("Ferruginous Hawk", "Buteo regalis", "bird", None),
-    ("Rough-legged Hawk", "Buteo lagopus", "bird", None),
-    ("Swainson's Hawk", "Buteo swainsoni", "bird", None),
-    ("Broad-winged Hawk", "Buteo platypterus", "bird", None),
-    ("Harris's Hawk", "Parabuteo unicinctus", "bird", None),
-    ("White-tailed Hawk", "Geranoaetus albicaudatus", "bird", None),
-    ("Sharp-shinned Hawk", "Accipiter striatus", "bird", None),
-    ("Crested Caracara", "Caracara plancus", "bird", None),
-    ("Merlin", "Falco columbarius", "bird", None),
-    ("Prairie Falcon", "Falco mexicanus", "bird", None),
-    # Additional Owls
-    ("Barred Owl", "Strix varia", "bird", None),
-    ("Burrowing Owl", "Athene cunicularia", "bird", None),
-    ("Eastern Screech-Owl", "Megascops asio", "bird", None),
-    ("Long-eared Owl", "Asio otus", "bird", None),
-    ("Great Gray Owl", "Strix nebulosa", "bird", None),
-    # Additional Herons/Egrets/Wading Birds
-    ("Snowy Egret", "Egretta thula", "bird", None),
-    ("Little Blue Heron", "Egretta caerulea", "bird", None),
-    ("Tricolored Heron", "Egretta tricolor", "bird", None),
-    ("Yellow-crowned Night-Heron", "Nyctanassa violacea", "bird", None),
-    ("White Ibis", "Eudocimus albus", "bird", None),
-    ("Glossy Ibis", "Plegadis falcinellus", "bird", None),
-    ("White-faced Ibis", "Plegadis chihi", "bird", None),
-    ("Roseate Spoonbill", "Platalea ajaja", "bird", None),
-    ("Wood Stork", "Mycteria americana", "bird", None),
-    ("Anhinga", "Anhinga anhinga", "bird", None),
-    # Other Water Birds
-    ("American Coot", "Fulica americana", "bird", None),
-    ("Common Loon", "Gavia immer", "bird", None),
-    ("Whooping Crane", "Grus americana", "bird", None),
-    # Additional Waterfowl
-    ("Gadwall", "Mareca strepera", "bird", None),
-    ("American Wigeon", "Mareca americana", "bird", None),
-    ("Northern Shoveler", "Spatula clypeata", "bird", None),
-    ("Canvasback", "Aythya valisineria", "bird", None),
-    ("Redhead", "Aythya americana", "bird", None),
-    ("Ring-necked Duck", "Aythya collaris", "bird", None),
-    ("Lesser Scaup", "Aythya affinis", "bird", None),
-    ("Greater Scaup", "Aythya marila", "bird", None),
-    ("Bufflehead", "Bucephala albeola", "bird", None),
-    ("Common Goldeneye", "Bucephala clangula", "bird", None),
-    ("Hooded Merganser", "Lophodytes cucullatus", "bird", None),
-    ("Common Merganser", "Mergus merganser", "bird", None),
-    ("Red-breasted Merganser", "Mergus serrator", "bird", None),
-    ("Ruddy Duck", "Oxyura jamaicensis", "bird", None),
-    # Additional Gulls/Terns
-    ("California Gull", "Larus californicus", "bird", None),
-    ("Western Gull", "Larus occidentalis", "bird", None),
-    ("Glaucous-winged Gull", "Larus glaucescens", "bird", None),
-    ("Glaucous Gull", "Larus hyperboreus", "bird", None),
-    ("Iceland Gull", "Larus glaucoides", "bird", None),
-    ("Lesser Black-backed Gull", "Larus fuscus", "bird", None),
-    ("Franklin's Gull", "Leucophaeus pipixcan", "bird", None),
-    ("Royal Tern", "Thalasseus maximus", "bird", None),
-    ("Caspian Tern", "Hydroprogne caspia", "bird", None),
-    ("Common Tern", "Sterna hirundo", "bird", None),
-    ("Least Tern", "Sternula antillarum", "bird", None),
-    ("Forster's Tern", "Sterna forsteri", "bird", None),
-    ("Black Skimmer", "Rynchops niger", "bird", None),
-    # Additional Shorebirds
-    ("Willet", "Tringa semipalmata", "bird", None),
-    ("Greater Yellowlegs", "Tringa melanoleuca", "bird", None),
-    ("Lesser Yellowlegs", "Tringa flavipes", "bird", None),
-    ("Spotted Sandpiper", "Actitis macularius", "bird", None),
-    ("Least Sandpiper", "Calidris minutilla", "bird", None),
-    ("Dunlin", "Calidris alpina", "bird", None),
-    ("Long-billed Curlew", "Numenius americanus", "bird", None),
-    ("Marbled Godwit", "Limosa fedoa", "bird", None),
-    ("American Avocet", "Recurvirostra americana", "bird", None),
-    ("Black-necked Stilt", "Himantopus mexicanus", "bird", None),
-    ("Black-bellied Plover", "Pluvialis squatarola", "bird", None),
-    ("American Golden-Plover", "Pluvialis dominica", "bird", None),
-    ("Piping Plover", "Charadrius melodus", "bird", None),
-    # Corvids/Blackbirds/Medium Birds
-    ("Fish Crow", "Corvus ossifragus", "bird", None),
-    ("Common Raven", "Corvus corax", "bird", None),
-    ("Black-billed Magpie", "Pica hudsonia", "bird", None),
-    ("Brewer's Blackbird", "Euphagus cyanocephalus", "bird", None),
-    ("Western Meadowlark", "Sturnella neglecta", "bird", None),
-    ("Yellow-headed Blackbird", "Xanthocephalus xanthocephalus", "bird", None),
-    ("Rusty Blackbird", "Euphagus carolinus", "bird", None),
-    ("Western Kingbird", "Tyrannus verticalis", "bird", None),
-    ("Eastern Kingbird", "Tyrannus tyrannus", "bird", None),
-    ("Say's Phoebe", "Sayornis saya", "bird", None),
-    ("Eastern Phoebe", "Sayornis phoebe", "bird", None),
-    ("Belted Kingfisher", "Megaceryle alcyon", "bird", None),
-    ("Red-bellied Woodpecker", "Melanerpes carolinus", "bird", None),
-    ("Downy Woodpecker", "Dryobates pubescens", "bird", None),
-    ("Red-headed Woodpecker", "Melanerpes erythrocephalus", "bird", None),
-    # Small Songbirds
-    ("Western Bluebird", "Sialia mexicana", "bird", None),
-    ("Mountain Bluebird", "Sialia currucoides", "bird", None),
-    ("Vesper Sparrow", "Pooecetes gramineus", "bird", None),
-    ("Grasshopper Sparrow", "Ammodramus savannarum", "bird", None),
-    ("Lark Sparrow", "Chondestes grammacus", "bird", None),
-    ("White-crowned Sparrow", "Zonotrichia leucophrys", "bird", None),
-    ("Dark-eyed Junco", "Junco hyemalis", "bird", None),
-    ("Dickcissel", "Spiza americana", "bird", None),
-    ("Bobolink", "Dolichonyx oryzivorus", "bird", None),
-    ("American Pipit", "Anthus rubescens", "bird", None),
-    ("Bank Swallow", "Riparia riparia", "bird", None),
-    ("Northern Rough-winged Swallow", "Stelgidopteryx serripennis", "bird", None),
-    ("Ruby-throated Hummingbird", "Archilochus colubris", "bird", None),
-    ("Snow Bunting", "Plectrophenax nivalis", "bird", None),
-    ("Lapland Longspur", "Calcarius lapponicus", "bird", None),
-    # Additional Gamebirds
-    ("Greater Sage-Grouse", "Centrocercus urophasianus", "bird", None),
-    ("Greater Prairie-Chicken", "Tympanuchus cupido", "bird", None),
-    ("California Quail", "Callipepla californica", "bird", None),
-    ("Gambel's Quail", "Callipepla gambelii", "bird", None),
-    ("Scaled Quail", "Callipepla squamata", "bird", None),
-    ("Chukar", "Alectoris chukar", "bird", None),
-    ("Gray Partridge", "Perdix perdix", "bird", None),
-    ("Greater Roadrunner", "Geococcyx californianus", "bird", None),
-    # Alaska/Hawaii/Overseas
-    ("Laysan Albatross", "Phoebastria immutabilis", "bird", None),
-    ("Black-footed Albatross", "Phoebastria nigripes", "bird", None),
-    ("Short-tailed Albatross", "Phoebastria albatrus", "bird", None),
-    ("Wedge-tailed Shearwater", "Ardenna pacifica", "bird", None),
-    ("Common Myna", "Acridotheres tristis", "bird", None),
-    ("Pacific Golden-Plover", "Pluvialis fulva", "bird", None),
-    ("Rock Ptarmigan", "Lagopus muta", "bird", None),
-    ("Steller's Sea-Eagle", "Haliaeetus pelagicus", "bird", None),
-    # Additional Mammals — Large
-    ("Elk", "Cervus canadensis", "mammal", None),
-    ("Moose", "Alces alces", "mammal", None),
-    ("American Black Bear", "Ursus americanus", "mammal", None),
-    ("Bobcat", "Lynx rufus", "mammal", None),
-    ("Feral Dog", "Canis lupus familiaris", "mammal", None),
-    ("Feral Cat", "Felis catus", "mammal", None),
-    ("Javelina (Collared Peccary)", "Pecari tajacu", "mammal", None),
-    ("American Bison", "Bison bison", "mammal", None),
-    ("Caribou", "Rangifer tarandus", "mammal", None),
-    ("Mountain Lion", "Puma concolor", "mammal", None),
-    ("Kit Fox", "Vulpes macrotis", "mammal", None),
-    ("Swift Fox", "Vulpes velox", "mammal", None),
-    ("Arctic Fox", "Vulpes lagopus", "mammal", None),
-    ("American Badger", "Taxidea taxus", "mammal", None),
-    # Additional Mammals — Small/Medium
-    ("Desert Cottontail", "Sylvilagus audubonii", "mammal", None),
-    ("Black-tailed Jackrabbit", "Lepus californicus", "mammal", None),
-    ("White-tailed Jackrabbit", "Lepus townsendii", "mammal", None),
-    ("Snowshoe Hare", "Lepus americanus", "mammal", None),
-    ("Nutria (Coypu)", "Myocastor coypus", "mammal", None),
-    ("Muskrat", "Ondatra zibethicus", "mammal", None),
-    ("American Beaver", "Castor canadensis", "mammal", None),
-    ("Fox Squirrel", "Sciurus niger", "mammal", None),
-    ("Eastern Gray Squirrel", "Sciurus carolinensis", "mammal", None),
-    ("Rock Squirrel", "Otospermophilus variegatus", "mammal", None),
-    ("Richardson's Ground Squirrel", "Urocitellus richardsonii", "mammal", None),
-    ("California Ground Squirrel", "Otospermophilus beecheyi", "mammal", None),
-    ("White-tailed Prairie Dog", "Cynomys leucurus", "mammal", None),
-    ("Gunnison's Prairie Dog", "Cynomys gunnisoni", "mammal", None),
-    ("Long-tailed Weasel", "Mustela frenata", "mammal", None),
-    ("Small Indian Mongoose", "Urva auropunctata", "mammal", None),
-    # Additional Reptiles
-    ("Gopher Tortoise", "Gopherus polyphemus", "reptile", None),
-    ("Desert Tortoise", "Gopherus agassizii", "reptile", None),
-    ("Eastern Diamondback Rattlesnake", "Crotalus adamanteus", "reptile", None),
-    ("Western Diamondback Rattlesnake", "Crotalus atrox", "reptile", None),
-    ("Cottonmouth", "Agkistrodon piscivorus", "reptile", None),
-    ("Black Racer", "Coluber constrictor", "reptile", None),
-    ("Gopher Snake", "Pituophis catenifer", "reptile", None),
-    ("Green Iguana", "Iguana iguana", "reptile", None),
-    ("American Crocodile", "Crocodylus acutus", "reptile", None),
-    ("Red-eared Slider", "Trachemys scripta elegans", "reptile", None),
-    ("Painted Turtle", "Chrysemys picta", "reptile", None),
-    # Additional Bats
-    ("Silver-haired Bat", "Lasionycteris noctivagans", "bat", None),
-    ("Tri-colored Bat", "Perimyotis subflavus", "bat", None),
-    ("Evening Bat", "Nycticeius humeralis", "bat", None),
-    ("Indiana Bat", "Myotis sodalis", "bat", None),
-    ("Northern Long-eared Bat", "Myotis septentrionalis", "bat", None),
-    ("Pallid Bat", "Antrozous pallidus", "bat", None),
-    ("Cave Myotis", "Myotis velifer", "bat", None),
-    ("Western Small-footed Myotis", "Myotis ciliolabrum", "bat", None),
-    ("Townsend's Big-eared Bat", "Corynorhinus townsendii", "bat", None),
-    # ── Additional Gulls (added 2026-04-13) ──
-    ("Black-headed Gull", "Chroicocephalus ridibundus", "bird", None),
-    ("Common Gull", "Larus canus", "bird", None),
-    ("Little Gull", "Hydrocoloeus minutus", "bird", None),
-    ("Saunders's Gull", "Saundersilarus saundersi", "bird", None),
-    ("Slender-billed Gull", "Chroicocephalus genei", "bird", None),
-    ("Brown-hooded Gull", "Chroicocephalus maculipennis", "bird", None),
-    ("Brown-headed Gull", "Chroicocephalus brunnicephalus", "bird", None),
-    ("Grey Gull", "Leucophaeus modestus", "bird", None),
-    ("Silver Gull", "Chroicocephalus novaehollandiae", "bird", None),
-    ("Grey-headed Gull", "Chroicocephalus cirrocephalus", "bird", None),
-    ("Black-billed Gull", "Chroicocephalus bulleri", "bird", None),
-    ("Dolphin Gull", "Leucophaeus scoresbii", "bird", None),
-    ("Andean Gull", "Chroicocephalus serranus", "bird", None),
-    ("Lava Gull", "Leucophaeus fuliginosus", "bird", None),
-    ("Hartlaub's Gull", "Chroicocephalus hartlaubii", "bird", None),
-    # ── Additional Terns ──
-    ("Arctic Tern", "Sterna paradisaea", "bird", None),
-    ("Inca Tern", "Larosterna inca", "bird", None),
-    ("Large-billed Tern", "Phaetusa simplex", "bird", None),
-    # ── Additional Kestrels ──
-    ("Common Kestrel", "Falco tinnunculus", "bird", None),
-    ("Malagasy Kestrel", "Falco newtoni", "bird", None),
-]
+DELAY_SECONDS = 1.5  # Be polite — minimum interval between requests to one host
+STRIKE_RISK_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3}   # --budget priority
+FAILURE_CACHE_NAME = "wildlife_failure_cache.json"   # in asset_runtime.CACHE_DIR
+SNAPSHOT_NAME = "wildlife_species_snapshot.json"     # likewise
+
+# Species list: (common_name, scientific_name, group, natdiglib_id_or_none),
+# parsed from WILDLIFE_SPECIES in lib/wildlife-species-data.ts (asset_species.py)
+# by load_species(), so importing this module reads and writes nothing
+SPECIES_DATA: dict | None = None
+SPECIES: list[tuple] = []
+
+
+def load_species():
+    """Fill SPECIES_DATA and SPECIES, once; run(), plan() and merge() start with it."""
+    global SPECIES_DATA, SPECIES
+    if SPECIES_DATA is None:
+        SPECIES_DATA = asset_species.load()
+        SPECIES = [(s["common_name"], s["scientific_name"], s["group"], s["natdiglib_id"])
+                   for s in SPECIES_DATA["species"]]
+
+
+negative_cache: NegativeCache | None = None  # set by run()
+catalogue_db: asset_catalogue.Catalogue | None = None  # set by run() / merge()
+schedule: asset_schedule.Schedule | None = None  # set by run(): per-host pacing and the --budget
+inat_taxa: asset_inat.Taxa | None = None  # set by run()
+wikidata: asset_wikidata.Resolver | None = None  # set by run()
+
+
+def species_lookups(common_name: str, scientific_name: str, natdiglib_id: int | None) -> list[tuple[str, str]]:
+    """Every (source, query) lookup main() may try for a species, in order."""
+    lookups = []
+    if natdiglib_id is not None:
+        lookups.append(("usfws", str(natdiglib_id)))
+    if "spp." not in scientific_name:
+        lookups.append(("wikidata", scientific_name))
+    lookups += [("commons", scientific_name), ("commons", common_name)]
+    if "spp." not in scientific_name:
+        lookups.append(("inat", scientific_name))
+    return lookups
+
+
+def known_miss(common_name: str, source: str, query: str) -> bool:
+    return negative_cache is not None and negative_cache.skip(common_name, source, query)
+
+
+def record_miss(common_name: str, source: str, query: str):
+    record_attempt(common_name, "miss", source, query)
+    if negative_cache is not None:
+        negative_cache.fail(common_name, source, query)
+
+
+def record_attempt(common_name: str, status: str, source: str | None = None, query: str | None = None):
+    if catalogue_db is not None:
+        catalogue_db.attempt(common_name, status, source, query)
 
 
 def safe_filename(name: str) -> str:
-    """Sanitize species name for use as filename."""
-    return re.sub(r'[^a-z0-9_]', '', name.lower().replace(' ', '_').replace('-', '_').replace("'", ''))
+    """Species name as a file stem, by resolveWildlifeImage()'s own rule (asset_species.py)."""
+    return asset_species.safe_filename(name, SPECIES_DATA["filename_rule"])
 
 
-def download_image(url: str, dest: Path, timeout: int = 30) -> bool:
-    """Download an image URL to dest. Returns True on success."""
-    try:
-        req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            content_type = resp.headers.get("Content-Type", "")
-            data = resp.read()
-            # Reject HTML error pages
-            if "text/html" in content_type or data[:20].lower().startswith((b"<!doctype", b"<html")):
-                return False
-            if len(data) < 500:
-                return False
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            dest.write_bytes(data)
-            return True
-    except Exception:
-        return False
-
-
-def download_usfws(natdiglib_id: int, dest: Path) -> str | None:
-    """Download image from USFWS IIIF endpoint. Returns source URL or None."""
-    url = f"{IIIF_BASE}/{natdiglib_id}/full/800,/0/default.jpg"
-    if download_image(url, dest):
-        return url
-    print(f"    ! USFWS download failed")
-    return None
-
-
-def download_commons_image(scientific_name: str, common_name: str, dest: Path) -> tuple[str, str] | None:
+def usfws_candidates(natdiglib_id: str) -> list[dict]:
+    """The IIIF rendering of a USFWS Digital Media Library image."""
+    asset_schedule.pace(DELAY_SECONDS)   # its download is the request
+    return [{"url": f"{IIIF_BASE}/{natdiglib_id}/full/800,/0/default.jpg",
+             "desc_url": f"https://digitalmedia.fws.gov/digital/collection/natdiglib/id/{natdiglib_id}",
+             "license": "Public Domain (U.S. Government Work)"}]
+
+
+def wikidata_candidates(scientific_name: str):
+    """The prefetched P18 image for the species' Wikidata item, then files from its P373 category."""
+    for candidate in wikidata.candidates(scientific_name):
+        yield {**candidate, "license": f"{candidate['license']} (Wikimedia Commons)"}
+
+
+def commons_candidates(search_term: str) -> list[dict]:
     """
-    Search Wikimedia Commons API for species image.
+    Search Wikimedia Commons API for species images, in search order.
     Uses the proper API endpoint (not Wikipedia page scraping).
-    Returns (source_url, page_url) or None.
     """
-    # Try scientific name first, then common name
-    for search_term in [scientific_name, common_name]:
-        params = urllib.parse.urlencode({
-            "action": "query",
-            "generator": "search",
-            "gsrnamespace": "6",  # File namespace
-            "gsrsearch": f"{search_term} animal",
-            "gsrlimit": "5",
-            "prop": "imageinfo",
-            "iiprop": "url|size|mime",
-            "iiurlwidth": "800",
-            "format": "json",
-        })
-        url = f"{COMMONS_API}?{params}"
-        try:
-            req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-            with urllib.request.urlopen(req, timeout=15) as resp:
-                data = json.loads(resp.read())
-
-            pages = data.get("query", {}).get("pages", {})
-            if not pages:
-                continue
-
-            # Find best image: prefer JPEG, reasonable size
-            best = None
-            for page_id, page in pages.items():
-                info_list = page.get("imageinfo", [])
-                if not info_list:
-                    continue
-                info = info_list[0]
-                mime = info.get("mime", "")
-                if "image" not in mime:
-                    continue
-                # Prefer the resized thumb URL if available
-                thumb_url = info.get("thumburl") or info.get("url")
-                page_url = info.get("descriptionurl", "")
-                if thumb_url:
-                    best = (thumb_url, page_url)
-                    break  # take first good result
-
-            if best:
-                thumb_url, page_url = best
-                if download_image(thumb_url, dest):
-                    return (thumb_url, page_url)
-
-        except Exception as e:
-            print(f"    ! Commons API error: {e}")
+    params = urllib.parse.urlencode({
+        "action": "query",
+        "generator": "search",
+        "gsrnamespace": "6",  # File namespace
+        "gsrsearch": f"{search_term} animal",
+        "gsrlimit": "5",
+        "prop": "imageinfo",
+        "iiprop": "url|size|mime",
+        "iiurlwidth": "800",
+        "format": "json",
+    })
+    req = urllib.request.Request(f"{COMMONS_API}?{params}", headers={"User-Agent": USER_AGENT})
+    with metrics.stage("commons_search"), urllib.request.urlopen(req, timeout=15) as resp:
+        data = json.loads(resp.read())
+    asset_schedule.pace(DELAY_SECONDS)
+
+    candidates = []
+    for page in data.get("query", {}).get("pages", {}).values():
+        info_list = page.get("imageinfo", [])
+        if not info_list:
             continue
+        info = info_list[0]
+        mime = info.get("mime", "")
+        # Prefer the resized thumb URL if available
+        thumb_url = info.get("thumburl") or info.get("url")
+        if "image" in mime and thumb_url:
+            candidates.append({
+                "url": thumb_url,
+                "desc_url": info.get("descriptionurl", ""),
+                "mime": mime,
+                "width": info.get("thumbwidth") or info.get("width", 0),
+                "height": info.get("thumbheight") or info.get("height", 0),
+                "license": "CC BY-SA (Wikimedia Commons)",
+            })
+    return candidates
+
+
+def inat_candidates(scientific_name: str) -> list[dict]:
+    """
+    Photo of the species' iNaturalist taxon (asset_inat.py: ID from the cached
+    map, photo data batched), large size first, then medium.
+    """
+    taxon = inat_taxa.lookup(scientific_name)
+    asset_schedule.pace(DELAY_SECONDS)
+    if taxon is None:
+        return []
+    # Use medium_url (500px) or original
+    photo = taxon["default_photo"]
+    photo_url = photo.get("medium_url") or photo.get("url")
+    if not photo_url:
+        return []
+    # Upgrade to larger size: replace "medium" with "large" in URL (iNat convention)
+    photo_url_large = photo_url.replace("/medium.", "/large.").replace("square.", "large.")
+    taxa_url = f"https://www.inaturalist.org/taxa/{taxon.get('id', '')}"
+    return [{"url": url, "desc_url": taxa_url, "license": "CC (iNaturalist)"}
+            for url in dict.fromkeys((photo_url_large, photo_url))]
 
-    return None
 
+# Candidate lists for each species_lookups() source, in asset_pipeline's Lookup.find form
+FINDERS = {"usfws": usfws_candidates, "wikidata": wikidata_candidates,
+           "commons": commons_candidates, "inat": inat_candidates}
 
-def download_inaturalist_image(scientific_name: str, dest: Path) -> tuple[str, str] | None:
-    """
-    Search iNaturalist API for species photo.
-    Returns (photo_url, taxa_page_url) or None.
-    """
-    # Skip generic "spp." entries
-    if "spp." in scientific_name:
-        return None
 
-    params = urllib.parse.urlencode({
-        "q": scientific_name,
-        "per_page": "3",
-        "is_active": "true",
-    })
-    url = f"{INAT_API}/taxa?{params}"
-    try:
-        req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read())
-
-        results = data.get("results", [])
-        for taxon in results:
-            # Match on scientific name (case-insensitive)
-            taxon_name = taxon.get("name", "")
-            if taxon_name.lower() != scientific_name.lower():
-                # Also check if our name is a subspecies match
-                if not scientific_name.lower().startswith(taxon_name.lower()):
-                    continue
+def shard_species(shard: asset_shard.Shard | None) -> list:
+    """SPECIES rows this run processes: all of them, or the --shard slice (by common name)."""
+    return [row for row in SPECIES if shard is None or shard.owns(row[0])]
 
-            photo = taxon.get("default_photo")
-            if not photo:
-                continue
 
-            # Use medium_url (500px) or original
-            photo_url = photo.get("medium_url") or photo.get("url")
-            if not photo_url:
-                continue
+def image_path(common_name: str, group: str) -> Path:
+    return IMAGE_DIR / group / f"{safe_filename(common_name)}.jpg"
 
-            # Upgrade to larger size: replace "medium" with "large" in URL (iNat convention)
-            photo_url_large = photo_url.replace("/medium.", "/large.").replace("square.", "large.")
 
-            taxa_url = f"https://www.inaturalist.org/taxa/{taxon.get('id', '')}"
+def species_changes() -> tuple[dict, dict, dict | None]:
+    """
+    (previous snapshot, current snapshot, asset_species.diff between them).
+    The diff is None on a first run, which is a full pass.
+    """
+    previous = asset_species.load_snapshot(asset_runtime.cache_path(SNAPSHOT_NAME))
+    current = asset_species.snapshot(SPECIES_DATA["species"])
+    return previous or {}, current, asset_species.diff(previous, current) if previous is not None else None
 
-            if download_image(photo_url_large, dest):
-                return (photo_url_large, taxa_url)
-            # Fallback to medium if large fails
-            if download_image(photo_url, dest):
-                return (photo_url, taxa_url)
 
-    except Exception as e:
-        print(f"    ! iNaturalist API error: {e}")
+def move_renamed(renamed: list[tuple[str, str]], existing: dict, shard: asset_shard.Shard | None) -> int:
+    """
+    Renamed species keep their image: move it to the new name (and group) and
+    re-key `existing`, so the run keeps it instead of fetching. Returns moves.
+    """
+    groups = {common_name: group for common_name, _, group, _ in SPECIES}
+    moved = 0
+    for old, new in renamed:
+        entry = existing.pop(old, None)
+        if entry is None or (shard and not shard.owns(new)):
+            continue
+        src = IMAGE_DIR / entry["filename"]
+        dest = image_path(new, groups[new])
+        if not src.exists():
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(src, dest)
+        crops = entry.pop("crops", None) or {}
+        for record in crops.values():   # rendered again under the new name by asset_crop.py
+            if isinstance(record, dict) and record.get("file"):
+                (IMAGE_DIR / record["file"]).unlink(missing_ok=True)
+        existing[new] = {**entry, "filename": dest.relative_to(IMAGE_DIR).as_posix(), "group": groups[new]}
+        if asset_crop.manual_crops(crops):
+            existing[new]["crops"] = asset_crop.manual_crops(crops)
+        record_attempt(new, "renamed", None, old)
+        print(f"  [moved] {old} -> {new}")
+        moved += 1
+    return moved
+
+
+def image_files(filename: str) -> list[str]:
+    """An image and the crop siblings asset_crop.py renders next to it."""
+    return [filename, *(asset_crop.crop_filename(filename, profile)
+                        for profile in asset_crop.PROFILES["wildlife_images"])]
+
+
+def collect_removed(removed: list[str], previous: dict, manifest: dict) -> int:
+    """Delete the images (and their crops) of species gone from WILDLIFE_SPECIES. Returns images deleted."""
+    in_use = {entry["filename"] for entry in manifest.values()}
+    deleted = 0
+    for common_name in removed:
+        path = image_path(common_name, previous[common_name]["group"])
+        rel = path.relative_to(IMAGE_DIR).as_posix()
+        if path.exists() and rel not in in_use:
+            for sibling in image_files(rel):
+                (IMAGE_DIR / sibling).unlink(missing_ok=True)
+            print(f"  [removed] {common_name} ({rel})")
+            deleted += 1
+    return deleted
+
+
+def synced_snapshot(previous: dict, current: dict, pending) -> dict:
+    """`current`, except changed species not refetched yet keep their last synced record."""
+    return {name: previous[name] if name in pending and name in previous else record
+            for name, record in current.items()}
+
+
+def scheduled_species(rows: list, existing: dict, refreshed: dict[str, float]) -> list:
+    """
+    `rows` in --budget priority order (asset_schedule.priority): missing
+    images first, then by strike risk, then least recently refreshed.
+    """
+    risk = {s["common_name"]: s["strike_risk"] for s in SPECIES_DATA["species"]}
+
+    def key(item):
+        position, (common_name, _, group, _) = item
+        missing = common_name not in existing or not asset_verify.present(image_path(common_name, group))
+        rank = STRIKE_RISK_RANK.get(risk.get(common_name), len(STRIKE_RISK_RANK))
+        return asset_schedule.priority(missing, rank, refreshed.get(common_name), position)
+
+    return [row for _, row in sorted(enumerate(rows), key=key)]
+
+
+def load_existing_manifest() -> dict:
+    return asset_catalogue.load_manifest(IMAGE_DIR, MANIFEST_PATH)
+
+
+# Requests per lookup: (on success, worst case). USFWS is a direct IIIF image
+# fetch; Commons and iNaturalist are a search plus one or two downloads.
+# Wikidata's bulk pass is shared (a plan note); per species it is the P18
+# download, then a category listing and up to five more.
+LOOKUP_REQUESTS = {"usfws": (1, 1), "wikidata": (1, 7), "commons": (2, 2), "inat": (2, 3)}
+
+
+def plan(args: argparse.Namespace) -> Plan:
+    """Offline: what would run() do? Reads the manifest, files and failure cache only."""
+    load_species()
+    result = Plan(f"wildlife images ({IMAGE_DIR})" + (f", shard {args.shard}" if args.shard else ""))
+    existing = load_existing_manifest()
+    negatives = NegativeCache(asset_runtime.cache_path(FAILURE_CACHE_NAME), args.failure_ttl, args.retry_failures)
+    outdated = asset_schedule.stale(asset_catalogue.refreshed_at(IMAGE_DIR.name), args.stale_days)
+    _, _, changes = species_changes()
+    renamed_from = {}
+    if changes is not None:
+        result.note(f"Species since last sync: {asset_species.describe(changes)}")
+        outdated |= set(changes["changed"])
+        renamed_from = {new: old for old, new in changes["renamed"]
+                        if old in existing and asset_verify.present(IMAGE_DIR / existing[old]["filename"])}
+
+    desired = {f"{group}/{safe_filename(common_name)}.jpg" for common_name, _, group, _ in SPECIES}
+    inat, titles = [], []   # scientific names whose iNaturalist / Wikidata lookup is still open
+    for common_name, scientific_name, group, natdiglib_id in shard_species(args.shard):
+        rel_path = f"{group}/{safe_filename(common_name)}.jpg"
+        if common_name in existing and asset_verify.present(IMAGE_DIR / rel_path) and common_name not in outdated:
+            result.add("keep", common_name, rel_path)
+            continue
+        if common_name in renamed_from:
+            result.add("move", common_name, f"{existing[renamed_from[common_name]]['filename']} -> {rel_path}")
+            continue
 
-    return None
+        fp = fingerprint(common_name, scientific_name, natdiglib_id)
+        stale = negatives.entries.get(common_name, {}).get("fingerprint") != fp
+        lookups = [
+            (source, query) for source, query in species_lookups(common_name, scientific_name, natdiglib_id)
+            if args.retry_failures or stale or not negatives.known(common_name, source, query)
+        ]
+        if not lookups:
+            result.add("skip", common_name, "all lookups are cached failures")
+            continue
 
+        inat += [query for source, query in lookups if source == "inat"]
+        titles += [query for source, query in lookups if source == "wikidata"]
+        best = LOOKUP_REQUESTS[lookups[0][0]][0]
+        worst = sum(LOOKUP_REQUESTS[source][1] for source, _ in lookups)
+        sources = ", ".join(dict.fromkeys(source for source, _ in lookups))
+        result.add("fetch", common_name, f"{rel_path} via {sources}",
+                   requests=(best, worst), seconds=(DELAY_SECONDS, DELAY_SECONDS))
+
+    names = {common_name for common_name, *_ in SPECIES}
+    moved = set(renamed_from.values())
+    removed = set(changes["removed"]) if changes else set()
+    for common_name, entry in existing.items():
+        if common_name not in names and common_name not in moved:
+            result.add("drop", common_name, entry.get("filename", "")
+                       + (" (image deleted)" if common_name in removed else ""))
+
+    groups = sorted({group for _, _, group, _ in SPECIES})
+    desired |= set(asset_crop.crop_files({name: entry for name, entry in existing.items() if name in names}))
+    handled = {rel for name in moved | removed if name in existing   # moved or deleted, crops included
+               for rel in image_files(existing[name]["filename"])}
+    for rel in sorted(files_under(IMAGE_DIR, groups) - desired - handled):
+        result.add("orphan", rel)
+    if titles:
+        items = asset_wikidata.Resolver(USER_AGENT, 800).items
+        cached = sum(name in items for name in titles)
+        result.note(f"Wikidata: {cached}/{len(titles)} species have a cached item; the bulk pass adds up to "
+                    f"{3 * -(-len(titles) // asset_wikidata.BATCH_SIZE)} requests.")
+    if inat:
+        resolved = sum(name in asset_inat.Taxa(USER_AGENT).ids for name in inat)
+        result.note(f"iNaturalist: {resolved}/{len(inat)} fetched species have a cached taxon ID "
+                    f"(photo data {asset_inat.BATCH_SIZE} per request; the rest are searched once).")
+    if args.budget:
+        result.note(f"--budget {args.budget}: fetches run missing-first by strike risk and stop once it is spent.")
+    return result
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Download wildlife species images")
+    parser.add_argument("command", nargs="?", choices=["run", "plan", "merge"], default="run",
+                        help="run (default) downloads; plan prints the work set offline; "
+                             "merge combines --shard partial manifests")
+    parser.add_argument("--verbose", action="store_true", help="plan: also list unchanged entries")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Threads per network stage of the pipeline (sharing the per-host delay)")
+    asset_negcache.add_cli_options(parser)
+    asset_metrics.add_cli_options(parser)
+    asset_shard.add_cli_options(parser)
+    asset_schedule.add_cli_options(parser)
+    args = parser.parse_args(argv)
+
+    if args.command == "plan":
+        plan(args).print(show_keep=args.verbose)
+        return
+    if args.command == "merge":
+        merge()
+        return
+
+    with asset_metrics.session("scrape_wildlife_images", args):
+        run(args)
+
+
+def run(args: argparse.Namespace):
+    global negative_cache, catalogue_db, schedule, inat_taxa, wikidata
+    load_species()
+    negative_cache = NegativeCache(asset_runtime.cache_path(FAILURE_CACHE_NAME), args.failure_ttl, args.retry_failures)
+    inat_taxa = asset_inat.Taxa(USER_AGENT, api=INAT_API)
+    wikidata = asset_wikidata.Resolver(USER_AGENT, 800)
+    catalogue_db = asset_catalogue.Catalogue() if not args.shard else None
+    started_at = time.time()
 
-def main():
     print("=" * 60)
     print("Wildlife Species Image Downloader")
-    print("Sources: USFWS > Wikimedia Commons > iNaturalist")
+    print("Sources: USFWS > Wikidata > Wikimedia Commons > iNaturalist")
+    if args.budget:
+        print(f"Budget: {args.budget} (missing first, by strike risk; {DELAY_SECONDS:g}s per host)")
     print("=" * 60)
     print()
 
     manifest: dict[str, dict] = {}
+    failures: dict[str, dict] = {}   # species without an image, kept in the catalogue
     success = 0
     failed = 0
     skipped = 0
+    known_failed = 0
 
     # Load existing manifest for incremental runs
-    if MANIFEST_PATH.exists():
-        try:
-            existing = json.loads(MANIFEST_PATH.read_text())
-            print(f"Found existing manifest with {len(existing)} entries")
-        except Exception:
-            existing = {}
-    else:
-        existing = {}
-
-    for common_name, scientific_name, group, natdiglib_id in SPECIES:
-        fname = safe_filename(common_name)
-        rel_path = f"{group}/{fname}.jpg"
-        dest = IMAGE_DIR / group / f"{fname}.jpg"
-
-        # Skip if already downloaded (incremental mode)
-        if common_name in existing and dest.exists():
-            manifest[common_name] = existing[common_name]
-            skipped += 1
-            print(f"  [skip] {common_name} (already downloaded)")
-            continue
-
-        print(f"  >> {common_name} ({scientific_name})...")
-
-        source_url = None
-        source_page = ""
-        license_info = ""
-
-        # 1. Try USFWS first
-        if natdiglib_id is not None:
-            source_url = download_usfws(natdiglib_id, dest)
-            if source_url:
-                source_page = f"https://digitalmedia.fws.gov/digital/collection/natdiglib/id/{natdiglib_id}"
-                license_info = "Public Domain (U.S. Government Work)"
-
-        # 2. Fallback: Wikimedia Commons API
-        if source_url is None:
-            print(f"    -> Trying Wikimedia Commons...")
-            result = download_commons_image(scientific_name, common_name, dest)
-            if result:
-                source_url, source_page = result
-                license_info = "CC BY-SA (Wikimedia Commons)"
-
-        # 3. Fallback: iNaturalist
-        if source_url is None:
-            print(f"    -> Trying iNaturalist...")
-            result = download_inaturalist_image(scientific_name, dest)
-            if result:
-                source_url, source_page = result
-                license_info = "CC (iNaturalist)"
-
-        if source_url and dest.exists():
+    existing = load_existing_manifest()
+    if existing:
+        print(f"Found existing manifest with {len(existing)} entries")
+    refreshed = asset_catalogue.refreshed_at(IMAGE_DIR.name)
+    outdated = asset_schedule.stale(refreshed, args.stale_days)
+
+    # Change-driven sync: only what changed in wildlife-species-data.ts since the last run
+    previous, current, changes = species_changes()
+    if changes is not None:
+        print(f"Species since last sync: {asset_species.describe(changes)}")
+        move_renamed(changes["renamed"], existing, args.shard)
+        outdated |= set(changes["changed"])   # new scientific name or IIIF id: refetch
+    attempted = set()
+
+    rows = shard_species(args.shard)
+    earlier_failures = {}   # species -> last run's failure record, kept for deferred species
+    if args.budget:
+        rows = scheduled_species(rows, existing, refreshed)
+        if catalogue_db is not None:
+            earlier_failures = {f["species"]: f for f in catalogue_db.failures(IMAGE_DIR.name)}
+    # Species this run may look up, in order: the bulk Wikidata pass and the
+    # iNaturalist photo batches are filled from it
+    open_rows = [(common_name, scientific_name) for common_name, scientific_name, group, _ in rows
+                 if common_name not in existing or common_name in outdated
+                 or not asset_verify.present(image_path(common_name, group))]
+    inat_taxa.queue(scientific_name for _, scientific_name in open_rows)
+    schedule = asset_schedule.Schedule(args.budget, DELAY_SECONDS).install()
+    try:
+        # One bulk Wikidata pass for the same species (asset_wikidata.py)
+        titles = [scientific_name for common_name, scientific_name in open_rows if "spp." not in scientific_name
+                  and (args.retry_failures or not negative_cache.known(common_name, "wikidata", scientific_name))]
+        if titles:
+            print(f"Wikidata: {wikidata.prefetch(titles)}/{len(set(titles))} species resolved\n")
+        def commit(job: asset_pipeline.Job):
+            # The single writer of manifest, failures and the negative cache (asset_pipeline.py)
+            nonlocal success, failed, skipped, known_failed
+            (common_name, scientific_name, group, _), status = job.payload
+            dest = image_path(common_name, group)
+            if status == "kept":
+                manifest[common_name] = existing[common_name]
+                skipped += 1
+                return
+            if status == "cached":
+                failures[common_name] = failure_record(common_name, scientific_name, group)
+                known_failed += 1
+                return
+            if job.deferred:
+                # Budget spent: keep the last image (or failure) and leave the species to the next run
+                if common_name in existing and asset_verify.present(dest):
+                    manifest[common_name] = existing[common_name]
+                elif common_name in earlier_failures:
+                    failures[common_name] = earlier_failures[common_name]
+                schedule.defer()
+                job.log.append(f"  [deferred] {common_name} (budget spent)")
+                return
+
+            attempted.add(common_name)
+            for lookup, outcome in job.outcomes:
+                if outcome == "miss":
+                    record_miss(common_name, lookup.source, lookup.query)
+                else:
+                    record_attempt(common_name, "error", lookup.source, lookup.query)
+            if job.candidate is None:
+                job.log.append(f"    FAIL - no image available")
+                metrics.event("entry", name=common_name, status="failed")
+                failures[common_name] = failure_record(common_name, scientific_name, group)
+                failed += 1
+                return
+
+            with metrics.stage("write_image"):
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.write_bytes(job.data)
+            metrics.count("image_bytes", len(job.data))
+            license_info = job.candidate["license"]
             manifest[common_name] = {
-                "filename": rel_path,
-                "source_url": source_url,
-                "source_page": source_page,
+                "filename": f"{group}/{dest.name}",
+                "source_url": job.candidate["url"],
+                "source_page": job.candidate.get("desc_url", ""),
                 "license": license_info,
                 "group": group,
             }
-            size_kb = dest.stat().st_size / 1024
-            print(f"    OK ({size_kb:.0f} KB) [{license_info}]")
+            job.log.append(f"    OK ({len(job.data) / 1024:.0f} KB) [{license_info}]")
+            metrics.event("entry", name=common_name, status="ok", license=license_info)
+            record_attempt(common_name, "ok", job.lookup.source, job.lookup.query)
+            negative_cache.succeed(common_name)
             success += 1
-        else:
-            print(f"    FAIL - no image available")
-            failed += 1
 
-        # Be polite — 1.5s between requests
-        time.sleep(1.5)
+        # The app requests <name>.jpg, so only a JPEG will do here
+        with asset_pipeline.Pipeline(commit, USER_AGENT, workers=args.workers, accept=(".jpg",),
+                                     exhausted=schedule.exhausted) as pipeline:
+            for row in rows:
+                common_name, scientific_name, group, natdiglib_id = row
+                job = asset_pipeline.Job(common_name, payload=(row, "fetch"))
+
+                # Skip if already downloaded (incremental mode), unless older than --stale-days
+                cached = (common_name in existing and asset_verify.present(image_path(common_name, group))
+                          and common_name not in outdated)
+                metrics.cache("incremental", hit=cached)
+                if cached:
+                    job.payload = (row, "kept")
+                    job.log.append(f"  [skip] {common_name} (already downloaded)")
+                    pipeline.submit(job)
+                    continue
 
-    # Write manifest
-    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
-    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+                negative_cache.begin(common_name, fingerprint(common_name, scientific_name, natdiglib_id))
+                lookups = species_lookups(common_name, scientific_name, natdiglib_id)
+                if not args.retry_failures and all(negative_cache.known(common_name, *l) for l in lookups):
+                    metrics.cache("negative", hit=True)
+                    job.payload = (row, "cached")
+                    job.log.append(f"  [skip] {common_name} (no image found last time — cached failure)")
+                    pipeline.submit(job)
+                    continue
+
+                job.log.append(f"  >> {common_name} ({scientific_name})...")
+                for source, query in lookups:
+                    if source == "wikidata" and not wikidata.known(query):
+                        continue   # not prefetched: nothing to say about it
+                    if known_miss(common_name, source, query):
+                        job.log.append(f"    [cached miss] {source}: '{query}'")
+                        continue
+                    job.lookups.append(asset_pipeline.Lookup(common_name, source, query,
+                                                             partial(FINDERS[source], query)))
+                pipeline.submit(job)
+    finally:
+        asset_image.shutdown()
+        schedule.uninstall()
+    print(f"Pipeline: {pipeline.describe()}")
+    # Written in declaration order whatever order the work ran (and committed) in
+    order = {common_name: i for i, (common_name, *_) in enumerate(SPECIES)}
+    manifest = dict(sorted(manifest.items(), key=lambda item: order[item[0]]))
+    failures = dict(sorted(failures.items(), key=lambda item: order[item[0]]))
+
+    with metrics.stage("write_manifest"):
+        negative_cache.prune(common_name for common_name, *_ in SPECIES)
+        negative_cache.save()
+        inat_taxa.save()
+        wikidata.save()
+        # Crop boxes follow unchanged images; manual ones survive a refetch
+        asset_crop.carry_over(manifest, existing, IMAGE_DIR)
+    if args.shard:
+        with metrics.stage("write_manifest"):
+            partial_path = asset_shard.write_partial(MANIFEST_PATH, args.shard, [row[0] for row in SPECIES], manifest,
+                                                list(failures.items()))
+        print()
+        print("=" * 60)
+        print(f"Shard {args.shard} done! {success} new, {skipped} skipped, {failed} failed, "
+              f"{known_failed} cached failures")
+        print(f"Partial manifest: {partial_path} (combine with the merge command)")
+        print("=" * 60)
+        return
+
+    manifest, stats, precache, compression = write_outputs(manifest, failures, started_at)
+    removed = collect_removed(changes["removed"], previous, manifest) if changes else 0
+    pending = set(changes["changed"]) - attempted if changes else set()
+    asset_species.save_snapshot(asset_runtime.cache_path(SNAPSHOT_NAME), synced_snapshot(previous, current, pending))
 
     print()
     print("=" * 60)
-    print(f"Done! {success} new, {skipped} skipped, {failed} failed")
+    print(f"Done! {success} new, {skipped} skipped, {failed} failed, {known_failed} cached failures"
+          + (f", {removed} removed" if removed else ""))
     print(f"Total in manifest: {len(manifest)}")
     print(f"Images: {IMAGE_DIR}")
     print(f"Manifest: {MANIFEST_PATH}")
+    print(f"Catalogue: {asset_catalogue.describe(stats)}")
+    print(f"Wikidata: {wikidata.describe()}")
+    print(f"iNaturalist: {inat_taxa.describe()}")
+    if args.budget:
+        print(f"Budget: {schedule.describe()}")
+    print(f"Precache: {asset_precache.describe(precache)}")
     print("=" * 60)
+    asset_compress.print_report(compression)
+
+
+def failure_record(common_name: str, scientific_name: str, group: str) -> dict:
+    return {"species": common_name, "scientific_name": scientific_name, "group": group}
+
+
+def write_outputs(manifest: dict, failures: dict | None = None, started_at: float | None = None):
+    """
+    Catalogue commit (one transaction), then its exports: manifest, runtime
+    maps, precache section and compressed siblings.
+    Returns (manifest, catalogue stats, precache, compression).
+    """
+    with metrics.stage("catalogue"):
+        stats = catalogue_db.commit(IMAGE_DIR.name, "scrape_wildlife_images", IMAGE_DIR, manifest,
+                                    failures, started_at)
+        manifest = catalogue_db.export(IMAGE_DIR.name, MANIFEST_PATH,
+                                       lambda m: json.dumps(m, indent=2, ensure_ascii=False) + "\n")
+    with metrics.stage("write_manifest"):
+        asset_runtime.write_runtime(IMAGE_DIR, manifest, category_key="group")
+    with metrics.stage("precache"):
+        precache = asset_precache.write_section(IMAGE_DIR, asset_crop.crop_files(manifest), "full")
+    return manifest, stats, precache, asset_compress.finalize(asset_compress.section_outputs(IMAGE_DIR, MANIFEST_PATH))
+
+
+def merge():
+    """Combine the --shard partial manifests into the outputs an unsharded run writes."""
+    global catalogue_db
+    load_species()
+    try:
+        manifest, failures, partials = asset_shard.merge(MANIFEST_PATH, [row[0] for row in SPECIES])
+    except ValueError as e:
+        print(f"[ERROR] Cannot merge: {e}")
+        sys.exit(1)
+    catalogue_db = asset_catalogue.Catalogue()
+    manifest, stats, precache, compression = write_outputs(
+        manifest, {record["species"]: record for record in failures})
+    previous, current, changes = species_changes()
+    if changes:
+        collect_removed(changes["removed"], previous, manifest)
+    asset_species.save_snapshot(asset_runtime.cache_path(SNAPSHOT_NAME), current)
+    for path in partials:
+        path.unlink()
+    print(f"Merged {len(partials)} shards: {len(manifest)} species in {MANIFEST_PATH}")
+    print(f"Catalogue: {asset_catalogue.describe(stats)}")
+    print(f"Precache: {asset_precache.describe(precache)}")
+    asset_compress.print_report(compression)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+import email.message
+import io
+import json
+import sys
+import urllib.parse
+import urllib.request
+import urllib.response
+from pathlib import Path
+
+import pytest
+
+# The asset scripts import each other as top-level modules
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import asset_http  # noqa: E402
+import asset_runtime  # noqa: E402
+import bench_scrapers  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Point the cache dir every script keeps its state in at tmp_path; scripts/.cache/ must not change."""
+    before = bench_scrapers.cache_state()
+    monkeypatch.setattr(asset_runtime, "CACHE_DIR", tmp_path / ".cache")
+    yield asset_runtime.CACHE_DIR
+    assert bench_scrapers.cache_state() == before
+
+
+class FakeAPI(urllib.request.BaseHandler):
+    """Answers every HTTPS request with respond(host, path, params) (bytes, else sent as JSON), and logs what was asked."""
+
+    handler_order = 100   # ahead of urllib's own HTTPSHandler
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests: list[tuple[str, str, dict]] = []
+
+    def https_open(self, req):
+        url = urllib.parse.urlsplit(req.full_url)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        self.requests.append((url.netloc, url.path, params))
+        body = self.respond(url.netloc, url.path, params)
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        response = urllib.response.addinfourl(io.BytesIO(body), email.message.Message(), req.full_url, 200)
+        response.msg = "OK"
+        return response
+
+
+@pytest.fixture
+def fake_api():
+    """fake_api(respond) routes urllib.request.urlopen() to a FakeAPI until the test ends."""
+    handlers = []
+
+    def serve(respond) -> FakeAPI:
+        handlers.append(asset_http.register_handler(FakeAPI(respond)))
+        return handlers[-1]
+
+    yield serve
+    for handler in handlers:
+        asset_http.unregister_handler(handler)
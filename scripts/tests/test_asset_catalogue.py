@@ -0,0 +1,91 @@
+"""Commit, export and reload of a manifest section (asset_catalogue.py)."""
+
+import json
+
+import pytest
+
+import asset_catalogue
+
+SECTION = "aircraft_images"
+
+
+def render(manifest: dict) -> str:
+    return json.dumps(manifest, indent=2, ensure_ascii=False)
+
+
+@pytest.fixture
+def section(tmp_path):
+    root = tmp_path / SECTION
+    (root / "commercial").mkdir(parents=True)
+    (root / "commercial" / "A330-200.jpg").write_bytes(b"a330")
+    (root / "commercial" / "A380.jpg").write_bytes(b"a380")
+    return root
+
+
+@pytest.fixture
+def cat():
+    cat = asset_catalogue.Catalogue()
+    yield cat
+    cat.close()
+
+
+MANIFEST = {
+    "A380": {"filename": "commercial/A380.jpg", "category": "commercial", "source_url": "https://x/A380",
+             "title": "Airbus A380 – Émirats"},
+    "A330-200": {"filename": "commercial/A330-200.jpg", "category": "commercial", "dedup_from": "A330"},
+}
+
+
+def test_catalogue_lives_in_the_cache_dir(cache_dir, cat):
+    assert cat.path == cache_dir / asset_catalogue.CACHE_NAME
+    assert cat.path.exists()
+
+
+def test_export_round_trips_the_manifest(section, cat):
+    stats = cat.commit(SECTION, "test", section, MANIFEST, failures={"C-5M": {"aircraft": "C-5M"}})
+    assert stats == {"added": 3, "changed": 0, "removed": 0, "missing": 0, "failed": 1, "hashed": 2}
+
+    json_path = section.parent / "image_manifest.json"
+    exported = cat.export(SECTION, json_path, render)
+    assert list(exported) == ["A380", "A330-200"]   # written order, failures left out
+    assert json_path.read_text(encoding="utf-8") == render(MANIFEST)
+    assert cat.failures(SECTION) == [{"aircraft": "C-5M"}]
+
+    # The unchanged export is read back from the catalogue...
+    assert asset_catalogue.load_manifest(section, json_path) == MANIFEST
+    # ...a hand-edited one from the JSON
+    edited = {"A380": MANIFEST["A380"]}
+    json_path.write_text(render(edited), encoding="utf-8")
+    assert asset_catalogue.load_manifest(section, json_path) == edited
+
+
+def test_recommit_counts_changes_and_reuses_hashes(section, cat):
+    cat.commit(SECTION, "test", section, MANIFEST)
+    refreshed = cat.refreshed(SECTION)
+
+    (section / "commercial" / "A380.jpg").unlink()
+    manifest = {"A380": MANIFEST["A380"], "A330-200": {**MANIFEST["A330-200"], "dedup_from": None}}
+    stats = cat.commit(SECTION, "test", section, manifest)
+    assert stats == {"added": 0, "changed": 2, "removed": 0, "missing": 1, "failed": 0, "hashed": 0}
+    assert [row["name"] for row in cat.needs_work(SECTION)] == ["A380"]
+
+    stats = cat.commit(SECTION, "test", section, {"A330-200": manifest["A330-200"]})
+    assert stats["removed"] == 1 and stats["changed"] == 0
+    assert cat.refreshed(SECTION)["A330-200"] > refreshed["A330-200"]
+
+
+def test_annotate_keeps_updated_at(section, cat):
+    cat.commit(SECTION, "test", section, MANIFEST)
+    before = cat.refreshed(SECTION)
+    crops = {"source": "ab", "card": {"box": [0, 0, 16, 9]}}
+    cat.annotate(SECTION, {"A380": {**MANIFEST["A380"], "crops": crops}})
+    assert cat.manifest(SECTION)["A380"]["crops"] == crops
+    assert cat.refreshed(SECTION) == before
+
+
+def test_load_manifest_without_a_catalogue(tmp_path, cache_dir):
+    json_path = tmp_path / "image_manifest.json"
+    assert asset_catalogue.load_manifest(tmp_path / SECTION, json_path) == {}
+    json_path.write_text(render(MANIFEST), encoding="utf-8")
+    assert asset_catalogue.load_manifest(tmp_path / SECTION, json_path) == MANIFEST
+    assert not (cache_dir / asset_catalogue.CACHE_NAME).exists()
@@ -0,0 +1,121 @@
+"""Crop file naming, carry-over across refetches, and the scrapers' plan orphans (asset_crop.py)."""
+
+import argparse
+import json
+
+import pytest
+
+import asset_crop
+import asset_negcache
+import asset_verify
+import scrape_aircraft_images
+import scrape_wildlife_images
+
+
+def crops_for(filename: str, source: str, manual: tuple[str, ...] = ()) -> dict:
+    crops = {"source": source}
+    for profile in ("card", "thumb"):
+        crops[profile] = {"box": [0, 0, 16, 9], "file": asset_crop.crop_filename(filename, profile), "size": [16, 9]}
+        if profile in manual:
+            crops[profile]["manual"] = True
+    return crops
+
+
+def write_files(root, *names):
+    for name in names:
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_bytes(b"jpeg")
+
+
+def test_crop_filename():
+    assert asset_crop.crop_filename("commercial/A330-200.jpg", "card") == "commercial/A330-200.card.jpg"
+    assert asset_crop.crop_filename("bird/canada_goose.png", "thumb") == "bird/canada_goose.thumb.jpg"
+    # Only the last suffix is replaced
+    assert asset_crop.crop_filename("commercial/DC-8-61, -71.v2.jpg", "card") == "commercial/DC-8-61, -71.v2.card.jpg"
+
+
+def test_crop_files_lists_each_image_then_its_crops():
+    manifest = {
+        "A330-200": {"filename": "commercial/A330-200.jpg", "crops": crops_for("commercial/A330-200.jpg", "ab")},
+        "C-17A": {"filename": "military/C-17A.jpg"},
+    }
+    assert list(asset_crop.crop_files(manifest)) == [
+        "commercial/A330-200.jpg", "commercial/A330-200.card.jpg", "commercial/A330-200.thumb.jpg",
+        "military/C-17A.jpg",
+    ]
+
+
+def test_carry_over_keeps_every_crop_of_an_unchanged_image(tmp_path):
+    write_files(tmp_path, "commercial/A330-200.jpg")
+    source = asset_verify.hash_file(tmp_path / "commercial/A330-200.jpg")[0][:16]
+    previous = {"A330-200": {"filename": "commercial/A330-200.jpg", "crops": crops_for("commercial/A330-200.jpg", source)}}
+    manifest = {"A330-200": {"filename": "commercial/A330-200.jpg"}}
+
+    assert asset_crop.carry_over(manifest, previous, tmp_path) == 1
+    assert manifest["A330-200"]["crops"] == previous["A330-200"]["crops"]
+
+
+def test_carry_over_keeps_only_manual_boxes_of_a_changed_image(tmp_path):
+    write_files(tmp_path, "commercial/A330-200.jpg", "commercial/A380.jpg")
+    previous = {
+        "A330-200": {"filename": "commercial/A330-200.jpg",
+                     "crops": crops_for("commercial/A330-200.jpg", "0" * 16, manual=("card",))},
+        "A380": {"filename": "commercial/A380.jpg", "crops": crops_for("commercial/A380.jpg", "0" * 16)},
+    }
+    manifest = {"A330-200": {"filename": "commercial/A330-200.jpg"}, "A380": {"filename": "commercial/A380.jpg"}}
+
+    assert asset_crop.carry_over(manifest, previous, tmp_path) == 1
+    assert manifest["A330-200"]["crops"] == {"card": {"box": [0, 0, 16, 9], "manual": True}}
+    assert "crops" not in manifest["A380"]   # auto boxes are rendered again from scratch
+
+
+def test_carry_over_leaves_rebuilt_crops_alone(tmp_path):
+    write_files(tmp_path, "commercial/A330-200.jpg")
+    previous = {"A330-200": {"filename": "commercial/A330-200.jpg", "crops": crops_for("commercial/A330-200.jpg", "ab")}}
+    manifest = {"A330-200": {"filename": "commercial/A330-200.jpg", "crops": {"source": "cd"}}}
+
+    assert asset_crop.carry_over(manifest, previous, tmp_path) == 0
+    assert manifest["A330-200"]["crops"] == {"source": "cd"}
+
+
+def orphans(plan) -> list[str]:
+    return [key for action, key, *_ in plan.actions if action == "orphan"]
+
+
+def test_aircraft_plan_orphans_skip_recorded_crops(tmp_path, monkeypatch):
+    output = tmp_path / "aircraft_images"
+    monkeypatch.setattr(scrape_aircraft_images, "OUTPUT_DIR", output)
+    monkeypatch.setattr(scrape_aircraft_images, "INCREMENTAL", True)
+    filename = "commercial/A330-200.jpg"
+    write_files(output, filename, *asset_crop.crop_files({"": {"filename": filename, "crops": crops_for(filename, "ab")}}),
+                "commercial/stray.jpg", "commercial/stray.card.jpg")
+    (output / "image_manifest.json").write_text(json.dumps(
+        {"A330-200": {"filename": filename, "category": "commercial", "crops": crops_for(filename, "ab")}}))
+
+    plan = scrape_aircraft_images.plan_all()
+    assert ("keep", "A330-200", filename) in [action[:3] for action in plan.actions]
+    assert orphans(plan) == ["commercial/stray.card.jpg", "commercial/stray.jpg"]
+
+
+@pytest.fixture
+def species():
+    scrape_wildlife_images.load_species()
+    common_name, _, group, _ = scrape_wildlife_images.SPECIES[0]
+    return common_name, f"{group}/{scrape_wildlife_images.safe_filename(common_name)}.jpg"
+
+
+def test_wildlife_plan_orphans_skip_recorded_crops(tmp_path, monkeypatch, species):
+    common_name, filename = species
+    group = filename.split("/")[0]
+    image_dir = tmp_path / "wildlife_images"
+    monkeypatch.setattr(scrape_wildlife_images, "IMAGE_DIR", image_dir)
+    monkeypatch.setattr(scrape_wildlife_images, "MANIFEST_PATH", tmp_path / "wildlife_image_manifest.json")
+    write_files(image_dir, *scrape_wildlife_images.image_files(filename), f"{group}/stray.jpg", f"{group}/stray.thumb.jpg")
+    (tmp_path / "wildlife_image_manifest.json").write_text(json.dumps(
+        {common_name: {"filename": filename, "group": group, "crops": crops_for(filename, "ab")}}))
+
+    args = argparse.Namespace(shard=None, failure_ttl=asset_negcache.DEFAULT_TTL_DAYS, retry_failures=False,
+                              stale_days=None, budget=None)
+    plan = scrape_wildlife_images.plan(args)
+    assert ("keep", common_name, filename) in [action[:3] for action in plan.actions]
+    assert orphans(plan) == [f"{group}/stray.jpg", f"{group}/stray.thumb.jpg"]
@@ -0,0 +1,91 @@
+"""Round trip of the silhouette geometry blob (asset_geometry.py)."""
+
+import math
+
+import pytest
+
+import asset_geometry
+
+SQUARE = [[(2, 4), (12, 4), (12, 8), (2, 8), (2, 4)]]
+WING = [[(0.0, 0.0), (31.3, 2.7), (64.1, 0.5), (40.0, 12.25), (7.5, 9.9)],
+        [(20.0, 3.0), (24.0, 3.0), (22.0, 6.0)]]
+
+
+def index_entries(blob: bytes) -> list[tuple]:
+    count = asset_geometry.HEADER.unpack_from(blob, 0)[2]
+    return [asset_geometry.INDEX.unpack_from(blob, asset_geometry.HEADER.size + asset_geometry.INDEX.size * i)
+            for i in range(count)]
+
+
+def test_decode_inverts_encode():
+    shapes = {"c130": SQUARE, "wing": WING}
+    blob = asset_geometry.encode(shapes)
+    decoded = asset_geometry.decode(blob)
+    assert list(decoded) == ["c130", "wing"]
+
+    assert asset_geometry.verify(blob, shapes) < 0.5 / asset_geometry.GRID
+    for shape_id, lines in shapes.items():
+        _, _, step, _ = asset_geometry.quantize(lines)
+        assert len(decoded[shape_id]) == len(lines)
+        for ring, line in zip(decoded[shape_id], lines):
+            source = line[:-1] if line[0] == line[-1] else line
+            assert len(ring) == len(source)
+            for (x, y), (sx, sy) in zip(ring, source):
+                assert math.isclose(x, sx, abs_tol=step / 2) and math.isclose(y, sy, abs_tol=step / 2)
+
+
+def test_lattice_is_exact():
+    # A grid that divides the shape evenly: every point lands on the lattice
+    blob = asset_geometry.encode({"c130": SQUARE}, grid=10)
+    rings, frame = asset_geometry.decode(blob, quantized=True)["c130"]
+    assert frame == (2.0, 4.0, 1.0)
+    assert rings == [[(0, 0), (10, 0), (10, 4), (0, 4)]]
+    assert asset_geometry.decode(blob)["c130"] == [[(2.0, 4.0), (12.0, 4.0), (12.0, 8.0), (2.0, 8.0)]]
+    assert asset_geometry.encode({"c130": SQUARE}, grid=10) == blob
+
+
+def test_identical_shapes_share_data():
+    distinct = asset_geometry.encode({"c130": SQUARE, "wing": WING})
+    shared = asset_geometry.encode({"c130": SQUARE, "c130j": [list(SQUARE[0])], "wing": WING})
+    c130, c130j, wing = index_entries(shared)
+    assert c130 == c130j              # same frame, same data offset
+    assert wing[3] > c130[3]
+    data_words = lambda blob: asset_geometry.HEADER.unpack_from(blob, 0)[5]
+    assert data_words(shared) == data_words(distinct)
+    decoded = asset_geometry.decode(shared)
+    assert decoded["c130"] == decoded["c130j"]
+
+
+def test_lod_tiers_ride_along():
+    shapes, meta = asset_geometry.lod_shapes({"wing": WING})
+    assert list(shapes) == ["wing", "wing@coarse", "wing@medium"]
+    assert meta["wing"]["coarse"]["max_px"] == 24
+    assert "max_px" not in meta["wing"]["full"]
+    blob = asset_geometry.encode(shapes)
+    assert list(asset_geometry.decode(blob)) == list(shapes)
+    assert asset_geometry.verify(blob, shapes) < 0.5 / asset_geometry.GRID
+
+
+def test_rejects_other_files():
+    blob = bytearray(asset_geometry.encode({"c130": SQUARE}))
+    blob[:4] = b"SLG2"
+    with pytest.raises(ValueError):
+        asset_geometry.decode(bytes(blob))
+
+
+def test_cache_requantizes_only_new_polylines():
+    cache = {}
+    shapes = {"c130": SQUARE, "wing": WING}
+    blob = asset_geometry.encode(shapes, cache=cache)
+    assert set(cache) == {"c130", "wing"}
+    kept = cache["c130"]
+
+    edited = {"c130": SQUARE, "wing": [WING[0]]}
+    updated = asset_geometry.encode(edited, cache=cache)
+    assert cache["c130"] is kept and cache["wing"][0] is edited["wing"]
+    assert updated == asset_geometry.encode(edited) != blob
+    assert asset_geometry.verify(updated, edited, only={"wing"}) < 0.5 / asset_geometry.GRID
+    assert list(asset_geometry.decode(updated, only={"wing"})) == ["wing"]
+
+    asset_geometry.encode({"wing": WING}, cache=cache)
+    assert set(cache) == {"wing"}
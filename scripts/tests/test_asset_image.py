@@ -0,0 +1,91 @@
+"""What the download validation stage accepts and rejects (asset_image.py)."""
+
+import io
+
+import pytest
+
+import asset_image
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")   # builds the payloads; the checks also run without it
+
+
+def encode(fmt: str, width: int = 320, height: int = 240, blank: bool = False, **params) -> bytes:
+    """Noise, so every payload clears MIN_BYTES; a blank one only varies by a level or two."""
+    low, high = (127, 130) if blank else (0, 256)
+    pixels = np.random.default_rng(0).integers(low, high, (height, width, 3), np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, fmt, **params)
+    return out.getvalue()
+
+
+@pytest.fixture(params=[True, False], ids=["pillow", "structure-only"])
+def pillow(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(asset_image, "Image", None)
+    return request.param
+
+
+@pytest.mark.parametrize("fmt, ext", [("JPEG", ".jpg"), ("PNG", ".png")])
+def test_accepts_a_whole_image(pillow, fmt, ext):
+    assert asset_image.inspect(encode(fmt)) == (ext, 320, 240, None, False)
+
+
+def test_accepts_an_interlaced_png(pillow):
+    assert asset_image.inspect(encode("PNG", optimize=False, interlace=1)).error is None
+
+
+def test_magic_bytes_decide_the_extension():
+    assert asset_image.sniff(encode("PNG")) == ".png"
+    assert asset_image.sniff(encode("GIF")) == ".gif"
+    assert asset_image.sniff(b"RIFF\0\0\0\0WEBPVP8 ") == ".webp"
+    assert asset_image.sniff(b"\xff\xd8\xff\xe0") == ".jpg"
+
+
+@pytest.mark.parametrize("payload, error", [
+    (b"<!DOCTYPE html><html><body>" + b"x" * 2048, "HTML page, not an image"),
+    (b'<?xml version="1.0"?><svg xmlns="http://www.w3.org/2000/svg">' + b" " * 2048, "SVG, not a raster image"),
+    (b"\0" * 2048, "unrecognised format (starts 0000000000000000)"),
+    (b"\xff\xd8\xff" + b"\0" * 100, "tiny (103 bytes)"),
+])
+def test_rejects_what_is_not_an_image(payload, error):
+    assert asset_image.inspect(payload).error == error
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+def test_truncation_is_transient(pillow, fmt):
+    data = encode(fmt)
+    verdict = asset_image.inspect(data[:len(data) * 2 // 3])
+    assert verdict.error.startswith("truncated: ") and verdict.transient
+
+
+def test_rejects_a_png_with_a_bad_crc(pillow):
+    data = bytearray(encode("PNG"))
+    data[40] ^= 0xFF   # inside the first IDAT chunk
+    verdict = asset_image.inspect(bytes(data))
+    assert verdict.error.startswith("corrupt: CRC mismatch") and not verdict.transient
+
+
+def test_rejects_a_blank_image():
+    verdict = asset_image.inspect(encode("PNG", blank=True))
+    assert verdict.error.startswith("blank (greyscale stddev 0.")
+
+
+def test_blank_check_needs_pillow(monkeypatch):
+    monkeypatch.setattr(asset_image, "Image", None)
+    assert asset_image.inspect(encode("PNG", blank=True)).error is None
+
+
+@pytest.mark.parametrize("width, height, error", [
+    (400, 100, "tiny (400x100)"),
+    (1000, 200, "skewed (1000x200)"),
+])
+def test_rejects_bad_geometry(pillow, width, height, error):
+    assert asset_image.inspect(encode("JPEG", width, height)).error == error
+
+
+def test_validate_limits_the_extensions(monkeypatch):
+    monkeypatch.setattr(asset_image, "WORKERS", 1)   # inline, no pool
+    gif = encode("GIF")
+    assert asset_image.validate(gif).error == ".gif image, expected .jpg or .png"
+    assert asset_image.validate(gif, accept=(".gif",)).error is None
@@ -0,0 +1,89 @@
+"""Taxon ID resolution, batched photo fetches and the ID cache (asset_inat.py)."""
+
+import json
+
+import pytest
+
+import asset_inat
+
+API = "https://inat.test/v1"
+TAXA = {   # the fake iNaturalist: id -> taxon
+    1: {"id": 1, "name": "Branta canadensis", "default_photo": {"medium_url": "https://x/1.jpg"}},
+    2: {"id": 2, "name": "Cygnus olor", "default_photo": {"medium_url": "https://x/2.jpg"}},
+    3: {"id": 3, "name": "Quiscalus major", "default_photo": {"medium_url": "https://x/3.jpg"}},
+    4: {"id": 4, "name": "Anser caerulescens", "default_photo": None},
+}
+
+
+def respond(host, path, params):
+    if path == "/v1/taxa":   # search
+        return {"results": [t for t in TAXA.values() if params["q"].lower().startswith(t["name"].lower())]}
+    ids = map(int, path.rsplit("/", 1)[1].split(","))
+    return {"results": [TAXA[i] for i in ids if i in TAXA]}
+
+
+@pytest.fixture
+def api(fake_api):
+    return fake_api(respond)
+
+
+def write_cache(path, taxa: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": asset_inat.CACHE_VERSION, "taxa": taxa}))
+
+
+def test_match_takes_the_species_of_a_subspecies():
+    results = [TAXA[4], TAXA[1]]
+    assert asset_inat.match(results, "Branta canadensis maxima") is TAXA[1]
+    assert asset_inat.match(results, "Anser caerulescens") is None   # no photo
+    assert asset_inat.match(results, "Branta") is None
+
+
+def test_search_once_then_cache_the_id(api, cache_dir):
+    taxa = asset_inat.Taxa("test", api=API)
+    assert taxa.path == cache_dir / asset_inat.CACHE_NAME
+    assert taxa.lookup("Branta canadensis") == TAXA[1]
+    assert taxa.lookup("Branta canadensis") == TAXA[1]   # this run's photo data, no request
+    assert taxa.lookup("Cygnus olor columbianus") == TAXA[2]
+    assert taxa.lookup("Nothing here") is None
+    assert taxa.requests == {"search": 3, "batch": 0}
+    taxa.save()
+
+    assert json.loads(taxa.path.read_text()) == {
+        "version": 1, "taxa": {"Branta canadensis": 1, "Cygnus olor columbianus": 2}}
+    assert asset_inat.Taxa("test", api=API).ids == {"Branta canadensis": 1, "Cygnus olor columbianus": 2}
+
+
+def test_cached_ids_are_fetched_in_batches(api, cache_dir, monkeypatch):
+    monkeypatch.setattr(asset_inat, "BATCH_SIZE", 2)
+    write_cache(cache_dir / asset_inat.CACHE_NAME, {"Branta canadensis": 1, "Cygnus olor": 2, "Quiscalus major": 3})
+    taxa = asset_inat.Taxa("test", api=API)
+    taxa.queue(["Branta canadensis", "Unresolved", "Cygnus olor", "Quiscalus major", "Cygnus olor"])
+
+    assert taxa.lookup("Branta canadensis") == TAXA[1]
+    assert api.requests[-1][1] == "/v1/taxa/1,2"   # the next resolved species rides along
+    assert taxa.lookup("Cygnus olor") == TAXA[2]
+    assert taxa.lookup("Quiscalus major") == TAXA[3]
+    assert api.requests[-1][1] == "/v1/taxa/3"
+    assert taxa.requests == {"search": 0, "batch": 2}
+
+
+def test_an_id_that_stopped_resolving_is_searched_again(api, cache_dir):
+    write_cache(cache_dir / asset_inat.CACHE_NAME, {"Branta canadensis": 99, "Anser caerulescens": 4})
+    taxa = asset_inat.Taxa("test", api=API)
+    taxa.queue(["Branta canadensis", "Anser caerulescens"])
+
+    assert taxa.lookup("Branta canadensis") is None   # 99 is gone
+    assert taxa.lookup("Anser caerulescens") is None   # 4 has no photo any more
+    assert taxa.requests == {"search": 0, "batch": 1}
+    taxa.save()
+    assert json.loads(taxa.path.read_text())["taxa"] == {}
+
+
+def test_unreadable_or_old_caches_start_empty(api, cache_dir):
+    path = cache_dir / asset_inat.CACHE_NAME
+    path.parent.mkdir(parents=True)
+    path.write_text("{not json")
+    assert asset_inat.Taxa("test", api=API).ids == {}
+    path.write_text(json.dumps({"version": 0, "taxa": {"Branta canadensis": 1}}))
+    assert asset_inat.Taxa("test", api=API).ids == {}
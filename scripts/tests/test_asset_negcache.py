@@ -0,0 +1,90 @@
+"""TTL expiry, fingerprint resets and persistence of the failure cache (asset_negcache.py)."""
+
+import json
+import types
+
+import pytest
+
+import asset_negcache
+from asset_negcache import NegativeCache, fingerprint
+
+DAY = 86400
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """asset_negcache's time.time(), moved by hand."""
+    now = types.SimpleNamespace(value=1_700_000_000.0)
+    monkeypatch.setattr(asset_negcache, "time", types.SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def failed(path, ttl_days=7.0, retry=False) -> NegativeCache:
+    cache = NegativeCache(path, ttl_days, retry)
+    cache.begin("Mute Swan", fingerprint("Mute Swan", "Cygnus olor"))
+    cache.fail("Mute Swan", "commons", "Cygnus olor")
+    return cache
+
+
+def test_a_miss_is_skipped_until_the_ttl_runs_out(tmp_path, clock):
+    cache = failed(tmp_path / "failures.json", ttl_days=2)
+    assert cache.skip("Mute Swan", "commons", "Cygnus olor")
+    assert not cache.skip("Mute Swan", "inat", "Cygnus olor")
+
+    clock.value += 2 * DAY - 1
+    assert cache.skip("Mute Swan", "commons", "Cygnus olor")
+    clock.value += 1
+    assert not cache.skip("Mute Swan", "commons", "Cygnus olor")
+    assert cache.skipped == 2
+
+
+def test_prune_drops_expired_records_and_gone_entries(tmp_path, clock):
+    cache = failed(tmp_path / "failures.json", ttl_days=1)
+    cache.begin("Canada Goose", "fp")
+    cache.fail("Canada Goose", "usfws", "1489")
+    clock.value += DAY / 2
+    cache.fail("Mute Swan", "inat", "Cygnus olor")
+
+    clock.value += DAY / 2
+    cache.prune(["Mute Swan"])
+    assert cache.entries == {"Mute Swan": {"fingerprint": fingerprint("Mute Swan", "Cygnus olor"),
+                                           "failures": {"inat:Cygnus olor": round(clock.value - DAY / 2)}}}
+    clock.value += DAY / 2
+    cache.prune(["Mute Swan"])
+    assert cache.entries == {}
+
+
+def test_changed_inputs_and_success_forget_the_misses(tmp_path, clock):
+    cache = failed(tmp_path / "failures.json")
+    cache.begin("Mute Swan", fingerprint("Mute Swan", "Cygnus olor", 42))
+    assert not cache.known("Mute Swan", "commons", "Cygnus olor")
+
+    cache = failed(tmp_path / "failures.json")
+    cache.succeed("Mute Swan")
+    assert cache.entries == {}
+
+
+def test_retry_records_but_never_skips(tmp_path, clock):
+    cache = failed(tmp_path / "failures.json", retry=True)
+    assert cache.known("Mute Swan", "commons", "Cygnus olor")
+    assert not cache.skip("Mute Swan", "commons", "Cygnus olor")
+
+
+def test_save_and_reload(tmp_path, clock):
+    path = tmp_path / "failures.json"
+    failed(path).save()
+    assert json.loads(path.read_text()) == {"version": 1, "entries": {"Mute Swan": {
+        "fingerprint": fingerprint("Mute Swan", "Cygnus olor"), "failures": {"commons:Cygnus olor": 1_700_000_000}}}}
+
+    clock.value += 6 * DAY
+    assert NegativeCache(path).skip("Mute Swan", "commons", "Cygnus olor")
+    assert not NegativeCache(path, ttl_days=5).skip("Mute Swan", "commons", "Cygnus olor")
+
+    path.write_text("{broken")
+    assert NegativeCache(path).entries == {}
+
+
+def test_fingerprint_is_stable_and_order_sensitive():
+    assert fingerprint(["a", "b"], 3) == fingerprint(["a", "b"], 3)
+    assert fingerprint(["a", "b"], 3) != fingerprint(["b", "a"], 3)
+    assert len(fingerprint("x")) == 16
@@ -0,0 +1,127 @@
+"""Stage order, retries and the single committer of the scraper pipeline (asset_pipeline.py)."""
+
+import io
+import threading
+
+import pytest
+
+import asset_image
+import asset_pipeline
+from asset_pipeline import Job, Lookup, Pipeline
+
+Image = pytest.importorskip("PIL.Image")
+np = pytest.importorskip("numpy")
+
+
+def jpeg() -> bytes:
+    out = io.BytesIO()
+    Image.fromarray(np.random.default_rng(0).integers(0, 256, (240, 320, 3), np.uint8)).save(out, "JPEG")
+    return out.getvalue()
+
+
+DOWNLOADS = {
+    "/good.jpg": jpeg(),
+    "/html.jpg": b"<!DOCTYPE html><html>" + b" " * 2048,
+    "/cut.jpg": jpeg()[:3000],
+}
+
+
+@pytest.fixture
+def downloads(fake_api, monkeypatch):
+    monkeypatch.setattr(asset_image, "WORKERS", 1)   # validate inline, no process pool
+    return fake_api(lambda host, path, params: DOWNLOADS[path])
+
+
+def candidate(name: str, **reported) -> dict:
+    return {"url": f"https://upload.test/{name}", **reported}
+
+
+def lookup(source: str, *candidates, error: Exception | None = None) -> Lookup:
+    def find():
+        if error is not None:
+            raise error
+        return list(candidates)
+    return Lookup("Mute Swan", source, "Cygnus olor", find)
+
+
+def run(jobs, **options) -> list[Job]:
+    committed = []
+    with Pipeline(committed.append, user_agent="test", **options) as pipeline:
+        for job in jobs:
+            pipeline.submit(job)
+    return committed
+
+
+def test_a_job_walks_the_stages_to_its_first_good_image(downloads):
+    failing = lookup("usfws", error=OSError("timed out"))
+    found = lookup("commons", candidate("sound.ogg", mime="audio/ogg"), candidate("icon.png", width=64, height=64),
+                   candidate("html.jpg"), candidate("good.jpg"), candidate("never.jpg"))
+    unused = lookup("inat", candidate("never.jpg"))
+    [job] = run([Job("Mute Swan", [failing, found, unused])])
+
+    assert job.lookup is found and job.candidate["url"].endswith("/good.jpg")
+    assert job.verdict.ext == ".jpg" and job.data is None   # released after commit
+    assert job.outcomes == [(failing, "error")]
+    assert list(job.lookups) == [unused]
+    assert [path for _, path, _ in downloads.requests] == ["/html.jpg", "/good.jpg"]
+    assert job.log == [
+        "    usfws: 'Cygnus olor'",
+        "    ! usfws lookup failed: timed out",
+        "    commons: 'Cygnus olor'",
+        "    ! Skipped sound.ogg: not an image (audio/ogg)",
+        "    ! Skipped icon.png: 64x64 is too small",
+        "    ! Rejected html.jpg: HTML page, not an image",
+    ]
+
+
+def test_a_job_with_nothing_found_commits_without_an_image(downloads):
+    empty = lookup("wikidata")
+    cut = lookup("commons", candidate("cut.jpg"))
+    [job] = run([Job("Mute Swan", [empty, cut])])
+    assert job.candidate is None and job.lookup is None
+    # A truncated download is worth another try next run; an empty lookup is not
+    assert job.outcomes == [(empty, "miss"), (cut, "error")]
+
+
+def test_every_job_is_committed_once_by_one_thread(downloads):
+    threads = set()
+    committed = []
+
+    def commit(job):
+        threads.add(threading.current_thread().name)
+        committed.append(job.key)
+
+    keys = [f"job {i}" for i in range(20)]
+    with Pipeline(commit, user_agent="test", workers=3, in_flight=4) as pipeline:
+        for key in keys:
+            pipeline.submit(Job(key, [lookup("commons", candidate("good.jpg"))]))
+    assert sorted(committed) == sorted(keys)
+    assert threads == {"commit-0"}
+    assert pipeline.downloads == 20
+
+
+def test_exhausted_budget_defers_jobs_not_started(downloads):
+    [job] = run([Job("Mute Swan", [lookup("commons", candidate("good.jpg"))])], exhausted=lambda: True)
+    assert job.deferred and job.candidate is None and job.outcomes == []
+    assert downloads.requests == []
+
+
+def test_dry_run_stops_before_the_download(downloads):
+    [job] = run([Job("Mute Swan", [lookup("commons", candidate("good.jpg"))])], dry_run=True)
+    assert job.candidate["url"].endswith("/good.jpg") and job.verdict is None
+    assert downloads.requests == []
+
+
+def test_a_commit_error_is_raised_from_the_block(downloads):
+    def commit(job):
+        raise RuntimeError(f"disk full writing {job.key}")
+
+    with pytest.raises(RuntimeError, match="disk full writing Mute Swan"):
+        with Pipeline(commit, user_agent="test") as pipeline:
+            pipeline.submit(Job("Mute Swan", [lookup("commons", candidate("good.jpg"))]))
+
+
+def test_implausible():
+    assert asset_pipeline.implausible({"mime": "image/svg+xml", "width": 2000, "height": 1000}) is None
+    assert asset_pipeline.implausible({"width": 1000, "height": 200}) == "1000x200 is too elongated"
+    assert asset_pipeline.implausible({"url": "x"}) is None   # nothing reported: download and see
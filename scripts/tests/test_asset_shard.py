@@ -0,0 +1,96 @@
+"""Shard assignment, partial manifests and their merge (asset_shard.py)."""
+
+import argparse
+import json
+
+import pytest
+
+import asset_shard
+from asset_shard import Shard
+
+CATALOGUE = [f"Species {i:02d}" for i in range(40)]
+
+
+def write_shards(manifest_path, count, catalogue=CATALOGUE, key=str):
+    """A partial per shard, each listing its keys in reverse so the merge has to reorder them."""
+    paths = []
+    for index in range(1, count + 1):
+        shard = Shard(index, count)
+        owned = [name for name in reversed(catalogue) if shard.owns(key(name))]
+        entries = {name: {"filename": f"{name}.jpg"} for name in owned if not name.endswith("7")}
+        records = [(name, {"name": name, "status": "failed"}) for name in owned if name.endswith("7")]
+        paths.append(asset_shard.write_partial(manifest_path, shard, catalogue, entries, records))
+    return paths
+
+
+def test_shards_partition_the_catalogue():
+    owners = [[index for index in (1, 2, 3) if Shard(index, 3).owns(name)] for name in CATALOGUE]
+    assert all(len(found) == 1 for found in owners)
+    assert {found[0] for found in owners} == {1, 2, 3}
+    assert asset_shard.shard_of("Mute Swan", 4) == asset_shard.shard_of("Mute Swan", 4)
+
+
+def test_parse_shard():
+    assert asset_shard.parse_shard(" 2 / 5 ") == Shard(2, 5)
+    assert str(Shard(2, 5)) == "2/5"
+    for text in ("0/3", "4/3", "1-3", "x"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            asset_shard.parse_shard(text)
+
+
+def test_partial_file_format(tmp_path):
+    path = asset_shard.write_partial(tmp_path / "manifest.json", Shard(1, 2), ["a", "b"],
+                                     {"b": {"filename": "b.jpg"}}, [("a", {"status": "failed"})])
+    assert path.name == "manifest.shard-1-of-2.json"
+    assert json.loads(path.read_text()) == {"shard": [1, 2], "catalogue": asset_shard.catalogue_fingerprint(["a", "b"]),
+                                            "entries": {"b": {"filename": "b.jpg"}},
+                                            "records": [["a", {"status": "failed"}]]}
+
+
+@pytest.mark.parametrize("count", [1, 2, 5])
+def test_merge_is_in_catalogue_order_whatever_the_count(tmp_path, count):
+    manifest_path = tmp_path / "manifest.json"
+    paths = write_shards(manifest_path, count)
+    entries, records, merged = asset_shard.merge(manifest_path, CATALOGUE)
+    assert list(entries) == [name for name in CATALOGUE if not name.endswith("7")]
+    assert [record["name"] for record in records] == ["Species 07", "Species 17", "Species 27", "Species 37"]
+    assert merged == sorted(paths)
+
+
+def test_merge_by_shard_key(tmp_path):
+    groups = {name: f"group {i % 3}" for i, name in enumerate(CATALOGUE)}
+    write_shards(tmp_path / "manifest.json", 3, key=groups.__getitem__)
+    entries, _, _ = asset_shard.merge(tmp_path / "manifest.json", CATALOGUE, shard_key=groups.__getitem__)
+    assert len(entries) == 36
+    with pytest.raises(ValueError, match="which it does not own"):
+        asset_shard.merge(tmp_path / "manifest.json", CATALOGUE)
+
+
+def test_merge_refuses_an_incomplete_or_mixed_set(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    with pytest.raises(ValueError, match="no partial manifests"):
+        asset_shard.merge(manifest_path, CATALOGUE)
+
+    paths = write_shards(manifest_path, 3)
+    paths[1].unlink()
+    with pytest.raises(ValueError, match=r"missing shard\(s\) 2/3"):
+        asset_shard.merge(manifest_path, CATALOGUE)
+
+    write_shards(manifest_path, 2)
+    with pytest.raises(ValueError, match=r"different shard counts: \[2, 3\]"):
+        asset_shard.merge(manifest_path, CATALOGUE)
+
+
+def test_merge_refuses_another_catalogue_or_a_foreign_key(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    write_shards(manifest_path, 2)
+    with pytest.raises(ValueError, match=r"shard\(s\) 1/2, 2/2 were built from a different catalogue"):
+        asset_shard.merge(manifest_path, CATALOGUE + ["Species 40"])
+
+    path = asset_shard.partial_path(manifest_path, Shard(1, 2))
+    data = json.loads(path.read_text())
+    stranger = next(name for name in CATALOGUE if not Shard(1, 2).owns(name))
+    data["entries"][stranger] = {"filename": "x.jpg"}
+    path.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match=f"shard 1/2 holds '{stranger}', which it does not own"):
+        asset_shard.merge(manifest_path, CATALOGUE)
@@ -0,0 +1,118 @@
+"""Bulk title -> item -> P18 resolution and the item cache (asset_wikidata.py)."""
+
+import json
+
+import pytest
+
+import asset_wikidata
+
+REDIRECTS = {"Falco sparverius": "American kestrel"}
+PAGES = {"American kestrel": "Q1", "Mute swan": "Q2", "Airbus A330": "Q3"}
+CLAIMS = {   # item -> (P18, P373)
+    "Q1": ("Kestrel.jpg", "Falco sparverius"),
+    "Q2": ("Swan.jpg", None),
+    "Q3": (None, "Airbus A330"),
+}
+CATEGORY = {"Category:Falco sparverius": ["File:Kestrel.jpg", "File:Kestrel 2.jpg", "File:Kestrel call.ogg"]}
+
+
+def statement(value, rank="normal"):
+    return {"rank": rank, "mainsnak": {"datavalue": {"value": value}}}
+
+
+def imageinfo(title):
+    mime = "audio/ogg" if title.endswith(".ogg") else "image/jpeg"
+    return {"title": title, "imageinfo": [{"thumburl": f"https://upload.test/{title[5:]}", "mime": mime,
+                                           "thumbwidth": 800, "thumbheight": 600, "descriptionurl": "",
+                                           "extmetadata": {"LicenseShortName": {"value": "CC BY-SA 4.0"}}}]}
+
+
+def respond(host, path, params):
+    if host == "en.wikipedia.org":
+        titles = params["titles"].split("|")
+        redirects = [{"from": t, "to": REDIRECTS[t]} for t in titles if t in REDIRECTS]
+        pages = {}
+        for i, title in enumerate(REDIRECTS.get(t, t) for t in titles):
+            pages[str(i)] = {"title": title, "pageprops": {"wikibase_item": PAGES[title]}} if title in PAGES \
+                else {"title": title, "missing": ""}
+        return {"query": {"redirects": redirects, "pages": pages}}
+    if host == "www.wikidata.org":
+        entities = {}
+        for qid in params["ids"].split("|"):
+            if qid not in CLAIMS:
+                entities[qid] = {"id": qid, "missing": ""}
+                continue
+            image, category = CLAIMS[qid]
+            claims = {"P18": [statement(image)] if image else []}
+            if category:
+                claims["P373"] = [statement("Deprecated", "deprecated"), statement(category)]
+            entities[qid] = {"id": qid, "claims": claims}
+        return {"entities": entities}
+    if params.get("generator") == "categorymembers":
+        return {"query": {"pages": {str(i): imageinfo(t) for i, t in enumerate(CATEGORY[params["gcmtitle"]])}}}
+    return {"query": {"pages": {str(i): imageinfo(t) for i, t in enumerate(params["titles"].split("|"))}}}
+
+
+@pytest.fixture
+def api(fake_api):
+    return fake_api(respond)
+
+
+def test_prefetch_resolves_every_title_in_three_requests(api, cache_dir):
+    resolver = asset_wikidata.Resolver("test", 800)
+    assert resolver.path == cache_dir / asset_wikidata.CACHE_NAME
+    titles = ["Falco sparverius", "Mute swan", "Airbus A330", "No such page", "Mute swan"]
+    assert resolver.prefetch(titles) == 3
+    assert resolver.requests == {"resolve": 1, "claims": 1, "images": 1, "category": 0}
+
+    kestrel = resolver.entity("Falco sparverius")
+    assert {k: kestrel[k] for k in ("item", "file", "category")} == \
+        {"item": "Q1", "file": "Kestrel.jpg", "category": "Falco sparverius"}   # deprecated P373 skipped
+    assert kestrel["image"]["url"] == "https://upload.test/Kestrel.jpg"
+    assert kestrel["image"]["license"] == "CC BY-SA 4.0"
+    assert resolver.entity("Airbus A330")["image"] is None
+    assert resolver.known("No such page") and resolver.entity("No such page") is None
+
+    resolver.save()
+    assert json.loads(resolver.path.read_text()) == {
+        "version": 1, "items": {"Airbus A330": "Q3", "Falco sparverius": "Q1", "Mute swan": "Q2"}}
+
+
+def test_cached_items_skip_the_resolve_pass(api):
+    first = asset_wikidata.Resolver("test", 800)
+    first.prefetch(["Falco sparverius", "Mute swan"])
+    first.save()
+
+    again = asset_wikidata.Resolver("test", 800)
+    assert again.prefetch(["Falco sparverius", "Mute swan"]) == 2
+    assert again.requests == {"resolve": 0, "claims": 1, "images": 1, "category": 0}
+    assert again.prefetch(["Mute swan"]) == 0   # already answered this run
+    assert again.requests["claims"] == 1
+
+
+def test_titles_are_batched(api):
+    resolver = asset_wikidata.Resolver("test", 800)
+    titles = [f"Page {i}" for i in range(2 * asset_wikidata.BATCH_SIZE)] + ["Falco sparverius", "Mute swan"]
+    assert resolver.prefetch(titles) == 2
+    assert resolver.requests == {"resolve": 3, "claims": 1, "images": 1, "category": 0}
+    asked = [params["titles"].split("|") for host, _, params in api.requests if host == "en.wikipedia.org"]
+    assert [len(batch) for batch in asked] == [asset_wikidata.BATCH_SIZE, asset_wikidata.BATCH_SIZE, 2]
+    assert sum(asked, []) == titles
+
+
+def test_a_deleted_item_is_resolved_again_next_run(api, cache_dir):
+    cache = cache_dir / asset_wikidata.CACHE_NAME
+    cache.parent.mkdir(parents=True)
+    cache.write_text(json.dumps({"version": 1, "items": {"Mute swan": "Q404"}}))
+    resolver = asset_wikidata.Resolver("test", 800)
+    assert resolver.prefetch(["Mute swan"]) == 0
+    assert resolver.known("Mute swan") and resolver.items == {}
+
+
+def test_candidates_are_p18_then_the_category(api):
+    resolver = asset_wikidata.Resolver("test", 800)
+    resolver.prefetch(["Falco sparverius", "Mute swan"])
+    assert [c["title"] for c in resolver.candidates("Falco sparverius")] == ["File:Kestrel.jpg", "File:Kestrel 2.jpg"]
+    assert [c["title"] for c in resolver.candidates("Mute swan")] == ["File:Swan.jpg"]
+    assert list(resolver.candidates("Not prefetched")) == []
+    assert resolver.requests["category"] == 1
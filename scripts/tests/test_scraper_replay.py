@@ -0,0 +1,94 @@
+"""
+Replay smoke test for both image scrapers.
+
+fixtures/scrapers.zip is a tiny archive in asset_fixtures' format: the API
+responses and images for four aircraft and three species, in the shapes the
+Wikimedia, Wikidata and USFWS endpoints return. Each scraper runs on that
+slice of its catalogue against an asset_fixtures.ReplayServer, with every
+output and cache under tmp_path, and the manifests are checked entry by entry.
+"""
+
+import importlib
+import json
+from pathlib import Path
+
+import pytest
+
+import asset_fixtures
+import asset_http
+
+ARCHIVE = Path(__file__).resolve().parent / "fixtures" / "scrapers.zip"
+
+AIRCRAFT = ["A330-200", "A380-843F, -863F", "DC-8-61, -71", "DC-8-61F, -71F"]
+SPECIES = ["Canada Goose", "Boat-tailed Grackle", "Mute Swan"]
+
+
+@pytest.fixture
+def replay():
+    server = asset_fixtures.ReplayServer(asset_fixtures.FixtureArchive.load(ARCHIVE))
+    server.start_background()
+    handler = asset_http.register_handler(asset_fixtures.ReplayRedirectHandler(server.base_url))
+    try:
+        yield server
+    finally:
+        asset_http.unregister_handler(handler)
+        server.shutdown()
+
+
+@pytest.fixture
+def state(tmp_path):
+    """Outputs under tmp_path; conftest's cache_dir keeps the caches there too."""
+    return tmp_path
+
+
+def test_aircraft_manifest(replay, state, monkeypatch):
+    scraper = importlib.import_module("scrape_aircraft_images")
+    rows = [row for row in scraper.AIRCRAFT_DATABASE if row[0] in AIRCRAFT]
+    assert [row[0] for row in rows] == AIRCRAFT
+    monkeypatch.setattr(scraper, "AIRCRAFT_DATABASE", rows)
+    monkeypatch.setattr(scraper, "OUTPUT_DIR", state / "aircraft_images")
+    monkeypatch.setattr(scraper, "DELAY_SECONDS", 0)
+
+    scraper.scrape_all()
+
+    manifest = json.loads((state / "aircraft_images" / "image_manifest.json").read_text())
+    assert list(manifest) == AIRCRAFT
+    assert manifest["A330-200"]["license"] == "CC0"                  # Wikidata P18
+    assert manifest["A380-843F, -863F"]["license"] == "CC BY"        # Commons search fallback
+    assert manifest["DC-8-61F, -71F"]["dedup_from"] == "DC-8-61, -71"
+    assert manifest["DC-8-61F, -71F"]["source_url"] == manifest["DC-8-61, -71"]["source_url"]
+    for entry in manifest.values():
+        assert entry["category"] == "commercial"
+        assert (state / "aircraft_images" / entry["filename"]).stat().st_size > 0
+    assert json.loads((state / "aircraft_images" / "failures.json").read_text()) == []
+    assert replay.stats.snapshot()["misses"] == 0
+
+
+def test_wildlife_manifest(replay, state, monkeypatch):
+    scraper = importlib.import_module("scrape_wildlife_images")
+    scraper.load_species()
+    species = [s for s in scraper.SPECIES_DATA["species"] if s["common_name"] in SPECIES]
+    assert len(species) == len(SPECIES)
+    monkeypatch.setattr(scraper, "SPECIES_DATA", {**scraper.SPECIES_DATA, "species": species})
+    monkeypatch.setattr(scraper, "SPECIES", [row for row in scraper.SPECIES if row[0] in SPECIES])
+    monkeypatch.setattr(scraper, "PUBLIC_DIR", state)
+    monkeypatch.setattr(scraper, "IMAGE_DIR", state / "wildlife_images")
+    monkeypatch.setattr(scraper, "MANIFEST_PATH", state / "wildlife_image_manifest.json")
+    monkeypatch.setattr(scraper, "DELAY_SECONDS", 0)
+
+    scraper.main([])
+
+    manifest = json.loads((state / "wildlife_image_manifest.json").read_text())
+    assert list(manifest) == [row[0] for row in scraper.SPECIES]
+    assert manifest["Canada Goose"] == {
+        "filename": "bird/canada_goose.jpg",
+        "source_url": "https://digitalmedia.fws.gov/digital/iiif/natdiglib/1489/full/800,/0/default.jpg",
+        "source_page": "https://digitalmedia.fws.gov/digital/collection/natdiglib/id/1489",
+        "license": "Public Domain (U.S. Government Work)",
+        "group": "bird",
+    }
+    assert manifest["Boat-tailed Grackle"]["license"] == "CC0 (Wikimedia Commons)"   # Wikidata P18
+    assert manifest["Mute Swan"]["license"] == "CC BY-SA (Wikimedia Commons)"        # Commons search
+    for entry in manifest.values():
+        assert (state / "wildlife_images" / entry["filename"]).stat().st_size > 0
+    assert replay.stats.snapshot()["misses"] == 0
@@ -0,0 +1,62 @@
+import { describe, it, expect } from 'vitest'
+import { aircraftNumber, aircraftSilhouettePath, bundledAircraft } from '@/lib/aircraft-bundle'
+import { AIRCRAFT_COUNT, allAircraft } from '@/lib/aircraft-data'
+import commercialRaw from '../public/commercial_aircraft.json'
+import militaryRaw from '../public/military_aircraft.json'
+
+// Reads the committed public/runtime/aircraft_bundle.json (scripts/build_aircraft_bundle.py)
+
+describe('bundledAircraft', () => {
+  it('keeps the bundle row order: military, then commercial', () => {
+    const rows = bundledAircraft()
+    const firstCommercial = rows.findIndex(a => a.category === 'commercial')
+    expect(firstCommercial).toBeGreaterThan(0)
+    expect(rows.slice(0, firstCommercial).every(a => a.category === 'military')).toBe(true)
+    expect(rows.slice(firstCommercial).every(a => a.category === 'commercial')).toBe(true)
+  })
+
+  it('renders every row back to its source strings', () => {
+    const rows = new Map(bundledAircraft().map(a => [a.aircraft, a]))
+    const sources: [string, Record<string, unknown>[]][] = [
+      ['military', militaryRaw as Record<string, unknown>[]],
+      ['commercial', commercialRaw as Record<string, unknown>[]],
+    ]
+    for (const [category, source] of sources) {
+      for (const { image_url: _url, image_license: _license, image_source_url: _source, ...entry } of source) {
+        const expected: Record<string, unknown> = { category }
+        for (const [field, value] of Object.entries(entry)) {
+          if (field === 'acn') {
+            const acn = Object.fromEntries(Object.entries((value ?? {}) as Record<string, string>).filter(([, v]) => v !== ''))
+            if (Object.keys(acn).length) expected.acn = acn
+          } else if (value !== '' && value !== null) {
+            expected[field] = value
+          }
+        }
+        const { image_url: _image, image_card_url: _card, ...row } = rows.get(entry.aircraft as string)!
+        expect(row).toEqual(expected)
+      }
+    }
+  })
+
+  it('keeps display strings verbatim and parses them for sorting', () => {
+    const c17 = bundledAircraft().find(a => a.aircraft === 'C-17A Globemaster III')!
+    expect(c17.max_to_wt_klbs).toBe('585.0')
+    expect(aircraftNumber(c17.aircraft, 'max_to_wt_klbs')).toBe(585)
+    expect(c17.source_page).toBe(84)
+    expect(c17.image_url).toBe('/aircraft_images/military/C-17A_Globemaster_III.jpg')
+    expect(c17).not.toHaveProperty('silhouette')
+    expect(aircraftSilhouettePath(c17.aircraft)).toBe('/aircraft_silhouettes/c17.svg')
+
+    // parseFloat() on the page reads the ACN weight as written
+    const a380 = bundledAircraft().find(a => a.acn?.max_wt === '1234.6')
+    expect(a380).toBeDefined()
+    expect(aircraftNumber(a380!.aircraft, 'acn.max_wt')).toBe(1234.6)
+  })
+})
+
+describe('allAircraft', () => {
+  it('is the bundle, counted by category', () => {
+    expect(allAircraft.map(a => a.aircraft)).toEqual(bundledAircraft().map(a => a.aircraft))
+    expect(AIRCRAFT_COUNT.military + AIRCRAFT_COUNT.commercial).toBe(AIRCRAFT_COUNT.total)
+  })
+})
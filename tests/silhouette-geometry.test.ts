@@ -0,0 +1,66 @@
+import { describe, it, expect } from 'vitest'
+import { decodeSilhouetteGeometry, silhouetteLodId, silhouetteLodTier } from '@/lib/silhouette-geometry'
+
+// ─────────────────────────────────────────────────────────────
+// Blob written by scripts/asset_geometry.py:
+//   encode({'c130': square, 'c130j': same square, 'c130@coarse': triangle}, grid=10)
+// with square (2,4)-(12,4)-(12,8)-(2,8) and triangle (2,4)-(12,6)-(2,8). On a
+// 10-step grid the lattice step is exactly 1, so every point decodes exactly;
+// c130 and c130j share one ring in the data section.
+// ─────────────────────────────────────────────────────────────
+
+const BLOB_BASE64 =
+  'U0xHMQEAAwAKAAAAEAAAABYAAAAAAABAAACAQAAAgD8AAAAAAQAAAAAAAEAAAIBAAACAPwAAAAAB' +
+  'AAAAAAAAQAAAgEAAAIA/CQAAAAEAAAAEAAAAAAAKAAAAAAAEAPb/AAADAAAAAAAKAAIA9v8CAGMx' +
+  'MzAKYzEzMGoKYzEzMEBjb2Fyc2U='
+
+function blob(): ArrayBuffer {
+  const bytes = Uint8Array.from(atob(BLOB_BASE64), c => c.charCodeAt(0))
+  return bytes.buffer
+}
+
+describe('decodeSilhouetteGeometry', () => {
+  it('decodes every shape in index order', () => {
+    const outlines = decodeSilhouetteGeometry(blob())
+    expect([...outlines.keys()]).toEqual(['c130', 'c130j', 'c130@coarse'])
+  })
+
+  it('rebuilds rings from the origin, step and deltas', () => {
+    const c130 = decodeSilhouetteGeometry(blob()).get('c130')!
+    expect(c130.rings).toHaveLength(1)
+    expect(Array.from(c130.rings[0])).toEqual([2, 4, 12, 4, 12, 8, 2, 8])
+    expect(c130.bbox).toEqual([2, 4, 12, 8])
+
+    const coarse = decodeSilhouetteGeometry(blob()).get('c130@coarse')!
+    expect(Array.from(coarse.rings[0])).toEqual([2, 4, 12, 6, 2, 8])
+  })
+
+  it('decodes shared data once per shape that points at it', () => {
+    const outlines = decodeSilhouetteGeometry(blob())
+    expect(Array.from(outlines.get('c130j')!.rings[0])).toEqual(Array.from(outlines.get('c130')!.rings[0]))
+    expect(outlines.get('c130j')!.bbox).toEqual(outlines.get('c130')!.bbox)
+  })
+
+  it('rejects other files', () => {
+    const bytes = new Uint8Array(blob())
+    bytes[3] = 0x32 // "SLG2"
+    expect(() => decodeSilhouetteGeometry(bytes.buffer)).toThrow()
+  })
+})
+
+describe('silhouette LOD tiers', () => {
+  it('picks the coarsest tier built for the on-screen size', () => {
+    expect(silhouetteLodTier(16)).toBe('coarse')
+    expect(silhouetteLodTier(24)).toBe('coarse')
+    expect(silhouetteLodTier(60)).toBe('medium')
+    expect(silhouetteLodTier(96)).toBe('medium')
+    expect(silhouetteLodTier(256)).toBe('full')
+  })
+
+  it('names the shape for a tier or a size', () => {
+    expect(silhouetteLodId('c130', 'coarse')).toBe('c130@coarse')
+    expect(silhouetteLodId('c130', 'full')).toBe('c130')
+    expect(silhouetteLodId('c130', 60)).toBe('c130@medium')
+    expect(silhouetteLodId('c130', 256)).toBe('c130')
+  })
+})